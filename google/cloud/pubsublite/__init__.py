@@ -15,97 +15,194 @@
 # limitations under the License.
 #
 
-from google.cloud.pubsublite_v1.services.admin_service.async_client import (
-    AdminServiceAsyncClient,
-)
-from google.cloud.pubsublite_v1.services.admin_service.client import AdminServiceClient
-from google.cloud.pubsublite_v1.services.cursor_service.async_client import (
-    CursorServiceAsyncClient,
-)
-from google.cloud.pubsublite_v1.services.cursor_service.client import (
-    CursorServiceClient,
-)
-from google.cloud.pubsublite_v1.services.partition_assignment_service.async_client import (
-    PartitionAssignmentServiceAsyncClient,
-)
-from google.cloud.pubsublite_v1.services.partition_assignment_service.client import (
-    PartitionAssignmentServiceClient,
-)
-from google.cloud.pubsublite_v1.services.publisher_service.async_client import (
-    PublisherServiceAsyncClient,
-)
-from google.cloud.pubsublite_v1.services.publisher_service.client import (
-    PublisherServiceClient,
-)
-from google.cloud.pubsublite_v1.services.subscriber_service.async_client import (
-    SubscriberServiceAsyncClient,
-)
-from google.cloud.pubsublite_v1.services.subscriber_service.client import (
-    SubscriberServiceClient,
-)
-from google.cloud.pubsublite_v1.services.topic_stats_service.async_client import (
-    TopicStatsServiceAsyncClient,
-)
-from google.cloud.pubsublite_v1.services.topic_stats_service.client import (
-    TopicStatsServiceClient,
-)
-from google.cloud.pubsublite_v1.types.admin import CreateSubscriptionRequest
-from google.cloud.pubsublite_v1.types.admin import CreateTopicRequest
-from google.cloud.pubsublite_v1.types.admin import DeleteSubscriptionRequest
-from google.cloud.pubsublite_v1.types.admin import DeleteTopicRequest
-from google.cloud.pubsublite_v1.types.admin import GetSubscriptionRequest
-from google.cloud.pubsublite_v1.types.admin import GetTopicPartitionsRequest
-from google.cloud.pubsublite_v1.types.admin import GetTopicRequest
-from google.cloud.pubsublite_v1.types.admin import ListSubscriptionsRequest
-from google.cloud.pubsublite_v1.types.admin import ListSubscriptionsResponse
-from google.cloud.pubsublite_v1.types.admin import ListTopicSubscriptionsRequest
-from google.cloud.pubsublite_v1.types.admin import ListTopicSubscriptionsResponse
-from google.cloud.pubsublite_v1.types.admin import ListTopicsRequest
-from google.cloud.pubsublite_v1.types.admin import ListTopicsResponse
-from google.cloud.pubsublite_v1.types.admin import TopicPartitions
-from google.cloud.pubsublite_v1.types.admin import UpdateSubscriptionRequest
-from google.cloud.pubsublite_v1.types.admin import UpdateTopicRequest
-from google.cloud.pubsublite_v1.types.common import AttributeValues
-from google.cloud.pubsublite_v1.types.common import Cursor
-from google.cloud.pubsublite_v1.types.common import PubSubMessage
-from google.cloud.pubsublite_v1.types.common import SequencedMessage
-from google.cloud.pubsublite_v1.types.common import Subscription
-from google.cloud.pubsublite_v1.types.common import Topic
-from google.cloud.pubsublite_v1.types.cursor import CommitCursorRequest
-from google.cloud.pubsublite_v1.types.cursor import CommitCursorResponse
-from google.cloud.pubsublite_v1.types.cursor import InitialCommitCursorRequest
-from google.cloud.pubsublite_v1.types.cursor import InitialCommitCursorResponse
-from google.cloud.pubsublite_v1.types.cursor import ListPartitionCursorsRequest
-from google.cloud.pubsublite_v1.types.cursor import ListPartitionCursorsResponse
-from google.cloud.pubsublite_v1.types.cursor import PartitionCursor
-from google.cloud.pubsublite_v1.types.cursor import SequencedCommitCursorRequest
-from google.cloud.pubsublite_v1.types.cursor import SequencedCommitCursorResponse
-from google.cloud.pubsublite_v1.types.cursor import StreamingCommitCursorRequest
-from google.cloud.pubsublite_v1.types.cursor import StreamingCommitCursorResponse
-from google.cloud.pubsublite_v1.types.publisher import InitialPublishRequest
-from google.cloud.pubsublite_v1.types.publisher import InitialPublishResponse
-from google.cloud.pubsublite_v1.types.publisher import MessagePublishRequest
-from google.cloud.pubsublite_v1.types.publisher import MessagePublishResponse
-from google.cloud.pubsublite_v1.types.publisher import PublishRequest
-from google.cloud.pubsublite_v1.types.publisher import PublishResponse
-from google.cloud.pubsublite_v1.types.subscriber import FlowControlRequest
-from google.cloud.pubsublite_v1.types.subscriber import (
-    InitialPartitionAssignmentRequest,
-)
-from google.cloud.pubsublite_v1.types.subscriber import InitialSubscribeRequest
-from google.cloud.pubsublite_v1.types.subscriber import InitialSubscribeResponse
-from google.cloud.pubsublite_v1.types.subscriber import MessageResponse
-from google.cloud.pubsublite_v1.types.subscriber import PartitionAssignment
-from google.cloud.pubsublite_v1.types.subscriber import PartitionAssignmentAck
-from google.cloud.pubsublite_v1.types.subscriber import PartitionAssignmentRequest
-from google.cloud.pubsublite_v1.types.subscriber import SeekRequest
-from google.cloud.pubsublite_v1.types.subscriber import SeekResponse
-from google.cloud.pubsublite_v1.types.subscriber import SubscribeRequest
-from google.cloud.pubsublite_v1.types.subscriber import SubscribeResponse
-from google.cloud.pubsublite_v1.types.topic_stats import ComputeMessageStatsRequest
-from google.cloud.pubsublite_v1.types.topic_stats import ComputeMessageStatsResponse
-from google.cloud.pubsublite.admin_client_interface import AdminClientInterface
-from google.cloud.pubsublite.admin_client import AdminClient
+import importlib
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from google.cloud.pubsublite_v1.services.admin_service.async_client import (
+        AdminServiceAsyncClient,
+    )
+    from google.cloud.pubsublite_v1.services.admin_service.client import (
+        AdminServiceClient,
+    )
+    from google.cloud.pubsublite_v1.services.cursor_service.async_client import (
+        CursorServiceAsyncClient,
+    )
+    from google.cloud.pubsublite_v1.services.cursor_service.client import (
+        CursorServiceClient,
+    )
+    from google.cloud.pubsublite_v1.services.partition_assignment_service.async_client import (
+        PartitionAssignmentServiceAsyncClient,
+    )
+    from google.cloud.pubsublite_v1.services.partition_assignment_service.client import (
+        PartitionAssignmentServiceClient,
+    )
+    from google.cloud.pubsublite_v1.services.publisher_service.async_client import (
+        PublisherServiceAsyncClient,
+    )
+    from google.cloud.pubsublite_v1.services.publisher_service.client import (
+        PublisherServiceClient,
+    )
+    from google.cloud.pubsublite_v1.services.subscriber_service.async_client import (
+        SubscriberServiceAsyncClient,
+    )
+    from google.cloud.pubsublite_v1.services.subscriber_service.client import (
+        SubscriberServiceClient,
+    )
+    from google.cloud.pubsublite_v1.services.topic_stats_service.async_client import (
+        TopicStatsServiceAsyncClient,
+    )
+    from google.cloud.pubsublite_v1.services.topic_stats_service.client import (
+        TopicStatsServiceClient,
+    )
+    from google.cloud.pubsublite_v1.types.admin import CreateSubscriptionRequest
+    from google.cloud.pubsublite_v1.types.admin import CreateTopicRequest
+    from google.cloud.pubsublite_v1.types.admin import DeleteSubscriptionRequest
+    from google.cloud.pubsublite_v1.types.admin import DeleteTopicRequest
+    from google.cloud.pubsublite_v1.types.admin import GetSubscriptionRequest
+    from google.cloud.pubsublite_v1.types.admin import GetTopicPartitionsRequest
+    from google.cloud.pubsublite_v1.types.admin import GetTopicRequest
+    from google.cloud.pubsublite_v1.types.admin import ListSubscriptionsRequest
+    from google.cloud.pubsublite_v1.types.admin import ListSubscriptionsResponse
+    from google.cloud.pubsublite_v1.types.admin import ListTopicSubscriptionsRequest
+    from google.cloud.pubsublite_v1.types.admin import ListTopicSubscriptionsResponse
+    from google.cloud.pubsublite_v1.types.admin import ListTopicsRequest
+    from google.cloud.pubsublite_v1.types.admin import ListTopicsResponse
+    from google.cloud.pubsublite_v1.types.admin import TopicPartitions
+    from google.cloud.pubsublite_v1.types.admin import UpdateSubscriptionRequest
+    from google.cloud.pubsublite_v1.types.admin import UpdateTopicRequest
+    from google.cloud.pubsublite_v1.types.common import AttributeValues
+    from google.cloud.pubsublite_v1.types.common import Cursor
+    from google.cloud.pubsublite_v1.types.common import PubSubMessage
+    from google.cloud.pubsublite_v1.types.common import SequencedMessage
+    from google.cloud.pubsublite_v1.types.common import Subscription
+    from google.cloud.pubsublite_v1.types.common import Topic
+    from google.cloud.pubsublite_v1.types.cursor import CommitCursorRequest
+    from google.cloud.pubsublite_v1.types.cursor import CommitCursorResponse
+    from google.cloud.pubsublite_v1.types.cursor import InitialCommitCursorRequest
+    from google.cloud.pubsublite_v1.types.cursor import InitialCommitCursorResponse
+    from google.cloud.pubsublite_v1.types.cursor import ListPartitionCursorsRequest
+    from google.cloud.pubsublite_v1.types.cursor import ListPartitionCursorsResponse
+    from google.cloud.pubsublite_v1.types.cursor import PartitionCursor
+    from google.cloud.pubsublite_v1.types.cursor import SequencedCommitCursorRequest
+    from google.cloud.pubsublite_v1.types.cursor import SequencedCommitCursorResponse
+    from google.cloud.pubsublite_v1.types.cursor import StreamingCommitCursorRequest
+    from google.cloud.pubsublite_v1.types.cursor import StreamingCommitCursorResponse
+    from google.cloud.pubsublite_v1.types.publisher import InitialPublishRequest
+    from google.cloud.pubsublite_v1.types.publisher import InitialPublishResponse
+    from google.cloud.pubsublite_v1.types.publisher import MessagePublishRequest
+    from google.cloud.pubsublite_v1.types.publisher import MessagePublishResponse
+    from google.cloud.pubsublite_v1.types.publisher import PublishRequest
+    from google.cloud.pubsublite_v1.types.publisher import PublishResponse
+    from google.cloud.pubsublite_v1.types.subscriber import FlowControlRequest
+    from google.cloud.pubsublite_v1.types.subscriber import (
+        InitialPartitionAssignmentRequest,
+    )
+    from google.cloud.pubsublite_v1.types.subscriber import InitialSubscribeRequest
+    from google.cloud.pubsublite_v1.types.subscriber import InitialSubscribeResponse
+    from google.cloud.pubsublite_v1.types.subscriber import MessageResponse
+    from google.cloud.pubsublite_v1.types.subscriber import PartitionAssignment
+    from google.cloud.pubsublite_v1.types.subscriber import PartitionAssignmentAck
+    from google.cloud.pubsublite_v1.types.subscriber import PartitionAssignmentRequest
+    from google.cloud.pubsublite_v1.types.subscriber import SeekRequest
+    from google.cloud.pubsublite_v1.types.subscriber import SeekResponse
+    from google.cloud.pubsublite_v1.types.subscriber import SubscribeRequest
+    from google.cloud.pubsublite_v1.types.subscriber import SubscribeResponse
+    from google.cloud.pubsublite_v1.types.topic_stats import ComputeMessageStatsRequest
+    from google.cloud.pubsublite_v1.types.topic_stats import ComputeMessageStatsResponse
+    from google.cloud.pubsublite.admin_client_interface import AdminClientInterface
+    from google.cloud.pubsublite.admin_client import AdminClient
+
+# The admin client and generated service clients are imported on first access, so that importing the package, or
+# one of its subpackages, does not load every service.
+_LAZY_IMPORTS = {
+    "AdminServiceAsyncClient": "google.cloud.pubsublite_v1.services.admin_service.async_client",
+    "AdminServiceClient": "google.cloud.pubsublite_v1.services.admin_service.client",
+    "CursorServiceAsyncClient": "google.cloud.pubsublite_v1.services.cursor_service.async_client",
+    "CursorServiceClient": "google.cloud.pubsublite_v1.services.cursor_service.client",
+    "PartitionAssignmentServiceAsyncClient": "google.cloud.pubsublite_v1.services.partition_assignment_service.async_client",
+    "PartitionAssignmentServiceClient": "google.cloud.pubsublite_v1.services.partition_assignment_service.client",
+    "PublisherServiceAsyncClient": "google.cloud.pubsublite_v1.services.publisher_service.async_client",
+    "PublisherServiceClient": "google.cloud.pubsublite_v1.services.publisher_service.client",
+    "SubscriberServiceAsyncClient": "google.cloud.pubsublite_v1.services.subscriber_service.async_client",
+    "SubscriberServiceClient": "google.cloud.pubsublite_v1.services.subscriber_service.client",
+    "TopicStatsServiceAsyncClient": "google.cloud.pubsublite_v1.services.topic_stats_service.async_client",
+    "TopicStatsServiceClient": "google.cloud.pubsublite_v1.services.topic_stats_service.client",
+    "CreateSubscriptionRequest": "google.cloud.pubsublite_v1.types.admin",
+    "CreateTopicRequest": "google.cloud.pubsublite_v1.types.admin",
+    "DeleteSubscriptionRequest": "google.cloud.pubsublite_v1.types.admin",
+    "DeleteTopicRequest": "google.cloud.pubsublite_v1.types.admin",
+    "GetSubscriptionRequest": "google.cloud.pubsublite_v1.types.admin",
+    "GetTopicPartitionsRequest": "google.cloud.pubsublite_v1.types.admin",
+    "GetTopicRequest": "google.cloud.pubsublite_v1.types.admin",
+    "ListSubscriptionsRequest": "google.cloud.pubsublite_v1.types.admin",
+    "ListSubscriptionsResponse": "google.cloud.pubsublite_v1.types.admin",
+    "ListTopicSubscriptionsRequest": "google.cloud.pubsublite_v1.types.admin",
+    "ListTopicSubscriptionsResponse": "google.cloud.pubsublite_v1.types.admin",
+    "ListTopicsRequest": "google.cloud.pubsublite_v1.types.admin",
+    "ListTopicsResponse": "google.cloud.pubsublite_v1.types.admin",
+    "TopicPartitions": "google.cloud.pubsublite_v1.types.admin",
+    "UpdateSubscriptionRequest": "google.cloud.pubsublite_v1.types.admin",
+    "UpdateTopicRequest": "google.cloud.pubsublite_v1.types.admin",
+    "AttributeValues": "google.cloud.pubsublite_v1.types.common",
+    "Cursor": "google.cloud.pubsublite_v1.types.common",
+    "PubSubMessage": "google.cloud.pubsublite_v1.types.common",
+    "SequencedMessage": "google.cloud.pubsublite_v1.types.common",
+    "Subscription": "google.cloud.pubsublite_v1.types.common",
+    "Topic": "google.cloud.pubsublite_v1.types.common",
+    "CommitCursorRequest": "google.cloud.pubsublite_v1.types.cursor",
+    "CommitCursorResponse": "google.cloud.pubsublite_v1.types.cursor",
+    "InitialCommitCursorRequest": "google.cloud.pubsublite_v1.types.cursor",
+    "InitialCommitCursorResponse": "google.cloud.pubsublite_v1.types.cursor",
+    "ListPartitionCursorsRequest": "google.cloud.pubsublite_v1.types.cursor",
+    "ListPartitionCursorsResponse": "google.cloud.pubsublite_v1.types.cursor",
+    "PartitionCursor": "google.cloud.pubsublite_v1.types.cursor",
+    "SequencedCommitCursorRequest": "google.cloud.pubsublite_v1.types.cursor",
+    "SequencedCommitCursorResponse": "google.cloud.pubsublite_v1.types.cursor",
+    "StreamingCommitCursorRequest": "google.cloud.pubsublite_v1.types.cursor",
+    "StreamingCommitCursorResponse": "google.cloud.pubsublite_v1.types.cursor",
+    "InitialPublishRequest": "google.cloud.pubsublite_v1.types.publisher",
+    "InitialPublishResponse": "google.cloud.pubsublite_v1.types.publisher",
+    "MessagePublishRequest": "google.cloud.pubsublite_v1.types.publisher",
+    "MessagePublishResponse": "google.cloud.pubsublite_v1.types.publisher",
+    "PublishRequest": "google.cloud.pubsublite_v1.types.publisher",
+    "PublishResponse": "google.cloud.pubsublite_v1.types.publisher",
+    "FlowControlRequest": "google.cloud.pubsublite_v1.types.subscriber",
+    "InitialPartitionAssignmentRequest": "google.cloud.pubsublite_v1.types.subscriber",
+    "InitialSubscribeRequest": "google.cloud.pubsublite_v1.types.subscriber",
+    "InitialSubscribeResponse": "google.cloud.pubsublite_v1.types.subscriber",
+    "MessageResponse": "google.cloud.pubsublite_v1.types.subscriber",
+    "PartitionAssignment": "google.cloud.pubsublite_v1.types.subscriber",
+    "PartitionAssignmentAck": "google.cloud.pubsublite_v1.types.subscriber",
+    "PartitionAssignmentRequest": "google.cloud.pubsublite_v1.types.subscriber",
+    "SeekRequest": "google.cloud.pubsublite_v1.types.subscriber",
+    "SeekResponse": "google.cloud.pubsublite_v1.types.subscriber",
+    "SubscribeRequest": "google.cloud.pubsublite_v1.types.subscriber",
+    "SubscribeResponse": "google.cloud.pubsublite_v1.types.subscriber",
+    "ComputeMessageStatsRequest": "google.cloud.pubsublite_v1.types.topic_stats",
+    "ComputeMessageStatsResponse": "google.cloud.pubsublite_v1.types.topic_stats",
+    "AdminClientInterface": "google.cloud.pubsublite.admin_client_interface",
+    "AdminClient": "google.cloud.pubsublite.admin_client",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# Module __getattr__ is only supported from python 3.7.
+if sys.version_info < (3, 7):  # pragma: NO COVER
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
 
 __all__ = (
     # Manual files
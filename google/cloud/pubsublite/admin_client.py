@@ -20,6 +20,11 @@ from google.auth.credentials import Credentials
 from google.protobuf.field_mask_pb2 import FieldMask
 
 from google.cloud.pubsublite.admin_client_interface import AdminClientInterface
+from google.cloud.pubsublite.internal.channel_pool import (
+    DEFAULT_CHANNEL_POOL_SIZE,
+    can_pool,
+    get_sync_channel_pool,
+)
 from google.cloud.pubsublite.internal.constructable_from_service_account import (
     ConstructableFromServiceAccount,
 )
@@ -33,6 +38,9 @@ from google.cloud.pubsublite.types import (
     BacklogLocation,
 )
 from google.cloud.pubsublite_v1 import AdminServiceClient, Subscription, Topic
+from google.cloud.pubsublite_v1.services.admin_service.transports.grpc import (
+    AdminServiceGrpcTransport,
+)
 
 
 class AdminClient(AdminClientInterface, ConstructableFromServiceAccount):
@@ -48,6 +56,7 @@ class AdminClient(AdminClientInterface, ConstructableFromServiceAccount):
         credentials: Optional[Credentials] = None,
         transport: Optional[str] = None,
         client_options: Optional[ClientOptions] = None,
+        channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
     ):
         """
         Create a new AdminClient.
@@ -57,9 +66,20 @@ class AdminClient(AdminClientInterface, ConstructableFromServiceAccount):
             credentials: The credentials to use when connecting.
             transport: The transport to use.
             client_options: The client options to use when connecting. If used, must explicitly set `api_endpoint`.
+            channel_pool_size: The maximum number of channels shared by admin clients with the same endpoint and
+                credentials.
         """
         if client_options is None:
             client_options = ClientOptions(api_endpoint=regional_endpoint(region))
+        if can_pool(transport, client_options):
+            # Admin calls are unary, so they share the least loaded channel to the endpoint.
+            transport = AdminServiceGrpcTransport(
+                host=client_options.api_endpoint,
+                channel=get_sync_channel_pool(
+                    client_options, credentials, channel_pool_size
+                ).channel(),
+            )
+            credentials = None
         self._impl = AdminClientImpl(
             AdminServiceClient(
                 client_options=client_options,
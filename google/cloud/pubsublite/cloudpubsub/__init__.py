@@ -12,29 +12,79 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-# flake8: noqa
-from .message_transformer import MessageTransformer
-from .nack_handler import NackHandler
-from .publisher_client import AsyncPublisherClient, PublisherClient
-from .publisher_client_interface import (
-    AsyncPublisherClientInterface,
-    PublisherClientInterface,
-)
-from .subscriber_client import AsyncSubscriberClient, SubscriberClient
-from .subscriber_client_interface import (
-    AsyncSubscriberClientInterface,
-    SubscriberClientInterface,
-)
+import importlib
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from .assignment_listener import AssignmentListener
+    from .event_loop_pool import EventLoopPool, uvloop_if_installed
+    from .message_transformer import MessageTransformer
+    from .nack_handler import NackHandler
+    from .publisher_client import AsyncPublisherClient, PublisherClient
+    from .publisher_client_interface import (
+        AsyncPublisherClientInterface,
+        PublisherClientInterface,
+    )
+    from .subscriber_client import (
+        AsyncSubscriberClient,
+        ProcessPoolSubscriberClient,
+        SubscriberClient,
+    )
+    from .subscriber_client_interface import (
+        AsyncSubscriberClientInterface,
+        SubscriberClientInterface,
+    )
+
+# Publisher and subscriber clients are imported on first access, so that a program using one does not load the other.
+_LAZY_IMPORTS = {
+    "AssignmentListener": ".assignment_listener",
+    "AsyncPublisherClient": ".publisher_client",
+    "AsyncPublisherClientInterface": ".publisher_client_interface",
+    "AsyncSubscriberClient": ".subscriber_client",
+    "AsyncSubscriberClientInterface": ".subscriber_client_interface",
+    "EventLoopPool": ".event_loop_pool",
+    "MessageTransformer": ".message_transformer",
+    "NackHandler": ".nack_handler",
+    "ProcessPoolSubscriberClient": ".subscriber_client",
+    "PublisherClient": ".publisher_client",
+    "PublisherClientInterface": ".publisher_client_interface",
+    "SubscriberClient": ".subscriber_client",
+    "SubscriberClientInterface": ".subscriber_client_interface",
+    "uvloop_if_installed": ".event_loop_pool",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# Module __getattr__ is only supported from python 3.7.
+if sys.version_info < (3, 7):  # pragma: NO COVER
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
 
 __all__ = (
+    "AssignmentListener",
     "AsyncPublisherClient",
     "AsyncPublisherClientInterface",
     "AsyncSubscriberClient",
     "AsyncSubscriberClientInterface",
+    "EventLoopPool",
     "MessageTransformer",
     "NackHandler",
+    "ProcessPoolSubscriberClient",
     "PublisherClient",
     "PublisherClientInterface",
     "SubscriberClient",
     "SubscriberClientInterface",
+    "uvloop_if_installed",
 )
@@ -0,0 +1,55 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC
+from typing import Set
+
+from google.cloud.pubsublite.types import Partition, SubscriptionPath
+
+
+class AssignmentListener(ABC):
+    """
+  An AssignmentListener is notified when partitions are assigned to or revoked from a subscriber. It is called from a
+  thread other than the subscriber's event loop thread and may block, which delays the rebalance until it returns. A
+  client's listener is shared by all of its subscriptions, so each call identifies the subscription which changed.
+  """
+
+    def on_partitions_assigned(
+        self, subscription: SubscriptionPath, partitions: Set[Partition]
+    ):
+        """Called with newly assigned partitions before any messages are read from them.
+
+    Args:
+      subscription: The subscription whose partitions were assigned.
+      partitions: The partitions which were assigned.
+
+    Raises:
+      GoogleAPICallError: To fail the client if raised inline.
+    """
+        pass
+
+    def on_partitions_revoked(
+        self, subscription: SubscriptionPath, partitions: Set[Partition]
+    ):
+        """Called with revoked partitions after messages are no longer read from them, but before waiting for
+    outstanding acks to be committed. Messages already received from these partitions may still be acked.
+
+    Args:
+      subscription: The subscription whose partitions were revoked.
+      partitions: The partitions which were revoked.
+
+    Raises:
+      GoogleAPICallError: To fail the client if raised inline.
+    """
+        pass
@@ -0,0 +1,118 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Hashable, List, Optional
+
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    EventLoopHandle,
+    LoopFactory,
+    ManagedEventLoop,
+)
+
+
+def uvloop_if_installed() -> asyncio.AbstractEventLoop:
+    """
+    A loop_factory which creates a uvloop event loop if uvloop is installed, and a default asyncio event loop
+    otherwise.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+class EventLoopPool:
+    """
+    A fixed number of event loop threads shared by synchronous clients. Topics and subscriptions are hashed across the
+    loops. A loop's thread is started when the first publisher or subscriber using it starts, and is stopped when the
+    last one exits.
+
+    The same pool may be passed to any number of PublisherClients and SubscriberClients.
+    """
+
+    _size: int
+    _loop_factory: Optional[LoopFactory]
+    _lock: threading.Lock
+    _loops: List[Optional[ManagedEventLoop]]
+    _users: List[int]
+
+    def __init__(self, size: int = 1, loop_factory: Optional[LoopFactory] = None):
+        """
+        Create a new EventLoopPool.
+
+        Args:
+            size: The number of event loop threads.
+            loop_factory: Creates each event loop, for example uvloop_if_installed. A default asyncio event loop is
+                used if None.
+        """
+        if size < 1:
+            raise InvalidArgument(
+                f"Event loop pool size must be at least 1, was {size}."
+            )
+        self._size = size
+        self._loop_factory = loop_factory
+        self._lock = threading.Lock()
+        self._loops = [None] * size
+        self._users = [0] * size
+
+    def loop_for(self, key: Hashable) -> EventLoopHandle:
+        """Get a handle to the event loop used for the given topic or subscription."""
+        return _PooledEventLoop(self, hash(key) % self._size)
+
+    def _acquire(self, index: int) -> ManagedEventLoop:
+        with self._lock:
+            if self._users[index] == 0:
+                loop = ManagedEventLoop(self._loop_factory)
+                loop.__enter__()
+                self._loops[index] = loop
+            self._users[index] += 1
+            return self._loops[index]
+
+    def _release(self, index: int):
+        with self._lock:
+            self._users[index] -= 1
+            if self._users[index] > 0:
+                return
+            loop = self._loops[index]
+            self._loops[index] = None
+        loop.__exit__(None, None, None)
+
+
+class _PooledEventLoop(EventLoopHandle):
+    _pool: EventLoopPool
+    _index: int
+    _loop: Optional[ManagedEventLoop]
+
+    def __init__(self, pool: EventLoopPool, index: int):
+        self._pool = pool
+        self._index = index
+        self._loop = None
+
+    def __enter__(self):
+        self._loop = self._pool._acquire(self._index)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._loop = None
+        self._pool._release(self._index)
+
+    def submit(self, coro) -> Future:
+        assert self._loop is not None
+        return self._loop.submit(coro)
@@ -0,0 +1,189 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import time
+from typing import Callable, Optional
+
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.partition_flow_control import (
+    FlowGrant,
+    PartitionFlowControl,
+)
+from google.cloud.pubsublite.types import FlowControlSettings
+from google.cloud.pubsublite_v1 import FlowControlRequest
+
+_SAMPLE_SECONDS = 0.5
+_EWMA_WEIGHT = 0.3
+# The window is sized to this multiple of the bandwidth delay product.
+_HEADROOM = 2.0
+_GROWTH_FACTOR = 2.0
+_SHRINK_FACTOR = 0.75
+
+
+def _ewma(current: Optional[float], sample: float) -> float:
+    if current is None:
+        return sample
+    return _EWMA_WEIGHT * sample + (1 - _EWMA_WEIGHT) * current
+
+
+def _clamp(value: float, lower: int, upper: int) -> int:
+    return int(max(lower, min(upper, math.ceil(value))))
+
+
+class AdaptiveFlowControl(PartitionFlowControl):
+    """
+    Sizes a partition's flow control window to its bandwidth delay product: the ack rate multiplied by the fill time,
+    which is the delay between granting tokens to a starved stream and receiving messages with them.
+
+    Every sample period, the window grows multiplicatively if the stream was starved for tokens while the consumer was
+    keeping up, and otherwise decays toward the bandwidth delay product, always staying between min_settings and
+    max_settings. Tokens for acked messages are withheld while the window is above its size.
+    """
+
+    _min: FlowControlSettings
+    _max: FlowControlSettings
+    _clock: Callable[[], float]
+    _grant: Optional[FlowGrant]
+
+    _window_messages: int
+    _window_bytes: int
+    _credit_messages: int
+    _credit_bytes: int
+    _outstanding_messages: int
+    _outstanding_bytes: int
+
+    _ack_rate: Optional[float]
+    _fill_seconds: Optional[float]
+    _message_bytes: Optional[float]
+    _starved_grant_time: Optional[float]
+    _sample_start: float
+    _sample_acks: int
+    _sample_starved: bool
+
+    def __init__(
+        self,
+        min_settings: FlowControlSettings,
+        max_settings: FlowControlSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if min_settings.messages_outstanding < 1 or min_settings.bytes_outstanding < 1:
+            raise InvalidArgument(
+                f"Minimum flow control must allow at least one message and byte, was {min_settings}."
+            )
+        if (
+            min_settings.messages_outstanding > max_settings.messages_outstanding
+            or min_settings.bytes_outstanding > max_settings.bytes_outstanding
+        ):
+            raise InvalidArgument(
+                f"Minimum flow control {min_settings} exceeds maximum {max_settings}."
+            )
+        self._min = min_settings
+        self._max = max_settings
+        self._clock = clock
+        self._grant = None
+        self._window_messages = min_settings.messages_outstanding
+        self._window_bytes = min_settings.bytes_outstanding
+        self._credit_messages = 0
+        self._credit_bytes = 0
+        self._outstanding_messages = 0
+        self._outstanding_bytes = 0
+        self._ack_rate = None
+        self._fill_seconds = None
+        self._message_bytes = None
+        self._starved_grant_time = None
+        self._sample_start = clock()
+        self._sample_acks = 0
+        self._sample_starved = False
+
+    def window(self) -> FlowControlSettings:
+        """The current size of the window."""
+        return FlowControlSettings(self._window_messages, self._window_bytes)
+
+    def _starved(self) -> bool:
+        return self._credit_messages <= 0 or self._credit_bytes <= 0
+
+    def _top_up(self):
+        messages = max(
+            0,
+            self._window_messages - self._credit_messages - self._outstanding_messages,
+        )
+        size_bytes = max(
+            0, self._window_bytes - self._credit_bytes - self._outstanding_bytes
+        )
+        if self._grant is None or (messages == 0 and size_bytes == 0):
+            return
+        if self._starved() and self._starved_grant_time is None:
+            self._starved_grant_time = self._clock()
+        self._credit_messages += messages
+        self._credit_bytes += size_bytes
+        self._grant(
+            FlowControlRequest(allowed_messages=messages, allowed_bytes=size_bytes)
+        )
+
+    def _resize(self):
+        now = self._clock()
+        elapsed = now - self._sample_start
+        if elapsed < _SAMPLE_SECONDS:
+            return
+        self._ack_rate = _ewma(self._ack_rate, self._sample_acks / elapsed)
+        target = _HEADROOM * self._ack_rate * (self._fill_seconds or 0)
+        if self._sample_starved:
+            window = max(self._window_messages * _GROWTH_FACTOR, target)
+        else:
+            window = max(self._window_messages * _SHRINK_FACTOR, target)
+        self._window_messages = _clamp(
+            window, self._min.messages_outstanding, self._max.messages_outstanding
+        )
+        if self._message_bytes is not None:
+            self._window_bytes = _clamp(
+                self._window_messages * self._message_bytes,
+                self._min.bytes_outstanding,
+                self._max.bytes_outstanding,
+            )
+        self._sample_start = now
+        self._sample_acks = 0
+        self._sample_starved = False
+
+    def start(self, grant: FlowGrant):
+        self._grant = grant
+        self._top_up()
+
+    def on_received(self, messages: int, size_bytes: int):
+        if self._starved_grant_time is not None:
+            self._fill_seconds = _ewma(
+                self._fill_seconds, self._clock() - self._starved_grant_time
+            )
+            self._starved_grant_time = None
+        self._message_bytes = _ewma(self._message_bytes, size_bytes / messages)
+        # The stream is limited by the window rather than the consumer if the consumer had drained most of the window
+        # when the server ran out of tokens.
+        drained = self._outstanding_messages * 2 < self._window_messages
+        self._credit_messages -= messages
+        self._credit_bytes -= size_bytes
+        self._outstanding_messages += messages
+        self._outstanding_bytes += size_bytes
+        if drained and self._starved():
+            self._sample_starved = True
+
+    def on_acked(self, messages: int, size_bytes: int):
+        self._outstanding_messages -= messages
+        self._outstanding_bytes -= size_bytes
+        self._sample_acks += messages
+        self._resize()
+        self._top_up()
+
+    def stop(self):
+        self._grant = None
@@ -12,87 +12,222 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from asyncio import Future, Queue, ensure_future
-from typing import Callable, NamedTuple, Dict, Set, Optional
+import asyncio
+import logging
+from asyncio import Future, ensure_future
+from typing import Callable, NamedTuple, Dict, List, Set, Optional
 
+from google.api_core.exceptions import GoogleAPICallError
 from google.cloud.pubsub_v1.subscriber.message import Message
 
+from google.cloud.pubsublite.cloudpubsub.assignment_listener import AssignmentListener
+from google.cloud.pubsublite.cloudpubsub.internal.partition_merger import (
+    PartitionMerger,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
     AsyncSingleSubscriber,
+    AsyncPartitionSubscriber,
+)
+from google.cloud.pubsublite.internal.gather_bounded import (
+    gather_bounded,
+    DEFAULT_MAX_PARALLELISM,
 )
 from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_cancelled
 from google.cloud.pubsublite.internal.wire.assigner import Assigner
 from google.cloud.pubsublite.internal.wire.permanent_failable import PermanentFailable
-from google.cloud.pubsublite.types import Partition
+from google.cloud.pubsublite.types import Partition, SubscriptionPath
+
+_LOGGER = logging.getLogger(__name__)
 
-PartitionSubscriberFactory = Callable[[Partition], AsyncSingleSubscriber]
+DEFAULT_REVOCATION_GRACE_SECONDS = 30.0
+DEFAULT_MAX_BUFFERED_PER_PARTITION = 1000
+
+PartitionSubscriberFactory = Callable[[Partition], AsyncPartitionSubscriber]
 
 
 class _RunningSubscriber(NamedTuple):
-    subscriber: AsyncSingleSubscriber
+    subscriber: AsyncPartitionSubscriber
     poller: Future
 
 
 class AssigningSingleSubscriber(AsyncSingleSubscriber, PermanentFailable):
     _assigner_factory: Callable[[], Assigner]
     _subscriber_factory: PartitionSubscriberFactory
+    _max_parallelism: int
+    _assignment_listener: Optional[AssignmentListener]
+    _subscription: Optional[SubscriptionPath]
+    _revocation_grace_seconds: float
+    _max_buffered_per_partition: int
+    _partition_weight: Callable[[Partition], int]
 
     _subscribers: Dict[Partition, _RunningSubscriber]
+    # Revoked subscribers which have not yet been exited.
+    _releasing: Dict[Partition, _RunningSubscriber]
 
     # Lazily initialized to ensure they are initialized on the thread where __aenter__ is called.
     _assigner: Optional[Assigner]
-    _messages: Optional["Queue[Message]"]
+    _merger: Optional[PartitionMerger]
     _assign_poller: Future
 
     def __init__(
         self,
         assigner_factory: Callable[[], Assigner],
         subscriber_factory: PartitionSubscriberFactory,
+        max_parallelism: int = DEFAULT_MAX_PARALLELISM,
+        assignment_listener: Optional[AssignmentListener] = None,
+        revocation_grace_seconds: float = DEFAULT_REVOCATION_GRACE_SECONDS,
+        max_buffered_per_partition: int = DEFAULT_MAX_BUFFERED_PER_PARTITION,
+        partition_weight: Optional[Callable[[Partition], int]] = None,
+        subscription: Optional[SubscriptionPath] = None,
     ):
         """
         Accepts a factory for an Assigner instead of an Assigner because GRPC asyncio uses the current thread's event
         loop.
+
+        At most max_parallelism partition subscribers are started or stopped at once. When a partition is revoked,
+        reading from it stops and its subscriber waits up to revocation_grace_seconds for outstanding acks to be
+        committed before it is released, so the next owner does not redeliver messages which were processed.
+
+        Messages are moved from each partition in batches into a buffer of at most max_buffered_per_partition messages,
+        or a single batch if it is larger, and read from the buffers in weighted round-robin order. partition_weight gives the number of messages read
+        from a partition per turn, which is 1 for every partition if None.
+
+        The assignment_listener is notified with the subscription, which is required if a listener is provided.
         """
+        if assignment_listener is not None and subscription is None:
+            raise ValueError(
+                "A subscription is required to notify an assignment listener."
+            )
         super().__init__()
         self._assigner_factory = assigner_factory
         self._assigner = None
         self._subscriber_factory = subscriber_factory
+        self._max_parallelism = max_parallelism
+        self._assignment_listener = assignment_listener
+        self._subscription = subscription
+        self._revocation_grace_seconds = revocation_grace_seconds
+        self._max_buffered_per_partition = max_buffered_per_partition
+        self._partition_weight = partition_weight or (lambda partition: 1)
         self._subscribers = {}
-        self._messages = None
+        self._releasing = {}
+        self._merger = None
 
     async def read(self) -> Message:
-        return await self.await_unless_failed(self._messages.get())
+        return await self.await_unless_failed(self._merger.get())
+
+    def buffered_messages(self) -> Dict[Partition, int]:
+        if self._merger is None:
+            return {}
+        return self._merger.depths()
+
+    async def _subscribe_action(
+        self, partition: Partition, subscriber: AsyncPartitionSubscriber
+    ):
+        batch = await subscriber.read_batch()
+        await self._merger.put(partition, batch)
+
+    async def _notify(
+        self,
+        notify: Callable[[SubscriptionPath, Set[Partition]], None],
+        partitions: Set[Partition],
+    ):
+        # Listeners may block, so they must not run on the event loop.
+        await asyncio.get_event_loop().run_in_executor(
+            None, notify, self._subscription, partitions
+        )
+
+    async def _notify_assigned(self, partitions: Set[Partition]):
+        if self._assignment_listener is not None and partitions:
+            await self._notify(
+                self._assignment_listener.on_partitions_assigned, partitions
+            )
 
-    async def _subscribe_action(self, subscriber: AsyncSingleSubscriber):
-        message = await subscriber.read()
-        await self._messages.put(message)
+    async def _notify_revoked(self, partitions: Set[Partition]):
+        if self._assignment_listener is not None and partitions:
+            await self._notify(
+                self._assignment_listener.on_partitions_revoked, partitions
+            )
 
     async def _start_subscriber(self, partition: Partition):
         new_subscriber = self._subscriber_factory(partition)
         await new_subscriber.__aenter__()
+        self._merger.add_partition(partition, self._partition_weight(partition))
         poller = ensure_future(
-            self.run_poller(lambda: self._subscribe_action(new_subscriber))
+            self.run_poller(lambda: self._subscribe_action(partition, new_subscriber))
         )
         self._subscribers[partition] = _RunningSubscriber(new_subscriber, poller)
 
-    async def _stop_subscriber(self, running: _RunningSubscriber):
+    @staticmethod
+    async def _stop_polling(running: _RunningSubscriber):
         running.poller.cancel()
         await wait_ignore_cancelled(running.poller)
-        await running.subscriber.__aexit__(None, None, None)
+
+    async def _release_subscriber(
+        self,
+        partition: Partition,
+        running: _RunningSubscriber,
+        abandoned: List[Message],
+    ):
+        try:
+            await asyncio.wait_for(
+                running.subscriber.wait_for_acks(abandoned),
+                self._revocation_grace_seconds,
+            )
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                f"Timed out waiting for acks on revoked partition {partition}, unacked messages will be redelivered."
+            )
+        except GoogleAPICallError as e:
+            _LOGGER.debug(f"Revoked partition {partition} failed while draining: {e}")
+        interrupted = False
+        try:
+            await running.subscriber.__aexit__(None, None, None)
+        except asyncio.CancelledError:
+            # Left tracked, so that the shutdown which interrupted the exit closes the subscriber.
+            interrupted = True
+            raise
+        finally:
+            if not interrupted and self._releasing.get(partition) is running:
+                del self._releasing[partition]
+
+    async def _revoke(self, removed_partitions: Set[Partition]):
+        removed = {
+            partition: self._subscribers.pop(partition)
+            for partition in removed_partitions
+        }
+        self._releasing.update(removed)
+        # Stop reading first, so no new messages from revoked partitions are delivered.
+        await gather_bounded(
+            [self._stop_polling(running) for running in removed.values()],
+            self._max_parallelism,
+        )
+        abandoned = {
+            partition: self._merger.remove_partition(partition)
+            for partition in removed_partitions
+        }
+        await self._notify_revoked(removed_partitions)
+        await gather_bounded(
+            [
+                self._release_subscriber(partition, running, abandoned[partition])
+                for partition, running in removed.items()
+            ],
+            self._max_parallelism,
+        )
 
     async def _assign_action(self):
         assignment: Set[Partition] = await self._assigner.get_assignment()
         added_partitions = assignment - self._subscribers.keys()
         removed_partitions = self._subscribers.keys() - assignment
-        for partition in added_partitions:
-            await self._start_subscriber(partition)
-        for partition in removed_partitions:
-            subscriber = self._subscribers[partition]
-            del self._subscribers[partition]
-            await self._stop_subscriber(subscriber)
+        await self._notify_assigned(added_partitions)
+        # Subscribers which have started deliver messages while the rest are starting.
+        await gather_bounded(
+            [self._start_subscriber(partition) for partition in added_partitions],
+            self._max_parallelism,
+        )
+        await self._revoke(removed_partitions)
 
     async def __aenter__(self):
-        self._messages = Queue()
+        self._merger = PartitionMerger(self._max_buffered_per_partition)
         self._assigner = self._assigner_factory()
         await self._assigner.__aenter__()
         self._assign_poller = ensure_future(self.run_poller(self._assign_action))
@@ -102,6 +237,21 @@ class AssigningSingleSubscriber(AsyncSingleSubscriber, PermanentFailable):
         self._assign_poller.cancel()
         await wait_ignore_cancelled(self._assign_poller)
         await self._assigner.__aexit__(exc_type, exc_value, traceback)
-        for running in self._subscribers.values():
-            await self._stop_subscriber(running)
-        pass
+        # Subscribers still draining after being revoked are exited along with the assigned ones.
+        releasing = list(self._releasing.values())
+        self._releasing = {}
+        await gather_bounded(
+            [
+                self._stop_polling(running)
+                for running in list(self._subscribers.values()) + releasing
+            ],
+            self._max_parallelism,
+        )
+        await self._notify_revoked(set(self._subscribers))
+        await gather_bounded(
+            [
+                running.subscriber.__aexit__(None, None, None)
+                for running in list(self._subscribers.values()) + releasing
+            ],
+            self._max_parallelism,
+        )
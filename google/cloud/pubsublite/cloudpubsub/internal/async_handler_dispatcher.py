@@ -0,0 +1,118 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Optional, Set
+
+from google.api_core.exceptions import InvalidArgument
+from google.cloud.pubsub_v1.subscriber.message import Message
+
+from google.cloud.pubsublite.cloudpubsub.subscriber_client_interface import (
+    AsyncMessageHandler,
+)
+from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_errors
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncHandlerDispatcher:
+    """
+    Runs an async handler on each message from an iterator as a task, with at most max_concurrency handlers running.
+
+    A slot in the semaphore must be acquired before the next message is read, so a saturated dispatcher stops pulling
+    from the subscriber and flow control tokens are only returned to the server as handlers complete.
+    """
+
+    _messages: AsyncIterator[Message]
+    _handler: AsyncMessageHandler
+    _max_concurrency: int
+    _ordered_by_key: bool
+
+    _semaphore: Optional[asyncio.Semaphore]
+    _running: Set[asyncio.Future]
+    _key_tails: Dict[str, asyncio.Future]
+
+    def __init__(
+        self,
+        messages: AsyncIterator[Message],
+        handler: AsyncMessageHandler,
+        max_concurrency: int,
+        ordered_by_key: bool,
+    ):
+        if max_concurrency < 1:
+            raise InvalidArgument(
+                f"max_concurrency must be at least 1, was {max_concurrency}."
+            )
+        self._messages = messages
+        self._handler = handler
+        self._max_concurrency = max_concurrency
+        self._ordered_by_key = ordered_by_key
+        self._semaphore = None
+        self._running = set()
+        self._key_tails = {}
+
+    async def _handle(self, message: Message, previous: Optional[asyncio.Future]):
+        try:
+            if previous is not None:
+                await wait_ignore_errors(previous)
+            try:
+                await self._handler(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _LOGGER.debug(f"Message handler failed, nacking message: {e}")
+                message.nack()
+                return
+            message.ack()
+        finally:
+            self._semaphore.release()
+
+    def _on_done(self, key: str, task: asyncio.Future):
+        self._running.discard(task)
+        if self._key_tails.get(key) is task:
+            del self._key_tails[key]
+
+    def _dispatch(self, message: Message):
+        key = message.ordering_key if self._ordered_by_key else ""
+        previous = self._key_tails.get(key) if key else None
+        task = asyncio.ensure_future(self._handle(message, previous))
+        self._running.add(task)
+        if key:
+            self._key_tails[key] = task
+        task.add_done_callback(lambda fut: self._on_done(key, fut))
+
+    async def _stop_running(self):
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        for task in running:
+            await wait_ignore_errors(task)
+
+    async def run(self):
+        """
+        Dispatch messages until the iterator fails or this is cancelled, in which case running handlers are cancelled.
+        """
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        try:
+            while True:
+                await self._semaphore.acquire()
+                try:
+                    message = await self._messages.__anext__()
+                except:  # noqa: E722
+                    self._semaphore.release()
+                    raise
+                self._dispatch(message)
+        finally:
+            await self._stop_running()
@@ -23,6 +23,7 @@ from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
     AsyncSinglePublisher,
 )
 from google.cloud.pubsublite.internal.wire.publisher import Publisher
+from google.cloud.pubsublite.types import Partition
 
 
 class AsyncSinglePublisherImpl(AsyncSinglePublisher):
@@ -39,13 +40,21 @@ class AsyncSinglePublisherImpl(AsyncSinglePublisher):
         self._publisher = None
 
     async def publish(
-        self, data: bytes, ordering_key: str = "", **attrs: Mapping[str, str]
+        self,
+        data: bytes,
+        ordering_key: str = "",
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> str:
         cps_message = PubsubMessage(
             data=data, ordering_key=ordering_key, attributes=attrs
         )
         psl_message = from_cps_publish_message(cps_message)
-        return (await self._publisher.publish(psl_message)).encode()
+        return (await self._publisher.publish(psl_message, partition)).encode()
+
+    async def flush(self):
+        await self._publisher.flush()
 
     async def __aenter__(self):
         self._publisher = self._publisher_factory()
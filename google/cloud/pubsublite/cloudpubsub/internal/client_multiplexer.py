@@ -13,22 +13,31 @@
 # limitations under the License.
 
 import asyncio
+import concurrent.futures
 import threading
-from typing import Generic, TypeVar, Callable, Dict, Awaitable
+from typing import Generic, TypeVar, Callable, Dict, Awaitable, Optional
 
 from google.api_core.exceptions import FailedPrecondition
 
+from google.cloud.pubsublite.internal.gather_bounded import gather_bounded
+
 _Key = TypeVar("_Key")
 _Client = TypeVar("_Client")
 
 
 class ClientMultiplexer(Generic[_Key, _Client]):
+    """
+    Holds one live client per key. Clients for different keys are created concurrently, and concurrent callers for
+    the same key share a single creation.
+    """
+
     _OpenedClientFactory = Callable[[], _Client]
     _ClientCloser = Callable[[_Client], None]
 
     _closer: _ClientCloser
     _lock: threading.Lock
     _live_clients: Dict[_Key, _Client]
+    _creating: Dict[_Key, "concurrent.futures.Future[_Client]"]
 
     def __init__(
         self, closer: _ClientCloser = lambda client: client.__exit__(None, None, None)
@@ -36,21 +45,54 @@ class ClientMultiplexer(Generic[_Key, _Client]):
         self._closer = closer
         self._lock = threading.Lock()
         self._live_clients = {}
+        self._creating = {}
+
+    def _create(
+        self,
+        key: _Key,
+        factory: _OpenedClientFactory,
+        future: "concurrent.futures.Future[_Client]",
+    ) -> _Client:
+        try:
+            client = factory()
+        except BaseException as e:
+            with self._lock:
+                if self._creating.get(key) is future:
+                    del self._creating[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            # If the multiplexer was closed during creation, it closes the client through the future instead.
+            if self._creating.get(key) is future:
+                del self._creating[key]
+                self._live_clients[key] = client
+        future.set_result(client)
+        return client
 
     def get_or_create(self, key: _Key, factory: _OpenedClientFactory) -> _Client:
         with self._lock:
-            if key not in self._live_clients:
-                self._live_clients[key] = factory()
-            return self._live_clients[key]
+            if key in self._live_clients:
+                return self._live_clients[key]
+            if key in self._creating:
+                future = self._creating[key]
+                owner = False
+            else:
+                future = concurrent.futures.Future()
+                self._creating[key] = future
+                owner = True
+        if owner:
+            return self._create(key, factory, future)
+        return future.result()
 
     def create_or_fail(self, key: _Key, factory: _OpenedClientFactory) -> _Client:
         with self._lock:
-            if key in self._live_clients:
+            if key in self._live_clients or key in self._creating:
                 raise FailedPrecondition(
                     f"Cannot create two clients with the same key. {_Key}"
                 )
-            self._live_clients[key] = factory()
-            return self._live_clients[key]
+            future = concurrent.futures.Future()
+            self._creating[key] = future
+        return self._create(key, factory, future)
 
     def try_erase(self, key: _Key, client: _Client):
         with self._lock:
@@ -62,6 +104,16 @@ class ClientMultiplexer(Generic[_Key, _Client]):
             del self._live_clients[key]
         self._closer(client)
 
+    def try_remove(self, key: _Key) -> Optional[_Client]:
+        """Remove the client for the key without closing it, returning it if one was live."""
+        with self._lock:
+            return self._live_clients.pop(key, None)
+
+    def live_clients(self) -> Dict[_Key, _Client]:
+        """A snapshot of the clients which are currently live."""
+        with self._lock:
+            return dict(self._live_clients)
+
     def __enter__(self):
         return self
 
@@ -69,58 +121,114 @@ class ClientMultiplexer(Generic[_Key, _Client]):
         live_clients: Dict[_Key, _Client]
         with self._lock:
             live_clients = self._live_clients
+            creating = self._creating
             self._live_clients = {}
+            self._creating = {}
+        for future in creating.values():
+            try:
+                self._closer(future.result())
+            except Exception:
+                pass
         for topic, client in live_clients.items():
             self._closer(client)
 
 
 class AsyncClientMultiplexer(Generic[_Key, _Client]):
+    """
+    Holds one live client per key. Clients for different keys are created concurrently, and concurrent callers for
+    the same key share a single creation.
+    """
+
     _OpenedClientFactory = Callable[[], Awaitable[_Client]]
     _ClientCloser = Callable[[_Client], Awaitable[None]]
 
     _closer: _ClientCloser
-    _lock: asyncio.Lock
     _live_clients: Dict[_Key, _Client]
+    _creating: Dict[_Key, "asyncio.Future[_Client]"]
 
     def __init__(
         self, closer: _ClientCloser = lambda client: client.__aexit__(None, None, None)
     ):
         self._closer = closer
         self._live_clients = {}
+        self._creating = {}
+
+    async def _create(self, key: _Key, factory: _OpenedClientFactory) -> _Client:
+        future = asyncio.get_event_loop().create_future()
+        self._creating[key] = future
+        try:
+            client = await factory()
+        except BaseException as e:
+            if self._creating.get(key) is future:
+                del self._creating[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Callers waiting on the future observe the error, so it must not be logged if there are none.
+                future.exception()
+            raise
+        # If the multiplexer was closed during creation, it closes the client through the future instead.
+        if self._creating.get(key) is future:
+            del self._creating[key]
+            self._live_clients[key] = client
+        future.set_result(client)
+        return client
 
     async def get_or_create(self, key: _Key, factory: _OpenedClientFactory) -> _Client:
-        async with self._lock:
-            if key not in self._live_clients:
-                self._live_clients[key] = await factory()
-            return self._live_clients[key]
+        while True:
+            if key in self._live_clients:
+                return self._live_clients[key]
+            if key not in self._creating:
+                return await self._create(key, factory)
+            future = self._creating[key]
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The creating caller was cancelled rather than this one, so retry the creation.
+                if not future.cancelled():
+                    raise
 
     async def create_or_fail(self, key: _Key, factory: _OpenedClientFactory) -> _Client:
-        async with self._lock:
-            if key in self._live_clients:
-                raise FailedPrecondition(
-                    f"Cannot create two clients with the same key. {_Key}"
-                )
-            self._live_clients[key] = await factory()
-            return self._live_clients[key]
+        if key in self._live_clients or key in self._creating:
+            raise FailedPrecondition(
+                f"Cannot create two clients with the same key. {_Key}"
+            )
+        return await self._create(key, factory)
 
     async def try_erase(self, key: _Key, client: _Client):
-        async with self._lock:
-            if key not in self._live_clients:
-                return
-            current_client = self._live_clients[key]
-            if current_client is not client:
-                return
-            del self._live_clients[key]
+        if key not in self._live_clients:
+            return
+        current_client = self._live_clients[key]
+        if current_client is not client:
+            return
+        del self._live_clients[key]
         await self._closer(client)
 
+    async def try_remove(
+        self, key: _Key, condition: Callable[[], bool] = lambda: True
+    ) -> Optional[_Client]:
+        """Remove the client for the key without closing it if condition() holds, returning it if one was removed."""
+        if not condition():
+            return None
+        return self._live_clients.pop(key, None)
+
+    def live_clients(self) -> Dict[_Key, _Client]:
+        """A snapshot of the clients which are currently live."""
+        return dict(self._live_clients)
+
     async def __aenter__(self):
-        self._lock = asyncio.Lock()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        live_clients: Dict[_Key, _Client]
-        async with self._lock:
-            live_clients = self._live_clients
-            self._live_clients = {}
-        for topic, client in live_clients.items():
-            await self._closer(client)
+        live_clients = self._live_clients
+        creating = self._creating
+        self._live_clients = {}
+        self._creating = {}
+        if creating:
+            await asyncio.wait(creating.values())
+        clients = list(live_clients.values())
+        for future in creating.values():
+            if not future.cancelled() and future.exception() is None:
+                clients.append(future.result())
+        await gather_bounded([self._closer(client) for client in clients])
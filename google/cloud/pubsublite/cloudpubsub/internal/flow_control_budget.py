@@ -0,0 +1,186 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from typing import List, Optional, Tuple
+
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.partition_flow_control import (
+    FlowGrant,
+    PartitionFlowControl,
+)
+from google.cloud.pubsublite.types import FlowControlSettings
+from google.cloud.pubsublite_v1 import FlowControlRequest
+
+
+class BudgetMember:
+    """
+    A partition subscriber's share of a FlowControlBudget. Tokens are credit while the server may still use them to
+    send messages, and held while the received messages are outstanding.
+    """
+
+    cap: FlowControlSettings
+    grant: FlowGrant
+    credit_messages: int
+    credit_bytes: int
+    held_messages: int
+    held_bytes: int
+
+    def __init__(self, cap: FlowControlSettings, grant: FlowGrant):
+        self.cap = cap
+        self.grant = grant
+        self.credit_messages = 0
+        self.credit_bytes = 0
+        self.held_messages = 0
+        self.held_bytes = 0
+
+
+class FlowControlBudget:
+    """
+    A budget of outstanding messages and bytes shared by partition subscribers, which may run on different event
+    loops.
+
+    Each member is entitled to an equal share of the budget, limited by its own cap. Tokens returned when messages are
+    acked go first to the members furthest below their share, so tokens move toward the partitions which are
+    consuming rather than sitting with partitions whose messages are piling up unacked. Tokens already granted to the
+    server cannot be taken back, so an idle partition keeps its share until it is released.
+
+    Grants are made by calling the member's grant callable, which may happen on any thread.
+    """
+
+    _total: FlowControlSettings
+    _lock: threading.Lock
+    _pool_messages: int
+    _pool_bytes: int
+    _members: List[BudgetMember]
+
+    def __init__(self, settings: FlowControlSettings):
+        if settings.messages_outstanding < 1 or settings.bytes_outstanding < 1:
+            raise InvalidArgument(
+                f"Flow control budget must allow at least one message and byte, was {settings}."
+            )
+        self._total = settings
+        self._lock = threading.Lock()
+        self._pool_messages = settings.messages_outstanding
+        self._pool_bytes = settings.bytes_outstanding
+        self._members = []
+
+    def register(self, cap: FlowControlSettings, grant: FlowGrant) -> BudgetMember:
+        """Add a member with the given cap, which will be granted its share of the budget as tokens are available."""
+        member = BudgetMember(cap, grant)
+        with self._lock:
+            self._members.append(member)
+            grants = self._distribute()
+        self._send(grants)
+        return member
+
+    def unregister(self, member: BudgetMember):
+        """Remove a member, returning both its unused credit and its outstanding messages to the budget."""
+        with self._lock:
+            self._members.remove(member)
+            self._pool_messages += member.credit_messages + member.held_messages
+            self._pool_bytes += member.credit_bytes + member.held_bytes
+            grants = self._distribute()
+        self._send(grants)
+
+    def on_received(self, member: BudgetMember, messages: int, size_bytes: int):
+        """Move tokens from credit to held when the server sends messages."""
+        with self._lock:
+            member.credit_messages -= messages
+            member.credit_bytes -= size_bytes
+            member.held_messages += messages
+            member.held_bytes += size_bytes
+
+    def release(self, member: BudgetMember, messages: int, size_bytes: int):
+        """Return the tokens for acked messages to the budget."""
+        with self._lock:
+            member.held_messages -= messages
+            member.held_bytes -= size_bytes
+            self._pool_messages += messages
+            self._pool_bytes += size_bytes
+            grants = self._distribute()
+        self._send(grants)
+
+    def _distribute(self) -> List[Tuple[BudgetMember, FlowControlRequest]]:
+        if not self._members:
+            return []
+        share_messages = max(1, self._total.messages_outstanding // len(self._members))
+        share_bytes = max(1, self._total.bytes_outstanding // len(self._members))
+
+        def deficit(member: BudgetMember) -> Tuple[int, int]:
+            return (
+                min(member.cap.messages_outstanding, share_messages)
+                - member.credit_messages
+                - member.held_messages,
+                min(member.cap.bytes_outstanding, share_bytes)
+                - member.credit_bytes
+                - member.held_bytes,
+            )
+
+        grants = []
+        for member in sorted(self._members, key=deficit, reverse=True):
+            if self._pool_messages <= 0 and self._pool_bytes <= 0:
+                break
+            deficit_messages, deficit_bytes = deficit(member)
+            messages = max(0, min(deficit_messages, self._pool_messages))
+            size_bytes = max(0, min(deficit_bytes, self._pool_bytes))
+            if messages == 0 and size_bytes == 0:
+                continue
+            member.credit_messages += messages
+            member.credit_bytes += size_bytes
+            self._pool_messages -= messages
+            self._pool_bytes -= size_bytes
+            grants.append(
+                (
+                    member,
+                    FlowControlRequest(
+                        allowed_messages=messages, allowed_bytes=size_bytes
+                    ),
+                )
+            )
+        return grants
+
+    @staticmethod
+    def _send(grants: List[Tuple[BudgetMember, FlowControlRequest]]):
+        # Grants are sent outside the lock, as they may schedule work on other threads.
+        for member, request in grants:
+            member.grant(request)
+
+
+class BudgetFlowControl(PartitionFlowControl):
+    """Draws a partition's tokens from a shared budget, holding at most cap."""
+
+    _budget: FlowControlBudget
+    _cap: FlowControlSettings
+    _member: Optional[BudgetMember]
+
+    def __init__(self, budget: FlowControlBudget, cap: FlowControlSettings):
+        self._budget = budget
+        self._cap = cap
+        self._member = None
+
+    def start(self, grant: FlowGrant):
+        self._member = self._budget.register(self._cap, grant)
+
+    def on_received(self, messages: int, size_bytes: int):
+        self._budget.on_received(self._member, messages, size_bytes)
+
+    def on_acked(self, messages: int, size_bytes: int):
+        self._budget.release(self._member, messages, size_bytes)
+
+    def stop(self):
+        if self._member is not None:
+            self._budget.unregister(self._member)
+            self._member = None
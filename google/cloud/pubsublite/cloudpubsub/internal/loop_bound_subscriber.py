@@ -0,0 +1,83 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Callable, Iterable, List, Optional
+
+from google.cloud.pubsub_v1.subscriber.message import Message
+
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    EventLoopHandle,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
+    AsyncPartitionSubscriber,
+)
+
+
+class LoopBoundPartitionSubscriber(AsyncPartitionSubscriber):
+    """
+    Runs a partition subscriber on another event loop, so that the work for different partitions can use more than
+    one thread. The subscriber is created on that loop, since its streams are bound to the loop they are opened on.
+    """
+
+    _factory: Callable[[], AsyncPartitionSubscriber]
+    _event_loop: EventLoopHandle
+    _underlying: Optional[AsyncPartitionSubscriber]
+
+    def __init__(
+        self,
+        factory: Callable[[], AsyncPartitionSubscriber],
+        event_loop: EventLoopHandle,
+    ):
+        self._factory = factory
+        self._event_loop = event_loop
+        self._underlying = None
+
+    async def _run(self, coro):
+        return await asyncio.wrap_future(self._event_loop.submit(coro))
+
+    async def _open(self) -> AsyncPartitionSubscriber:
+        subscriber = self._factory()
+        await subscriber.__aenter__()
+        return subscriber
+
+    async def _stop_event_loop(self):
+        # Stopping the last user of a loop joins its thread, which must not block this loop.
+        await asyncio.get_event_loop().run_in_executor(
+            None, self._event_loop.__exit__, None, None, None
+        )
+
+    async def read(self) -> Message:
+        return await self._run(self._underlying.read())
+
+    async def read_batch(self) -> List[Message]:
+        return await self._run(self._underlying.read_batch())
+
+    async def wait_for_acks(self, abandoned: Iterable[Message]):
+        await self._run(self._underlying.wait_for_acks(list(abandoned)))
+
+    async def __aenter__(self):
+        self._event_loop.__enter__()
+        try:
+            self._underlying = await self._run(self._open())
+        except BaseException:
+            await self._stop_event_loop()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            await self._run(self._underlying.__aexit__(exc_type, exc_value, traceback))
+        finally:
+            await self._stop_event_loop()
@@ -18,9 +18,14 @@ from google.api_core.client_options import ClientOptions
 from google.auth.credentials import Credentials
 from google.cloud.pubsub_v1.types import BatchSettings
 
+from google.cloud.pubsublite.cloudpubsub.event_loop_pool import EventLoopPool
 from google.cloud.pubsublite.cloudpubsub.internal.async_publisher_impl import (
     AsyncSinglePublisherImpl,
 )
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    LoopFactory,
+    ManagedEventLoop,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.publisher_impl import (
     SinglePublisherImpl,
 )
@@ -28,7 +33,10 @@ from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
     AsyncSinglePublisher,
     SinglePublisher,
 )
+from google.cloud.pubsublite.internal.channel_pool import DEFAULT_CHANNEL_POOL_SIZE
 from google.cloud.pubsublite.internal.wire.make_publisher import (
+    DEFAULT_IDLE_CLOSE_SECONDS,
+    DEFAULT_PARTITION_POLL_PERIOD,
     make_publisher as make_wire_publisher,
     DEFAULT_BATCHING_SETTINGS as WIRE_DEFAULT_BATCHING,
 )
@@ -47,6 +55,11 @@ def make_async_publisher(
     credentials: Optional[Credentials] = None,
     client_options: Optional[ClientOptions] = None,
     metadata: Optional[Mapping[str, str]] = None,
+    idle_close_seconds: Optional[float] = DEFAULT_IDLE_CLOSE_SECONDS,
+    stream_recycle_seconds: Optional[float] = None,
+    partition_poll_period: float = DEFAULT_PARTITION_POLL_PERIOD,
+    initial_partition_count: Optional[int] = None,
+    channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
 ) -> AsyncSinglePublisher:
     """
   Make a new publisher for the given topic.
@@ -58,6 +71,13 @@ def make_async_publisher(
     credentials: The credentials to use to connect. GOOGLE_DEFAULT_CREDENTIALS is used if None.
     client_options: Other options to pass to the client. Note that if you pass any you must set api_endpoint.
     metadata: Additional metadata to send with the RPC.
+    idle_close_seconds: The time after which the stream for an idle partition is closed. Streams are never closed if None.
+    stream_recycle_seconds: The time after which the stream for each partition is replaced without interrupting
+      publishes. Streams are only replaced on failure if None.
+    partition_poll_period: The time between polls for the topic's partition count.
+    initial_partition_count: A partition count to route messages with until the topic's partition count has been
+      read. It must not exceed the topic's partition count.
+    channel_pool_size: The maximum number of channels shared by streams with the same endpoint and credentials.
 
   Returns:
     A new AsyncPublisher.
@@ -75,6 +95,11 @@ def make_async_publisher(
             credentials=credentials,
             client_options=client_options,
             metadata=metadata,
+            idle_close_seconds=idle_close_seconds,
+            stream_recycle_seconds=stream_recycle_seconds,
+            partition_poll_period=partition_poll_period,
+            initial_partition_count=initial_partition_count,
+            channel_pool_size=channel_pool_size,
         )
 
     return AsyncSinglePublisherImpl(underlying_factory)
@@ -87,6 +112,13 @@ def make_publisher(
     credentials: Optional[Credentials] = None,
     client_options: Optional[ClientOptions] = None,
     metadata: Optional[Mapping[str, str]] = None,
+    idle_close_seconds: Optional[float] = DEFAULT_IDLE_CLOSE_SECONDS,
+    stream_recycle_seconds: Optional[float] = None,
+    partition_poll_period: float = DEFAULT_PARTITION_POLL_PERIOD,
+    initial_partition_count: Optional[int] = None,
+    channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+    event_loop_pool: Optional[EventLoopPool] = None,
+    loop_factory: Optional[LoopFactory] = None,
 ) -> SinglePublisher:
     """
   Make a new publisher for the given topic.
@@ -98,6 +130,15 @@ def make_publisher(
     credentials: The credentials to use to connect. GOOGLE_DEFAULT_CREDENTIALS is used if None.
     client_options: Other options to pass to the client. Note that if you pass any you must set api_endpoint.
     metadata: Additional metadata to send with the RPC.
+    idle_close_seconds: The time after which the stream for an idle partition is closed. Streams are never closed if None.
+    stream_recycle_seconds: The time after which the stream for each partition is replaced without interrupting
+      publishes. Streams are only replaced on failure if None.
+    partition_poll_period: The time between polls for the topic's partition count.
+    initial_partition_count: A partition count to route messages with until the topic's partition count has been
+      read. It must not exceed the topic's partition count.
+    channel_pool_size: The maximum number of channels shared by streams with the same endpoint and credentials.
+    event_loop_pool: If provided, the publisher runs on a shared event loop from the pool instead of its own thread.
+    loop_factory: Creates the publisher's own event loop if event_loop_pool is not provided.
 
   Returns:
     A new Publisher.
@@ -113,5 +154,13 @@ def make_publisher(
             credentials=credentials,
             client_options=client_options,
             metadata=metadata,
-        )
+            idle_close_seconds=idle_close_seconds,
+            stream_recycle_seconds=stream_recycle_seconds,
+            partition_poll_period=partition_poll_period,
+            initial_partition_count=initial_partition_count,
+            channel_pool_size=channel_pool_size,
+        ),
+        ManagedEventLoop(loop_factory)
+        if event_loop_pool is None
+        else event_loop_pool.loop_for(topic),
     )
@@ -16,8 +16,11 @@ from typing import Optional, Mapping, Set, AsyncIterator, Callable
 from uuid import uuid4
 
 from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import InvalidArgument
 from google.auth.credentials import Credentials
 
+from google.cloud.pubsublite.cloudpubsub.assignment_listener import AssignmentListener
+from google.cloud.pubsublite.cloudpubsub.event_loop_pool import EventLoopPool
 from google.cloud.pubsublite.cloudpubsub.message_transforms import (
     to_cps_subscribe_message,
     add_id_to_cps_subscribe_transformer,
@@ -26,7 +29,22 @@ from google.cloud.pubsublite.types import FlowControlSettings
 from google.cloud.pubsublite.cloudpubsub.internal.ack_set_tracker_impl import (
     AckSetTrackerImpl,
 )
+from google.cloud.pubsublite.cloudpubsub.internal.adaptive_flow_control import (
+    AdaptiveFlowControl,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.flow_control_budget import (
+    BudgetFlowControl,
+    FlowControlBudget,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.loop_bound_subscriber import (
+    LoopBoundPartitionSubscriber,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import LoopFactory
+from google.cloud.pubsublite.cloudpubsub.internal.partition_flow_control import (
+    PartitionFlowControl,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.assigning_subscriber import (
+    DEFAULT_MAX_BUFFERED_PER_PARTITION,
     PartitionSubscriberFactory,
     AssigningSingleSubscriber,
 )
@@ -40,14 +58,16 @@ from google.cloud.pubsublite.cloudpubsub.nack_handler import (
 )
 from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
     AsyncSingleSubscriber,
+    AsyncPartitionSubscriber,
 )
+from google.cloud.pubsublite.internal.channel_pool import DEFAULT_CHANNEL_POOL_SIZE
 from google.cloud.pubsublite.internal.endpoints import regional_endpoint
 from google.cloud.pubsublite.internal.wire.assigner import Assigner
 from google.cloud.pubsublite.internal.wire.assigner_impl import AssignerImpl
 from google.cloud.pubsublite.internal.wire.committer_impl import CommitterImpl
 from google.cloud.pubsublite.internal.wire.fixed_set_assigner import FixedSetAssigner
 from google.cloud.pubsublite.internal.wire.gapic_connection import (
-    GapicConnectionFactory,
+    make_gapic_connection_factory,
 )
 from google.cloud.pubsublite.internal.wire.merge_metadata import merge_metadata
 from google.cloud.pubsublite.internal.wire.pubsub_context import pubsub_context
@@ -73,8 +93,21 @@ from google.cloud.pubsublite_v1.services.partition_assignment_service.async_clie
 from google.cloud.pubsublite_v1.services.cursor_service.async_client import (
     CursorServiceAsyncClient,
 )
+from google.cloud.pubsublite_v1.services.cursor_service.transports.grpc_asyncio import (
+    CursorServiceGrpcAsyncIOTransport,
+)
+from google.cloud.pubsublite_v1.services.partition_assignment_service.transports.grpc_asyncio import (
+    PartitionAssignmentServiceGrpcAsyncIOTransport,
+)
+from google.cloud.pubsublite_v1.services.subscriber_service.transports.grpc_asyncio import (
+    SubscriberServiceGrpcAsyncIOTransport,
+)
 
 _DEFAULT_FLUSH_SECONDS = 0.1
+_MIN_ADAPTIVE_FLUSH_SECONDS = 0.01
+_MIN_ADAPTIVE_FLOW_CONTROL = FlowControlSettings(
+    messages_outstanding=100, bytes_outstanding=1024 * 1024
+)
 
 
 def _make_dynamic_assigner(
@@ -83,20 +116,59 @@ def _make_dynamic_assigner(
     client_options: ClientOptions,
     credentials: Optional[Credentials],
     base_metadata: Optional[Mapping[str, str]],
+    client_id: bytes,
+    channel_pool_size: int,
 ) -> Assigner:
-    def assignment_connection_factory(
+    def assign_partitions(
+        client: PartitionAssignmentServiceAsyncClient,
         requests: AsyncIterator[PartitionAssignmentRequest],
     ):
-        assignment_client = PartitionAssignmentServiceAsyncClient(credentials=credentials, transport=transport, client_options=client_options)  # type: ignore
-        return assignment_client.assign_partitions(
-            requests, metadata=list(base_metadata.items())
-        )
+        return client.assign_partitions(requests, metadata=list(base_metadata.items()))
 
     return AssignerImpl(
         InitialPartitionAssignmentRequest(
-            subscription=str(subscription), client_id=uuid4().bytes
+            subscription=str(subscription), client_id=client_id
+        ),
+        make_gapic_connection_factory(
+            PartitionAssignmentServiceAsyncClient,
+            PartitionAssignmentServiceGrpcAsyncIOTransport,
+            assign_partitions,
+            transport,
+            client_options,
+            credentials,
+            channel_pool_size,
         ),
-        GapicConnectionFactory(assignment_connection_factory),
+    )
+
+
+def make_assigner_factory(
+    subscription: SubscriptionPath,
+    transport: str,
+    fixed_partitions: Optional[Set[Partition]],
+    client_options: ClientOptions,
+    credentials: Optional[Credentials],
+    metadata: Optional[Mapping[str, str]],
+    client_id: Optional[bytes] = None,
+    channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+) -> Callable[[], Assigner]:
+    """
+  Make a factory for the Assigner of a subscription. The factory must be called on the event loop the Assigner runs on.
+
+  The client_id identifies this subscriber to the assignment service. Reusing it across reconnects and recreated
+  subscribers lets the service keep the same partitions assigned to this client. A random id is used if None.
+  """
+    if fixed_partitions:
+        return lambda: FixedSetAssigner(fixed_partitions)  # noqa: E731
+    if client_id is None:
+        client_id = uuid4().bytes
+    return lambda: _make_dynamic_assigner(  # noqa: E731
+        subscription,
+        transport,
+        client_options,
+        credentials,
+        metadata,
+        client_id,
+        channel_pool_size,
     )
 
 
@@ -109,25 +181,46 @@ def _make_partition_subscriber_factory(
     flow_control_settings: FlowControlSettings,
     nack_handler: NackHandler,
     message_transformer: MessageTransformer,
+    flow_control_budget: Optional[FlowControlBudget],
+    adaptive_flow_control: bool,
+    event_loop_pool: Optional[EventLoopPool],
+    channel_pool_size: int,
 ) -> PartitionSubscriberFactory:
-    def factory(partition: Partition) -> AsyncSingleSubscriber:
-        subscribe_client = SubscriberServiceAsyncClient(
-            credentials=credentials, client_options=client_options, transport=transport
-        )  # type: ignore
-        cursor_client = CursorServiceAsyncClient(credentials=credentials, client_options=client_options, transport=transport)  # type: ignore
+    def make_flow_control() -> Optional[PartitionFlowControl]:
+        if flow_control_budget is not None:
+            return BudgetFlowControl(flow_control_budget, flow_control_settings)
+        if adaptive_flow_control:
+            return AdaptiveFlowControl(
+                FlowControlSettings(
+                    min(
+                        _MIN_ADAPTIVE_FLOW_CONTROL.messages_outstanding,
+                        flow_control_settings.messages_outstanding,
+                    ),
+                    min(
+                        _MIN_ADAPTIVE_FLOW_CONTROL.bytes_outstanding,
+                        flow_control_settings.bytes_outstanding,
+                    ),
+                ),
+                flow_control_settings,
+            )
+        return None
+
+    def make_partition_subscriber(partition: Partition) -> AsyncPartitionSubscriber:
         final_metadata = merge_metadata(
             base_metadata, subscription_routing_metadata(subscription, partition)
         )
 
-        def subscribe_connection_factory(requests: AsyncIterator[SubscribeRequest]):
-            return subscribe_client.subscribe(
-                requests, metadata=list(final_metadata.items())
-            )
+        def subscribe(
+            client: SubscriberServiceAsyncClient,
+            requests: AsyncIterator[SubscribeRequest],
+        ):
+            return client.subscribe(requests, metadata=list(final_metadata.items()))
 
-        def cursor_connection_factory(
+        def streaming_commit_cursor(
+            client: CursorServiceAsyncClient,
             requests: AsyncIterator[StreamingCommitCursorRequest],
         ):
-            return cursor_client.streaming_commit_cursor(
+            return client.streaming_commit_cursor(
                 requests, metadata=list(final_metadata.items())
             )
 
@@ -136,14 +229,31 @@ def _make_partition_subscriber_factory(
                 subscription=str(subscription), partition=partition.value
             ),
             _DEFAULT_FLUSH_SECONDS,
-            GapicConnectionFactory(subscribe_connection_factory),
+            make_gapic_connection_factory(
+                SubscriberServiceAsyncClient,
+                SubscriberServiceGrpcAsyncIOTransport,
+                subscribe,
+                transport,
+                client_options,
+                credentials,
+                channel_pool_size,
+            ),
+            _MIN_ADAPTIVE_FLUSH_SECONDS if adaptive_flow_control else None,
         )
         committer = CommitterImpl(
             InitialCommitCursorRequest(
                 subscription=str(subscription), partition=partition.value
             ),
             _DEFAULT_FLUSH_SECONDS,
-            GapicConnectionFactory(cursor_connection_factory),
+            make_gapic_connection_factory(
+                CursorServiceAsyncClient,
+                CursorServiceGrpcAsyncIOTransport,
+                streaming_commit_cursor,
+                transport,
+                client_options,
+                credentials,
+                channel_pool_size,
+            ),
         )
         ack_set_tracker = AckSetTrackerImpl(committer)
         return SinglePartitionSingleSubscriber(
@@ -152,6 +262,15 @@ def _make_partition_subscriber_factory(
             ack_set_tracker,
             nack_handler,
             add_id_to_cps_subscribe_transformer(partition, message_transformer),
+            make_flow_control(),
+        )
+
+    def factory(partition: Partition) -> AsyncPartitionSubscriber:
+        if event_loop_pool is None:
+            return make_partition_subscriber(partition)
+        return LoopBoundPartitionSubscriber(
+            lambda: make_partition_subscriber(partition),
+            event_loop_pool.loop_for(partition.value),
         )
 
     return factory
@@ -167,6 +286,15 @@ def make_async_subscriber(
     credentials: Optional[Credentials] = None,
     client_options: Optional[ClientOptions] = None,
     metadata: Optional[Mapping[str, str]] = None,
+    assignment_listener: Optional[AssignmentListener] = None,
+    client_id: Optional[bytes] = None,
+    flow_control_budget: Optional[FlowControlBudget] = None,
+    adaptive_flow_control: bool = False,
+    partition_event_loops: Optional[int] = None,
+    loop_factory: Optional[LoopFactory] = None,
+    channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+    max_buffered_per_partition: int = DEFAULT_MAX_BUFFERED_PER_PARTITION,
+    partition_weight: Optional[Callable[[Partition], int]] = None,
 ) -> AsyncSingleSubscriber:
     """
   Make a Pub/Sub Lite AsyncSubscriber.
@@ -182,22 +310,44 @@ def make_async_subscriber(
     credentials: The credentials to use to connect. GOOGLE_DEFAULT_CREDENTIALS is used if None.
     client_options: Other options to pass to the client. Note that if you pass any you must set api_endpoint.
     metadata: Additional metadata to send with the RPC.
+    assignment_listener: An optional listener notified when partitions are assigned or revoked.
+    client_id: The id identifying this client to the assignment service. A random id is used if None.
+    flow_control_budget: An optional budget shared with other subscribers, which partitions draw their flow control
+      tokens from. per_partition_flow_control_settings then caps the tokens each partition may hold.
+    adaptive_flow_control: Whether to size each partition's flow control window to its consumption rate, with
+      per_partition_flow_control_settings as the upper limit. May not be used with flow_control_budget.
+    partition_event_loops: If set, partitions are spread across this many event loop threads of their own, while
+      assignment and message delivery stay on the calling event loop.
+    loop_factory: Creates the event loops for partition_event_loops. A default asyncio event loop is used if None.
+    channel_pool_size: The maximum number of channels shared by streams with the same endpoint and credentials on an
+      event loop.
+    max_buffered_per_partition: The number of messages received from each partition which may wait to be read, or a
+      single batch if it is larger.
+    partition_weight: The number of messages read from a partition per turn. Every partition has a weight of 1 if
+      None.
 
   Returns:
     A new AsyncSubscriber.
   """
+    if flow_control_budget is not None and adaptive_flow_control:
+        raise InvalidArgument(
+            "Adaptive flow control may not be used with a flow control budget."
+        )
     metadata = merge_metadata(pubsub_context(framework="CLOUD_PUBSUB_SHIM"), metadata)
     if client_options is None:
         client_options = ClientOptions(
             api_endpoint=regional_endpoint(subscription.location.region)
         )
-    assigner_factory: Callable[[], Assigner]
-    if fixed_partitions:
-        assigner_factory = lambda: FixedSetAssigner(fixed_partitions)  # noqa: E731
-    else:
-        assigner_factory = lambda: _make_dynamic_assigner(  # noqa: E731
-            subscription, transport, client_options, credentials, metadata,
-        )
+    assigner_factory = make_assigner_factory(
+        subscription,
+        transport,
+        fixed_partitions,
+        client_options,
+        credentials,
+        metadata,
+        client_id,
+        channel_pool_size,
+    )
 
     if nack_handler is None:
         nack_handler = DefaultNackHandler()
@@ -212,5 +362,18 @@ def make_async_subscriber(
         per_partition_flow_control_settings,
         nack_handler,
         message_transformer,
+        flow_control_budget,
+        adaptive_flow_control,
+        None
+        if partition_event_loops is None
+        else EventLoopPool(partition_event_loops, loop_factory),
+        channel_pool_size,
+    )
+    return AssigningSingleSubscriber(
+        assigner_factory,
+        partition_subscriber_factory,
+        assignment_listener=assignment_listener,
+        max_buffered_per_partition=max_buffered_per_partition,
+        partition_weight=partition_weight,
+        subscription=subscription,
     )
-    return AssigningSingleSubscriber(assigner_factory, partition_subscriber_factory)
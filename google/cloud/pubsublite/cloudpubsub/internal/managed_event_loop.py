@@ -12,24 +12,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from abc import abstractmethod
 from asyncio import AbstractEventLoop, new_event_loop, run_coroutine_threadsafe
 from concurrent.futures import Future
 from threading import Thread
-from typing import ContextManager
+from typing import Callable, ContextManager, Optional
 
+from google.cloud.pubsublite.internal.channel_pool import close_async_channel_pools
+
+LoopFactory = Callable[[], AbstractEventLoop]
+
+
+class EventLoopHandle(ContextManager):
+    """An event loop running on another thread, which is available between __enter__ and __exit__."""
+
+    @abstractmethod
+    def submit(self, coro) -> Future:
+        """Run the coroutine on the event loop."""
+        raise NotImplementedError()
+
+
+class ManagedEventLoop(EventLoopHandle):
+    """An event loop with a dedicated thread, which can be entered only once."""
 
-class ManagedEventLoop(ContextManager):
     _loop: AbstractEventLoop
     _thread: Thread
 
-    def __init__(self):
-        self._loop = new_event_loop()
+    def __init__(self, loop_factory: Optional[LoopFactory] = None):
+        """
+        Args:
+          loop_factory: Creates the event loop, such as the new_event_loop method of an event loop policy. A default
+            asyncio event loop is used if None.
+        """
+        self._loop = (loop_factory or new_event_loop)()
         self._thread = Thread(target=lambda: self._loop.run_forever())
 
     def __enter__(self):
         self._thread.start()
 
     def __exit__(self, exc_type, exc_value, traceback):
+        # Pooled channels are bound to this loop, so they must be closed before it stops.
+        self.submit(close_async_channel_pools()).result()
         self._loop.call_soon_threadsafe(self._loop.stop)
         self._thread.join()
 
@@ -12,22 +12,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Callable, Union, Mapping
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Union, Mapping
 
-from google.api_core.exceptions import GoogleAPICallError
+from google.api_core.exceptions import DeadlineExceeded, GoogleAPICallError
 
 from google.cloud.pubsublite.cloudpubsub.internal.client_multiplexer import (
     AsyncClientMultiplexer,
 )
+from google.cloud.pubsublite.cloudpubsub.internal.multiplexed_publisher_client import (
+    select_evictions,
+    validate_eviction_settings,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
     AsyncSinglePublisher,
 )
 from google.cloud.pubsublite.cloudpubsub.publisher_client_interface import (
     AsyncPublisherClientInterface,
 )
-from google.cloud.pubsublite.types import TopicPath
+from google.cloud.pubsublite.internal.gather_bounded import gather_bounded
+from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_cancelled
+from google.cloud.pubsublite.internal.wire.publisher import InvalidPartition
+from google.cloud.pubsublite.types import Partition, TopicPath
 from overrides import overrides
 
+_LOGGER = logging.getLogger(__name__)
 
 AsyncPublisherFactory = Callable[[TopicPath], AsyncSinglePublisher]
 
@@ -35,10 +47,28 @@ AsyncPublisherFactory = Callable[[TopicPath], AsyncSinglePublisher]
 class MultiplexedAsyncPublisherClient(AsyncPublisherClientInterface):
     _publisher_factory: AsyncPublisherFactory
     _multiplexer: AsyncClientMultiplexer[TopicPath, AsyncSinglePublisher]
+    _max_live_topics: Optional[int]
+    _topic_idle_seconds: Optional[float]
+
+    _outstanding: Dict[TopicPath, int]
+    _last_used: "OrderedDict[TopicPath, float]"
+    _wake: asyncio.Event
+    _evictor: Optional[asyncio.Future]
 
-    def __init__(self, publisher_factory: AsyncPublisherFactory):
+    def __init__(
+        self,
+        publisher_factory: AsyncPublisherFactory,
+        max_live_topics: Optional[int] = None,
+        topic_idle_seconds: Optional[float] = None,
+    ):
+        validate_eviction_settings(max_live_topics, topic_idle_seconds)
         self._publisher_factory = publisher_factory
         self._multiplexer = AsyncClientMultiplexer()
+        self._max_live_topics = max_live_topics
+        self._topic_idle_seconds = topic_idle_seconds
+        self._outstanding = {}
+        self._last_used = OrderedDict()
+        self._evictor = None
 
     @overrides
     async def publish(
@@ -46,7 +76,9 @@ class MultiplexedAsyncPublisherClient(AsyncPublisherClientInterface):
         topic: Union[TopicPath, str],
         data: bytes,
         ordering_key: str = "",
-        **attrs: Mapping[str, str]
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> str:
         if isinstance(topic, str):
             topic = TopicPath.parse(topic)
@@ -56,20 +88,99 @@ class MultiplexedAsyncPublisherClient(AsyncPublisherClientInterface):
             await client.__aenter__()
             return client
 
-        publisher = await self._multiplexer.get_or_create(topic, create_and_open)
+        self._acquire(topic)
         try:
-            return await publisher.publish(
-                data=data, ordering_key=ordering_key, **attrs
+            publisher = await self._multiplexer.get_or_create(topic, create_and_open)
+            try:
+                return await publisher.publish(
+                    data=data, ordering_key=ordering_key, partition=partition, **attrs
+                )
+            except InvalidPartition:
+                raise
+            except GoogleAPICallError as e:
+                await self._multiplexer.try_erase(topic, publisher)
+                raise e
+        finally:
+            self._release(topic)
+
+    @overrides
+    async def flush(self, timeout: Optional[float] = None):
+        publishers = self._multiplexer.live_clients().values()
+        try:
+            await asyncio.wait_for(
+                gather_bounded([publisher.flush() for publisher in publishers]), timeout
+            )
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(
+                f"Published messages were not acknowledged within {timeout} seconds."
             )
-        except GoogleAPICallError as e:
-            await self._multiplexer.try_erase(topic, publisher)
-            raise e
+
+    def _acquire(self, topic: TopicPath):
+        self._outstanding[topic] = self._outstanding.get(topic, 0) + 1
+        self._last_used[topic] = time.monotonic()
+        self._last_used.move_to_end(topic)
+        self._wake_if_over_capacity()
+
+    def _release(self, topic: TopicPath):
+        self._outstanding[topic] -= 1
+        if self._outstanding[topic] == 0:
+            del self._outstanding[topic]
+        if topic in self._last_used:
+            self._last_used[topic] = time.monotonic()
+        self._wake_if_over_capacity()
+
+    def _wake_if_over_capacity(self):
+        if (
+            self._max_live_topics is not None
+            and len(self._last_used) > self._max_live_topics
+            and self._evictor is not None
+        ):
+            self._wake.set()
+
+    async def _evict(self):
+        topics = select_evictions(
+            self._last_used,
+            self._outstanding,
+            self._max_live_topics,
+            self._topic_idle_seconds,
+            time.monotonic(),
+        )
+        for topic in topics:
+            # A publish which started while closing earlier topics keeps its publisher open.
+            publisher = await self._multiplexer.try_remove(
+                topic, lambda: topic not in self._outstanding
+            )
+            if publisher is None:
+                continue
+            try:
+                # Exiting flushes any messages which are still batched.
+                await publisher.__aexit__(None, None, None)
+            except GoogleAPICallError as e:
+                _LOGGER.debug(f"Error closing evicted publisher for {topic}: {e!r}")
+
+    async def _evict_loop(self):
+        period = (
+            None if self._topic_idle_seconds is None else self._topic_idle_seconds / 2
+        )
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), period)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._evict()
 
     @overrides
     async def __aenter__(self):
         await self._multiplexer.__aenter__()
+        if self._max_live_topics is not None or self._topic_idle_seconds is not None:
+            self._wake = asyncio.Event()
+            self._evictor = asyncio.ensure_future(self._evict_loop())
         return self
 
     @overrides
     async def __aexit__(self, exc_type, exc_value, traceback):
+        if self._evictor is not None:
+            self._evictor.cancel()
+            await wait_ignore_cancelled(self._evictor)
         await self._multiplexer.__aexit__(exc_type, exc_value, traceback)
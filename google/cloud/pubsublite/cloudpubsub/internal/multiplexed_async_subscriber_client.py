@@ -11,18 +11,22 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-
+import asyncio
 from typing import (
     Union,
     AsyncIterator,
     Awaitable,
     Callable,
+    Dict,
     Optional,
     Set,
 )
 
 from google.cloud.pubsub_v1.subscriber.message import Message
 
+from google.cloud.pubsublite.cloudpubsub.internal.async_handler_dispatcher import (
+    AsyncHandlerDispatcher,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.client_multiplexer import (
     AsyncClientMultiplexer,
 )
@@ -32,7 +36,9 @@ from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
 )
 from google.cloud.pubsublite.cloudpubsub.subscriber_client_interface import (
     AsyncSubscriberClientInterface,
+    AsyncMessageHandler,
 )
+from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_errors
 from google.cloud.pubsublite.types import (
     SubscriptionPath,
     FlowControlSettings,
@@ -64,13 +70,19 @@ class _SubscriberAsyncIterator(AsyncIterator):
         return self
 
 
+async def _noop_on_failure():
+    pass
+
+
 class MultiplexedAsyncSubscriberClient(AsyncSubscriberClientInterface):
     _underlying_factory: AsyncSubscriberFactory
     _multiplexer: AsyncClientMultiplexer[SubscriptionPath, AsyncSingleSubscriber]
+    _handler_runs: Set[asyncio.Future]
 
     def __init__(self, underlying_factory: AsyncSubscriberFactory):
         self._underlying_factory = underlying_factory
         self._multiplexer = AsyncClientMultiplexer()
+        self._handler_runs = set()
 
     @overrides
     async def subscribe(
@@ -96,6 +108,58 @@ class MultiplexedAsyncSubscriberClient(AsyncSubscriberClientInterface):
             subscriber, lambda: self._multiplexer.try_erase(subscription, subscriber)
         )
 
+    @overrides
+    async def subscribe_with_handler(
+        self,
+        subscription: Union[SubscriptionPath, str],
+        handler: AsyncMessageHandler,
+        per_partition_flow_control_settings: FlowControlSettings,
+        max_concurrency: int,
+        ordered_by_key: bool = False,
+        fixed_partitions: Optional[Set[Partition]] = None,
+    ) -> "asyncio.Future[None]":
+        if isinstance(subscription, str):
+            subscription = SubscriptionPath.parse(subscription)
+
+        async def create_and_open():
+            client = self._underlying_factory(
+                subscription, fixed_partitions, per_partition_flow_control_settings
+            )
+            await client.__aenter__()
+            return client
+
+        subscriber = await self._multiplexer.create_or_fail(
+            subscription, create_and_open
+        )
+        dispatcher = AsyncHandlerDispatcher(
+            _SubscriberAsyncIterator(subscriber, _noop_on_failure),
+            handler,
+            max_concurrency,
+            ordered_by_key,
+        )
+
+        async def run():
+            try:
+                await dispatcher.run()
+            finally:
+                await self._multiplexer.try_erase(subscription, subscriber)
+
+        run_future = asyncio.ensure_future(run())
+        self._handler_runs.add(run_future)
+        run_future.add_done_callback(self._handler_runs.discard)
+        return run_future
+
+    @overrides
+    def buffered_messages(
+        self, subscription: Union[SubscriptionPath, str]
+    ) -> Dict[Partition, int]:
+        if isinstance(subscription, str):
+            subscription = SubscriptionPath.parse(subscription)
+        subscriber = self._multiplexer.live_clients().get(subscription)
+        if subscriber is None:
+            return {}
+        return subscriber.buffered_messages()
+
     @overrides
     async def __aenter__(self):
         await self._multiplexer.__aenter__()
@@ -103,4 +167,9 @@ class MultiplexedAsyncSubscriberClient(AsyncSubscriberClientInterface):
 
     @overrides
     async def __aexit__(self, exc_type, exc_value, traceback):
+        handler_runs = list(self._handler_runs)
+        for run_future in handler_runs:
+            run_future.cancel()
+        for run_future in handler_runs:
+            await wait_ignore_errors(run_future)
         await self._multiplexer.__aexit__(exc_type, exc_value, traceback)
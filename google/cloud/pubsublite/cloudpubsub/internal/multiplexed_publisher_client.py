@@ -12,10 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from concurrent.futures import Future
-from typing import Callable, Union, Mapping
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from typing import Callable, Dict, List, Optional, Union, Mapping
 
-from google.api_core.exceptions import GoogleAPICallError
+from google.api_core.exceptions import (
+    DeadlineExceeded,
+    GoogleAPICallError,
+    InvalidArgument,
+)
 
 from google.cloud.pubsublite.cloudpubsub.internal.client_multiplexer import (
     ClientMultiplexer,
@@ -26,19 +34,92 @@ from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
 from google.cloud.pubsublite.cloudpubsub.publisher_client_interface import (
     PublisherClientInterface,
 )
-from google.cloud.pubsublite.types import TopicPath
+from google.cloud.pubsublite.internal.wire.publisher import InvalidPartition
+from google.cloud.pubsublite.types import Partition, TopicPath
 from overrides import overrides
 
+_LOGGER = logging.getLogger(__name__)
+
 PublisherFactory = Callable[[TopicPath], SinglePublisher]
 
 
+def validate_eviction_settings(
+    max_live_topics: Optional[int], topic_idle_seconds: Optional[float]
+):
+    if max_live_topics is not None and max_live_topics < 1:
+        raise InvalidArgument(
+            f"max_live_topics must be at least 1, was {max_live_topics}."
+        )
+    if topic_idle_seconds is not None and topic_idle_seconds <= 0:
+        raise InvalidArgument(
+            f"topic_idle_seconds must be positive, was {topic_idle_seconds}."
+        )
+
+
+def select_evictions(
+    last_used: "OrderedDict[TopicPath, float]",
+    outstanding: Dict[TopicPath, int],
+    max_live_topics: Optional[int],
+    topic_idle_seconds: Optional[float],
+    now: float,
+) -> List[TopicPath]:
+    """
+    Remove and return the topics to evict from last_used, which is ordered from least to most recently used. Topics
+    with outstanding publishes are never evicted, so the number of live topics may exceed max_live_topics while they
+    are all in use.
+    """
+    idle = [topic for topic in last_used if outstanding.get(topic, 0) == 0]
+    evicted = []
+    excess = 0 if max_live_topics is None else len(last_used) - max_live_topics
+    for topic in idle:
+        if excess > 0 or (
+            topic_idle_seconds is not None
+            and now - last_used[topic] >= topic_idle_seconds
+        ):
+            evicted.append(topic)
+            excess -= 1
+    for topic in evicted:
+        del last_used[topic]
+    return evicted
+
+
 class MultiplexedPublisherClient(PublisherClientInterface):
     _publisher_factory: PublisherFactory
     _multiplexer: ClientMultiplexer[TopicPath, SinglePublisher]
+    _max_live_topics: Optional[int]
+    _topic_idle_seconds: Optional[float]
+    _drain_timeout: Optional[float]
+
+    _lock: threading.Lock
+    _outstanding: Dict[TopicPath, int]
+    _last_used: "OrderedDict[TopicPath, float]"
+    _wake: threading.Event
+    _stopping: threading.Event
+    _evictor: Optional[threading.Thread]
 
-    def __init__(self, publisher_factory: PublisherFactory):
+    def __init__(
+        self,
+        publisher_factory: PublisherFactory,
+        max_live_topics: Optional[int] = None,
+        topic_idle_seconds: Optional[float] = None,
+        drain_timeout: Optional[float] = None,
+    ):
+        """
+        On exit, the client waits up to drain_timeout seconds for published messages to be acknowledged before closing
+        the publishers. It waits indefinitely if None.
+        """
+        validate_eviction_settings(max_live_topics, topic_idle_seconds)
         self._publisher_factory = publisher_factory
         self._multiplexer = ClientMultiplexer()
+        self._max_live_topics = max_live_topics
+        self._topic_idle_seconds = topic_idle_seconds
+        self._drain_timeout = drain_timeout
+        self._lock = threading.Lock()
+        self._outstanding = {}
+        self._last_used = OrderedDict()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._evictor = None
 
     @overrides
     def publish(
@@ -46,32 +127,133 @@ class MultiplexedPublisherClient(PublisherClientInterface):
         topic: Union[TopicPath, str],
         data: bytes,
         ordering_key: str = "",
-        **attrs: Mapping[str, str]
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> "Future[str]":
         if isinstance(topic, str):
             topic = TopicPath.parse(topic)
-        publisher = self._multiplexer.get_or_create(
-            topic, lambda: self._publisher_factory(topic).__enter__()
-        )
-        future = publisher.publish(data=data, ordering_key=ordering_key, **attrs)
+        self._acquire(topic)
+        try:
+            publisher = self._multiplexer.get_or_create(
+                topic, lambda: self._publisher_factory(topic).__enter__()
+            )
+            future = publisher.publish(
+                data=data, ordering_key=ordering_key, partition=partition, **attrs
+            )
+        except:  # noqa: E722
+            self._release(topic)
+            raise
         future.add_done_callback(
             lambda fut: self._on_future_completion(topic, publisher, fut)
         )
         return future
 
+    @overrides
+    def flush(self, timeout: Optional[float] = None):
+        flushes = [
+            publisher.flush() for publisher in self._multiplexer.live_clients().values()
+        ]
+        if not flushes:
+            return
+        _, not_done = wait(flushes, timeout)
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            raise DeadlineExceeded(
+                f"Published messages were not acknowledged within {timeout} seconds."
+            )
+        for future in flushes:
+            future.result()
+
+    def _acquire(self, topic: TopicPath):
+        with self._lock:
+            self._outstanding[topic] = self._outstanding.get(topic, 0) + 1
+            self._last_used[topic] = time.monotonic()
+            self._last_used.move_to_end(topic)
+            self._wake_if_over_capacity()
+
+    def _release(self, topic: TopicPath):
+        with self._lock:
+            self._outstanding[topic] -= 1
+            if self._outstanding[topic] == 0:
+                del self._outstanding[topic]
+            if topic in self._last_used:
+                self._last_used[topic] = time.monotonic()
+            self._wake_if_over_capacity()
+
+    def _wake_if_over_capacity(self):
+        if (
+            self._max_live_topics is not None
+            and len(self._last_used) > self._max_live_topics
+        ):
+            self._wake.set()
+
     def _on_future_completion(
         self, topic: TopicPath, publisher: SinglePublisher, future: "Future[str]"
     ):
+        self._release(topic)
         try:
             future.result()
+        except InvalidPartition:
+            pass
         except GoogleAPICallError:
             self._multiplexer.try_erase(topic, publisher)
 
+    def _evict(self):
+        with self._lock:
+            topics = select_evictions(
+                self._last_used,
+                self._outstanding,
+                self._max_live_topics,
+                self._topic_idle_seconds,
+                time.monotonic(),
+            )
+            # Removed under the lock so that a concurrent publish opens a new publisher instead of using one which
+            # is being closed.
+            publishers = [self._multiplexer.try_remove(topic) for topic in topics]
+        for topic, publisher in zip(topics, publishers):
+            if publisher is None:
+                continue
+            try:
+                # Exiting flushes any messages which are still batched.
+                publisher.__exit__(None, None, None)
+            except GoogleAPICallError as e:
+                _LOGGER.debug(f"Error closing evicted publisher for {topic}: {e!r}")
+
+    def _evict_loop(self):
+        period = (
+            None if self._topic_idle_seconds is None else self._topic_idle_seconds / 2
+        )
+        while not self._stopping.is_set():
+            self._wake.wait(period)
+            self._wake.clear()
+            if not self._stopping.is_set():
+                self._evict()
+
     @overrides
     def __enter__(self):
         self._multiplexer.__enter__()
+        if self._max_live_topics is not None or self._topic_idle_seconds is not None:
+            self._evictor = threading.Thread(target=self._evict_loop, daemon=True)
+            self._evictor.start()
         return self
 
     @overrides
     def __exit__(self, exc_type, exc_value, traceback):
+        if self._evictor is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._evictor.join()
+        try:
+            # Drains all topics concurrently, so that closing them one at a time below is fast.
+            self.flush(self._drain_timeout)
+        except DeadlineExceeded:
+            _LOGGER.warning(
+                f"Published messages were not acknowledged within the drain timeout of {self._drain_timeout} seconds, "
+                "closing the publishers anyway."
+            )
+        except GoogleAPICallError as e:
+            # Failed messages have already failed their publish futures.
+            _LOGGER.debug(f"Error flushing publishers on exit: {e!r}")
         self._multiplexer.__exit__(exc_type, exc_value, traceback)
@@ -17,9 +17,14 @@ from typing import Union, Optional, Set
 
 from google.cloud.pubsub_v1.subscriber.futures import StreamingPullFuture
 
+from google.cloud.pubsublite.cloudpubsub.event_loop_pool import EventLoopPool
 from google.cloud.pubsublite.cloudpubsub.internal.client_multiplexer import (
     ClientMultiplexer,
 )
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    LoopFactory,
+    ManagedEventLoop,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
     AsyncSubscriberFactory,
 )
@@ -39,14 +44,22 @@ from overrides import overrides
 class MultiplexedSubscriberClient(SubscriberClientInterface):
     _executor: ThreadPoolExecutor
     _underlying_factory: AsyncSubscriberFactory
+    _event_loop_pool: Optional[EventLoopPool]
+    _loop_factory: Optional[LoopFactory]
 
     _multiplexer: ClientMultiplexer[SubscriptionPath, StreamingPullFuture]
 
     def __init__(
-        self, executor: ThreadPoolExecutor, underlying_factory: AsyncSubscriberFactory
+        self,
+        executor: ThreadPoolExecutor,
+        underlying_factory: AsyncSubscriberFactory,
+        event_loop_pool: Optional[EventLoopPool] = None,
+        loop_factory: Optional[LoopFactory] = None,
     ):
         self._executor = executor
         self._underlying_factory = underlying_factory
+        self._event_loop_pool = event_loop_pool
+        self._loop_factory = loop_factory
 
         def cancel_streaming_pull_future(fut: StreamingPullFuture):
             try:
@@ -72,7 +85,14 @@ class MultiplexedSubscriberClient(SubscriberClientInterface):
             underlying = self._underlying_factory(
                 subscription, fixed_partitions, per_partition_flow_control_settings
             )
-            subscriber = SubscriberImpl(underlying, callback, self._executor)
+            subscriber = SubscriberImpl(
+                underlying,
+                callback,
+                self._executor,
+                ManagedEventLoop(self._loop_factory)
+                if self._event_loop_pool is None
+                else self._event_loop_pool.loop_for(subscription),
+            )
             future = StreamingPullFuture(subscriber)
             subscriber.__enter__()
             return future
@@ -0,0 +1,46 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from google.cloud.pubsublite_v1 import FlowControlRequest
+
+FlowGrant = Callable[[FlowControlRequest], None]
+
+
+class PartitionFlowControl(ABC):
+    """
+  Decides when flow control tokens are granted to the server for a single partition subscriber.
+  """
+
+    @abstractmethod
+    def start(self, grant: FlowGrant):
+        """Start granting tokens by calling grant, which may happen on any thread."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def on_received(self, messages: int, size_bytes: int):
+        """Called when messages are received from the server."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def on_acked(self, messages: int, size_bytes: int):
+        """Called when received messages are acked, so their tokens may be granted again."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stop(self):
+        """Stop granting tokens. Any outstanding tokens are abandoned."""
+        raise NotImplementedError()
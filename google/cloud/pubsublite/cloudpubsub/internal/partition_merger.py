@@ -0,0 +1,135 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List
+
+from google.api_core.exceptions import InvalidArgument
+from google.cloud.pubsub_v1.subscriber.message import Message
+
+from google.cloud.pubsublite.types import Partition
+
+
+class _PartitionBuffer:
+    weight: int
+    messages: Deque[Message]
+    # A batch waiting for room in the buffer.
+    pending: List[Message]
+    space_freed: asyncio.Event
+
+    def __init__(self, weight: int):
+        self.weight = weight
+        self.messages = deque()
+        self.pending = []
+        self.space_freed = asyncio.Event()
+
+
+class PartitionMerger:
+    """
+    Merges batches of messages from many partitions into a single stream.
+
+    Each partition has its own buffer of at most max_buffered_per_partition messages, so a partition with a deep
+    backlog cannot crowd out the others. A batch larger than the bound is only added to an empty buffer. Reads
+    take turns between partitions with buffered messages in weighted round-robin order, reading up to a partition's
+    weight in messages before moving on to the next partition.
+
+    Must be created on the event loop it is used on.
+    """
+
+    _max_buffered: int
+    _buffers: Dict[Partition, _PartitionBuffer]
+    _ready: Deque[Partition]
+    _turn_remaining: int
+    _available: asyncio.Event
+
+    def __init__(self, max_buffered_per_partition: int):
+        if max_buffered_per_partition < 1:
+            raise InvalidArgument(
+                f"max_buffered_per_partition must be at least 1, was {max_buffered_per_partition}."
+            )
+        self._max_buffered = max_buffered_per_partition
+        self._buffers = {}
+        self._ready = deque()
+        self._turn_remaining = 0
+        self._available = asyncio.Event()
+
+    def add_partition(self, partition: Partition, weight: int = 1):
+        if weight < 1:
+            raise InvalidArgument(
+                f"Partition weight must be at least 1, was {weight} for {partition}."
+            )
+        self._buffers[partition] = _PartitionBuffer(weight)
+
+    def remove_partition(self, partition: Partition) -> List[Message]:
+        """
+        Stop merging the partition, returning the messages which were buffered but not read, including any batch
+        whose put was waiting for space.
+        """
+        buffer = self._buffers.pop(partition)
+        if partition in self._ready:
+            if self._ready[0] == partition:
+                self._turn_remaining = 0
+            self._ready.remove(partition)
+        return list(buffer.messages) + buffer.pending
+
+    async def put(self, partition: Partition, messages: List[Message]):
+        """
+        Add a batch of messages for the partition, waiting until its buffer has room for the whole batch. Only one put
+        may wait for each partition at a time. If the put is cancelled, the batch is still returned by
+        remove_partition.
+        """
+        buffer = self._buffers[partition]
+        buffer.pending = messages
+        while (
+            buffer.messages
+            and len(buffer.messages) + len(messages) > self._max_buffered
+        ):
+            buffer.space_freed.clear()
+            await buffer.space_freed.wait()
+        buffer.pending = []
+        if not messages:
+            return
+        if not buffer.messages:
+            self._ready.append(partition)
+        buffer.messages.extend(messages)
+        self._available.set()
+
+    def _pop(self) -> Message:
+        partition = self._ready[0]
+        buffer = self._buffers[partition]
+        if self._turn_remaining <= 0:
+            self._turn_remaining = buffer.weight
+        message = buffer.messages.popleft()
+        self._turn_remaining -= 1
+        buffer.space_freed.set()
+        if not buffer.messages:
+            self._ready.popleft()
+            self._turn_remaining = 0
+        elif self._turn_remaining == 0:
+            self._ready.rotate(-1)
+        return message
+
+    async def get(self) -> Message:
+        while not self._ready:
+            self._available.clear()
+            await self._available.wait()
+        return self._pop()
+
+    def depths(self) -> Dict[Partition, int]:
+        """The number of buffered messages for each partition."""
+        return {
+            partition: len(buffer.messages)
+            for partition, buffer in self._buffers.items()
+        }
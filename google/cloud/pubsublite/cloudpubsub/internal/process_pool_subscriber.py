@@ -0,0 +1,473 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Set
+
+from google.api_core.exceptions import GoogleAPICallError, from_http_status
+from google.cloud.pubsub_v1.subscriber.futures import StreamingPullFuture
+
+from google.cloud.pubsublite.cloudpubsub.internal.client_multiplexer import (
+    ClientMultiplexer,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    ManagedEventLoop,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.streaming_pull_manager import (
+    StreamingPullManager,
+    CloseCallback,
+)
+from google.cloud.pubsublite.cloudpubsub.subscriber_client_interface import (
+    SubscriberClientInterface,
+    MessageCallback,
+)
+from google.cloud.pubsublite.internal.wire.assigner import Assigner
+from google.cloud.pubsublite.types import (
+    FlowControlSettings,
+    Partition,
+    SubscriptionPath,
+)
+from overrides import overrides
+
+_LOGGER = logging.getLogger(__name__)
+
+_RESTART_POLL_SECONDS = 1.0
+_MAX_RESTART_BACKOFF_SECONDS = 60.0
+_WORKER_STOP_TIMEOUT_SECONDS = 30.0
+
+
+class Worker(ABC):
+    """A handle to a worker which subscribes to a fixed set of partitions until stopped."""
+
+    @abstractmethod
+    def start(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def is_alive(self) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def request_stop(self):
+        """Ask the worker to stop, without waiting for it to exit."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def join(self, timeout: float):
+        """Block until the worker has exited, killing it if it has not exited within the timeout."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def failure(self) -> Optional[GoogleAPICallError]:
+        """The permanent error the worker exited with, if any. Workers which died without one are restarted."""
+        raise NotImplementedError()
+
+
+WorkerFactory = Callable[[Set[Partition]], Worker]
+
+
+def _stop_workers(workers: List[Worker]):
+    """Stop the workers in parallel, blocking until all of them have exited."""
+    for worker in workers:
+        worker.request_stop()
+    deadline = time.monotonic() + _WORKER_STOP_TIMEOUT_SECONDS
+    for worker in workers:
+        worker.join(max(0.0, deadline - time.monotonic()))
+
+
+def _run_worker(
+    client_kwargs: Dict[str, Any],
+    subscription: SubscriptionPath,
+    callback: MessageCallback,
+    per_partition_flow_control_settings: FlowControlSettings,
+    partitions: Set[Partition],
+    stop_event: "multiprocessing.synchronize.Event",
+    failure_sender: "multiprocessing.connection.Connection",
+):
+    # Imported here to avoid a cycle, as subscriber_client depends on this module.
+    from google.cloud.pubsublite.cloudpubsub.subscriber_client import SubscriberClient
+
+    with SubscriberClient(**client_kwargs) as client:
+        future = client.subscribe(
+            subscription,
+            callback,
+            per_partition_flow_control_settings,
+            fixed_partitions=partitions,
+        )
+        while not stop_event.wait(_RESTART_POLL_SECONDS):
+            if future.done():
+                break
+        future.cancel()
+        try:
+            future.result()
+        except concurrent.futures.CancelledError:
+            pass
+        except GoogleAPICallError as e:
+            _LOGGER.exception(f"Worker for partitions {partitions} failed.")
+            # Exceptions may not be picklable, so the error is sent as its status and message.
+            failure_sender.send((e.code, e.message))
+            sys.exit(1)
+
+
+class _ProcessWorker(Worker):
+    _process: multiprocessing.Process
+    _stop_event: "multiprocessing.synchronize.Event"
+    _failure_receiver: "multiprocessing.connection.Connection"
+
+    def __init__(
+        self,
+        context: multiprocessing.context.BaseContext,
+        client_kwargs: Dict[str, Any],
+        subscription: SubscriptionPath,
+        callback: MessageCallback,
+        per_partition_flow_control_settings: FlowControlSettings,
+        partitions: Set[Partition],
+    ):
+        self._stop_event = context.Event()
+        self._failure_receiver, failure_sender = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_run_worker,
+            args=(
+                client_kwargs,
+                subscription,
+                callback,
+                per_partition_flow_control_settings,
+                partitions,
+                self._stop_event,
+                failure_sender,
+            ),
+            daemon=True,
+        )
+
+    def start(self):
+        self._process.start()
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def request_stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout: float):
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+
+    def failure(self) -> Optional[GoogleAPICallError]:
+        if not self._failure_receiver.poll():
+            return None
+        code, message = self._failure_receiver.recv()
+        return from_http_status(code, message)
+
+
+def rebalance(
+    current: List[Set[Partition]], assignment: Set[Partition]
+) -> List[Set[Partition]]:
+    """
+    Distribute the assigned partitions across the workers, moving as few partitions as possible and leaving the
+    worker loads within one partition of each other.
+    """
+    result = [partitions & assignment for partitions in current]
+    placed: Set[Partition] = set().union(*result)
+    for partition in sorted(assignment - placed):
+        min(result, key=len).add(partition)
+    while True:
+        largest = max(result, key=len)
+        smallest = min(result, key=len)
+        if len(largest) - len(smallest) <= 1:
+            return result
+        moved = max(largest)
+        largest.remove(moved)
+        smallest.add(moved)
+
+
+class ProcessPoolSubscriberImpl(ContextManager, StreamingPullManager):
+    """
+    Coordinates the assignment for a subscription and shards the assigned partitions across worker processes, each
+    of which runs its own subscriber stack for a fixed set of partitions. Workers which die are restarted.
+    """
+
+    _assigner_factory: Callable[[], Assigner]
+    _worker_factory: WorkerFactory
+
+    _event_loop: ManagedEventLoop
+    _assign_future: concurrent.futures.Future
+    _monitor: threading.Thread
+    _stopping: threading.Event
+
+    _lock: threading.Lock
+    _partitions: List[Set[Partition]]
+    _workers: List[Optional[Worker]]
+    _restart_poll_seconds: float
+    _restart_backoff: List[float]
+    _restart_at: List[Optional[float]]
+    _started_at: List[float]
+
+    _close_lock: threading.Lock
+    _failure: Optional[GoogleAPICallError]
+    _close_callback: Optional[CloseCallback]
+    _closed: bool
+
+    def __init__(
+        self,
+        assigner_factory: Callable[[], Assigner],
+        worker_factory: WorkerFactory,
+        num_workers: int,
+        restart_poll_seconds: float = _RESTART_POLL_SECONDS,
+    ):
+        self._assigner_factory = assigner_factory
+        self._worker_factory = worker_factory
+        self._event_loop = ManagedEventLoop()
+        self._monitor = threading.Thread(
+            target=self._monitor_loop, args=(restart_poll_seconds,)
+        )
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._partitions = [set() for _ in range(num_workers)]
+        self._workers = [None for _ in range(num_workers)]
+        self._restart_poll_seconds = restart_poll_seconds
+        self._restart_backoff = [0.0 for _ in range(num_workers)]
+        self._restart_at = [None for _ in range(num_workers)]
+        self._started_at = [0.0 for _ in range(num_workers)]
+        self._close_lock = threading.Lock()
+        self._failure = None
+        self._close_callback = None
+        self._closed = False
+
+    def add_close_callback(self, close_callback: CloseCallback):
+        with self._close_lock:
+            assert self._close_callback is None
+            self._close_callback = close_callback
+
+    def close(self):
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.__exit__(None, None, None)
+
+    def _fail(self, error: GoogleAPICallError):
+        self._failure = error
+        self.close()
+
+    def _start_worker(self, index: int):
+        if not self._partitions[index]:
+            self._workers[index] = None
+            return
+        worker = self._worker_factory(set(self._partitions[index]))
+        worker.start()
+        self._workers[index] = worker
+        self._started_at[index] = time.monotonic()
+
+    def _apply_assignment(self, assignment: Set[Partition]):
+        with self._lock:
+            if self._stopping.is_set():
+                return
+            new_partitions = rebalance(self._partitions, assignment)
+            changed = [
+                index
+                for index, partitions in enumerate(new_partitions)
+                if partitions != self._partitions[index]
+            ]
+            _stop_workers(
+                [
+                    self._workers[index]
+                    for index in changed
+                    if self._workers[index] is not None
+                ]
+            )
+            for index in changed:
+                self._partitions[index] = new_partitions[index]
+                self._restart_backoff[index] = 0.0
+                self._restart_at[index] = None
+                self._start_worker(index)
+
+    def _restart_delay(self, index: int, now: float) -> float:
+        if now - self._started_at[index] > _MAX_RESTART_BACKOFF_SECONDS:
+            # The worker ran for a while before dying, so it is not crash looping.
+            self._restart_backoff[index] = 0.0
+        delay = self._restart_backoff[index]
+        self._restart_backoff[index] = min(
+            _MAX_RESTART_BACKOFF_SECONDS, max(self._restart_poll_seconds, 2 * delay)
+        )
+        return delay
+
+    def _restart_dead_workers(self) -> Optional[GoogleAPICallError]:
+        """Restart workers which died, backing off when they die repeatedly, or return the permanent error a worker
+        exited with."""
+        with self._lock:
+            if self._stopping.is_set():
+                return None
+            now = time.monotonic()
+            for index, worker in enumerate(self._workers):
+                if worker is None or worker.is_alive():
+                    continue
+                failure = worker.failure()
+                if failure is not None:
+                    return failure
+                if self._restart_at[index] is None:
+                    delay = self._restart_delay(index, now)
+                    self._restart_at[index] = now + delay
+                    _LOGGER.warning(
+                        f"Worker for partitions {self._partitions[index]} died, restarting it in {delay}s."
+                    )
+                if now >= self._restart_at[index]:
+                    self._restart_at[index] = None
+                    self._start_worker(index)
+            return None
+
+    def _monitor_loop(self, restart_poll_seconds: float):
+        while not self._stopping.wait(restart_poll_seconds):
+            failure = self._restart_dead_workers()
+            if failure is not None:
+                # Closing joins this thread, so it cannot happen on this thread.
+                threading.Thread(target=self._fail, args=(failure,)).start()
+                return
+
+    async def _assign_loop(self):
+        try:
+            async with self._assigner_factory() as assigner:
+                while True:
+                    assignment = await assigner.get_assignment()
+                    # Stopping workers blocks, so it cannot run on the event loop.
+                    await asyncio.get_event_loop().run_in_executor(
+                        None, self._apply_assignment, assignment
+                    )
+        except GoogleAPICallError as e:
+            # Closing joins the event loop thread, so it cannot happen on that thread.
+            threading.Thread(target=self._fail, args=(e,)).start()
+
+    def __enter__(self):
+        assert self._close_callback is not None
+        self._event_loop.__enter__()
+        self._assign_future = self._event_loop.submit(self._assign_loop())
+        self._monitor.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self._assign_future.cancel()
+            self._assign_future.result()
+        except concurrent.futures.CancelledError:
+            pass
+        self._event_loop.__exit__(exc_type, exc_value, traceback)
+        with self._lock:
+            self._stopping.set()
+            _stop_workers([worker for worker in self._workers if worker is not None])
+            self._workers = [None for _ in self._workers]
+        self._monitor.join()
+        assert self._close_callback is not None
+        self._close_callback(self, self._failure)
+
+
+def make_process_worker_factory(
+    client_kwargs: Dict[str, Any],
+    subscription: SubscriptionPath,
+    callback: MessageCallback,
+    per_partition_flow_control_settings: FlowControlSettings,
+) -> WorkerFactory:
+    """
+    Make a factory for worker processes. The processes are spawned rather than forked, since gRPC does not support
+    forking after channels have been created. All arguments must therefore be picklable.
+    """
+    context = multiprocessing.get_context("spawn")
+    return lambda partitions: _ProcessWorker(
+        context,
+        client_kwargs,
+        subscription,
+        callback,
+        per_partition_flow_control_settings,
+        partitions,
+    )
+
+
+AssignerFactoryFactory = Callable[
+    [SubscriptionPath, Optional[Set[Partition]]], Callable[[], Assigner]
+]
+
+
+class ProcessPoolSubscriberClientImpl(SubscriberClientInterface):
+    _assigner_factory_factory: AssignerFactoryFactory
+    _client_kwargs: Dict[str, Any]
+    _num_processes: int
+
+    _multiplexer: ClientMultiplexer[SubscriptionPath, StreamingPullFuture]
+
+    def __init__(
+        self,
+        assigner_factory_factory: AssignerFactoryFactory,
+        client_kwargs: Dict[str, Any],
+        num_processes: int,
+    ):
+        self._assigner_factory_factory = assigner_factory_factory
+        self._client_kwargs = client_kwargs
+        self._num_processes = num_processes
+
+        def cancel_streaming_pull_future(fut: StreamingPullFuture):
+            try:
+                fut.cancel()
+                fut.result()
+            except:  # noqa: E722
+                pass
+
+        self._multiplexer = ClientMultiplexer(cancel_streaming_pull_future)
+
+    @overrides
+    def subscribe(
+        self,
+        subscription,
+        callback: MessageCallback,
+        per_partition_flow_control_settings: FlowControlSettings,
+        fixed_partitions: Optional[Set[Partition]] = None,
+    ) -> StreamingPullFuture:
+        if isinstance(subscription, str):
+            subscription = SubscriptionPath.parse(subscription)
+
+        def create_and_open():
+            subscriber = ProcessPoolSubscriberImpl(
+                self._assigner_factory_factory(subscription, fixed_partitions),
+                make_process_worker_factory(
+                    self._client_kwargs,
+                    subscription,
+                    callback,
+                    per_partition_flow_control_settings,
+                ),
+                self._num_processes,
+            )
+            future = StreamingPullFuture(subscriber)
+            subscriber.__enter__()
+            return future
+
+        future = self._multiplexer.create_or_fail(subscription, create_and_open)
+        future.add_done_callback(
+            lambda fut: self._multiplexer.try_erase(subscription, future)
+        )
+        return future
+
+    @overrides
+    def __enter__(self):
+        self._multiplexer.__enter__()
+        return self
+
+    @overrides
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._multiplexer.__exit__(exc_type, exc_value, traceback)
@@ -13,33 +13,51 @@
 # limitations under the License.
 
 from concurrent.futures import Future
-from typing import Mapping
+from typing import Mapping, Optional
 
 from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    EventLoopHandle,
     ManagedEventLoop,
 )
 from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
     SinglePublisher,
     AsyncSinglePublisher,
 )
+from google.cloud.pubsublite.types import Partition
 
 
 class SinglePublisherImpl(SinglePublisher):
-    _managed_loop: ManagedEventLoop
+    _managed_loop: EventLoopHandle
     _underlying: AsyncSinglePublisher
 
-    def __init__(self, underlying: AsyncSinglePublisher):
+    def __init__(
+        self,
+        underlying: AsyncSinglePublisher,
+        event_loop: Optional[EventLoopHandle] = None,
+    ):
         super().__init__()
-        self._managed_loop = ManagedEventLoop()
+        self._managed_loop = (
+            event_loop if event_loop is not None else ManagedEventLoop()
+        )
         self._underlying = underlying
 
     def publish(
-        self, data: bytes, ordering_key: str = "", **attrs: Mapping[str, str]
+        self,
+        data: bytes,
+        ordering_key: str = "",
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> "Future[str]":
         return self._managed_loop.submit(
-            self._underlying.publish(data=data, ordering_key=ordering_key, **attrs)
+            self._underlying.publish(
+                data=data, ordering_key=ordering_key, partition=partition, **attrs
+            )
         )
 
+    def flush(self) -> "Future[None]":
+        return self._managed_loop.submit(self._underlying.flush())
+
     def __enter__(self):
         self._managed_loop.__enter__()
         self._managed_loop.submit(self._underlying.__aenter__()).result()
@@ -13,7 +13,8 @@
 # limitations under the License.
 
 import asyncio
-from typing import Union, Dict, NamedTuple
+import threading
+from typing import Callable, Union, Dict, NamedTuple, Iterable, List, Optional
 import queue
 
 from google.api_core.exceptions import FailedPrecondition, GoogleAPICallError
@@ -23,10 +24,13 @@ from google.pubsub_v1 import PubsubMessage
 from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_cancelled
 from google.cloud.pubsublite.types import FlowControlSettings
 from google.cloud.pubsublite.cloudpubsub.internal.ack_set_tracker import AckSetTracker
+from google.cloud.pubsublite.cloudpubsub.internal.partition_flow_control import (
+    PartitionFlowControl,
+)
 from google.cloud.pubsublite.cloudpubsub.message_transformer import MessageTransformer
 from google.cloud.pubsublite.cloudpubsub.nack_handler import NackHandler
 from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
-    AsyncSingleSubscriber,
+    AsyncPartitionSubscriber,
 )
 from google.cloud.pubsublite.internal.wire.permanent_failable import PermanentFailable
 from google.cloud.pubsublite.internal.wire.subscriber import Subscriber
@@ -39,16 +43,38 @@ class _SizedMessage(NamedTuple):
     size_bytes: int
 
 
-class SinglePartitionSingleSubscriber(PermanentFailable, AsyncSingleSubscriber):
+class _WakingQueue(queue.Queue):
+    """A queue.Queue which calls on_put after each item is put. Items may be put from any thread."""
+
+    _on_put: Callable[[], None]
+
+    def __init__(self, on_put: Callable[[], None]):
+        super().__init__()
+        self._on_put = on_put
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        self._on_put()
+
+
+class SinglePartitionSingleSubscriber(PermanentFailable, AsyncPartitionSubscriber):
     _underlying: Subscriber
     _flow_control_settings: FlowControlSettings
     _ack_set_tracker: AckSetTracker
     _nack_handler: NackHandler
     _transformer: MessageTransformer
+    _flow_control: Optional[PartitionFlowControl]
 
     _queue: queue.Queue
     _messages_by_offset: Dict[int, _SizedMessage]
     _looper_future: asyncio.Future
+    _acks_in_flight: int
+    # Lazily initialized to ensure it is initialized on the thread where __aenter__ is called.
+    _acks_changed: Optional[asyncio.Event]
+    _queue_changed: Optional[asyncio.Event]
+    _wakeup_pending: bool
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _loop_thread: Optional[int]
 
     def __init__(
         self,
@@ -57,52 +83,91 @@ class SinglePartitionSingleSubscriber(PermanentFailable, AsyncSingleSubscriber):
         ack_set_tracker: AckSetTracker,
         nack_handler: NackHandler,
         transformer: MessageTransformer,
+        flow_control: Optional[PartitionFlowControl] = None,
     ):
+        """
+        If flow_control is provided, it decides when tokens are granted, and flow_control_settings is not used.
+        Otherwise flow_control_settings are granted up front and tokens are returned as messages are acked.
+        """
         super().__init__()
         self._underlying = underlying
         self._flow_control_settings = flow_control_settings
         self._ack_set_tracker = ack_set_tracker
         self._nack_handler = nack_handler
         self._transformer = transformer
+        self._flow_control = flow_control
 
-        self._queue = queue.Queue()
+        self._queue = _WakingQueue(self._wake_looper)
         self._messages_by_offset = {}
+        self._acks_in_flight = 0
+        self._acks_changed = None
+        self._queue_changed = None
+        self._wakeup_pending = False
+        self._loop = None
+        self._loop_thread = None
+
+    def _wrap(self, message: SequencedMessage) -> Message:
+        cps_message = self._transformer.transform(message)
+        offset = message.cursor.offset
+        self._ack_set_tracker.track(offset)
+        if self._flow_control is not None:
+            self._flow_control.on_received(1, message.size_bytes)
+        self._messages_by_offset[offset] = _SizedMessage(
+            cps_message, message.size_bytes
+        )
+        return Message(
+            cps_message._pb,
+            ack_id=str(offset),
+            delivery_attempt=0,
+            request_queue=self._queue,
+        )
 
     async def read(self) -> Message:
         try:
             message: SequencedMessage = await self.await_unless_failed(
                 self._underlying.read()
             )
-            cps_message = self._transformer.transform(message)
-            offset = message.cursor.offset
-            self._ack_set_tracker.track(offset)
-            self._messages_by_offset[offset] = _SizedMessage(
-                cps_message, message.size_bytes
-            )
-            wrapped_message = Message(
-                cps_message._pb,
-                ack_id=str(offset),
-                delivery_attempt=0,
-                request_queue=self._queue,
+            return self._wrap(message)
+        except GoogleAPICallError as e:
+            self.fail(e)
+            raise e
+
+    async def read_batch(self) -> List[Message]:
+        try:
+            batch: List[SequencedMessage] = await self.await_unless_failed(
+                self._underlying.read_batch()
             )
-            return wrapped_message
+            return [self._wrap(message) for message in batch]
         except GoogleAPICallError as e:
             self.fail(e)
             raise e
 
+    async def wait_for_acks(self, abandoned: Iterable[Message]):
+        for message in abandoned:
+            self._messages_by_offset.pop(int(message.ack_id), None)
+        while self._messages_by_offset or self._acks_in_flight:
+            self._acks_changed.clear()
+            await self.await_unless_failed(self._acks_changed.wait())
+
     async def _handle_ack(self, message: requests.AckRequest):
         offset = int(message.ack_id)
-        await self._underlying.allow_flow(
-            FlowControlRequest(
-                allowed_messages=1,
-                allowed_bytes=self._messages_by_offset[offset].size_bytes,
-            )
-        )
-        del self._messages_by_offset[offset]
+        self._acks_in_flight += 1
         try:
-            await self._ack_set_tracker.ack(offset)
-        except GoogleAPICallError as e:
-            self.fail(e)
+            size_bytes = self._messages_by_offset[offset].size_bytes
+            if self._flow_control is not None:
+                self._flow_control.on_acked(1, size_bytes)
+            else:
+                await self._underlying.allow_flow(
+                    FlowControlRequest(allowed_messages=1, allowed_bytes=size_bytes)
+                )
+            del self._messages_by_offset[offset]
+            try:
+                await self._ack_set_tracker.ack(offset)
+            except GoogleAPICallError as e:
+                self.fail(e)
+        finally:
+            self._acks_in_flight -= 1
+            self._acks_changed.set()
 
     def _handle_nack(self, message: requests.NackRequest):
         offset = int(message.ack_id)
@@ -146,21 +211,59 @@ class SinglePartitionSingleSubscriber(PermanentFailable, AsyncSingleSubscriber):
         else:
             self._handle_nack(message)
 
+    def _wake_looper(self):
+        # Called on the thread which acked or nacked. Wakeups are coalesced until the looper runs.
+        if self._loop is None or self._wakeup_pending:
+            return
+        self._wakeup_pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._on_wakeup)
+        except RuntimeError:
+            # The event loop has been closed, so the subscriber has already shut down.
+            pass
+
+    def _on_wakeup(self):
+        self._wakeup_pending = False
+        self._queue_changed.set()
+
     async def _looper(self):
         while True:
-            try:
-                # This is not an asyncio.Queue, and therefore we cannot do `await self._queue.get()`.
-                # A blocking wait would block the event loop, this needs to be a queue.Queue for
-                # compatibility with the Cloud Pub/Sub Message's requirements.
-                queue_message = self._queue.get_nowait()
+            self._queue_changed.clear()
+            # This is not an asyncio.Queue, and therefore we cannot do `await self._queue.get()`.
+            # A blocking wait would block the event loop, this needs to be a queue.Queue for
+            # compatibility with the Cloud Pub/Sub Message's requirements. Puts wake the looper instead.
+            while True:
+                try:
+                    queue_message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
                 await self._handle_queue_message(queue_message)
-            except queue.Empty:
-                await asyncio.sleep(0.1)
+            await self._queue_changed.wait()
+
+    async def _allow_flow(self, request: FlowControlRequest):
+        try:
+            await self._underlying.allow_flow(request)
+        except GoogleAPICallError as e:
+            self.fail(e)
+
+    def _grant(self, request: FlowControlRequest):
+        # Grants may be made on any thread, but most are made by acks handled on the subscriber's own loop.
+        if threading.get_ident() == self._loop_thread:
+            asyncio.ensure_future(self._allow_flow(request))
+        else:
+            asyncio.run_coroutine_threadsafe(self._allow_flow(request), self._loop)
 
     async def __aenter__(self):
+        self._acks_changed = asyncio.Event()
+        self._queue_changed = asyncio.Event()
+        self._loop = asyncio.get_event_loop()
+        self._loop_thread = threading.get_ident()
         await self._ack_set_tracker.__aenter__()
         await self._underlying.__aenter__()
         self._looper_future = asyncio.ensure_future(self._looper())
+        if self._flow_control is not None:
+            self._flow_control.start(self._grant)
+            return self
         await self._underlying.allow_flow(
             FlowControlRequest(
                 allowed_messages=self._flow_control_settings.messages_outstanding,
@@ -170,6 +273,8 @@ class SinglePartitionSingleSubscriber(PermanentFailable, AsyncSingleSubscriber):
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
+        if self._flow_control is not None:
+            self._flow_control.stop()
         self._looper_future.cancel()
         await wait_ignore_cancelled(self._looper_future)
         await self._underlying.__aexit__(exc_type, exc_value, traceback)
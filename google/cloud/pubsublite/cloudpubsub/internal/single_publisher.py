@@ -13,9 +13,11 @@
 # limitations under the License.
 
 from abc import abstractmethod
-from typing import AsyncContextManager, Mapping, ContextManager
+from typing import AsyncContextManager, Mapping, ContextManager, Optional
 from concurrent import futures
 
+from google.cloud.pubsublite.types import Partition
+
 
 class AsyncSinglePublisher(AsyncContextManager):
     """
@@ -27,7 +29,12 @@ class AsyncSinglePublisher(AsyncContextManager):
 
     @abstractmethod
     async def publish(
-        self, data: bytes, ordering_key: str = "", **attrs: Mapping[str, str]
+        self,
+        data: bytes,
+        ordering_key: str = "",
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> str:
         """
     Publish a message.
@@ -35,11 +42,24 @@ class AsyncSinglePublisher(AsyncContextManager):
     Args:
       data: The bytestring payload of the message
       ordering_key: The key to enforce ordering on, or "" for no ordering.
+      partition: If set, the partition to publish the message to instead of the one its ordering key is routed to.
+        Must exist in the topic's current partition count.
       **attrs: Additional attributes to send.
 
     Returns:
       An ack id, which can be decoded using MessageMetadata.decode.
 
+    Raises:
+      InvalidArgument: If the partition does not exist.
+      GoogleApiCallError: On a permanent failure.
+    """
+
+    @abstractmethod
+    async def flush(self):
+        """
+    Send all messages published before the call without waiting for their batches to fill, and wait until they
+    have all been acknowledged.
+
     Raises:
       GoogleApiCallError: On a permanent failure.
     """
@@ -54,7 +74,12 @@ class SinglePublisher(ContextManager):
 
     @abstractmethod
     def publish(
-        self, data: bytes, ordering_key: str = "", **attrs: Mapping[str, str]
+        self,
+        data: bytes,
+        ordering_key: str = "",
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> "futures.Future[str]":
         """
     Publish a message.
@@ -62,11 +87,24 @@ class SinglePublisher(ContextManager):
     Args:
       data: The bytestring payload of the message
       ordering_key: The key to enforce ordering on, or "" for no ordering.
+      partition: If set, the partition to publish the message to instead of the one its ordering key is routed to.
+        Must exist in the topic's current partition count.
       **attrs: Additional attributes to send.
 
     Returns:
       A future completed with an ack id, which can be decoded using MessageMetadata.decode.
 
     Raises:
+      InvalidArgument: If the partition does not exist.
       GoogleApiCallError: On a permanent failure.
     """
+
+    @abstractmethod
+    def flush(self) -> "futures.Future[None]":
+        """
+    Send all messages published before the call without waiting for their batches to fill.
+
+    Returns:
+      A future completed once all of those messages have been acknowledged, or failed with a GoogleApiCallError on
+      a permanent failure.
+    """
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from abc import abstractmethod
-from typing import AsyncContextManager, Callable, Set, Optional
+from typing import AsyncContextManager, Callable, Dict, Iterable, List, Set, Optional
 
 from google.cloud.pubsub_v1.subscriber.message import Message
 
@@ -47,6 +47,47 @@ class AsyncSingleSubscriber(AsyncContextManager):
     """
         raise NotImplementedError()
 
+    def buffered_messages(self) -> Dict[Partition, int]:
+        """
+    The number of messages received from each partition which have not yet been read. Subscribers which do not buffer
+    messages by partition return an empty dict.
+    """
+        return {}
+
+
+class AsyncPartitionSubscriber(AsyncSingleSubscriber):
+    """
+  An AsyncSingleSubscriber for a single partition, which can be released gracefully when the partition is revoked.
+  """
+
+    @abstractmethod
+    async def read_batch(self) -> List[Message]:
+        """
+    Read all messages which are available, waiting until there is at least one.
+
+    Returns:
+      The next messages, in order. ack() or nack() must eventually be called exactly once on each.
+
+    Raises:
+      GoogleAPICallError: On a permanent error.
+    """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def wait_for_acks(self, abandoned: Iterable[Message]):
+        """
+    Wait until every message read from this subscriber has been acked and the acks have been committed. Must only be
+    called once read() is no longer being called.
+
+    Args:
+      abandoned: Messages which were read but will never be delivered to the user. These are not waited on, and are
+        redelivered to the next owner of the partition.
+
+    Raises:
+      GoogleAPICallError: On a permanent error.
+    """
+        raise NotImplementedError()
+
 
 AsyncSubscriberFactory = Callable[
     [SubscriptionPath, Optional[Set[Partition]], FlowControlSettings],
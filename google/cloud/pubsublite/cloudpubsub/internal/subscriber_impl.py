@@ -18,6 +18,7 @@ from concurrent.futures.thread import ThreadPoolExecutor
 from typing import ContextManager, Optional
 from google.api_core.exceptions import GoogleAPICallError
 from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    EventLoopHandle,
     ManagedEventLoop,
 )
 from google.cloud.pubsublite.cloudpubsub.internal.streaming_pull_manager import (
@@ -37,7 +38,7 @@ class SubscriberImpl(ContextManager, StreamingPullManager):
     _callback: MessageCallback
     _unowned_executor: ThreadPoolExecutor
 
-    _event_loop: ManagedEventLoop
+    _event_loop: EventLoopHandle
 
     _poller_future: concurrent.futures.Future
     _close_lock: threading.Lock
@@ -50,11 +51,12 @@ class SubscriberImpl(ContextManager, StreamingPullManager):
         underlying: AsyncSingleSubscriber,
         callback: MessageCallback,
         unowned_executor: ThreadPoolExecutor,
+        event_loop: Optional[EventLoopHandle] = None,
     ):
         self._underlying = underlying
         self._callback = callback
         self._unowned_executor = unowned_executor
-        self._event_loop = ManagedEventLoop()
+        self._event_loop = event_loop if event_loop is not None else ManagedEventLoop()
         self._close_lock = threading.Lock()
         self._failure = None
         self._close_callback = None
@@ -81,19 +83,27 @@ class SubscriberImpl(ContextManager, StreamingPullManager):
         self._failure = error
         self.close()
 
-    async def _poller(self):
+    async def _poller(self) -> GoogleAPICallError:
         try:
             while True:
                 message = await self._underlying.read()
                 self._unowned_executor.submit(self._callback, message)
-        except GoogleAPICallError as e:  # noqa: F841  Flake8 thinks e is unused
-            self._unowned_executor.submit(lambda: self._fail(e))  # noqa: F821
+        except GoogleAPICallError as e:
+            return e
+
+    def _on_poller_done(self, poller_future: concurrent.futures.Future):
+        if poller_future.cancelled():
+            return
+        error = poller_future.result()
+        self._unowned_executor.submit(lambda: self._fail(error))
 
     def __enter__(self):
         assert self._close_callback is not None
         self._event_loop.__enter__()
         self._event_loop.submit(self._underlying.__aenter__()).result()
         self._poller_future = self._event_loop.submit(self._poller())
+        # Added once _poller_future is set, since closing on failure waits for it.
+        self._poller_future.add_done_callback(self._on_poller_done)
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
@@ -19,6 +19,8 @@ from google.api_core.client_options import ClientOptions
 from google.auth.credentials import Credentials
 from google.cloud.pubsub_v1.types import BatchSettings
 
+from google.cloud.pubsublite.cloudpubsub.event_loop_pool import EventLoopPool
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import LoopFactory
 from google.cloud.pubsublite.cloudpubsub.internal.make_publisher import (
     make_publisher,
     make_async_publisher,
@@ -33,6 +35,11 @@ from google.cloud.pubsublite.cloudpubsub.publisher_client_interface import (
     PublisherClientInterface,
     AsyncPublisherClientInterface,
 )
+from google.cloud.pubsublite.internal.channel_pool import (
+    DEFAULT_CHANNEL_POOL_SIZE,
+    release_async_channel_pools,
+    retain_async_channel_pools,
+)
 from google.cloud.pubsublite.internal.constructable_from_service_account import (
     ConstructableFromServiceAccount,
 )
@@ -40,10 +47,17 @@ from google.cloud.pubsublite.internal.require_started import RequireStarted
 from google.cloud.pubsublite.internal.wire.make_publisher import (
     DEFAULT_BATCHING_SETTINGS as WIRE_DEFAULT_BATCHING,
 )
-from google.cloud.pubsublite.types import TopicPath
+from google.cloud.pubsublite.types import Partition, TopicPath
 from overrides import overrides
 
 
+def _check_partition_type(partition: Optional[Partition]):
+    if partition is not None and not isinstance(partition, Partition):
+        raise TypeError(
+            f"partition must be a Partition, was {partition!r}. Message attributes cannot be named 'partition'."
+        )
+
+
 class PublisherClient(PublisherClientInterface, ConstructableFromServiceAccount):
     """
     A PublisherClient publishes messages similar to Google Pub/Sub.
@@ -66,6 +80,12 @@ class PublisherClient(PublisherClientInterface, ConstructableFromServiceAccount)
         credentials: Optional[Credentials] = None,
         transport: str = "grpc_asyncio",
         client_options: Optional[ClientOptions] = None,
+        max_live_topics: Optional[int] = None,
+        topic_idle_seconds: Optional[float] = None,
+        event_loop_pool: Optional[EventLoopPool] = None,
+        loop_factory: Optional[LoopFactory] = None,
+        channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+        drain_timeout: Optional[float] = None,
     ):
         """
         Create a new PublisherClient.
@@ -75,6 +95,18 @@ class PublisherClient(PublisherClientInterface, ConstructableFromServiceAccount)
             credentials: If provided, the credentials to use when connecting.
             transport: The transport to use. Must correspond to an asyncio transport.
             client_options: The client options to use when connecting. If used, must explicitly set `api_endpoint`.
+            max_live_topics: If set, the least recently used topics are closed once more than this many are open.
+                Topics with messages still being published are not closed.
+            topic_idle_seconds: If set, topics which have not been published to for this long are closed. Closed
+                topics are reopened on the next publish.
+            event_loop_pool: If provided, publishers for all topics run on the pool's shared event loop threads instead
+                of a thread per topic.
+            loop_factory: Creates the event loop for each topic when event_loop_pool is not provided, for example
+                uvloop_if_installed or the new_event_loop method of an event loop policy.
+            channel_pool_size: The maximum number of channels shared by the streams of clients with the same endpoint
+                and credentials on an event loop.
+            drain_timeout: If set, __exit__ waits at most this many seconds for published messages to be acknowledged
+                before closing the client. It waits until all are acknowledged if None.
         """
         self._impl = MultiplexedPublisherClient(
             lambda topic: make_publisher(
@@ -83,7 +115,13 @@ class PublisherClient(PublisherClientInterface, ConstructableFromServiceAccount)
                 credentials=credentials,
                 client_options=client_options,
                 transport=transport,
-            )
+                event_loop_pool=event_loop_pool,
+                loop_factory=loop_factory,
+                channel_pool_size=channel_pool_size,
+            ),
+            max_live_topics,
+            topic_idle_seconds,
+            drain_timeout,
         )
         self._require_stared = RequireStarted()
 
@@ -93,13 +131,25 @@ class PublisherClient(PublisherClientInterface, ConstructableFromServiceAccount)
         topic: Union[TopicPath, str],
         data: bytes,
         ordering_key: str = "",
-        **attrs: Mapping[str, str]
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> "Future[str]":
         self._require_stared.require_started()
+        _check_partition_type(partition)
         return self._impl.publish(
-            topic=topic, data=data, ordering_key=ordering_key, **attrs
+            topic=topic,
+            data=data,
+            ordering_key=ordering_key,
+            partition=partition,
+            **attrs,
         )
 
+    @overrides
+    def flush(self, timeout: Optional[float] = None):
+        self._require_stared.require_started()
+        self._impl.flush(timeout)
+
     @overrides
     def __enter__(self):
         self._require_stared.__enter__()
@@ -136,6 +186,9 @@ class AsyncPublisherClient(
         credentials: Optional[Credentials] = None,
         transport: str = "grpc_asyncio",
         client_options: Optional[ClientOptions] = None,
+        max_live_topics: Optional[int] = None,
+        topic_idle_seconds: Optional[float] = None,
+        channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
     ):
         """
         Create a new AsyncPublisherClient.
@@ -145,6 +198,12 @@ class AsyncPublisherClient(
             credentials: If provided, the credentials to use when connecting.
             transport: The transport to use. Must correspond to an asyncio transport.
             client_options: The client options to use when connecting. If used, must explicitly set `api_endpoint`.
+            max_live_topics: If set, the least recently used topics are closed once more than this many are open.
+                Topics with messages still being published are not closed.
+            topic_idle_seconds: If set, topics which have not been published to for this long are closed. Closed
+                topics are reopened on the next publish.
+            channel_pool_size: The maximum number of channels shared by the streams of clients with the same endpoint
+                and credentials on an event loop.
         """
         self._impl = MultiplexedAsyncPublisherClient(
             lambda topic: make_async_publisher(
@@ -153,7 +212,10 @@ class AsyncPublisherClient(
                 credentials=credentials,
                 client_options=client_options,
                 transport=transport,
-            )
+                channel_pool_size=channel_pool_size,
+            ),
+            max_live_topics,
+            topic_idle_seconds,
         )
         self._require_stared = RequireStarted()
 
@@ -163,20 +225,40 @@ class AsyncPublisherClient(
         topic: Union[TopicPath, str],
         data: bytes,
         ordering_key: str = "",
-        **attrs: Mapping[str, str]
+        *,
+        partition: Optional[Partition] = None,
+        **attrs: Mapping[str, str],
     ) -> str:
         self._require_stared.require_started()
+        _check_partition_type(partition)
         return await self._impl.publish(
-            topic=topic, data=data, ordering_key=ordering_key, **attrs
+            topic=topic,
+            data=data,
+            ordering_key=ordering_key,
+            partition=partition,
+            **attrs,
         )
 
+    @overrides
+    async def flush(self, timeout: Optional[float] = None):
+        self._require_stared.require_started()
+        await self._impl.flush(timeout)
+
     @overrides
     async def __aenter__(self):
         self._require_stared.__enter__()
-        await self._impl.__aenter__()
+        retain_async_channel_pools()
+        try:
+            await self._impl.__aenter__()
+        except:  # noqa: E722
+            await release_async_channel_pools()
+            raise
         return self
 
     @overrides
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self._impl.__aexit__(exc_type, exc_value, traceback)
+        try:
+            await self._impl.__aexit__(exc_type, exc_value, traceback)
+        finally:
+            await release_async_channel_pools()
         self._require_stared.__exit__(exc_type, exc_value, traceback)
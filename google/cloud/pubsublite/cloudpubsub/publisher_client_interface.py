@@ -14,9 +14,9 @@
 
 from abc import abstractmethod
 from concurrent.futures import Future
-from typing import ContextManager, Mapping, Union, AsyncContextManager
+from typing import ContextManager, Mapping, Optional, Union, AsyncContextManager
 
-from google.cloud.pubsublite.types import TopicPath
+from google.cloud.pubsublite.types import Partition, TopicPath
 
 
 class AsyncPublisherClientInterface(AsyncContextManager):
@@ -33,6 +33,8 @@ class AsyncPublisherClientInterface(AsyncContextManager):
         topic: Union[TopicPath, str],
         data: bytes,
         ordering_key: str = "",
+        *,
+        partition: Optional[Partition] = None,
         **attrs: Mapping[str, str],
     ) -> str:
         """
@@ -42,12 +44,29 @@ class AsyncPublisherClientInterface(AsyncContextManager):
       topic: The topic to publish to. Publishes to new topics may have nontrivial startup latency.
       data: The bytestring payload of the message
       ordering_key: The key to enforce ordering on, or "" for no ordering.
+      partition: If set, the partition to publish the message to instead of the one its ordering key is routed to.
+        Must exist in the topic's current partition count.
       **attrs: Additional attributes to send.
 
     Returns:
       An ack id, which can be decoded using MessageMetadata.decode.
 
     Raises:
+      InvalidArgument: If the partition does not exist.
+      GoogleApiCallError: On a permanent failure.
+    """
+
+    @abstractmethod
+    async def flush(self, timeout: Optional[float] = None):
+        """
+    Send all messages published before the call to every topic and partition in parallel without waiting for
+    their batches to fill, and wait until they have all been acknowledged.
+
+    Args:
+      timeout: If set, the number of seconds to wait for the messages to be acknowledged.
+
+    Raises:
+      DeadlineExceeded: If the messages were not all acknowledged within the timeout.
       GoogleApiCallError: On a permanent failure.
     """
 
@@ -66,6 +85,8 @@ class PublisherClientInterface(ContextManager):
         topic: Union[TopicPath, str],
         data: bytes,
         ordering_key: str = "",
+        *,
+        partition: Optional[Partition] = None,
         **attrs: Mapping[str, str],
     ) -> "Future[str]":
         """
@@ -75,6 +96,8 @@ class PublisherClientInterface(ContextManager):
       topic: The topic to publish to. Publishes to new topics may have nontrivial startup latency.
       data: The bytestring payload of the message
       ordering_key: The key to enforce ordering on, or "" for no ordering.
+      partition: If set, the partition to publish the message to instead of the one its ordering key is routed to.
+        Must exist in the topic's current partition count.
       **attrs: Additional attributes to send.
 
     Returns:
@@ -82,5 +105,20 @@ class PublisherClientInterface(ContextManager):
       MessageMetadata.decode.
 
     Raises:
+      InvalidArgument: If the partition does not exist.
+      GoogleApiCallError: On a permanent failure.
+    """
+
+    @abstractmethod
+    def flush(self, timeout: Optional[float] = None):
+        """
+    Send all messages published before the call to every topic and partition in parallel without waiting for
+    their batches to fill, and block until they have all been acknowledged.
+
+    Args:
+      timeout: If set, the number of seconds to wait for the messages to be acknowledged.
+
+    Raises:
+      DeadlineExceeded: If the messages were not all acknowledged within the timeout.
       GoogleApiCallError: On a permanent failure.
     """
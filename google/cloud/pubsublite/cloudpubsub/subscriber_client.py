@@ -11,17 +11,29 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-
+import asyncio
+import os
 from concurrent.futures.thread import ThreadPoolExecutor
-from typing import Optional, Union, Set, AsyncIterator
+from typing import Callable, Dict, Optional, Union, Set, AsyncIterator
+from uuid import uuid4
 
 from google.api_core.client_options import ClientOptions
 from google.auth.credentials import Credentials
 from google.cloud.pubsub_v1.subscriber.futures import StreamingPullFuture
 from google.cloud.pubsub_v1.subscriber.message import Message
 
+from google.cloud.pubsublite.cloudpubsub.assignment_listener import AssignmentListener
+from google.cloud.pubsublite.cloudpubsub.event_loop_pool import EventLoopPool
+from google.cloud.pubsublite.cloudpubsub.internal.assigning_subscriber import (
+    DEFAULT_MAX_BUFFERED_PER_PARTITION,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import LoopFactory
+from google.cloud.pubsublite.cloudpubsub.internal.flow_control_budget import (
+    FlowControlBudget,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.make_subscriber import (
     make_async_subscriber,
+    make_assigner_factory,
 )
 from google.cloud.pubsublite.cloudpubsub.internal.multiplexed_async_subscriber_client import (
     MultiplexedAsyncSubscriberClient,
@@ -29,17 +41,29 @@ from google.cloud.pubsublite.cloudpubsub.internal.multiplexed_async_subscriber_c
 from google.cloud.pubsublite.cloudpubsub.internal.multiplexed_subscriber_client import (
     MultiplexedSubscriberClient,
 )
+from google.cloud.pubsublite.cloudpubsub.internal.process_pool_subscriber import (
+    ProcessPoolSubscriberClientImpl,
+)
 from google.cloud.pubsublite.cloudpubsub.message_transformer import MessageTransformer
 from google.cloud.pubsublite.cloudpubsub.nack_handler import NackHandler
 from google.cloud.pubsublite.cloudpubsub.subscriber_client_interface import (
     SubscriberClientInterface,
     AsyncSubscriberClientInterface,
+    AsyncMessageHandler,
     MessageCallback,
 )
+from google.cloud.pubsublite.internal.channel_pool import (
+    DEFAULT_CHANNEL_POOL_SIZE,
+    release_async_channel_pools,
+    retain_async_channel_pools,
+)
 from google.cloud.pubsublite.internal.constructable_from_service_account import (
     ConstructableFromServiceAccount,
 )
+from google.cloud.pubsublite.internal.endpoints import regional_endpoint
 from google.cloud.pubsublite.internal.require_started import RequireStarted
+from google.cloud.pubsublite.internal.wire.merge_metadata import merge_metadata
+from google.cloud.pubsublite.internal.wire.pubsub_context import pubsub_context
 from google.cloud.pubsublite.types import (
     FlowControlSettings,
     Partition,
@@ -67,6 +91,15 @@ class SubscriberClient(SubscriberClientInterface, ConstructableFromServiceAccoun
         credentials: Optional[Credentials] = None,
         transport: str = "grpc_asyncio",
         client_options: Optional[ClientOptions] = None,
+        assignment_listener: Optional[AssignmentListener] = None,
+        aggregate_flow_control_settings: Optional[FlowControlSettings] = None,
+        adaptive_flow_control: bool = False,
+        event_loop_pool: Optional[EventLoopPool] = None,
+        partition_event_loops: Optional[int] = None,
+        loop_factory: Optional[LoopFactory] = None,
+        channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+        max_buffered_per_partition: int = DEFAULT_MAX_BUFFERED_PER_PARTITION,
+        partition_weight: Optional[Callable[[Partition], int]] = None,
     ):
         """
         Create a new SubscriberClient.
@@ -78,7 +111,26 @@ class SubscriberClient(SubscriberClientInterface, ConstructableFromServiceAccoun
             credentials: If provided, the credentials to use when connecting.
             transport: The transport to use. Must correspond to an asyncio transport.
             client_options: The client options to use when connecting. If used, must explicitly set `api_endpoint`.
+            assignment_listener: A listener notified with the subscription when partitions of any subscription are
+                assigned to or revoked from this client.
+            aggregate_flow_control_settings: If provided, a budget of outstanding messages and bytes shared by all partitions of all subscriptions of this client. Per-partition flow control settings then cap what each partition may hold.
+            adaptive_flow_control: If true, each partition's flow control window is sized to how fast its messages are acked, with the per-partition flow control settings as the upper limit. May not be used with aggregate_flow_control_settings.
+            event_loop_pool: If provided, all subscriptions run on the pool's shared event loop threads instead of a thread per subscription.
+            partition_event_loops: If set, the partitions of each subscription are spread across this many additional event loop threads, so that decoding and ack processing for different partitions can use more than one core. Assignment and the callback executor are still shared by all partitions.
+            loop_factory: Creates the event loops this client starts, for example uvloop_if_installed or the new_event_loop method of an event loop policy. The loops of an event_loop_pool are created by the pool's own loop_factory.
+            channel_pool_size: The maximum number of channels shared by the streams of clients with the same endpoint
+                and credentials on an event loop.
+            max_buffered_per_partition: The number of messages received from each partition which may wait to be
+                read, or a single batch if it is larger. A partition whose buffer is full is not read from the
+                server until messages from it are read.
+            partition_weight: The number of messages read from a partition per turn when the partitions of a
+                subscription take turns delivering messages. Every partition has a weight of 1 if None.
         """
+        # The same client id is used for every subscription so the assignment is stable when subscribers are recreated.
+        client_id = uuid4().bytes
+        budget = None
+        if aggregate_flow_control_settings is not None:
+            budget = FlowControlBudget(aggregate_flow_control_settings)
         if executor is None:
             executor = ThreadPoolExecutor()
         self._impl = MultiplexedSubscriberClient(
@@ -92,7 +144,122 @@ class SubscriberClient(SubscriberClientInterface, ConstructableFromServiceAccoun
                 fixed_partitions=partitions,
                 credentials=credentials,
                 client_options=client_options,
+                assignment_listener=assignment_listener,
+                client_id=client_id,
+                flow_control_budget=budget,
+                adaptive_flow_control=adaptive_flow_control,
+                partition_event_loops=partition_event_loops,
+                loop_factory=loop_factory,
+                channel_pool_size=channel_pool_size,
+                max_buffered_per_partition=max_buffered_per_partition,
+                partition_weight=partition_weight,
             ),
+            event_loop_pool,
+            loop_factory,
+        )
+        self._require_started = RequireStarted()
+
+    @overrides
+    def subscribe(
+        self,
+        subscription: Union[SubscriptionPath, str],
+        callback: MessageCallback,
+        per_partition_flow_control_settings: FlowControlSettings,
+        fixed_partitions: Optional[Set[Partition]] = None,
+    ) -> StreamingPullFuture:
+        self._require_started.require_started()
+        return self._impl.subscribe(
+            subscription,
+            callback,
+            per_partition_flow_control_settings,
+            fixed_partitions,
+        )
+
+    @overrides
+    def __enter__(self):
+        self._require_started.__enter__()
+        self._impl.__enter__()
+        return self
+
+    @overrides
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._impl.__exit__(exc_type, exc_value, traceback)
+        self._require_started.__exit__(exc_type, exc_value, traceback)
+
+
+class ProcessPoolSubscriberClient(
+    SubscriberClientInterface, ConstructableFromServiceAccount
+):
+    """
+    A ProcessPoolSubscriberClient reads messages similar to Google Pub/Sub, sharding the partitions of each
+    subscription across worker processes so that CPU-bound callbacks are not limited by the GIL. This process owns the
+    partition assignment and restarts workers which die.
+
+    Workers are spawned, so the callback and all constructor arguments must be picklable. The callback runs in the
+    worker processes.
+
+    Must be used in a `with` block or have __enter__() called before use.
+    """
+
+    _impl: SubscriberClientInterface
+    _require_started: RequireStarted
+
+    def __init__(
+        self,
+        num_processes: Optional[int] = None,
+        nack_handler: Optional[NackHandler] = None,
+        message_transformer: Optional[MessageTransformer] = None,
+        credentials: Optional[Credentials] = None,
+        transport: str = "grpc_asyncio",
+        client_options: Optional[ClientOptions] = None,
+        channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+    ):
+        """
+        Create a new ProcessPoolSubscriberClient.
+
+        Args:
+            num_processes: The number of worker processes per subscription. Defaults to the number of CPUs.
+            nack_handler: A handler for when `nack()` is called. The default NackHandler raises an exception, which fails the worker with a permanent error and with it the whole subscription. Workers are only restarted if they die without one.
+            message_transformer: A transformer from Pub/Sub Lite messages to Cloud Pub/Sub messages. This may not return a message with "message_id" set.
+            credentials: If provided, the credentials to use when connecting.
+            transport: The transport to use. Must correspond to an asyncio transport.
+            client_options: The client options to use when connecting. If used, must explicitly set `api_endpoint`.
+            channel_pool_size: The maximum number of channels shared by the streams of each process with the same
+                endpoint and credentials.
+        """
+        if num_processes is None:
+            num_processes = os.cpu_count() or 1
+        metadata = merge_metadata(pubsub_context(framework="CLOUD_PUBSUB_SHIM"), None)
+        client_id = uuid4().bytes
+
+        def assigner_factory_factory(subscription, partitions):
+            options = client_options
+            if options is None:
+                options = ClientOptions(
+                    api_endpoint=regional_endpoint(subscription.location.region)
+                )
+            return make_assigner_factory(
+                subscription,
+                transport,
+                partitions,
+                options,
+                credentials,
+                metadata,
+                client_id,
+                channel_pool_size,
+            )
+
+        self._impl = ProcessPoolSubscriberClientImpl(
+            assigner_factory_factory,
+            {
+                "nack_handler": nack_handler,
+                "message_transformer": message_transformer,
+                "credentials": credentials,
+                "transport": transport,
+                "client_options": client_options,
+                "channel_pool_size": channel_pool_size,
+            },
+            num_processes,
         )
         self._require_started = RequireStarted()
 
@@ -145,6 +312,14 @@ class AsyncSubscriberClient(
         credentials: Optional[Credentials] = None,
         transport: str = "grpc_asyncio",
         client_options: Optional[ClientOptions] = None,
+        assignment_listener: Optional[AssignmentListener] = None,
+        aggregate_flow_control_settings: Optional[FlowControlSettings] = None,
+        adaptive_flow_control: bool = False,
+        partition_event_loops: Optional[int] = None,
+        loop_factory: Optional[LoopFactory] = None,
+        channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+        max_buffered_per_partition: int = DEFAULT_MAX_BUFFERED_PER_PARTITION,
+        partition_weight: Optional[Callable[[Partition], int]] = None,
     ):
         """
         Create a new AsyncSubscriberClient.
@@ -155,7 +330,25 @@ class AsyncSubscriberClient(
             credentials: If provided, the credentials to use when connecting.
             transport: The transport to use. Must correspond to an asyncio transport.
             client_options: The client options to use when connecting. If used, must explicitly set `api_endpoint`.
+            assignment_listener: A listener notified with the subscription when partitions of any subscription are
+                assigned to or revoked from this client.
+            aggregate_flow_control_settings: If provided, a budget of outstanding messages and bytes shared by all partitions of all subscriptions of this client. Per-partition flow control settings then cap what each partition may hold.
+            adaptive_flow_control: If true, each partition's flow control window is sized to how fast its messages are acked, with the per-partition flow control settings as the upper limit. May not be used with aggregate_flow_control_settings.
+            partition_event_loops: If set, the partitions of each subscription are spread across this many event loop threads, so that decoding and ack processing for different partitions can use more than one core. Messages are still delivered on the calling event loop.
+            loop_factory: Creates the event loops for partition_event_loops, for example uvloop_if_installed or the new_event_loop method of an event loop policy.
+            channel_pool_size: The maximum number of channels shared by the streams of clients with the same endpoint
+                and credentials on an event loop.
+            max_buffered_per_partition: The number of messages received from each partition which may wait to be
+                read, or a single batch if it is larger. A partition whose buffer is full is not read from the
+                server until messages from it are read.
+            partition_weight: The number of messages read from a partition per turn when the partitions of a
+                subscription take turns delivering messages. Every partition has a weight of 1 if None.
         """
+        # The same client id is used for every subscription so the assignment is stable when subscribers are recreated.
+        client_id = uuid4().bytes
+        budget = None
+        if aggregate_flow_control_settings is not None:
+            budget = FlowControlBudget(aggregate_flow_control_settings)
         self._impl = MultiplexedAsyncSubscriberClient(
             lambda subscription, partitions, settings: make_async_subscriber(
                 subscription=subscription,
@@ -166,6 +359,15 @@ class AsyncSubscriberClient(
                 fixed_partitions=partitions,
                 credentials=credentials,
                 client_options=client_options,
+                assignment_listener=assignment_listener,
+                client_id=client_id,
+                flow_control_budget=budget,
+                adaptive_flow_control=adaptive_flow_control,
+                partition_event_loops=partition_event_loops,
+                loop_factory=loop_factory,
+                channel_pool_size=channel_pool_size,
+                max_buffered_per_partition=max_buffered_per_partition,
+                partition_weight=partition_weight,
             )
         )
         self._require_started = RequireStarted()
@@ -182,13 +384,48 @@ class AsyncSubscriberClient(
             subscription, per_partition_flow_control_settings, fixed_partitions
         )
 
+    @overrides
+    async def subscribe_with_handler(
+        self,
+        subscription: Union[SubscriptionPath, str],
+        handler: AsyncMessageHandler,
+        per_partition_flow_control_settings: FlowControlSettings,
+        max_concurrency: int,
+        ordered_by_key: bool = False,
+        fixed_partitions: Optional[Set[Partition]] = None,
+    ) -> "asyncio.Future[None]":
+        self._require_started.require_started()
+        return await self._impl.subscribe_with_handler(
+            subscription,
+            handler,
+            per_partition_flow_control_settings,
+            max_concurrency,
+            ordered_by_key,
+            fixed_partitions,
+        )
+
+    @overrides
+    def buffered_messages(
+        self, subscription: Union[SubscriptionPath, str]
+    ) -> Dict[Partition, int]:
+        self._require_started.require_started()
+        return self._impl.buffered_messages(subscription)
+
     @overrides
     async def __aenter__(self):
         self._require_started.__enter__()
-        await self._impl.__aenter__()
+        retain_async_channel_pools()
+        try:
+            await self._impl.__aenter__()
+        except:  # noqa: E722
+            await release_async_channel_pools()
+            raise
         return self
 
     @overrides
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self._impl.__aexit__(exc_type, exc_value, traceback)
+        try:
+            await self._impl.__aexit__(exc_type, exc_value, traceback)
+        finally:
+            await release_async_channel_pools()
         self._require_started.__exit__(exc_type, exc_value, traceback)
@@ -12,13 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from abc import abstractmethod
 from typing import (
     ContextManager,
     Union,
     AsyncContextManager,
     AsyncIterator,
+    Awaitable,
     Callable,
+    Dict,
     Optional,
     Set,
 )
@@ -32,6 +35,8 @@ from google.cloud.pubsublite.types import (
     Partition,
 )
 
+AsyncMessageHandler = Callable[[Message], Awaitable[None]]
+
 
 class AsyncSubscriberClientInterface(AsyncContextManager):
     """
@@ -65,6 +70,53 @@ class AsyncSubscriberClientInterface(AsyncContextManager):
       GoogleApiCallError: On a permanent failure.
     """
 
+    @abstractmethod
+    async def subscribe_with_handler(
+        self,
+        subscription: Union[SubscriptionPath, str],
+        handler: AsyncMessageHandler,
+        per_partition_flow_control_settings: FlowControlSettings,
+        max_concurrency: int,
+        ordered_by_key: bool = False,
+        fixed_partitions: Optional[Set[Partition]] = None,
+    ) -> "asyncio.Future[None]":
+        """
+    Run an async handler on each message from a subscription as tasks on the current event loop.
+
+    The message is acked when the handler returns and nacked if it raises. No new message is read while
+    max_concurrency handlers are running, so unacked messages hold their flow control tokens.
+
+    Args:
+      subscription: The subscription to subscribe to.
+      handler: The coroutine function to run on each message. It must not ack() or nack() the message itself.
+      per_partition_flow_control_settings: The flow control settings for each partition subscribed to. Note that these
+          settings apply to each partition individually, not in aggregate.
+      max_concurrency: The maximum number of handlers running at once.
+      ordered_by_key: If true, messages sharing a non-empty ordering key are handled one at a time in order.
+      fixed_partitions: A fixed set of partitions to subscribe to. If not present, will instead use auto-assignment.
+
+    Returns:
+      A future which completes with an error when the subscription fails. Cancel it to stop handling messages.
+
+    Raises:
+      GoogleApiCallError: On a permanent failure.
+    """
+
+    @abstractmethod
+    def buffered_messages(
+        self, subscription: Union[SubscriptionPath, str]
+    ) -> Dict[Partition, int]:
+        """
+    The number of messages received from each assigned partition of a subscription which have not yet been read, to
+    show how far behind the reader each partition is.
+
+    Args:
+      subscription: The subscription to inspect.
+
+    Returns:
+      The buffered message count of each assigned partition, or an empty dict if the subscription is not open.
+    """
+
 
 MessageCallback = Callable[[Message], None]
 
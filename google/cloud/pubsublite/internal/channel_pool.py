@@ -0,0 +1,257 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import atexit
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from google.api_core import grpc_helpers, grpc_helpers_async
+from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import InvalidArgument
+from google.auth.credentials import Credentials
+
+DEFAULT_CHANNEL_POOL_SIZE = 4
+
+_SCOPES = ("https://www.googleapis.com/auth/cloud-platform",)
+_CHANNEL_OPTIONS = [
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+]
+
+Channel = TypeVar("Channel")
+
+
+class ChannelLease(Generic[Channel]):
+    """A channel leased from a pool for the lifetime of a stream. release() must be called once the stream is done."""
+
+    channel: Channel
+    _release: Optional[Callable[[], None]]
+
+    def __init__(self, channel: Channel, release: Callable[[], None]):
+        self.channel = channel
+        self._release = release
+
+    def release(self):
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+
+class ChannelPool(Generic[Channel]):
+    """
+  Up to a fixed number of channels to one endpoint, which are created as needed. Streams are placed on the channel
+  with the fewest active streams, and a new channel is only created once every existing channel has a stream.
+  """
+
+    _factory: Callable[[], Channel]
+    _size: int
+    _lock: threading.Lock
+    _channels: List[Channel]
+    _streams: List[int]
+    _generation: int
+
+    def __init__(self, factory: Callable[[], Channel], size: int):
+        if size < 1:
+            raise InvalidArgument(f"Channel pool size must be at least 1, was {size}.")
+        self._factory = factory
+        self._size = size
+        self._lock = threading.Lock()
+        self._channels = []
+        self._streams = []
+        self._generation = 0
+
+    def _least_loaded(self) -> int:
+        if len(self._channels) < self._size and all(self._streams):
+            self._channels.append(self._factory())
+            self._streams.append(0)
+        return min(range(len(self._channels)), key=self._streams.__getitem__)
+
+    def _release(self, index: int, generation: int):
+        with self._lock:
+            # Leases taken before the pool was drained no longer refer to its channels.
+            if generation == self._generation:
+                self._streams[index] -= 1
+
+    def acquire(self) -> ChannelLease[Channel]:
+        """Lease the channel with the fewest active streams for a new stream."""
+        with self._lock:
+            index = self._least_loaded()
+            self._streams[index] += 1
+            channel = self._channels[index]
+            generation = self._generation
+        return ChannelLease(channel, lambda: self._release(index, generation))
+
+    def channel(self) -> Channel:
+        """Get the channel with the fewest active streams, for unary calls which do not hold a lease."""
+        with self._lock:
+            return self._channels[self._least_loaded()]
+
+    def active_streams(self) -> List[int]:
+        with self._lock:
+            return list(self._streams)
+
+    def drain(self) -> List[Channel]:
+        """Remove and return all of the pool's channels so they can be closed. New channels are created as needed."""
+        with self._lock:
+            channels = self._channels
+            self._channels = []
+            self._streams = []
+            self._generation += 1
+            return channels
+
+
+_pools_lock = threading.Lock()
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, ChannelPool]]" = (
+    weakref.WeakKeyDictionary()
+)
+# The number of clients using each event loop's pools which have not yet been released.
+_async_pool_users: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int]" = (
+    weakref.WeakKeyDictionary()
+)
+_sync_pools: Dict[Tuple, ChannelPool] = {}
+
+
+def _host(client_options: ClientOptions) -> str:
+    endpoint = client_options.api_endpoint
+    return endpoint if ":" in endpoint else f"{endpoint}:443"
+
+
+def _key(
+    client_options: ClientOptions, credentials: Optional[Credentials], size: int
+) -> Tuple[Any, ...]:
+    return _host(client_options), credentials, client_options.quota_project_id, size
+
+
+def can_pool(transport: Optional[str], client_options: ClientOptions) -> bool:
+    """
+  Whether channels for the transport and client options can be shared. Options which configure the channel's
+  security are only supported on dedicated channels.
+  """
+    return (
+        transport in (None, "grpc", "grpc_asyncio")
+        and os.environ.get("GOOGLE_API_USE_CLIENT_CERTIFICATE", "false") != "true"
+        and client_options.api_endpoint is not None
+        and client_options.client_cert_source is None
+        and getattr(client_options, "client_encrypted_cert_source", None) is None
+        and client_options.credentials_file is None
+        and client_options.scopes is None
+    )
+
+
+def _create_async_channel(
+    client_options: ClientOptions, credentials: Optional[Credentials]
+):
+    return grpc_helpers_async.create_channel(
+        _host(client_options),
+        credentials=credentials,
+        scopes=_SCOPES,
+        quota_project_id=client_options.quota_project_id,
+        options=_CHANNEL_OPTIONS,
+    )
+
+
+def get_async_channel_pool(
+    client_options: ClientOptions,
+    credentials: Optional[Credentials],
+    size: int = DEFAULT_CHANNEL_POOL_SIZE,
+) -> ChannelPool:
+    """
+  Get the process-wide pool of asyncio channels for the endpoint and credentials on the current event loop. Clients
+  which ask for different pool sizes use separate pools.
+  """
+    loop = asyncio.get_event_loop()
+    key = _key(client_options, credentials, size)
+    with _pools_lock:
+        pools = _async_pools.setdefault(loop, {})
+        if key not in pools:
+            pools[key] = ChannelPool(
+                lambda: _create_async_channel(client_options, credentials), size,
+            )
+        return pools[key]
+
+
+async def close_async_channel_pools():
+    """
+  Close the pooled channels of the current event loop and forget its pools. Channels hold a reference to their event
+  loop, so this must be called before a loop which used pooled channels is discarded.
+  """
+    with _pools_lock:
+        pools = _async_pools.pop(asyncio.get_event_loop(), {})
+    for pool in pools.values():
+        for channel in pool.drain():
+            await channel.close()
+
+
+def retain_async_channel_pools():
+    """
+  Register a client which uses the pooled channels of the current event loop. The channels are closed when the last
+  registered client calls release_async_channel_pools, so that clients on event loops which the library does not own
+  do not leak channels once the loop is discarded.
+  """
+    loop = asyncio.get_event_loop()
+    with _pools_lock:
+        _async_pool_users[loop] = _async_pool_users.get(loop, 0) + 1
+
+
+async def release_async_channel_pools():
+    """Release a client registered by retain_async_channel_pools, closing the pools if no other clients use them."""
+    loop = asyncio.get_event_loop()
+    with _pools_lock:
+        users = _async_pool_users.get(loop, 0) - 1
+        if users > 0:
+            _async_pool_users[loop] = users
+            return
+        _async_pool_users.pop(loop, None)
+    await close_async_channel_pools()
+
+
+def get_sync_channel_pool(
+    client_options: ClientOptions,
+    credentials: Optional[Credentials],
+    size: int = DEFAULT_CHANNEL_POOL_SIZE,
+) -> ChannelPool:
+    """
+  Get the process-wide pool of synchronous channels for the endpoint and credentials. Clients which ask for different
+  pool sizes use separate pools.
+  """
+    key = _key(client_options, credentials, size)
+    with _pools_lock:
+        if key not in _sync_pools:
+            _sync_pools[key] = ChannelPool(
+                lambda: grpc_helpers.create_channel(
+                    _host(client_options),
+                    credentials=credentials,
+                    scopes=_SCOPES,
+                    quota_project_id=client_options.quota_project_id,
+                    options=_CHANNEL_OPTIONS,
+                ),
+                size,
+            )
+        return _sync_pools[key]
+
+
+def close_sync_channel_pools():
+    """Close the pooled synchronous channels. This is called when the process exits."""
+    with _pools_lock:
+        pools = list(_sync_pools.values())
+        _sync_pools.clear()
+    for pool in pools:
+        for channel in pool.drain():
+            channel.close()
+
+
+atexit.register(close_sync_channel_pools)
@@ -0,0 +1,57 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Awaitable, Iterable
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_PARALLELISM = 16
+
+
+async def gather_bounded(
+    awaitables: Iterable[Awaitable[None]],
+    max_parallelism: int = DEFAULT_MAX_PARALLELISM,
+):
+    """
+  Await all the awaitables, with at most max_parallelism of them running at once. Every awaitable runs to
+  completion even if others fail.
+
+  Args:
+    awaitables: Coroutines which have not yet been started.
+    max_parallelism: The maximum number of coroutines to run at once.
+
+  Raises:
+    The error of the earliest awaitable in the given order which failed, unchanged so that callers can handle it by
+    type. Only that error is raised: the errors of later awaitables are logged with their tracebacks and dropped.
+  """
+    semaphore = asyncio.Semaphore(max_parallelism)
+
+    async def run(awaitable: Awaitable[None]):
+        async with semaphore:
+            await awaitable
+
+    results = await asyncio.gather(
+        *[run(awaitable) for awaitable in awaitables], return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if not errors:
+        return
+    for error in errors[1:]:
+        _LOGGER.warning(
+            f"Additional error while running in parallel: {error!r}",
+            exc_info=(type(error), error, error.__traceback__),
+        )
+    raise errors[0]
@@ -24,6 +24,11 @@ from google.cloud.pubsublite.internal.wire.retrying_connection import (
     ConnectionFactory,
 )
 from google.api_core.exceptions import FailedPrecondition, GoogleAPICallError
+from google.cloud.pubsublite.internal.wire.flush_scheduler import (
+    FlushScheduler,
+    ScheduledFlush,
+    get_flush_scheduler,
+)
 from google.cloud.pubsublite.internal.wire.connection_reinitializer import (
     ConnectionReinitializer,
 )
@@ -63,6 +68,8 @@ class CommitterImpl(
 
     _receiver: Optional[asyncio.Future]
     _flusher: Optional[asyncio.Future]
+    _flush_scheduler: Optional[FlushScheduler]
+    _scheduled_flush: Optional[ScheduledFlush]
 
     def __init__(
         self,
@@ -71,6 +78,7 @@ class CommitterImpl(
         factory: ConnectionFactory[
             StreamingCommitCursorRequest, StreamingCommitCursorResponse
         ],
+        flush_scheduler: Optional[FlushScheduler] = None,
     ):
         self._initial = initial
         self._flush_seconds = flush_seconds
@@ -79,6 +87,8 @@ class CommitterImpl(
         self._outstanding_commits = []
         self._receiver = None
         self._flusher = None
+        self._flush_scheduler = flush_scheduler
+        self._scheduled_flush = None
 
     async def __aenter__(self):
         await self._connection.__aenter__()
@@ -88,18 +98,37 @@ class CommitterImpl(
         assert self._receiver is None
         assert self._flusher is None
         self._receiver = asyncio.ensure_future(self._receive_loop())
-        self._flusher = asyncio.ensure_future(self._flush_loop())
+        if not self._batcher.empty():
+            self._schedule_flush()
 
     async def _stop_loopers(self):
         if self._receiver:
             self._receiver.cancel()
             await wait_ignore_errors(self._receiver)
             self._receiver = None
+        if self._scheduled_flush:
+            self._scheduled_flush.cancel()
+            self._scheduled_flush = None
         if self._flusher:
             self._flusher.cancel()
             await wait_ignore_errors(self._flusher)
             self._flusher = None
 
+    def _schedule_flush(self):
+        if self._scheduled_flush is not None:
+            return
+        scheduler = self._flush_scheduler or get_flush_scheduler()
+        self._scheduled_flush = scheduler.schedule(
+            self._flush_seconds, self._on_flush_due
+        )
+
+    def _on_flush_due(self):
+        self._scheduled_flush = None
+        if self._receiver is None:
+            # Stopped for reinitialization, which schedules any flush still needed once it completes.
+            return
+        self._flusher = asyncio.ensure_future(self._flush())
+
     def _handle_response(self, response: StreamingCommitCursorResponse):
         if "commit" not in response:
             self._connection.fail(
@@ -123,11 +152,6 @@ class CommitterImpl(
             response = await self._connection.read()
             self._handle_response(response)
 
-    async def _flush_loop(self):
-        while True:
-            await asyncio.sleep(self._flush_seconds)
-            await self._flush()
-
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self._stop_loopers()
         if self._connection.error():
@@ -160,6 +184,8 @@ class CommitterImpl(
         if self._batcher.should_flush():
             # always returns false currently, here in case this changes in the future.
             await self._flush()
+        else:
+            self._schedule_flush()
         await future
 
     async def reinitialize(
@@ -36,3 +36,21 @@ class ConnectionReinitializer(Generic[Request, Response], metaclass=ABCMeta):
             GoogleAPICallError: If it fails to reinitialize.
         """
         raise NotImplementedError()
+
+
+class ConnectionRecycler(Generic[Request, Response], metaclass=ABCMeta):
+    """A class capable of initializing a replacement connection while the current connection is still in use."""
+
+    @abstractmethod
+    async def initialize_replacement(self, connection: Connection[Request, Response]):
+        """Initialize a connection which will replace the current one. Calls to the associated RetryingConnection
+        may continue on the current connection while this runs. Requests already sent on the current connection are
+        answered there before traffic moves to the replacement, so only the initial handshake is needed.
+
+        Args:
+            connection: The replacement connection to initialize
+
+        Raises:
+            GoogleAPICallError: If it fails to initialize.
+        """
+        raise NotImplementedError()
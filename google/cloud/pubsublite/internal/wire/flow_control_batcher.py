@@ -73,6 +73,17 @@ class FlowControlBatcher:
         self._pending_tokens = _AggregateRequest()
         return _to_optional(request)
 
+    def has_pending(self) -> bool:
+        """Whether there are tokens which have not been released."""
+        return _to_optional(self._pending_tokens.request) is not None
+
+    def server_messages(self) -> int:
+        """The number of messages the server may still send, excluding pending tokens which have not been released."""
+        return (
+            self._client_tokens.request.allowed_messages
+            - self._pending_tokens.request.allowed_messages
+        )
+
     def should_expedite(self):
         pending_request = self._pending_tokens.request
         client_request = self._client_tokens.request
@@ -0,0 +1,134 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import threading
+import weakref
+from typing import Callable, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TICK_SECONDS = 0.01
+
+_sequence = itertools.count()
+
+
+class ScheduledFlush:
+    """A flush which will run once its deadline passes, unless cancelled."""
+
+    deadline: float
+    _order: int
+    _callback: Optional[Callable[[], None]]
+
+    def __init__(self, deadline: float, callback: Callable[[], None]):
+        self.deadline = deadline
+        self._order = next(_sequence)
+        self._callback = callback
+
+    def __lt__(self, other: "ScheduledFlush") -> bool:
+        # Flushes due in the same tick run in the order they were scheduled.
+        return (self.deadline, self._order) < (other.deadline, other._order)
+
+    def cancelled(self) -> bool:
+        return self._callback is None
+
+    def cancel(self):
+        self._callback = None
+
+    def run(self):
+        """Run the flush now, unless it was cancelled. It runs at most once."""
+        callback = self._callback
+        self._callback = None
+        if callback is not None:
+            callback()
+
+
+class FlushScheduler:
+    """
+  Runs the deferred flushes of every component on an event loop from a single timer. Components schedule a flush
+  when they have work to send, so idle components cause no wakeups. Deadlines are rounded up to a tick, so flushes due
+  at about the same time, across partitions, run together from one wakeup.
+  """
+
+    _tick_seconds: float
+    _scheduled: List[ScheduledFlush]
+    _timer: Optional[asyncio.TimerHandle]
+    _timer_deadline: float
+
+    def __init__(self, tick_seconds: float = DEFAULT_TICK_SECONDS):
+        self._tick_seconds = tick_seconds
+        self._scheduled = []
+        self._timer = None
+        self._timer_deadline = math.inf
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> ScheduledFlush:
+        """
+    Run the callback on the current event loop after at least delay seconds. Must be called on the event loop.
+
+    Returns:
+      A handle which may be used to cancel the flush.
+    """
+        now = asyncio.get_event_loop().time()
+        deadline = math.ceil((now + delay) / self._tick_seconds) * self._tick_seconds
+        flush = ScheduledFlush(deadline, callback)
+        heapq.heappush(self._scheduled, flush)
+        self._arm()
+        return flush
+
+    def _arm(self):
+        while self._scheduled and self._scheduled[0].cancelled():
+            heapq.heappop(self._scheduled)
+        if not self._scheduled:
+            return
+        deadline = self._scheduled[0].deadline
+        if self._timer is not None:
+            if self._timer_deadline <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = asyncio.get_event_loop().call_at(deadline, self._fire)
+        self._timer_deadline = deadline
+
+    def _fire(self):
+        # The loop may run a timer up to its clock resolution early.
+        due = max(self._timer_deadline, asyncio.get_event_loop().time())
+        self._timer = None
+        self._timer_deadline = math.inf
+        while self._scheduled and self._scheduled[0].deadline <= due:
+            flush = heapq.heappop(self._scheduled)
+            try:
+                flush.run()
+            except Exception:
+                _LOGGER.exception("Scheduled flush failed.")
+        self._arm()
+
+
+_schedulers_lock = threading.Lock()
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FlushScheduler]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_flush_scheduler() -> FlushScheduler:
+    """Get the scheduler shared by all components on the current event loop."""
+    loop = asyncio.get_event_loop()
+    with _schedulers_lock:
+        scheduler = _schedulers.get(loop)
+        if scheduler is None:
+            scheduler = FlushScheduler()
+            _schedulers[loop] = scheduler
+        return scheduler
@@ -12,11 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import AsyncIterator, TypeVar, Optional, Callable, AsyncIterable, Awaitable
+from typing import (
+    Any,
+    AsyncIterator,
+    TypeVar,
+    Optional,
+    Callable,
+    AsyncIterable,
+    Awaitable,
+)
 import asyncio
 
+from google.api_core.client_options import ClientOptions
 from google.api_core.exceptions import GoogleAPICallError, FailedPrecondition
+from google.auth.credentials import Credentials
 
+from google.cloud.pubsublite.internal.channel_pool import (
+    DEFAULT_CHANNEL_POOL_SIZE,
+    ChannelPool,
+    can_pool,
+    get_async_channel_pool,
+)
 from google.cloud.pubsublite.internal.wire.connection import (
     Connection,
     Request,
@@ -32,21 +48,29 @@ T = TypeVar("T")
 class GapicConnection(
     Connection[Request, Response], AsyncIterator[Request], PermanentFailable
 ):
-    """A Connection wrapping a gapic AsyncIterator[Request/Response] pair."""
+    """
+  A Connection wrapping a gapic AsyncIterator[Request/Response] pair.
+
+  Writes are queued in the order they are made and each completes once gRPC has pulled its request from the request
+  iterator, so concurrent writes are pipelined and complete in order. The number of writes in flight is bounded by
+  the caller.
+  """
 
     _write_queue: "asyncio.Queue[WorkItem[Request]]"
     _response_it: Optional[AsyncIterator[Response]]
+    _on_close: Optional[Callable[[], None]]
 
-    def __init__(self):
+    def __init__(self, on_close: Optional[Callable[[], None]] = None):
         super().__init__()
-        self._write_queue = asyncio.Queue(maxsize=1)
+        self._write_queue = asyncio.Queue()
+        self._on_close = on_close
 
     def set_response_it(self, response_it: AsyncIterator[Response]):
         self._response_it = response_it
 
     async def write(self, request: Request) -> None:
         item = WorkItem(request)
-        await self.await_unless_failed(self._write_queue.put(item))
+        self._write_queue.put_nowait(item)
         await self.await_unless_failed(item.response_future)
 
     async def read(self) -> Response:
@@ -62,14 +86,19 @@ class GapicConnection(
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback) -> None:
-        pass
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
 
     async def __anext__(self) -> Request:
-        item: WorkItem[Request] = await self.await_unless_failed(
-            self._write_queue.get()
-        )
-        item.response_future.set_result(None)
-        return item.request
+        while True:
+            item: WorkItem[Request] = await self.await_unless_failed(
+                self._write_queue.get()
+            )
+            # A write which is no longer awaited is dropped, as it would have been had it not yet been queued.
+            if not item.response_future.done():
+                item.response_future.set_result(None)
+                return item.request
 
     def __aiter__(self) -> AsyncIterator[Response]:
         return self
@@ -94,3 +123,81 @@ class GapicConnectionFactory(ConnectionFactory[Request, Response]):
         response_iterable = await response_fut
         conn.set_response_it(response_iterable.__aiter__())
         return conn
+
+
+class PooledGapicConnectionFactory(ConnectionFactory[Request, Response]):
+    """
+  A ConnectionFactory that produces GapicConnections on channels leased from a pool. The lease is released when the
+  connection is closed.
+  """
+
+    _pool: ChannelPool
+    _producer: Callable[
+        [Any, AsyncIterator[Request]], Awaitable[AsyncIterable[Response]]
+    ]
+
+    def __init__(
+        self,
+        pool: ChannelPool,
+        producer: Callable[
+            [Any, AsyncIterator[Request]], Awaitable[AsyncIterable[Response]]
+        ],
+    ):
+        """
+    Args:
+      pool: The pool to lease channels from.
+      producer: Opens a stream on the given channel.
+    """
+        self._pool = pool
+        self._producer = producer
+
+    async def new(self) -> Connection[Request, Response]:
+        lease = self._pool.acquire()
+        conn = GapicConnection[Request, Response](on_close=lease.release)
+        try:
+            response_iterable = await self._producer(lease.channel, conn)
+        except:  # noqa: E722
+            lease.release()
+            raise
+        conn.set_response_it(response_iterable.__aiter__())
+        return conn
+
+
+def make_gapic_connection_factory(
+    client_class: Callable[..., Any],
+    transport_class: Callable[..., Any],
+    stream: Callable[[Any, AsyncIterator[Request]], Awaitable[AsyncIterable[Response]]],
+    transport: Optional[str],
+    client_options: ClientOptions,
+    credentials: Optional[Credentials],
+    channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+) -> ConnectionFactory[Request, Response]:
+    """
+  Make a ConnectionFactory for a streaming method. Streams share the channels of the process-wide pool for the
+  endpoint and credentials unless the transport or client options require a dedicated channel.
+
+  Args:
+    client_class: The gapic async client class.
+    transport_class: The gapic asyncio transport class for the client.
+    stream: Opens a stream on the given client.
+    transport: The transport type to use.
+    client_options: The client options, which must set api_endpoint.
+    credentials: The credentials to use to connect.
+    channel_pool_size: The maximum number of channels in the pool.
+  """
+    if can_pool(transport, client_options):
+        pool = get_async_channel_pool(client_options, credentials, channel_pool_size)
+
+        def producer(channel, requests: AsyncIterator[Request]):
+            client = client_class(
+                transport=transport_class(
+                    host=client_options.api_endpoint, channel=channel
+                )
+            )
+            return stream(client, requests)
+
+        return PooledGapicConnectionFactory(pool, producer)
+    client = client_class(
+        credentials=credentials, transport=transport, client_options=client_options
+    )
+    return GapicConnectionFactory(lambda requests: stream(client, requests))
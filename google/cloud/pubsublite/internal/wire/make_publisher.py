@@ -16,17 +16,18 @@ from typing import AsyncIterator, Mapping, Optional
 
 from google.cloud.pubsub_v1.types import BatchSettings
 
-from google.cloud.pubsublite.admin_client import AdminClient
+from google.cloud.pubsublite.internal.channel_pool import DEFAULT_CHANNEL_POOL_SIZE
 from google.cloud.pubsublite.internal.endpoints import regional_endpoint
 from google.cloud.pubsublite.internal.wire.default_routing_policy import (
     DefaultRoutingPolicy,
 )
 from google.cloud.pubsublite.internal.wire.gapic_connection import (
-    GapicConnectionFactory,
+    make_gapic_connection_factory,
 )
 from google.cloud.pubsublite.internal.wire.merge_metadata import merge_metadata
-from google.cloud.pubsublite.internal.wire.partition_count_watcher_impl import (
-    PartitionCountWatcherImpl,
+from google.cloud.pubsublite.internal.wire.partition_count_watcher_registry import (
+    make_partition_count_fetcher,
+    watch_partition_count,
 )
 from google.cloud.pubsublite.internal.wire.partition_count_watching_publisher import (
     PartitionCountWatchingPublisher,
@@ -39,6 +40,9 @@ from google.cloud.pubsublite.types import Partition, TopicPath
 from google.cloud.pubsublite.internal.routing_metadata import topic_routing_metadata
 from google.cloud.pubsublite_v1 import InitialPublishRequest, PublishRequest
 from google.cloud.pubsublite_v1.services.publisher_service import async_client
+from google.cloud.pubsublite_v1.services.publisher_service.transports.grpc_asyncio import (
+    PublisherServiceGrpcAsyncIOTransport,
+)
 from google.api_core.client_options import ClientOptions
 from google.auth.credentials import Credentials
 
@@ -50,6 +54,7 @@ DEFAULT_BATCHING_SETTINGS = BatchSettings(
     max_latency=0.05,  # 50 ms
 )
 DEFAULT_PARTITION_POLL_PERIOD = 600  # ten minutes
+DEFAULT_IDLE_CLOSE_SECONDS = 300  # five minutes
 
 
 def make_publisher(
@@ -59,6 +64,11 @@ def make_publisher(
     credentials: Optional[Credentials] = None,
     client_options: Optional[ClientOptions] = None,
     metadata: Optional[Mapping[str, str]] = None,
+    idle_close_seconds: Optional[float] = DEFAULT_IDLE_CLOSE_SECONDS,
+    stream_recycle_seconds: Optional[float] = None,
+    partition_poll_period: float = DEFAULT_PARTITION_POLL_PERIOD,
+    initial_partition_count: Optional[int] = None,
+    channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
 ) -> Publisher:
     """
   Make a new publisher for the given topic.
@@ -70,46 +80,80 @@ def make_publisher(
     credentials: The credentials to use to connect. GOOGLE_DEFAULT_CREDENTIALS is used if None.
     client_options: Other options to pass to the client. Note that if you pass any you must set api_endpoint.
     metadata: Additional metadata to send with the RPC.
+    idle_close_seconds: The time after which the stream for a partition with no messages being published is closed. It
+      is reopened by the next message routed to the partition. Streams are never closed if None.
+    stream_recycle_seconds: The time after which the stream for each partition is replaced by a new one, which is
+      opened before the old stream is retired so publishes are not interrupted. Streams are only replaced on failure
+      if None.
+    partition_poll_period: The time between polls for the topic's partition count. Publishers of the same topic on
+      an event loop share polls.
+    initial_partition_count: A partition count to route messages with until the topic's partition count has been
+      read, such as one saved by a previous run, so publishes need not wait for it. It must not exceed the topic's
+      partition count.
+    channel_pool_size: The maximum number of channels shared by the streams of publishers and subscribers with the
+      same endpoint and credentials on an event loop.
 
   Returns:
-    A new Publisher.
+    A new Publisher. Entering it does not wait for the topic's partition count, and messages published before the
+    count is known wait for it.
 
   Throws:
     GoogleApiCallException on any error determining topic structure.
   """
     if per_partition_batching_settings is None:
         per_partition_batching_settings = DEFAULT_BATCHING_SETTINGS
-    admin_client = AdminClient(
-        region=topic.location.region,
-        credentials=credentials,
-        client_options=client_options,
-    )
     if client_options is None:
         client_options = ClientOptions(
             api_endpoint=regional_endpoint(topic.location.region)
         )
-    client = async_client.PublisherServiceAsyncClient(
-        credentials=credentials, transport=transport, client_options=client_options
-    )  # type: ignore
 
     def publisher_factory(partition: Partition):
-        def connection_factory(requests: AsyncIterator[PublishRequest]):
-            final_metadata = merge_metadata(
-                metadata, topic_routing_metadata(topic, partition)
-            )
+        final_metadata = merge_metadata(
+            metadata, topic_routing_metadata(topic, partition)
+        )
+
+        def publish(
+            client: async_client.PublisherServiceAsyncClient,
+            requests: AsyncIterator[PublishRequest],
+        ):
             return client.publish(requests, metadata=list(final_metadata.items()))
 
         return SinglePartitionPublisher(
             InitialPublishRequest(topic=str(topic), partition=partition.value),
             per_partition_batching_settings,
-            GapicConnectionFactory(connection_factory),
+            make_gapic_connection_factory(
+                async_client.PublisherServiceAsyncClient,
+                PublisherServiceGrpcAsyncIOTransport,
+                publish,
+                transport,
+                client_options,
+                credentials,
+                channel_pool_size,
+            ),
+            stream_recycle_seconds,
         )
 
     def policy_factory(partition_count: int):
         return DefaultRoutingPolicy(partition_count)
 
+    watcher = watch_partition_count(
+        topic,
+        make_partition_count_fetcher(
+            transport, client_options, credentials, channel_pool_size
+        ),
+        partition_poll_period,
+        (
+            client_options.api_endpoint,
+            credentials,
+            client_options.quota_project_id,
+            transport,
+        ),
+    )
+
     return PartitionCountWatchingPublisher(
-        PartitionCountWatcherImpl(admin_client, topic, DEFAULT_PARTITION_POLL_PERIOD),
+        watcher,
         publisher_factory,
         policy_factory,
+        idle_close_seconds,
+        initial_partition_count,
     )
@@ -0,0 +1,323 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import GoogleAPICallError
+from google.auth.credentials import Credentials
+
+from google.cloud.pubsublite.internal.channel_pool import (
+    DEFAULT_CHANNEL_POOL_SIZE,
+    can_pool,
+    get_async_channel_pool,
+)
+from google.cloud.pubsublite.internal.gather_bounded import DEFAULT_MAX_PARALLELISM
+from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_cancelled
+from google.cloud.pubsublite.internal.wire.partition_count_watcher import (
+    PartitionCountWatcher,
+)
+from google.cloud.pubsublite.internal.wire.permanent_failable import PermanentFailable
+from google.cloud.pubsublite.types import TopicPath
+from google.cloud.pubsublite_v1.services.admin_service.async_client import (
+    AdminServiceAsyncClient,
+)
+from google.cloud.pubsublite_v1.services.admin_service.transports.grpc_asyncio import (
+    AdminServiceGrpcAsyncIOTransport,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PartitionCountFetcher = Callable[[TopicPath], Awaitable[int]]
+
+
+def make_partition_count_fetcher(
+    transport: Optional[str],
+    client_options: ClientOptions,
+    credentials: Optional[Credentials],
+    channel_pool_size: int = DEFAULT_CHANNEL_POOL_SIZE,
+) -> PartitionCountFetcher:
+    """
+  Make a function which reads the partition count of a topic with the asyncio admin client. The client is created on
+  first use, on the event loop it is used from, and shares the process-wide channel pool when the options allow.
+
+  Args:
+    transport: The transport type to use.
+    client_options: The client options, which must set api_endpoint.
+    credentials: The credentials to use to connect.
+    channel_pool_size: The maximum number of channels in the pool.
+  """
+    client: Optional[AdminServiceAsyncClient] = None
+
+    def get_client() -> AdminServiceAsyncClient:
+        nonlocal client
+        if client is None:
+            if can_pool(transport, client_options):
+                client = AdminServiceAsyncClient(
+                    transport=AdminServiceGrpcAsyncIOTransport(
+                        host=client_options.api_endpoint,
+                        channel=get_async_channel_pool(
+                            client_options, credentials, channel_pool_size
+                        ).channel(),
+                    )
+                )
+            else:
+                client = AdminServiceAsyncClient(
+                    credentials=credentials,
+                    transport=transport,
+                    client_options=client_options,
+                )
+        return client
+
+    async def fetch(topic: TopicPath) -> int:
+        partitions = await get_client().get_topic_partitions(name=str(topic))
+        return partitions.partition_count
+
+    return fetch
+
+
+class _SharedWatcher(PartitionCountWatcher, PermanentFailable):
+    """A watcher which receives the partition counts polled by a registry for its topic."""
+
+    _registry: Optional["PartitionCountWatcherRegistry"]
+    _key: Hashable
+    _topic: TopicPath
+    _fetch: PartitionCountFetcher
+    _poll_period: float
+    _latest: Optional[int]
+    _updated: asyncio.Event
+
+    def __init__(
+        self,
+        registry: Optional["PartitionCountWatcherRegistry"],
+        key: Hashable,
+        topic: TopicPath,
+        fetch: PartitionCountFetcher,
+        poll_period: float,
+    ):
+        super().__init__()
+        self._registry = registry
+        self._key = key
+        self._topic = topic
+        self._fetch = fetch
+        self._poll_period = poll_period
+        self._latest = None
+
+    async def __aenter__(self):
+        self._updated = asyncio.Event()
+        if self._registry is None:
+            self._registry = get_partition_count_watcher_registry()
+        self._registry._add(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._registry._remove(self)
+
+    def _update(self, partition_count: int):
+        # Only the most recent count matters, so counts the publisher has not yet read are replaced.
+        self._latest = partition_count
+        self._updated.set()
+
+    async def _next_count(self) -> int:
+        await self._updated.wait()
+        self._updated.clear()
+        return self._latest
+
+    async def get_partition_count(self) -> int:
+        return await self.await_unless_failed(self._next_count())
+
+
+class _WatchedTopic:
+    topic: TopicPath
+    fetch: PartitionCountFetcher
+    watchers: Set[_SharedWatcher]
+    latest: Optional[int]
+    next_poll: float
+    poll: Optional[asyncio.Future]
+
+    def __init__(self, topic: TopicPath, fetch: PartitionCountFetcher, now: float):
+        self.topic = topic
+        self.fetch = fetch
+        self.watchers = set()
+        self.latest = None
+        self.next_poll = now
+        self.poll = None
+
+    def poll_period(self) -> float:
+        return min(watcher._poll_period for watcher in self.watchers)
+
+
+class PartitionCountWatcherRegistry:
+    """
+  Polls the partition count of every watched topic on an event loop from one task, instead of a thread and timer per
+  publisher. All watchers of a topic share its polls, and a watcher which joins a topic that has already been polled
+  receives the last count without an RPC. Polls which fall due together run concurrently with bounded parallelism,
+  and each topic is polled on its own schedule from when it was first watched, so polls for topics watched at
+  different times do not synchronize.
+  """
+
+    _max_parallelism: int
+    _topics: Dict[Hashable, _WatchedTopic]
+    _semaphore: Optional[asyncio.Semaphore]
+    _changed: Optional[asyncio.Event]
+    _poller: Optional[asyncio.Future]
+
+    def __init__(self, max_parallelism: int = DEFAULT_MAX_PARALLELISM):
+        self._max_parallelism = max_parallelism
+        self._topics = {}
+        self._semaphore = None
+        self._changed = None
+        self._poller = None
+
+    def watcher(
+        self,
+        topic: TopicPath,
+        fetch: PartitionCountFetcher,
+        poll_period: float,
+        client_key: Hashable = None,
+    ) -> PartitionCountWatcher:
+        """
+    Make a watcher for the topic's partition count. It is registered while it is entered.
+
+    Args:
+      topic: The topic to watch.
+      fetch: Reads the topic's partition count. The fetch of the first watcher of a topic is used for all of them.
+      poll_period: The time between polls. A topic with several watchers is polled at the shortest of their periods.
+      client_key: Identifies the endpoint and credentials the fetch uses. Only watchers with the same key share polls.
+    """
+        return _SharedWatcher(self, (topic, client_key), topic, fetch, poll_period)
+
+    def watched_topics(self) -> int:
+        return len(self._topics)
+
+    def _add(self, watcher: _SharedWatcher):
+        loop = asyncio.get_event_loop()
+        if self._poller is None:
+            self._semaphore = asyncio.Semaphore(self._max_parallelism)
+            self._changed = asyncio.Event()
+            self._poller = asyncio.ensure_future(self._poll_loop())
+        watched = self._topics.get(watcher._key)
+        if watched is None:
+            watched = _WatchedTopic(watcher._topic, watcher._fetch, loop.time())
+            self._topics[watcher._key] = watched
+            self._changed.set()
+        watched.watchers.add(watcher)
+        if watched.latest is not None:
+            watcher._update(watched.latest)
+
+    async def _remove(self, watcher: _SharedWatcher):
+        watched = self._topics.get(watcher._key)
+        if watched is None or watcher not in watched.watchers:
+            return
+        watched.watchers.discard(watcher)
+        if watched.watchers:
+            return
+        del self._topics[watcher._key]
+        if watched.poll is not None:
+            watched.poll.cancel()
+        self._changed.set()
+        if not self._topics and self._poller is not None:
+            # The poller is stopped before the last watcher exits, so it is not left pending when the loop closes. The
+            # next watcher starts a new one.
+            poller = self._poller
+            self._poller = None
+            poller.cancel()
+            await wait_ignore_cancelled(poller)
+
+    async def _poll(self, key: Hashable, watched: _WatchedTopic):
+        try:
+            async with self._semaphore:
+                partition_count = await watched.fetch(watched.topic)
+        except GoogleAPICallError as e:
+            if watched.latest is not None:
+                _LOGGER.exception(
+                    f"Failed to retrieve partition count for {watched.topic}"
+                )
+                return
+            # Nothing is known about the topic, so its watchers cannot proceed. A later watcher tries again.
+            if self._topics.get(key) is watched:
+                del self._topics[key]
+            for watcher in watched.watchers:
+                watcher.fail(e)
+            return
+        finally:
+            watched.poll = None
+            self._changed.set()
+        watched.latest = partition_count
+        for watcher in watched.watchers:
+            watcher._update(partition_count)
+
+    async def _poll_loop(self):
+        loop = asyncio.get_event_loop()
+        polls = set()
+        try:
+            while self._topics:
+                self._changed.clear()
+                now = loop.time()
+                next_poll = None
+                for key, watched in self._topics.items():
+                    if watched.poll is not None:
+                        continue
+                    if watched.next_poll <= now:
+                        watched.next_poll = now + watched.poll_period()
+                        watched.poll = asyncio.ensure_future(self._poll(key, watched))
+                        polls.add(watched.poll)
+                        watched.poll.add_done_callback(polls.discard)
+                    elif next_poll is None or watched.next_poll < next_poll:
+                        next_poll = watched.next_poll
+                timeout = None if next_poll is None else next_poll - now
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            # Failed first polls removed the last topics, and the next watcher starts a new loop.
+            self._poller = None
+        finally:
+            for poll in polls:
+                poll.cancel()
+            if polls:
+                await asyncio.wait(list(polls))
+
+
+_registries_lock = threading.Lock()
+_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PartitionCountWatcherRegistry]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_partition_count_watcher_registry() -> PartitionCountWatcherRegistry:
+    """Get the registry shared by all publishers on the current event loop."""
+    loop = asyncio.get_event_loop()
+    with _registries_lock:
+        registry = _registries.get(loop)
+        if registry is None:
+            registry = PartitionCountWatcherRegistry()
+            _registries[loop] = registry
+        return registry
+
+
+def watch_partition_count(
+    topic: TopicPath,
+    fetch: PartitionCountFetcher,
+    poll_period: float,
+    client_key: Hashable = None,
+) -> PartitionCountWatcher:
+    """
+  Make a watcher for the topic's partition count, which registers with the registry of the event loop it is entered on.
+  See PartitionCountWatcherRegistry.watcher for the arguments.
+  """
+    return _SharedWatcher(None, (topic, client_key), topic, fetch, poll_period)
@@ -12,83 +12,244 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import asyncio
+import logging
 import sys
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional, Set
 
-from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_cancelled
+from google.api_core.exceptions import GoogleAPICallError, ResourceExhausted
+
+from google.cloud.pubsublite.internal.gather_bounded import gather_bounded
+from google.cloud.pubsublite.internal.wait_ignore_cancelled import (
+    wait_ignore_cancelled,
+    wait_ignore_errors,
+)
 from google.cloud.pubsublite.internal.wire.partition_count_watcher import (
     PartitionCountWatcher,
 )
-from google.cloud.pubsublite.internal.wire.publisher import Publisher
+from google.cloud.pubsublite.internal.wire.permanent_failable import PermanentFailable
+from google.cloud.pubsublite.internal.wire.publisher import Publisher, check_partition
 from google.cloud.pubsublite.internal.wire.routing_policy import RoutingPolicy
 from google.cloud.pubsublite.types import MessageMetadata, Partition
 from google.cloud.pubsublite_v1 import PubSubMessage
 
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_BUFFERED_MESSAGES = 10000
+
+
+class PartitionCountWatchingPublisher(Publisher, PermanentFailable):
+    """
+  A Publisher which routes messages across the partitions of a topic. The publisher for a partition is opened when the
+  first message is routed to it, and is closed once it has been idle for idle_close_seconds, if set.
+
+  Entering the publisher does not wait for the topic's partition count. Up to max_buffered_messages published before
+  the count is known wait for it, and are then routed together, so their partitions' streams open in parallel. A
+  failure to read the first partition count fails the publisher.
+  """
 
-class PartitionCountWatchingPublisher(Publisher):
     _publishers: Dict[Partition, Publisher]
+    _opening: Dict[Partition, asyncio.Future]
+    _handoffs: Set[asyncio.Future]
+    _outstanding: Dict[Partition, int]
+    _last_used: Dict[Partition, float]
     _publisher_factory: Callable[[Partition], Publisher]
     _policy_factory: Callable[[int], RoutingPolicy]
     _watcher: PartitionCountWatcher
+    _idle_close_seconds: Optional[float]
+    _max_buffered_messages: int
+    _buffered: int
+    _partition_count: int
+    _routable: asyncio.Event
+    _routing_policy: RoutingPolicy
     _partition_count_poller: asyncio.Future
+    _idle_closer: Optional[asyncio.Future]
 
     def __init__(
         self,
         watcher: PartitionCountWatcher,
         publisher_factory: Callable[[Partition], Publisher],
         policy_factory: Callable[[int], RoutingPolicy],
+        idle_close_seconds: Optional[float] = None,
+        initial_partition_count: Optional[int] = None,
+        max_buffered_messages: int = DEFAULT_MAX_BUFFERED_MESSAGES,
     ):
+        """
+    Args:
+      watcher: Reports the topic's partition count.
+      publisher_factory: Makes the publisher for a partition.
+      policy_factory: Makes the routing policy for a partition count.
+      idle_close_seconds: The time after which an idle partition's publisher is closed. Never closed if None.
+      initial_partition_count: A partition count to route with until the watcher reports one, such as one saved by a
+        previous run. It must not exceed the topic's partition count.
+      max_buffered_messages: The number of messages which may wait for the first partition count. Publishes beyond
+        this fail with ResourceExhausted.
+    """
+        super().__init__()
         self._publishers = {}
+        self._opening = {}
+        self._handoffs = set()
+        self._outstanding = {}
+        self._last_used = {}
         self._publisher_factory = publisher_factory
         self._policy_factory = policy_factory
         self._watcher = watcher
+        self._idle_close_seconds = idle_close_seconds
+        self._max_buffered_messages = max_buffered_messages
+        self._buffered = 0
+        self._partition_count = 0
+        self._idle_closer = None
+        if initial_partition_count is not None:
+            self._routing_policy = self._policy_factory(initial_partition_count)
+            self._partition_count = initial_partition_count
 
     async def __aenter__(self):
+        self._routable = asyncio.Event()
+        if self._partition_count > 0:
+            self._routable.set()
         try:
             await self._watcher.__aenter__()
-            await self._poll_partition_count_action()
         except Exception:
             await self._watcher.__aexit__(*sys.exc_info())
             raise
         self._partition_count_poller = asyncio.ensure_future(
-            self._watch_partition_count()
+            self.run_poller(self._poll_partition_count_action)
         )
+        if self._idle_close_seconds is not None:
+            self._idle_closer = asyncio.ensure_future(self._close_idle_publishers())
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         self._partition_count_poller.cancel()
         await wait_ignore_cancelled(self._partition_count_poller)
+        if self._idle_closer is not None:
+            self._idle_closer.cancel()
+            await wait_ignore_cancelled(self._idle_closer)
         await self._watcher.__aexit__(exc_type, exc_val, exc_tb)
-        for publisher in self._publishers.values():
-            await publisher.__aexit__(exc_type, exc_val, exc_tb)
+        opening = list(self._opening.values())
+        for future in opening:
+            future.cancel()
+        await asyncio.gather(*opening, return_exceptions=True)
+        await gather_bounded(
+            [
+                publisher.__aexit__(exc_type, exc_val, exc_tb)
+                for publisher in self._publishers.values()
+            ]
+        )
 
     async def _poll_partition_count_action(self):
         partition_count = await self._watcher.get_partition_count()
         await self._handle_partition_count_update(partition_count)
 
-    async def _watch_partition_count(self):
-        while True:
-            await self._poll_partition_count_action()
-
     async def _handle_partition_count_update(self, partition_count: int):
-        current_count = len(self._publishers)
-        if current_count == partition_count:
+        if self._partition_count >= partition_count:
             return
-        if current_count > partition_count:
+        self._routing_policy = self._policy_factory(partition_count)
+        self._partition_count = partition_count
+        self._routable.set()
+
+    async def _wait_routable(self):
+        if self._buffered >= self._max_buffered_messages:
+            raise ResourceExhausted(
+                f"More than {self._max_buffered_messages} messages were published before the topic's partition count "
+                f"was known."
+            )
+        self._buffered += 1
+        try:
+            await self.await_unless_failed(self._routable.wait())
+        finally:
+            self._buffered -= 1
+
+    async def _open(self, partition: Partition) -> Publisher:
+        publisher = self._publisher_factory(partition)
+        try:
+            await publisher.__aenter__()
+        except BaseException:
+            # The publisher may have opened its stream before failing or being cancelled.
+            await wait_ignore_errors(publisher.__aexit__(*sys.exc_info()))
+            raise
+        finally:
+            del self._opening[partition]
+        self._publishers[partition] = publisher
+        return publisher
+
+    async def _get_publisher(self, partition: Partition) -> Publisher:
+        if partition in self._publishers:
+            return self._publishers[partition]
+        if partition not in self._opening:
+            self._opening[partition] = asyncio.ensure_future(self._open(partition))
+        return await asyncio.shield(self._opening[partition])
+
+    async def _close_idle_publishers(self):
+        assert self._idle_close_seconds is not None
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self._idle_close_seconds / 2)
+            now = loop.time()
+            idle = [
+                partition
+                for partition in self._publishers
+                if self._outstanding.get(partition, 0) == 0
+                and now - self._last_used.get(partition, now)
+                >= self._idle_close_seconds
+            ]
+            for partition in idle:
+                publisher = self._publishers.pop(partition)
+                self._last_used.pop(partition, None)
+                try:
+                    await publisher.__aexit__(None, None, None)
+                except GoogleAPICallError as e:
+                    _LOGGER.debug(
+                        f"Error closing idle publisher for partition {partition}: {e!r}"
+                    )
+
+    def _begin_handoff(self) -> asyncio.Future:
+        handoff = asyncio.get_event_loop().create_future()
+        self._handoffs.add(handoff)
+        return handoff
+
+    def _end_handoff(self, handoff: Optional[asyncio.Future]):
+        if handoff is None or handoff.done():
             return
+        handoff.set_result(None)
+        self._handoffs.discard(handoff)
 
-        new_publishers = {
-            Partition(index): self._publisher_factory(Partition(index))
-            for index in range(current_count, partition_count)
-        }
-        await asyncio.gather(*[p.__aenter__() for p in new_publishers.values()])
-        routing_policy = self._policy_factory(partition_count)
-
-        self._publishers.update(new_publishers)
-        self._routing_policy = routing_policy
-
-    async def publish(self, message: PubSubMessage) -> MessageMetadata:
-        partition = self._routing_policy.route(message)
-        assert partition in self._publishers
-        publisher = self._publishers[partition]
-        return await publisher.publish(message)
+    async def publish(
+        self, message: PubSubMessage, partition: Optional[Partition] = None
+    ) -> MessageMetadata:
+        if self.error() is not None:
+            raise self.error()
+        # Set while the message waits to reach its partition's publisher, so that flushes wait for it.
+        handoff: Optional[asyncio.Future] = None
+        try:
+            if not self._routable.is_set():
+                handoff = self._begin_handoff()
+                await self._wait_routable()
+            if partition is None:
+                partition = self._routing_policy.route(message)
+            else:
+                check_partition(partition, self._partition_count)
+            assert partition.value < self._partition_count
+            self._outstanding[partition] = self._outstanding.get(partition, 0) + 1
+            try:
+                publisher = self._publishers.get(partition)
+                if publisher is None:
+                    if handoff is None:
+                        handoff = self._begin_handoff()
+                    publisher = await self._get_publisher(partition)
+                # Flushes waiting on the handoff resume only once publish has batched the message.
+                self._end_handoff(handoff)
+                return await publisher.publish(message)
+            finally:
+                self._outstanding[partition] -= 1
+                self._last_used[partition] = asyncio.get_event_loop().time()
+        finally:
+            self._end_handoff(handoff)
+
+    async def flush(self):
+        if self.error() is not None:
+            raise self.error()
+        if self._handoffs:
+            await self.await_unless_failed(asyncio.wait(list(self._handoffs)))
+        await gather_bounded(
+            [publisher.flush() for publisher in list(self._publishers.values())]
+        )
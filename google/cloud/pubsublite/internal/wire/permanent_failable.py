@@ -13,35 +13,43 @@
 # limitations under the License.
 
 import asyncio
-from typing import Awaitable, TypeVar, Optional, Callable
+from typing import Awaitable, Dict, List, TypeVar, Optional, Callable
 
 from google.api_core.exceptions import GoogleAPICallError
 
-from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_errors
-
 T = TypeVar("T")
 
+# The PermanentFailable whose failure cancelled each waiting task, so that the waiter can raise the failure in place of
+# the cancellation. Entries are only touched from the event loop running the task.
+_failure_cancellations: Dict[asyncio.Task, "PermanentFailable"] = {}
+
 
-class _TaskWithCleanup:
-    def __init__(self, a: Awaitable):
-        self._task = asyncio.ensure_future(a)
+def _current_task() -> Optional[asyncio.Task]:
+    try:
+        # asyncio.current_task was added in python 3.7.
+        if hasattr(asyncio, "current_task"):
+            return asyncio.current_task()
+        return asyncio.Task.current_task()
+    except RuntimeError:
+        return None
 
-    async def __aenter__(self):
-        return self._task
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if not self._task.done():
-            self._task.cancel()
-            await wait_ignore_errors(self._task)
+def _discard(awaitable: Awaitable):
+    if asyncio.iscoroutine(awaitable):
+        awaitable.close()
+    elif isinstance(awaitable, asyncio.Future):
+        awaitable.cancel()
 
 
 class PermanentFailable:
     """A class that can experience permanent failures, with helpers for forwarding these to client actions."""
 
     _maybe_failure_task: Optional[asyncio.Future]
+    _waiters: List[asyncio.Task]
 
     def __init__(self):
         self._maybe_failure_task = None
+        self._waiters = []
 
     @property
     def _failure_task(self) -> asyncio.Future:
@@ -53,21 +61,38 @@ class PermanentFailable:
     async def await_unless_failed(self, awaitable: Awaitable[T]) -> T:
         """
     Await the awaitable, unless fail() is called first.
+
+    The awaitable runs inline in the calling task rather than in a task of its own. If fail() is called while it is
+    outstanding, the calling task is cancelled and the cancellation is replaced by the permanent error. On python
+    3.11+, a cancellation of the calling task by anything else takes precedence and is raised as is. Earlier versions
+    do not count cancellation requests, so one which races with fail() is replaced by the permanent error.
+
     Args:
       awaitable: An awaitable
 
     Returns: The result of the awaitable
     Raises: The permanent error if fail() is called or the awaitable raises one.
     """
-        async with _TaskWithCleanup(awaitable) as task:
-            if self._failure_task.done():
-                raise self._failure_task.exception()
-            done, _ = await asyncio.wait(
-                [task, self._failure_task], return_when=asyncio.FIRST_COMPLETED
-            )
-            if task in done:
-                return await task
+        if self._failure_task.done():
+            _discard(awaitable)
             raise self._failure_task.exception()
+        task = _current_task()
+        self._waiters.append(task)
+        try:
+            return await awaitable
+        except asyncio.CancelledError:
+            if _failure_cancellations.get(task) is not self:
+                raise
+            del _failure_cancellations[task]
+            # Python 3.11+ counts cancellation requests, which must be balanced once one is handled. Any which remain
+            # were made by someone else, so the cancellation is theirs to handle.
+            if hasattr(task, "uncancel") and task.uncancel() > 0:
+                raise
+            raise self._failure_task.exception()
+        finally:
+            self._waiters.remove(task)
+            if _failure_cancellations.get(task) is self:
+                del _failure_cancellations[task]
 
     async def run_poller(self, poll_action: Callable[[], Awaitable[None]]):
         """
@@ -79,12 +104,26 @@ class PermanentFailable:
         try:
             while True:
                 await self.await_unless_failed(poll_action())
+                # Actions which complete without suspending would otherwise starve the rest of the event loop.
+                await asyncio.sleep(0)
         except GoogleAPICallError as e:
             self.fail(e)
 
     def fail(self, err: GoogleAPICallError):
-        if not self._failure_task.done():
-            self._failure_task.set_exception(err)
+        if self._failure_task.done():
+            return
+        self._failure_task.set_exception(err)
+        current = _current_task()
+        for task in self._waiters:
+            # A task failing itself is running, not waiting, and cannot be interrupted. A task which another failure
+            # has already cancelled will raise that failure, and one which is already being cancelled will raise the
+            # cancellation.
+            if task is current or task in _failure_cancellations:
+                continue
+            if hasattr(task, "cancelling") and task.cancelling() > 0:
+                continue
+            _failure_cancellations[task] = self
+            task.cancel()
 
     def error(self) -> Optional[GoogleAPICallError]:
         if not self._failure_task.done():
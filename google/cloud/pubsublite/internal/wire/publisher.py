@@ -13,9 +13,29 @@
 # limitations under the License.
 
 from abc import abstractmethod
-from typing import AsyncContextManager
+from typing import AsyncContextManager, Optional
+
+from google.api_core.exceptions import InvalidArgument
+
 from google.cloud.pubsublite_v1.types import PubSubMessage
-from google.cloud.pubsublite.types import MessageMetadata
+from google.cloud.pubsublite.types import MessageMetadata, Partition
+
+
+class InvalidPartition(InvalidArgument):
+    """
+  A message was published to a partition which does not exist. Unlike other errors, this only rejects the message and
+  leaves the publisher usable.
+  """
+
+
+def check_partition(partition: Partition, partition_count: int):
+    """
+  Raise InvalidPartition if the partition does not exist in a topic with partition_count partitions.
+  """
+    if not 0 <= partition.value < partition_count:
+        raise InvalidPartition(
+            f"Partition {partition.value} does not exist in a topic with {partition_count} partitions."
+        )
 
 
 class Publisher(AsyncContextManager):
@@ -24,16 +44,31 @@ class Publisher(AsyncContextManager):
   """
 
     @abstractmethod
-    async def publish(self, message: PubSubMessage) -> MessageMetadata:
+    async def publish(
+        self, message: PubSubMessage, partition: Optional[Partition] = None
+    ) -> MessageMetadata:
         """
     Publish the provided message.
 
     Args:
       message: The message to be published.
+      partition: If set, the partition to publish the message to instead of the one chosen by routing.
 
     Returns:
       Metadata about the published message.
 
+    Raises:
+      InvalidPartition: If the partition does not exist. The publisher remains usable.
+      GoogleAPICallError: On a permanent error.
+    """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def flush(self):
+        """
+    Send all messages published before the call without waiting for their batches to fill, and wait until they have
+    all been acknowledged.
+
     Raises:
       GoogleAPICallError: On a permanent error.
     """
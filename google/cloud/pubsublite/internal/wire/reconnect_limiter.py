@@ -0,0 +1,140 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import random
+import threading
+import time
+from typing import NamedTuple, Optional
+
+_MIN_BACKOFF_SECS = 0.01
+_MAX_BACKOFF_SECS = 10
+
+DEFAULT_RECONNECTS_PER_SECOND = 50.0
+DEFAULT_RECONNECT_BURST = 50
+
+
+def jittered_backoff(retries: int) -> float:
+    """
+  The full jitter backoff before the retry following `retries` consecutive failures: a uniformly random delay
+  between zero and an exponentially growing, capped, ceiling.
+  """
+    ceiling = _MAX_BACKOFF_SECS
+    if retries < 32:
+        ceiling = min(_MAX_BACKOFF_SECS, _MIN_BACKOFF_SECS * (2 ** retries))
+    return random.uniform(0, ceiling)
+
+
+class ReconnectStats(NamedTuple):
+    reconnects: int
+    """The number of reconnect attempts started."""
+    throttled: int
+    """The number of reconnect attempts which waited for the limiter."""
+    throttled_seconds: float
+    """The total time reconnect attempts spent waiting for the limiter."""
+    budgets_exhausted: int
+    """The number of streams which failed after exhausting their retry budget."""
+
+
+class ReconnectLimiter:
+    """
+  A token bucket limiting the rate at which streams reconnect after failures, so that streams which fail together
+  do not all reconnect together. Safe to share between threads and event loops.
+  """
+
+    _rate: float
+    _burst: float
+    _lock: threading.Lock
+    _tokens: float
+    _updated: float
+    _reconnects: int
+    _throttled: int
+    _throttled_seconds: float
+    _budgets_exhausted: int
+
+    def __init__(
+        self,
+        reconnects_per_second: float = DEFAULT_RECONNECTS_PER_SECOND,
+        burst: int = DEFAULT_RECONNECT_BURST,
+    ):
+        """
+    Args:
+      reconnects_per_second: The sustained rate at which reconnects may start.
+      burst: The number of reconnects which may start at once after a quiet period.
+    """
+        if reconnects_per_second <= 0 or burst < 1:
+            raise ValueError("Reconnect rate and burst must be positive.")
+        self._rate = reconnects_per_second
+        self._burst = burst
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._reconnects = 0
+        self._throttled = 0
+        self._throttled_seconds = 0.0
+        self._budgets_exhausted = 0
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            # Tokens may go negative: each waiter reserves its place in line.
+            self._tokens -= 1
+            self._reconnects += 1
+            if self._tokens >= 0:
+                return 0
+            delay = -self._tokens / self._rate
+            self._throttled += 1
+            self._throttled_seconds += delay
+            return delay
+
+    async def acquire(self):
+        """Wait until a reconnect may start."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_budget_exhausted(self):
+        with self._lock:
+            self._budgets_exhausted += 1
+
+    def stats(self) -> ReconnectStats:
+        with self._lock:
+            return ReconnectStats(
+                reconnects=self._reconnects,
+                throttled=self._throttled,
+                throttled_seconds=self._throttled_seconds,
+                budgets_exhausted=self._budgets_exhausted,
+            )
+
+
+_default_limiter: Optional[ReconnectLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def default_reconnect_limiter() -> ReconnectLimiter:
+    """The limiter shared by all streams in this process."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = ReconnectLimiter()
+        return _default_limiter
+
+
+def reconnect_stats() -> ReconnectStats:
+    """Reconnect metrics for all streams in this process sharing the default limiter."""
+    return default_reconnect_limiter().stats()
@@ -13,13 +13,19 @@
 # limitations under the License.
 
 import asyncio
+import logging
 from asyncio import Future
+from collections import deque
 
-from typing import Optional
+from typing import Callable, Deque, List, Optional, Tuple
 from google.api_core.exceptions import GoogleAPICallError, Cancelled
 from google.cloud.pubsublite.internal.status_codes import is_retryable
-from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_errors
+from google.cloud.pubsublite.internal.wait_ignore_cancelled import (
+    wait_ignore_cancelled,
+    wait_ignore_errors,
+)
 from google.cloud.pubsublite.internal.wire.connection_reinitializer import (
+    ConnectionRecycler,
     ConnectionReinitializer,
 )
 from google.cloud.pubsublite.internal.wire.connection import (
@@ -28,11 +34,50 @@ from google.cloud.pubsublite.internal.wire.connection import (
     Response,
     ConnectionFactory,
 )
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import (
+    ReconnectLimiter,
+    default_reconnect_limiter,
+    jittered_backoff,
+)
 from google.cloud.pubsublite.internal.wire.work_item import WorkItem
 from google.cloud.pubsublite.internal.wire.permanent_failable import PermanentFailable
 
-_MIN_BACKOFF_SECS = 0.01
-_MAX_BACKOFF_SECS = 10
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_WRITE_PIPELINE_DEPTH = 8
+
+RequestMerger = Callable[[Request, Request], Optional[Request]]
+
+
+def _complete(items: List[WorkItem], error: Optional[GoogleAPICallError] = None):
+    for item in items:
+        if item.response_future.done():
+            continue
+        if error is None:
+            item.response_future.set_result(None)
+        else:
+            item.response_future.set_exception(error)
+
+
+class _Entered(Connection[Request, Response]):
+    """Manages a connection which has already been entered."""
+
+    _connection: Connection[Request, Response]
+
+    def __init__(self, connection: Connection[Request, Response]):
+        self._connection = connection
+
+    async def __aenter__(self):
+        return self._connection
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._connection.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def write(self, request: Request) -> None:
+        await self._connection.write(request)
+
+    async def read(self) -> Response:
+        return await self._connection.read()
 
 
 class RetryingConnection(Connection[Request, Response], PermanentFailable):
@@ -40,6 +85,12 @@ class RetryingConnection(Connection[Request, Response], PermanentFailable):
 
     _connection_factory: ConnectionFactory[Request, Response]
     _reinitializer: ConnectionReinitializer[Request, Response]
+    _write_pipeline_depth: int
+    _merge_requests: Optional[RequestMerger]
+    _reconnect_limiter: ReconnectLimiter
+    _retry_budget: Optional[int]
+    _recycle_seconds: Optional[float]
+    _recycler: Optional[ConnectionRecycler[Request, Response]]
     _initialized_once: asyncio.Event
 
     _loop_task: asyncio.Future
@@ -51,12 +102,42 @@ class RetryingConnection(Connection[Request, Response], PermanentFailable):
         self,
         connection_factory: ConnectionFactory[Request, Response],
         reinitializer: ConnectionReinitializer[Request, Response],
+        write_pipeline_depth: int = DEFAULT_WRITE_PIPELINE_DEPTH,
+        merge_requests: Optional[RequestMerger] = None,
+        reconnect_limiter: Optional[ReconnectLimiter] = None,
+        retry_budget: Optional[int] = None,
+        recycle_seconds: Optional[float] = None,
+        recycler: Optional[ConnectionRecycler[Request, Response]] = None,
     ):
+        """
+    Args:
+      connection_factory: Creates the underlying connections.
+      reinitializer: Reinitializes each new underlying connection before it is used.
+      write_pipeline_depth: The number of writes which may be queued for the underlying connection at once. Writes
+        are sent and completed in the order they were made.
+      merge_requests: Combines two consecutive queued requests into one, or returns None if they cannot be combined.
+      reconnect_limiter: Limits the rate of reconnects after failures. Defaults to the limiter shared by the process.
+      retry_budget: The number of consecutive reconnects which may fail before the connection fails permanently with
+        the last error. Unlimited if None.
+      recycle_seconds: The time after which each underlying connection is replaced. The replacement is opened and
+        initialized by the recycler before writes move to it, once every write sent on the current connection has
+        been answered. Requires a stream which reads one response per request after initialization. Connections are
+        only replaced on failure if None.
+      recycler: Initializes replacement connections. Required if recycle_seconds is set.
+    """
+        if recycle_seconds is not None and recycler is None:
+            raise ValueError("A recycler is required to recycle connections.")
         super().__init__()
         self._connection_factory = connection_factory
         self._reinitializer = reinitializer
+        self._write_pipeline_depth = write_pipeline_depth
+        self._merge_requests = merge_requests
+        self._reconnect_limiter = reconnect_limiter or default_reconnect_limiter()
+        self._retry_budget = retry_budget
+        self._recycle_seconds = recycle_seconds
+        self._recycler = recycler
         self._initialized_once = asyncio.Event()
-        self._write_queue = asyncio.Queue(maxsize=1)
+        self._write_queue = asyncio.Queue(maxsize=write_pipeline_depth)
         self._read_queue = asyncio.Queue(maxsize=1)
 
     async def __aenter__(self):
@@ -66,6 +147,10 @@ class RetryingConnection(Connection[Request, Response], PermanentFailable):
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         self.fail(Cancelled("Connection shutting down."))
+        self._loop_task.cancel()
+        await wait_ignore_errors(self._loop_task)
+        # The loop may have been cancelled before observing the shutdown failure, which is expected and not logged.
+        self.error()
 
     async def write(self, request: Request) -> None:
         item = WorkItem(request)
@@ -80,32 +165,51 @@ class RetryingConnection(Connection[Request, Response], PermanentFailable):
     Processes actions on this connection and handles retries until cancelled.
     """
         last_failure: Optional[GoogleAPICallError] = None
+        replacement: Optional[Connection[Request, Response]] = None
+        unsent: List[Tuple[Request, List[WorkItem[Request, None]]]] = []
         try:
             bad_retries = 0
             while True:
                 try:
+                    if replacement is not None:
+                        # The replacement was initialized before the previous connection was retired.
+                        async with _Entered(replacement) as connection:
+                            replacement = None
+                            replacement = await self._loop_connection(
+                                connection, unsent
+                            )
+                        continue
+                    if last_failure is not None:
+                        await self._reconnect_limiter.acquire()
                     conn_fut = self._connection_factory.new()
                     async with (await conn_fut) as connection:
                         # Needs to happen prior to reinitialization to clear outstanding waiters.
                         if last_failure is not None:
                             while not self._write_queue.empty():
-                                self._write_queue.get_nowait().response_future.set_exception(
-                                    last_failure
+                                _complete(
+                                    [self._write_queue.get_nowait()], last_failure
                                 )
                         self._read_queue = asyncio.Queue(maxsize=1)
-                        self._write_queue = asyncio.Queue(maxsize=1)
+                        self._write_queue = asyncio.Queue(
+                            maxsize=self._write_pipeline_depth
+                        )
                         await self._reinitializer.reinitialize(connection)
                         self._initialized_once.set()
                         bad_retries = 0
-                        await self._loop_connection(connection)
+                        replacement = await self._loop_connection(connection, unsent)
                 except GoogleAPICallError as e:
                     last_failure = e
                     if not is_retryable(e):
                         self.fail(e)
                         return
-                    await asyncio.sleep(
-                        min(_MAX_BACKOFF_SECS, _MIN_BACKOFF_SECS * (2 ** bad_retries))
-                    )
+                    if (
+                        self._retry_budget is not None
+                        and bad_retries >= self._retry_budget
+                    ):
+                        self._reconnect_limiter.record_budget_exhausted()
+                        self.fail(e)
+                        return
+                    await asyncio.sleep(jittered_backoff(bad_retries))
                     bad_retries += 1
 
         except asyncio.CancelledError:
@@ -116,35 +220,167 @@ class RetryingConnection(Connection[Request, Response], PermanentFailable):
             traceback.print_exc()
             print(e)
 
-    async def _loop_connection(self, connection: Connection[Request, Response]):
+    async def _loop_connection(
+        self,
+        connection: Connection[Request, Response],
+        unsent: List[Tuple[Request, List[WorkItem[Request, None]]]],
+    ) -> Connection[Request, Response]:
+        """
+    Forward reads and writes to the connection until it fails, or until it has been replaced when recycling. Returns
+    the replacement, with the writes which were not sent on this connection left in unsent.
+    """
+        # Writes sent to the connection which have not completed, oldest first.
+        in_flight: "Deque[Tuple[Future[None], List[WorkItem[Request, None]]]]" = deque()
+        write_failure: "Future[None]" = asyncio.Future()
+        sent = 0
+        received = 0
+
+        def on_sent():
+            nonlocal sent
+            sent += 1
+
         read_task: "Future[Response]" = asyncio.ensure_future(connection.read())
-        write_task: "Future[WorkItem[Request]]" = asyncio.ensure_future(
-            self._write_queue.get()
+        write_task: "Future[None]" = asyncio.ensure_future(
+            self._write_loop(connection, in_flight, unsent, write_failure, on_sent)
         )
+        recycle_task: "Future[Connection[Request, Response]]" = self._start_recycle()
+        replacement: Optional[Connection[Request, Response]] = None
+        handed_off: Optional[Connection[Request, Response]] = None
+        failure: Optional[GoogleAPICallError] = None
         try:
             while True:
+                waiting = [write_task, write_failure, read_task, recycle_task]
+                if replacement is not None and in_flight:
+                    waiting.append(in_flight[-1][0])
                 done, _ = await asyncio.wait(
-                    [write_task, read_task], return_when=asyncio.FIRST_COMPLETED
+                    waiting, return_when=asyncio.FIRST_COMPLETED
                 )
                 if write_task in done:
-                    await self._handle_write(connection, await write_task)
-                    write_task = asyncio.ensure_future(self._write_queue.get())
+                    await write_task
+                if write_failure in done:
+                    await write_failure
                 if read_task in done:
                     await self._read_queue.put(await read_task)
+                    received += 1
                     read_task = asyncio.ensure_future(connection.read())
+                if recycle_task in done:
+                    try:
+                        replacement = await recycle_task
+                    except GoogleAPICallError as e:
+                        _LOGGER.debug(f"Failed to open replacement stream: {e}")
+                        recycle_task = self._start_recycle()
+                    else:
+                        # Hold writes back until those already sent have been answered.
+                        recycle_task = asyncio.Future()
+                        write_task.cancel()
+                        await wait_ignore_cancelled(write_task)
+                        write_task = asyncio.Future()
+                if replacement is not None and not in_flight and received >= sent:
+                    handed_off = replacement
+                    replacement = None
+                    return handed_off
+        except GoogleAPICallError as e:
+            failure = e
+            raise
         finally:
-            read_task.cancel()
-            write_task.cancel()
-            await wait_ignore_errors(read_task)
-            await wait_ignore_errors(write_task)
-
-    @staticmethod
-    async def _handle_write(
-        connection: Connection[Request, Response], to_write: WorkItem[Request, Response]
-    ):
+            for task in (read_task, write_task, recycle_task):
+                task.cancel()
+                await wait_ignore_errors(task)
+            if (
+                replacement is None
+                and handed_off is None
+                and recycle_task.done()
+                and not recycle_task.cancelled()
+                and recycle_task.exception() is None
+            ):
+                replacement = recycle_task.result()
+            if replacement is not None:
+                await wait_ignore_errors(replacement.__aexit__(None, None, None))
+            if failure is None:
+                failure = self.error() or Cancelled("Connection shutting down.")
+            while in_flight:
+                task, items = in_flight.popleft()
+                task.cancel()
+                _complete(items, failure)
+            if not write_failure.done():
+                write_failure.cancel()
+            if handed_off is None:
+                for _, items in unsent:
+                    _complete(items, failure)
+                unsent.clear()
+
+    def _start_recycle(self) -> "Future[Connection[Request, Response]]":
+        if self._recycle_seconds is None:
+            return asyncio.Future()
+        return asyncio.ensure_future(self._open_replacement())
+
+    async def _open_replacement(self) -> Connection[Request, Response]:
+        """Wait for the recycle period, then open and initialize a replacement connection."""
+        await asyncio.sleep(self._recycle_seconds)
+        replacement = await (await self._connection_factory.new()).__aenter__()
         try:
-            await connection.write(to_write.request)
-            to_write.response_future.set_result(None)
-        except GoogleAPICallError as e:
-            to_write.response_future.set_exception(e)
-            raise e
+            await self._recycler.initialize_replacement(replacement)
+        except BaseException:
+            await wait_ignore_errors(replacement.__aexit__(None, None, None))
+            raise
+        return replacement
+
+    async def _write_loop(
+        self,
+        connection: Connection[Request, Response],
+        in_flight: "Deque[Tuple[Future[None], List[WorkItem[Request, None]]]]",
+        unsent: List[Tuple[Request, List[WorkItem[Request, None]]]],
+        write_failure: "Future[None]",
+        on_sent: Callable[[], None],
+    ):
+        """
+    Send queued writes to the connection in order, with at most write_pipeline_depth of them in flight at once.
+    Writes are completed in order as the connection finishes them.
+    """
+
+        def settle(_):
+            while in_flight and in_flight[0][0].done():
+                task, items = in_flight.popleft()
+                if task.cancelled():
+                    error = Cancelled("Write was cancelled.")
+                else:
+                    error = task.exception()
+                _complete(items, error)
+                if error is not None and not write_failure.done():
+                    write_failure.set_exception(error)
+
+        while True:
+            if not unsent:
+                unsent.extend(self._take_writes(await self._write_queue.get()))
+            while unsent:
+                while len(in_flight) >= self._write_pipeline_depth:
+                    oldest = in_flight[0][0]
+                    if not oldest.done():
+                        await asyncio.wait([oldest])
+                    settle(oldest)
+                request, items = unsent.pop(0)
+                task = asyncio.ensure_future(connection.write(request))
+                in_flight.append((task, items))
+                on_sent()
+                task.add_done_callback(settle)
+
+    def _take_writes(
+        self, first: WorkItem[Request, None]
+    ) -> List[Tuple[Request, List[WorkItem[Request, None]]]]:
+        """
+    Take the writes which are already queued behind the first, merging consecutive writes into one request where
+    possible. Returns each request to send with the writes it completes.
+    """
+        writes = [(first.request, [first])]
+        while not self._write_queue.empty():
+            item = self._write_queue.get_nowait()
+            request, items = writes[-1]
+            merged = None
+            if self._merge_requests is not None:
+                merged = self._merge_requests(request, item.request)
+            if merged is None:
+                writes.append((item.request, [item]))
+            else:
+                items.append(item)
+                writes[-1] = (merged, items)
+        return writes
@@ -12,10 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
-from typing import Mapping
+from typing import Mapping, Optional
 
-from google.cloud.pubsublite.internal.wire.publisher import Publisher
+from google.cloud.pubsublite.internal.gather_bounded import gather_bounded
+from google.cloud.pubsublite.internal.wire.publisher import Publisher, check_partition
 from google.cloud.pubsublite.internal.wire.routing_policy import RoutingPolicy
 from google.cloud.pubsublite.types import Partition, MessageMetadata
 from google.cloud.pubsublite_v1 import PubSubMessage
@@ -32,17 +32,30 @@ class RoutingPublisher(Publisher):
         self._publishers = publishers
 
     async def __aenter__(self):
-        enter_futures = [
-            publisher.__aenter__() for publisher in self._publishers.values()
-        ]
-        await asyncio.gather(*enter_futures)
+        await gather_bounded(
+            [publisher.__aenter__() for publisher in self._publishers.values()]
+        )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        for publisher in self._publishers.values():
-            await publisher.__aexit__(exc_type, exc_val, exc_tb)
-
-    async def publish(self, message: PubSubMessage) -> MessageMetadata:
-        partition = self._routing_policy.route(message)
+        await gather_bounded(
+            [
+                publisher.__aexit__(exc_type, exc_val, exc_tb)
+                for publisher in self._publishers.values()
+            ]
+        )
+
+    async def publish(
+        self, message: PubSubMessage, partition: Optional[Partition] = None
+    ) -> MessageMetadata:
+        if partition is None:
+            partition = self._routing_policy.route(message)
+        else:
+            check_partition(partition, len(self._publishers))
         assert partition in self._publishers
         return await self._publishers[partition].publish(message)
+
+    async def flush(self):
+        await gather_bounded(
+            [publisher.flush() for publisher in self._publishers.values()]
+        )
@@ -56,6 +56,9 @@ class SerialBatcher(Generic[Request, Response]):
         self._requests.append(item)
         return item.response_future
 
+    def empty(self) -> bool:
+        return not self._requests
+
     def should_flush(self) -> bool:
         return self._tester.test(item.request for item in self._requests)
 
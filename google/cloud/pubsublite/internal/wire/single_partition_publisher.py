@@ -19,13 +19,25 @@ import logging
 from google.cloud.pubsub_v1.types import BatchSettings
 
 from google.cloud.pubsublite.internal.wait_ignore_cancelled import wait_ignore_errors
-from google.cloud.pubsublite.internal.wire.publisher import Publisher
+from google.cloud.pubsublite.internal.wire.publisher import (
+    InvalidPartition,
+    Publisher,
+)
 from google.cloud.pubsublite.internal.wire.retrying_connection import (
     RetryingConnection,
     ConnectionFactory,
 )
-from google.api_core.exceptions import FailedPrecondition, GoogleAPICallError
+from google.api_core.exceptions import (
+    FailedPrecondition,
+    GoogleAPICallError,
+)
+from google.cloud.pubsublite.internal.wire.flush_scheduler import (
+    FlushScheduler,
+    ScheduledFlush,
+    get_flush_scheduler,
+)
 from google.cloud.pubsublite.internal.wire.connection_reinitializer import (
+    ConnectionRecycler,
     ConnectionReinitializer,
 )
 from google.cloud.pubsublite.internal.wire.connection import Connection
@@ -55,6 +67,7 @@ _MAX_MESSAGES = 1000
 class SinglePartitionPublisher(
     Publisher,
     ConnectionReinitializer[PublishRequest, PublishResponse],
+    ConnectionRecycler[PublishRequest, PublishResponse],
     BatchTester[PubSubMessage],
 ):
     _initial: InitialPublishRequest
@@ -66,20 +79,28 @@ class SinglePartitionPublisher(
 
     _receiver: Optional[asyncio.Future]
     _flusher: Optional[asyncio.Future]
+    _flush_scheduler: Optional[FlushScheduler]
+    _scheduled_flush: Optional[ScheduledFlush]
 
     def __init__(
         self,
         initial: InitialPublishRequest,
         batching_settings: BatchSettings,
         factory: ConnectionFactory[PublishRequest, PublishResponse],
+        stream_recycle_seconds: Optional[float] = None,
+        flush_scheduler: Optional[FlushScheduler] = None,
     ):
         self._initial = initial
         self._batching_settings = batching_settings
-        self._connection = RetryingConnection(factory, self)
+        self._connection = RetryingConnection(
+            factory, self, recycle_seconds=stream_recycle_seconds, recycler=self,
+        )
         self._batcher = SerialBatcher(self)
         self._outstanding_writes = []
         self._receiver = None
         self._flusher = None
+        self._flush_scheduler = flush_scheduler
+        self._scheduled_flush = None
 
     @property
     def _partition(self) -> Partition:
@@ -93,18 +114,37 @@ class SinglePartitionPublisher(
         assert self._receiver is None
         assert self._flusher is None
         self._receiver = asyncio.ensure_future(self._receive_loop())
-        self._flusher = asyncio.ensure_future(self._flush_loop())
+        if not self._batcher.empty():
+            self._schedule_flush()
 
     async def _stop_loopers(self):
         if self._receiver:
             self._receiver.cancel()
             await wait_ignore_errors(self._receiver)
             self._receiver = None
+        if self._scheduled_flush:
+            self._scheduled_flush.cancel()
+            self._scheduled_flush = None
         if self._flusher:
             self._flusher.cancel()
             await wait_ignore_errors(self._flusher)
             self._flusher = None
 
+    def _schedule_flush(self):
+        if self._scheduled_flush is not None:
+            return
+        scheduler = self._flush_scheduler or get_flush_scheduler()
+        self._scheduled_flush = scheduler.schedule(
+            self._batching_settings.max_latency, self._on_flush_due
+        )
+
+    def _on_flush_due(self):
+        self._scheduled_flush = None
+        if self._receiver is None:
+            # Stopped for reinitialization, which schedules any flush still needed once it completes.
+            return
+        self._flusher = asyncio.ensure_future(self._flush())
+
     def _handle_response(self, response: PublishResponse):
         if "message_response" not in response:
             self._connection.fail(
@@ -129,11 +169,6 @@ class SinglePartitionPublisher(
             response = await self._connection.read()
             self._handle_response(response)
 
-    async def _flush_loop(self):
-        while True:
-            await asyncio.sleep(self._batching_settings.max_latency)
-            await self._flush()
-
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self._connection.error():
             self._fail_if_retrying_failed()
@@ -153,20 +188,50 @@ class SinglePartitionPublisher(
         if not batch:
             return
         self._outstanding_writes.append(batch)
-        aggregate = PublishRequest()
-        aggregate.message_publish_request.messages = [item.request for item in batch]
+        # Once recorded as outstanding, the batch must be sent even if the caller is cancelled while the connection's
+        # write queue is full, or later responses would be matched with the wrong batches. Sends start in the order
+        # their batches were recorded.
+        await asyncio.shield(self._send(batch))
+
+    async def _send(self, batch: List[WorkItem[PubSubMessage, Cursor]]):
         try:
-            await self._connection.write(aggregate)
+            await self._connection.write(self._as_request(batch))
         except GoogleAPICallError as e:
             _LOGGER.debug(f"Failed publish on stream: {e}")
             self._fail_if_retrying_failed()
 
-    async def publish(self, message: PubSubMessage) -> MessageMetadata:
+    async def publish(
+        self, message: PubSubMessage, partition: Optional[Partition] = None
+    ) -> MessageMetadata:
+        if partition is not None and partition != self._partition:
+            raise InvalidPartition(
+                f"Cannot publish to partition {partition.value} with the publisher for partition "
+                f"{self._partition.value}."
+            )
         cursor_future = self._batcher.add(message)
         if self._batcher.should_flush():
             await self._flush()
+        else:
+            self._schedule_flush()
         return MessageMetadata(self._partition, await cursor_future)
 
+    async def flush(self):
+        if self._connection.error():
+            raise self._connection.error()
+        if self._scheduled_flush:
+            self._scheduled_flush.cancel()
+            self._scheduled_flush = None
+        await self._flush()
+        pending = [
+            item.response_future
+            for batch in self._outstanding_writes
+            for item in batch
+            if not item.response_future.done()
+        ]
+        if pending:
+            # Waiting does not cancel the messages' futures if the flush is cancelled.
+            await self._connection.await_unless_failed(asyncio.wait(pending))
+
     async def reinitialize(
         self, connection: Connection[PublishRequest, PublishResponse]
     ):
@@ -179,14 +244,63 @@ class SinglePartitionPublisher(
                     "Received an invalid initial response on the publish stream."
                 )
             )
-        for batch in self._outstanding_writes:
-            aggregate = PublishRequest()
-            aggregate.message_publish_request.messages = [
-                item.request for item in batch
-            ]
-            await connection.write(aggregate)
+        self._outstanding_writes = self._repack(self._outstanding_writes)
+        # Queue every resent batch before waiting for any, so resending is not bounded by round trips.
+        writes = [
+            asyncio.ensure_future(connection.write(self._as_request(batch)))
+            for batch in self._outstanding_writes
+        ]
+        try:
+            await asyncio.gather(*writes)
+        except BaseException:
+            for write in writes:
+                write.cancel()
+            await asyncio.gather(*writes, return_exceptions=True)
+            raise
         self._start_loopers()
 
+    async def initialize_replacement(
+        self, connection: Connection[PublishRequest, PublishResponse]
+    ):
+        await connection.write(PublishRequest(initial_request=self._initial))
+        response = await connection.read()
+        if "initial_response" not in response:
+            raise FailedPrecondition(
+                "Received an invalid initial response on the publish stream."
+            )
+
+    @staticmethod
+    def _as_request(batch: List[WorkItem[PubSubMessage, Cursor]]) -> PublishRequest:
+        aggregate = PublishRequest()
+        aggregate.message_publish_request.messages = [item.request for item in batch]
+        return aggregate
+
+    @staticmethod
+    def _repack(
+        batches: List[List[WorkItem[PubSubMessage, Cursor]]]
+    ) -> List[List[WorkItem[PubSubMessage, Cursor]]]:
+        """
+    Combine consecutive outstanding batches into as few batches within the request limits as possible. Each response
+    assigns consecutive offsets to the messages of one batch, so messages stay in publish order.
+    """
+        repacked: List[List[WorkItem[PubSubMessage, Cursor]]] = []
+        repacked_bytes = 0
+        for batch in batches:
+            batch_bytes = sum(
+                PubSubMessage.pb(item.request).ByteSize() for item in batch
+            )
+            if (
+                repacked
+                and len(repacked[-1]) + len(batch) <= _MAX_MESSAGES
+                and repacked_bytes + batch_bytes <= _MAX_BYTES
+            ):
+                repacked[-1] = repacked[-1] + batch
+                repacked_bytes += batch_bytes
+            else:
+                repacked.append(batch)
+                repacked_bytes = batch_bytes
+        return repacked
+
     def test(self, requests: Iterable[PubSubMessage]) -> bool:
         request_count = 0
         byte_count = 0
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from abc import abstractmethod
-from typing import AsyncContextManager
+from typing import AsyncContextManager, List
 from google.cloud.pubsublite_v1.types import SequencedMessage, FlowControlRequest
 
 
@@ -35,6 +35,19 @@ class Subscriber(AsyncContextManager):
     """
         raise NotImplementedError()
 
+    @abstractmethod
+    async def read_batch(self) -> List[SequencedMessage]:
+        """
+    Read all messages which are available on the stream, waiting until there is at least one.
+
+    Returns:
+      The next messages, in order.
+
+    Raises:
+      GoogleAPICallError: On a permanent error.
+    """
+        raise NotImplementedError()
+
     @abstractmethod
     async def allow_flow(self, request: FlowControlRequest):
         """
@@ -13,7 +13,8 @@
 # limitations under the License.
 
 import asyncio
-from typing import Optional
+import time
+from typing import List, Optional
 
 from google.api_core.exceptions import GoogleAPICallError, FailedPrecondition
 
@@ -22,6 +23,11 @@ from google.cloud.pubsublite.internal.wire.connection import (
     Connection,
     ConnectionFactory,
 )
+from google.cloud.pubsublite.internal.wire.flush_scheduler import (
+    FlushScheduler,
+    ScheduledFlush,
+    get_flush_scheduler,
+)
 from google.cloud.pubsublite.internal.wire.connection_reinitializer import (
     ConnectionReinitializer,
 )
@@ -40,6 +46,25 @@ from google.cloud.pubsublite_v1 import (
     Cursor,
 )
 
+_ARRIVAL_RATE_WEIGHT = 0.3
+_FLUSH_DRAIN_FRACTION = 0.5
+
+
+def merge_flow_control_requests(
+    first: SubscribeRequest, second: SubscribeRequest
+) -> Optional[SubscribeRequest]:
+    """Combine two consecutive flow control requests into one. Other requests are not merged."""
+    if "flow_control" not in first or "flow_control" not in second:
+        return None
+    return SubscribeRequest(
+        flow_control=FlowControlRequest(
+            allowed_messages=first.flow_control.allowed_messages
+            + second.flow_control.allowed_messages,
+            allowed_bytes=first.flow_control.allowed_bytes
+            + second.flow_control.allowed_bytes,
+        )
+    )
+
 
 class SubscriberImpl(
     Subscriber, ConnectionReinitializer[SubscribeRequest, SubscribeResponse]
@@ -55,24 +80,44 @@ class SubscriberImpl(
 
     _message_queue: "asyncio.Queue[SequencedMessage]"
 
+    _min_token_flush_seconds: Optional[float]
+    _arrival_rate: Optional[float]
+    _last_arrival: Optional[float]
+
     _receiver: Optional[asyncio.Future]
     _flusher: Optional[asyncio.Future]
+    _flush_scheduler: Optional[FlushScheduler]
+    _scheduled_flush: Optional[ScheduledFlush]
 
     def __init__(
         self,
         initial: InitialSubscribeRequest,
         token_flush_seconds: float,
         factory: ConnectionFactory[SubscribeRequest, SubscribeResponse],
+        min_token_flush_seconds: Optional[float] = None,
+        flush_scheduler: Optional[FlushScheduler] = None,
     ):
+        """
+        Tokens are flushed to the server token_flush_seconds after they are allowed. If min_token_flush_seconds is
+        set, the flush delay instead adapts to the rate messages arrive at, flushing sooner as the server's remaining
+        tokens run out, but no sooner than min_token_flush_seconds.
+        """
         self._initial = initial
         self._token_flush_seconds = token_flush_seconds
-        self._connection = RetryingConnection(factory, self)
+        self._min_token_flush_seconds = min_token_flush_seconds
+        self._arrival_rate = None
+        self._last_arrival = None
+        self._connection = RetryingConnection(
+            factory, self, merge_requests=merge_flow_control_requests
+        )
         self._outstanding_flow_control = FlowControlBatcher()
         self._reinitializing = False
         self._last_received_offset = None
         self._message_queue = asyncio.Queue()
         self._receiver = None
         self._flusher = None
+        self._flush_scheduler = flush_scheduler
+        self._scheduled_flush = None
 
     async def __aenter__(self):
         await self._connection.__aenter__()
@@ -82,18 +127,37 @@ class SubscriberImpl(
         assert self._receiver is None
         assert self._flusher is None
         self._receiver = asyncio.ensure_future(self._receive_loop())
-        self._flusher = asyncio.ensure_future(self._flush_loop())
+        if self._outstanding_flow_control.has_pending():
+            self._schedule_flush()
 
     async def _stop_loopers(self):
         if self._receiver:
             self._receiver.cancel()
             await wait_ignore_errors(self._receiver)
             self._receiver = None
+        if self._scheduled_flush:
+            self._scheduled_flush.cancel()
+            self._scheduled_flush = None
         if self._flusher:
             self._flusher.cancel()
             await wait_ignore_errors(self._flusher)
             self._flusher = None
 
+    def _schedule_flush(self):
+        if self._scheduled_flush is not None:
+            return
+        scheduler = self._flush_scheduler or get_flush_scheduler()
+        self._scheduled_flush = scheduler.schedule(
+            self._next_flush_seconds(), self._on_flush_due
+        )
+
+    def _on_flush_due(self):
+        self._scheduled_flush = None
+        if self._receiver is None:
+            # Stopped for reinitialization, which schedules any flush still needed once it completes.
+            return
+        self._flusher = asyncio.ensure_future(self._try_send_tokens())
+
     def _handle_response(self, response: SubscribeResponse):
         if "messages" not in response:
             self._connection.fail(
@@ -103,6 +167,7 @@ class SubscriberImpl(
             )
             return
         self._outstanding_flow_control.on_messages(response.messages.messages)
+        self._record_arrival(len(response.messages.messages))
         for message in response.messages.messages:
             if (
                 self._last_received_offset is not None
@@ -136,10 +201,33 @@ class SubscriberImpl(
             # May be transient, in which case these tokens will be resent.
             pass
 
-    async def _flush_loop(self):
-        while True:
-            await asyncio.sleep(self._token_flush_seconds)
-            await self._try_send_tokens()
+    def _record_arrival(self, count: int):
+        if self._min_token_flush_seconds is None:
+            return
+        now = time.monotonic()
+        if self._last_arrival is not None and now > self._last_arrival:
+            sample = count / (now - self._last_arrival)
+            if self._arrival_rate is None:
+                self._arrival_rate = sample
+            else:
+                self._arrival_rate = (
+                    _ARRIVAL_RATE_WEIGHT * sample
+                    + (1 - _ARRIVAL_RATE_WEIGHT) * self._arrival_rate
+                )
+        self._last_arrival = now
+
+    def _next_flush_seconds(self) -> float:
+        if self._min_token_flush_seconds is None or not self._arrival_rate:
+            return self._token_flush_seconds
+        # Flush before the server runs out of tokens at the current arrival rate.
+        drain_seconds = (
+            max(0, self._outstanding_flow_control.server_messages())
+            / self._arrival_rate
+        )
+        return max(
+            self._min_token_flush_seconds,
+            min(self._token_flush_seconds, drain_seconds * _FLUSH_DRAIN_FRACTION),
+        )
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self._stop_loopers()
@@ -185,6 +273,12 @@ class SubscriberImpl(
     async def read(self) -> SequencedMessage:
         return await self._connection.await_unless_failed(self._message_queue.get())
 
+    async def read_batch(self) -> List[SequencedMessage]:
+        batch = [await self.read()]
+        while not self._message_queue.empty():
+            batch.append(self._message_queue.get_nowait())
+        return batch
+
     async def allow_flow(self, request: FlowControlRequest):
         self._outstanding_flow_control.add(request)
         if (
@@ -192,3 +286,5 @@ class SubscriberImpl(
             and self._outstanding_flow_control.should_expedite()
         ):
             await self._try_send_tokens()
+        else:
+            self._schedule_flush()
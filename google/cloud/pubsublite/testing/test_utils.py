@@ -18,6 +18,11 @@ from typing import List, Union, Any, TypeVar, Generic, Optional, Callable
 
 from asynctest import CoroutineMock
 
+from google.cloud.pubsublite.internal.wire.flush_scheduler import (
+    FlushScheduler,
+    ScheduledFlush,
+)
+
 T = TypeVar("T")
 
 
@@ -76,3 +81,24 @@ def run_on_thread(func: Callable[[], T]) -> T:
     thread.start()
     thread.join()
     return box.val
+
+
+class FakeFlushScheduler(FlushScheduler):
+    """A FlushScheduler whose flushes run only when the test runs them. Each flush's deadline is its delay."""
+
+    scheduled: "asyncio.Queue[ScheduledFlush]"
+
+    def __init__(self):
+        super().__init__()
+        self.scheduled = asyncio.Queue()
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> ScheduledFlush:
+        flush = ScheduledFlush(delay, callback)
+        self.scheduled.put_nowait(flush)
+        return flush
+
+    async def run_next(self) -> float:
+        """Wait for the next flush to be scheduled, run it, and return its delay."""
+        flush = await self.scheduled.get()
+        flush.run()
+        return flush.deadline
@@ -15,67 +15,156 @@
 # limitations under the License.
 #
 
-from .services.admin_service import AdminServiceClient
-from .services.cursor_service import CursorServiceClient
-from .services.partition_assignment_service import PartitionAssignmentServiceClient
-from .services.publisher_service import PublisherServiceClient
-from .services.subscriber_service import SubscriberServiceClient
-from .services.topic_stats_service import TopicStatsServiceClient
-from .types.admin import CreateSubscriptionRequest
-from .types.admin import CreateTopicRequest
-from .types.admin import DeleteSubscriptionRequest
-from .types.admin import DeleteTopicRequest
-from .types.admin import GetSubscriptionRequest
-from .types.admin import GetTopicPartitionsRequest
-from .types.admin import GetTopicRequest
-from .types.admin import ListSubscriptionsRequest
-from .types.admin import ListSubscriptionsResponse
-from .types.admin import ListTopicSubscriptionsRequest
-from .types.admin import ListTopicSubscriptionsResponse
-from .types.admin import ListTopicsRequest
-from .types.admin import ListTopicsResponse
-from .types.admin import TopicPartitions
-from .types.admin import UpdateSubscriptionRequest
-from .types.admin import UpdateTopicRequest
-from .types.common import AttributeValues
-from .types.common import Cursor
-from .types.common import PubSubMessage
-from .types.common import SequencedMessage
-from .types.common import Subscription
-from .types.common import Topic
-from .types.cursor import CommitCursorRequest
-from .types.cursor import CommitCursorResponse
-from .types.cursor import InitialCommitCursorRequest
-from .types.cursor import InitialCommitCursorResponse
-from .types.cursor import ListPartitionCursorsRequest
-from .types.cursor import ListPartitionCursorsResponse
-from .types.cursor import PartitionCursor
-from .types.cursor import SequencedCommitCursorRequest
-from .types.cursor import SequencedCommitCursorResponse
-from .types.cursor import StreamingCommitCursorRequest
-from .types.cursor import StreamingCommitCursorResponse
-from .types.publisher import InitialPublishRequest
-from .types.publisher import InitialPublishResponse
-from .types.publisher import MessagePublishRequest
-from .types.publisher import MessagePublishResponse
-from .types.publisher import PublishRequest
-from .types.publisher import PublishResponse
-from .types.subscriber import FlowControlRequest
-from .types.subscriber import InitialPartitionAssignmentRequest
-from .types.subscriber import InitialSubscribeRequest
-from .types.subscriber import InitialSubscribeResponse
-from .types.subscriber import MessageResponse
-from .types.subscriber import PartitionAssignment
-from .types.subscriber import PartitionAssignmentAck
-from .types.subscriber import PartitionAssignmentRequest
-from .types.subscriber import SeekRequest
-from .types.subscriber import SeekResponse
-from .types.subscriber import SubscribeRequest
-from .types.subscriber import SubscribeResponse
-from .types.topic_stats import ComputeHeadCursorRequest
-from .types.topic_stats import ComputeHeadCursorResponse
-from .types.topic_stats import ComputeMessageStatsRequest
-from .types.topic_stats import ComputeMessageStatsResponse
+import importlib
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: NO COVER
+    from .services.admin_service import AdminServiceClient
+    from .services.cursor_service import CursorServiceClient
+    from .services.partition_assignment_service import PartitionAssignmentServiceClient
+    from .services.publisher_service import PublisherServiceClient
+    from .services.subscriber_service import SubscriberServiceClient
+    from .services.topic_stats_service import TopicStatsServiceClient
+    from .types.admin import CreateSubscriptionRequest
+    from .types.admin import CreateTopicRequest
+    from .types.admin import DeleteSubscriptionRequest
+    from .types.admin import DeleteTopicRequest
+    from .types.admin import GetSubscriptionRequest
+    from .types.admin import GetTopicPartitionsRequest
+    from .types.admin import GetTopicRequest
+    from .types.admin import ListSubscriptionsRequest
+    from .types.admin import ListSubscriptionsResponse
+    from .types.admin import ListTopicSubscriptionsRequest
+    from .types.admin import ListTopicSubscriptionsResponse
+    from .types.admin import ListTopicsRequest
+    from .types.admin import ListTopicsResponse
+    from .types.admin import TopicPartitions
+    from .types.admin import UpdateSubscriptionRequest
+    from .types.admin import UpdateTopicRequest
+    from .types.common import AttributeValues
+    from .types.common import Cursor
+    from .types.common import PubSubMessage
+    from .types.common import SequencedMessage
+    from .types.common import Subscription
+    from .types.common import Topic
+    from .types.cursor import CommitCursorRequest
+    from .types.cursor import CommitCursorResponse
+    from .types.cursor import InitialCommitCursorRequest
+    from .types.cursor import InitialCommitCursorResponse
+    from .types.cursor import ListPartitionCursorsRequest
+    from .types.cursor import ListPartitionCursorsResponse
+    from .types.cursor import PartitionCursor
+    from .types.cursor import SequencedCommitCursorRequest
+    from .types.cursor import SequencedCommitCursorResponse
+    from .types.cursor import StreamingCommitCursorRequest
+    from .types.cursor import StreamingCommitCursorResponse
+    from .types.publisher import InitialPublishRequest
+    from .types.publisher import InitialPublishResponse
+    from .types.publisher import MessagePublishRequest
+    from .types.publisher import MessagePublishResponse
+    from .types.publisher import PublishRequest
+    from .types.publisher import PublishResponse
+    from .types.subscriber import FlowControlRequest
+    from .types.subscriber import InitialPartitionAssignmentRequest
+    from .types.subscriber import InitialSubscribeRequest
+    from .types.subscriber import InitialSubscribeResponse
+    from .types.subscriber import MessageResponse
+    from .types.subscriber import PartitionAssignment
+    from .types.subscriber import PartitionAssignmentAck
+    from .types.subscriber import PartitionAssignmentRequest
+    from .types.subscriber import SeekRequest
+    from .types.subscriber import SeekResponse
+    from .types.subscriber import SubscribeRequest
+    from .types.subscriber import SubscribeResponse
+    from .types.topic_stats import ComputeHeadCursorRequest
+    from .types.topic_stats import ComputeHeadCursorResponse
+    from .types.topic_stats import ComputeMessageStatsRequest
+    from .types.topic_stats import ComputeMessageStatsResponse
+
+# Service clients and message types are imported on first access, so that programs only pay to import the parts of
+# the API they use.
+_LAZY_IMPORTS = {
+    "AdminServiceClient": ".services.admin_service",
+    "CursorServiceClient": ".services.cursor_service",
+    "PartitionAssignmentServiceClient": ".services.partition_assignment_service",
+    "PublisherServiceClient": ".services.publisher_service",
+    "SubscriberServiceClient": ".services.subscriber_service",
+    "TopicStatsServiceClient": ".services.topic_stats_service",
+    "CreateSubscriptionRequest": ".types.admin",
+    "CreateTopicRequest": ".types.admin",
+    "DeleteSubscriptionRequest": ".types.admin",
+    "DeleteTopicRequest": ".types.admin",
+    "GetSubscriptionRequest": ".types.admin",
+    "GetTopicPartitionsRequest": ".types.admin",
+    "GetTopicRequest": ".types.admin",
+    "ListSubscriptionsRequest": ".types.admin",
+    "ListSubscriptionsResponse": ".types.admin",
+    "ListTopicSubscriptionsRequest": ".types.admin",
+    "ListTopicSubscriptionsResponse": ".types.admin",
+    "ListTopicsRequest": ".types.admin",
+    "ListTopicsResponse": ".types.admin",
+    "TopicPartitions": ".types.admin",
+    "UpdateSubscriptionRequest": ".types.admin",
+    "UpdateTopicRequest": ".types.admin",
+    "AttributeValues": ".types.common",
+    "Cursor": ".types.common",
+    "PubSubMessage": ".types.common",
+    "SequencedMessage": ".types.common",
+    "Subscription": ".types.common",
+    "Topic": ".types.common",
+    "CommitCursorRequest": ".types.cursor",
+    "CommitCursorResponse": ".types.cursor",
+    "InitialCommitCursorRequest": ".types.cursor",
+    "InitialCommitCursorResponse": ".types.cursor",
+    "ListPartitionCursorsRequest": ".types.cursor",
+    "ListPartitionCursorsResponse": ".types.cursor",
+    "PartitionCursor": ".types.cursor",
+    "SequencedCommitCursorRequest": ".types.cursor",
+    "SequencedCommitCursorResponse": ".types.cursor",
+    "StreamingCommitCursorRequest": ".types.cursor",
+    "StreamingCommitCursorResponse": ".types.cursor",
+    "InitialPublishRequest": ".types.publisher",
+    "InitialPublishResponse": ".types.publisher",
+    "MessagePublishRequest": ".types.publisher",
+    "MessagePublishResponse": ".types.publisher",
+    "PublishRequest": ".types.publisher",
+    "PublishResponse": ".types.publisher",
+    "FlowControlRequest": ".types.subscriber",
+    "InitialPartitionAssignmentRequest": ".types.subscriber",
+    "InitialSubscribeRequest": ".types.subscriber",
+    "InitialSubscribeResponse": ".types.subscriber",
+    "MessageResponse": ".types.subscriber",
+    "PartitionAssignment": ".types.subscriber",
+    "PartitionAssignmentAck": ".types.subscriber",
+    "PartitionAssignmentRequest": ".types.subscriber",
+    "SeekRequest": ".types.subscriber",
+    "SeekResponse": ".types.subscriber",
+    "SubscribeRequest": ".types.subscriber",
+    "SubscribeResponse": ".types.subscriber",
+    "ComputeHeadCursorRequest": ".types.topic_stats",
+    "ComputeHeadCursorResponse": ".types.topic_stats",
+    "ComputeMessageStatsRequest": ".types.topic_stats",
+    "ComputeMessageStatsResponse": ".types.topic_stats",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# Module __getattr__ is only supported from python 3.7.
+if sys.version_info < (3, 7):  # pragma: NO COVER
+    for _name in _LAZY_IMPORTS:
+        __getattr__(_name)
 
 
 __all__ = (
@@ -0,0 +1,206 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compares publish and subscribe throughput on the default asyncio event loop and on uvloop, through in-memory
+connections so that only client-side overhead is measured.
+
+Usage: python tests/performance/event_loop_benchmark.py [--messages N] [--message-bytes N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Callable, Dict
+
+from google.cloud.pubsub_v1.types import BatchSettings
+
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    LoopFactory,
+    ManagedEventLoop,
+)
+from google.cloud.pubsublite.internal.wire.connection import (
+    Connection,
+    ConnectionFactory,
+)
+from google.cloud.pubsublite.internal.wire.single_partition_publisher import (
+    SinglePartitionPublisher,
+)
+from google.cloud.pubsublite.internal.wire.subscriber_impl import SubscriberImpl
+from google.cloud.pubsublite_v1 import (
+    Cursor,
+    FlowControlRequest,
+    InitialPublishRequest,
+    InitialSubscribeRequest,
+    MessagePublishResponse,
+    MessageResponse,
+    PubSubMessage,
+    PublishRequest,
+    PublishResponse,
+    SequencedMessage,
+    SubscribeRequest,
+    SubscribeResponse,
+)
+
+_SUBSCRIBE_BATCH_SIZE = 1000
+
+
+class _InMemoryConnection(Connection):
+    """A connection which answers each request with the responses from a handler."""
+
+    def __init__(self, handler: Callable[[object], list]):
+        self._handler = handler
+        self._responses = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def write(self, request) -> None:
+        for response in self._handler(request):
+            self._responses.put_nowait(response)
+
+    async def read(self):
+        return await self._responses.get()
+
+
+class _PublishServer(ConnectionFactory[PublishRequest, PublishResponse]):
+    def __init__(self):
+        self._offset = 0
+
+    def _handle(self, request: PublishRequest):
+        if "initial_request" in request:
+            return [PublishResponse(initial_response={})]
+        start = self._offset
+        self._offset += len(request.message_publish_request.messages)
+        return [
+            PublishResponse(
+                message_response=MessagePublishResponse(
+                    start_cursor=Cursor(offset=start)
+                )
+            )
+        ]
+
+    async def new(self) -> Connection[PublishRequest, PublishResponse]:
+        return _InMemoryConnection(self._handle)
+
+
+class _SubscribeServer(ConnectionFactory[SubscribeRequest, SubscribeResponse]):
+    def __init__(self, message_bytes: int):
+        self._data = b"x" * message_bytes
+        self._offset = 0
+        self._tokens = 0
+
+    def _handle(self, request: SubscribeRequest):
+        if "initial" in request:
+            return [SubscribeResponse(initial={})]
+        self._tokens += request.flow_control.allowed_messages
+        responses = []
+        while self._tokens > 0:
+            count = min(self._tokens, _SUBSCRIBE_BATCH_SIZE)
+            messages = [
+                SequencedMessage(
+                    cursor=Cursor(offset=self._offset + i),
+                    message=PubSubMessage(data=self._data),
+                )
+                for i in range(count)
+            ]
+            self._offset += count
+            self._tokens -= count
+            responses.append(
+                SubscribeResponse(messages=MessageResponse(messages=messages))
+            )
+        return responses
+
+    async def new(self) -> Connection[SubscribeRequest, SubscribeResponse]:
+        return _InMemoryConnection(self._handle)
+
+
+async def _publish(messages: int, message_bytes: int) -> float:
+    publisher = SinglePartitionPublisher(
+        InitialPublishRequest(topic="topic", partition=0),
+        BatchSettings(max_messages=1000, max_bytes=3_500_000, max_latency=0.01),
+        _PublishServer(),
+    )
+    data = b"x" * message_bytes
+    async with publisher:
+        start = time.monotonic()
+        await asyncio.gather(
+            *[publisher.publish(PubSubMessage(data=data)) for _ in range(messages)]
+        )
+        return time.monotonic() - start
+
+
+async def _subscribe(messages: int, message_bytes: int) -> float:
+    subscriber = SubscriberImpl(
+        InitialSubscribeRequest(subscription="subscription", partition=0),
+        0.1,
+        _SubscribeServer(message_bytes),
+    )
+    async with subscriber:
+        start = time.monotonic()
+        await subscriber.allow_flow(
+            FlowControlRequest(
+                allowed_messages=_SUBSCRIBE_BATCH_SIZE,
+                allowed_bytes=_SUBSCRIBE_BATCH_SIZE * message_bytes,
+            )
+        )
+        received = 0
+        while received < messages:
+            batch = await subscriber.read_batch()
+            received += len(batch)
+            await subscriber.allow_flow(
+                FlowControlRequest(
+                    allowed_messages=len(batch),
+                    allowed_bytes=len(batch) * message_bytes,
+                )
+            )
+        return time.monotonic() - start
+
+
+def _run(loop_factory: LoopFactory, messages: int, message_bytes: int) -> Dict:
+    loop = ManagedEventLoop(loop_factory)
+    with loop:
+        publish_seconds = loop.submit(_publish(messages, message_bytes)).result()
+        subscribe_seconds = loop.submit(_subscribe(messages, message_bytes)).result()
+    return {
+        "publish": messages / publish_seconds,
+        "subscribe": messages / subscribe_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--message-bytes", type=int, default=100)
+    args = parser.parse_args()
+
+    loop_factories = {"asyncio": asyncio.new_event_loop}
+    try:
+        import uvloop
+
+        loop_factories["uvloop"] = uvloop.new_event_loop
+    except ImportError:
+        print("uvloop is not installed, only the default event loop is measured.")
+    for name, loop_factory in loop_factories.items():
+        rates = _run(loop_factory, args.messages, args.message_bytes)
+        print(
+            f"{name}: publish {rates['publish']:,.0f} msgs/s, "
+            f"subscribe {rates['subscribe']:,.0f} msgs/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the time a fresh interpreter takes to run common pubsublite imports, so that changes which make the package
+load more eagerly are noticed. Each import runs in its own interpreter, and the median of several runs is reported.
+
+Usage: python tests/performance/import_benchmark.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List
+
+IMPORTS = [
+    "import google.cloud.pubsublite",
+    "import google.cloud.pubsublite_v1",
+    "from google.cloud.pubsublite.types import TopicPath",
+    "from google.cloud.pubsublite import AdminClient",
+    "from google.cloud.pubsublite.cloudpubsub import PublisherClient",
+    "from google.cloud.pubsublite.cloudpubsub import SubscriberClient",
+]
+
+_TIMER = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(statement: str) -> float:
+    output = subprocess.check_output(
+        [sys.executable, "-W", "ignore", "-c", _TIMER.format(statement=statement)]
+    )
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for statement in IMPORTS:
+        times: List[float] = [time_import(statement) for _ in range(args.runs)]
+        print(f"{statistics.median(times) * 1000:8.1f} ms  {statement}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Measures the Tasks created and the time taken per message by PermanentFailable.await_unless_failed, against the
+previous approach of running every awaitable in a Task of its own and waiting on it alongside the failure future.
+
+Usage: python tests/performance/permanent_failable_benchmark.py [--messages N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+
+from google.cloud.pubsublite.internal.wire.permanent_failable import PermanentFailable
+
+
+class _TaskPerAwait(PermanentFailable):
+    """The previous implementation, which creates a Task for every awaitable."""
+
+    async def await_unless_failed(self, awaitable: Awaitable):
+        task = asyncio.ensure_future(awaitable)
+        try:
+            if self._failure_task.done():
+                raise self._failure_task.exception()
+            done, _ = await asyncio.wait(
+                [task, self._failure_task], return_when=asyncio.FIRST_COMPLETED
+            )
+            if task in done:
+                return await task
+            raise self._failure_task.exception()
+        finally:
+            if not task.done():
+                task.cancel()
+
+
+async def _measure(failable: PermanentFailable, messages: int):
+    loop = asyncio.get_event_loop()
+    created = 0
+
+    def task_factory(loop, coro):
+        nonlocal created
+        created += 1
+        return asyncio.Task(coro, loop=loop)
+
+    queue = asyncio.Queue()
+
+    async def produce():
+        for i in range(messages):
+            await queue.put(i)
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+
+    producer = asyncio.ensure_future(produce())
+    loop.set_task_factory(task_factory)
+    start = time.monotonic()
+    try:
+        for _ in range(messages):
+            await failable.await_unless_failed(queue.get())
+    finally:
+        loop.set_task_factory(None)
+    elapsed = time.monotonic() - start
+    await producer
+    return created / messages, elapsed / messages * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    args = parser.parse_args()
+
+    implementations: Dict[str, Callable[[], PermanentFailable]] = {
+        "task per await": _TaskPerAwait,
+        "inline": PermanentFailable,
+    }
+    loop = asyncio.new_event_loop()
+    for name, implementation in implementations.items():
+        tasks, micros = loop.run_until_complete(
+            _measure(implementation(), args.messages)
+        )
+        print(f"{name}: {tasks:.2f} tasks/message, {micros:.2f} us/message")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Measures how streams recover from a server-side outage. Every stream fails at once and reconnects are refused for
+the length of the outage, after which the server accepts a limited number of new streams per interval and refuses
+the rest. Reports the time for all streams to recover, the connection attempts made and the peak attempts per
+interval, with the previous lockstep backoff and with jittered, rate limited reconnects.
+
+Usage: python tests/performance/reconnect_benchmark.py [--streams N] [--outage-seconds S] [--accepts-per-interval N]
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Callable, List, Optional
+
+from google.api_core.exceptions import ServiceUnavailable
+
+from google.cloud.pubsublite.internal.wire import retrying_connection
+from google.cloud.pubsublite.internal.wire.connection import (
+    Connection,
+    ConnectionFactory,
+)
+from google.cloud.pubsublite.internal.wire.connection_reinitializer import (
+    ConnectionReinitializer,
+)
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import (
+    ReconnectLimiter,
+    jittered_backoff,
+    _MAX_BACKOFF_SECS,
+    _MIN_BACKOFF_SECS,
+)
+from google.cloud.pubsublite.internal.wire.retrying_connection import RetryingConnection
+
+_INTERVAL_SECS = 0.01
+
+
+def _lockstep_backoff(retries: int) -> float:
+    """The previous backoff, without jitter."""
+    return min(_MAX_BACKOFF_SECS, _MIN_BACKOFF_SECS * (2 ** min(retries, 32)))
+
+
+class _Server:
+    """Injects faults: fails every stream at once, then refuses or sheds new streams."""
+
+    _accepts_per_interval: int
+    _outage_until: float
+    _accepted: Counter
+    attempts: List[float]
+    _broken: Optional[asyncio.Future]
+
+    def __init__(self, accepts_per_interval: int):
+        self._accepts_per_interval = accepts_per_interval
+        self._outage_until = 0
+        self._accepted = Counter()
+        self.attempts = []
+        self._broken = None
+
+    def broken(self) -> asyncio.Future:
+        if self._broken is None:
+            self._broken = asyncio.Future()
+        return self._broken
+
+    def fail_all(self, outage_seconds: float):
+        self._outage_until = time.monotonic() + outage_seconds
+        self.attempts = []
+        self.broken().set_exception(ServiceUnavailable("Injected stream failure."))
+        self._broken = None
+
+    def accept(self):
+        now = time.monotonic()
+        self.attempts.append(now)
+        if now < self._outage_until:
+            raise ServiceUnavailable("Injected outage.")
+        interval = int(now / _INTERVAL_SECS)
+        if self._accepted[interval] >= self._accepts_per_interval:
+            raise ServiceUnavailable("Injected overload.")
+        self._accepted[interval] += 1
+
+
+class _Connection(Connection[int, int]):
+    _broken: asyncio.Future
+
+    def __init__(self, broken: asyncio.Future):
+        self._broken = broken
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def write(self, request: int) -> None:
+        pass
+
+    async def read(self) -> int:
+        return await asyncio.shield(self._broken)
+
+
+class _Factory(ConnectionFactory[int, int]):
+    _server: _Server
+
+    def __init__(self, server: _Server):
+        self._server = server
+
+    async def new(self) -> Connection[int, int]:
+        self._server.accept()
+        return _Connection(self._server.broken())
+
+
+class _Reinitializer(ConnectionReinitializer[int, int]):
+    recovered: int
+    all_recovered: asyncio.Event
+    _streams: int
+
+    def __init__(self, streams: int):
+        self._streams = streams
+        self.recovered = 0
+        self.all_recovered = asyncio.Event()
+
+    async def reinitialize(self, connection: Connection[int, int]):
+        self.recovered += 1
+        if self.recovered == self._streams:
+            self.all_recovered.set()
+
+
+async def _measure(
+    make_limiter: Callable[[], ReconnectLimiter],
+    streams: int,
+    outage_seconds: float,
+    accepts_per_interval: int,
+):
+    server = _Server(accepts_per_interval)
+    reinitializer = _Reinitializer(streams)
+    limiter = make_limiter()
+    connections = [
+        RetryingConnection(_Factory(server), reinitializer, reconnect_limiter=limiter)
+        for _ in range(streams)
+    ]
+    for connection in connections:
+        await connection.__aenter__()
+    reinitializer.recovered = 0
+    reinitializer.all_recovered.clear()
+    start = time.monotonic()
+    server.fail_all(outage_seconds)
+    await reinitializer.all_recovered.wait()
+    elapsed = time.monotonic() - start
+    for connection in connections:
+        await connection.__aexit__(None, None, None)
+    # Stop streams still backing off from before they recovered.
+    pending = [
+        task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+    ]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    attempts = server.attempts
+    peak = max(Counter(int(t / _INTERVAL_SECS) for t in attempts).values())
+    return elapsed, len(attempts), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--outage-seconds", type=float, default=0.2)
+    parser.add_argument("--accepts-per-interval", type=int, default=10)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    for name, backoff, make_limiter in [
+        (
+            "lockstep, unlimited",
+            _lockstep_backoff,
+            lambda: ReconnectLimiter(reconnects_per_second=1e9, burst=10 ** 9),
+        ),
+        (
+            "jittered, unlimited",
+            jittered_backoff,
+            lambda: ReconnectLimiter(reconnects_per_second=1e9, burst=10 ** 9),
+        ),
+        ("jittered, limited", jittered_backoff, ReconnectLimiter),
+    ]:
+        retrying_connection.jittered_backoff = backoff
+        elapsed, attempts, peak = loop.run_until_complete(
+            _measure(
+                make_limiter,
+                args.streams,
+                args.outage_seconds,
+                args.accepts_per_interval,
+            )
+        )
+        print(
+            f"{name}: recovered in {elapsed:.2f}s, {attempts} connection attempts, "
+            f"peak {peak} attempts per {_INTERVAL_SECS * 1000:.0f}ms"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.event_loop_pool import (
+    EventLoopPool,
+    uvloop_if_installed,
+)
+
+
+async def current_thread():
+    return threading.current_thread()
+
+
+def test_invalid_size():
+    with pytest.raises(InvalidArgument):
+        EventLoopPool(0)
+
+
+def test_shares_loop_until_last_exit():
+    pool = EventLoopPool()
+    first = pool.loop_for("topic-a")
+    second = pool.loop_for("topic-b")
+    with first:
+        thread = first.submit(current_thread()).result()
+        with second:
+            assert second.submit(current_thread()).result() is thread
+        # The loop keeps running while the first user is attached.
+        assert first.submit(current_thread()).result() is thread
+    thread.join(10)
+    assert not thread.is_alive()
+    # A new loop is started for the next user.
+    with second:
+        assert second.submit(current_thread()).result() is not thread
+
+
+def test_keys_hashed_across_loops():
+    pool = EventLoopPool(2)
+    handles = [pool.loop_for(key) for key in range(4)]
+    for handle in handles:
+        handle.__enter__()
+    threads = [handle.submit(current_thread()).result() for handle in handles]
+    assert threads[0] is threads[2]
+    assert threads[1] is threads[3]
+    assert threads[0] is not threads[1]
+    for handle in handles:
+        handle.__exit__(None, None, None)
+
+
+async def current_loop():
+    return asyncio.get_event_loop()
+
+
+def test_loop_factory():
+    created = []
+
+    def loop_factory():
+        loop = asyncio.new_event_loop()
+        created.append(loop)
+        return loop
+
+    pool = EventLoopPool(2, loop_factory)
+    handle = pool.loop_for(0)
+    with handle:
+        assert handle.submit(current_loop()).result() is created[0]
+    assert len(created) == 1
+
+
+def test_uvloop_if_installed_falls_back_to_asyncio():
+    with patch.dict(sys.modules, {"uvloop": None}):
+        loop = uvloop_if_installed()
+    try:
+        assert type(loop).__module__.startswith("asyncio")
+    finally:
+        loop.close()
@@ -0,0 +1,102 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+import pytest
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.adaptive_flow_control import (
+    AdaptiveFlowControl,
+)
+from google.cloud.pubsublite.types import FlowControlSettings
+from google.cloud.pubsublite_v1 import FlowControlRequest
+
+MIN = FlowControlSettings(10, 1000)
+MAX = FlowControlSettings(100, 10000)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Server:
+    """Tracks the tokens granted to the server."""
+
+    def __init__(self):
+        self.granted: List[FlowControlRequest] = []
+        self.tokens = 0
+
+    def __call__(self, request: FlowControlRequest):
+        self.granted.append(request)
+        self.tokens += request.allowed_messages
+
+
+def test_invalid_settings():
+    with pytest.raises(InvalidArgument):
+        AdaptiveFlowControl(FlowControlSettings(0, 100), MAX)
+    with pytest.raises(InvalidArgument):
+        AdaptiveFlowControl(MAX, MIN)
+
+
+def test_starts_at_minimum():
+    server = Server()
+    flow_control = AdaptiveFlowControl(MIN, MAX, FakeClock())
+    flow_control.start(server)
+    assert server.granted == [
+        FlowControlRequest(allowed_messages=10, allowed_bytes=1000)
+    ]
+
+
+def run_period(flow_control: AdaptiveFlowControl, server: Server, clock: FakeClock):
+    """Receive all granted messages, then ack them immediately, for one sample period."""
+    end = clock.now + 0.6
+    while clock.now < end:
+        clock.now += 0.05
+        received = server.tokens
+        server.tokens = 0
+        if received:
+            flow_control.on_received(received, received * 100)
+        for _ in range(received):
+            flow_control.on_acked(1, 100)
+
+
+def test_grows_when_starved_and_shrinks_when_consumer_is_slow():
+    server = Server()
+    clock = FakeClock()
+    flow_control = AdaptiveFlowControl(MIN, MAX, clock)
+    flow_control.start(server)
+    run_period(flow_control, server, clock)
+    assert flow_control.window().messages_outstanding == 20
+    for _ in range(3):
+        run_period(flow_control, server, clock)
+    assert flow_control.window() == MAX
+
+    # The consumer slows to one ack per period, so the window decays and acked tokens are withheld.
+    received = server.tokens
+    server.tokens = 0
+    flow_control.on_received(received, received * 100)
+    for _ in range(5):
+        clock.now += 0.6
+        flow_control.on_acked(1, 100)
+    assert flow_control.window().messages_outstanding < 50
+    server.tokens = 0
+    for _ in range(2):
+        clock.now += 0.6
+        flow_control.on_acked(1, 100)
+    assert server.tokens == 0
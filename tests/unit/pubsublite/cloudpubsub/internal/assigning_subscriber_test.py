@@ -21,20 +21,23 @@ from google.api_core.exceptions import FailedPrecondition
 from google.cloud.pubsub_v1.subscriber.message import Message
 from google.pubsub_v1 import PubsubMessage
 
+from google.cloud.pubsublite.cloudpubsub.assignment_listener import AssignmentListener
 from google.cloud.pubsublite.cloudpubsub.internal.assigning_subscriber import (
     AssigningSingleSubscriber,
     PartitionSubscriberFactory,
 )
 from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
-    AsyncSingleSubscriber,
+    AsyncPartitionSubscriber,
 )
 from google.cloud.pubsublite.internal.wire.assigner import Assigner
-from google.cloud.pubsublite.types import Partition
+from google.cloud.pubsublite.types import CloudZone, Partition, SubscriptionPath
 from google.cloud.pubsublite.testing.test_utils import wire_queues, Box
 
 # All test coroutines will be treated as marked.
 pytestmark = pytest.mark.asyncio
 
+SUBSCRIPTION = SubscriptionPath(1, CloudZone.parse("us-central1-a"), "sub")
+
 
 def mock_async_context_manager(cm):
     cm.__aenter__.return_value = cm
@@ -52,11 +55,21 @@ def subscriber_factory():
 
 
 @pytest.fixture()
-def subscriber(assigner, subscriber_factory):
+def listener():
+    return MagicMock(spec=AssignmentListener)
+
+
+@pytest.fixture()
+def subscriber(assigner, subscriber_factory, listener):
     box = Box()
 
     def set_box():
-        box.val = AssigningSingleSubscriber(lambda: assigner, subscriber_factory)
+        box.val = AssigningSingleSubscriber(
+            lambda: assigner,
+            subscriber_factory,
+            assignment_listener=listener,
+            subscription=SUBSCRIPTION,
+        )
 
     # Initialize AssigningSubscriber on another thread with a different event loop.
     thread = threading.Thread(target=set_box)
@@ -78,8 +91,8 @@ async def test_initial_assignment(subscriber, assigner, subscriber_factory):
     assign_queues = wire_queues(assigner.get_assignment)
     async with subscriber:
         await assign_queues.called.get()
-        sub1 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
-        sub2 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub2 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
         subscriber_factory.side_effect = (
             lambda partition: sub1 if partition == Partition(1) else sub2
         )
@@ -107,9 +120,9 @@ async def test_assignment_change(subscriber, assigner, subscriber_factory):
     assign_queues = wire_queues(assigner.get_assignment)
     async with subscriber:
         await assign_queues.called.get()
-        sub1 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
-        sub2 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
-        sub3 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub2 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub3 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
         subscriber_factory.side_effect = (
             lambda partition: sub1
             if partition == Partition(1)
@@ -140,8 +153,8 @@ async def test_subscriber_failure(subscriber, assigner, subscriber_factory):
     assign_queues = wire_queues(assigner.get_assignment)
     async with subscriber:
         await assign_queues.called.get()
-        sub1 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
-        sub1_queues = wire_queues(sub1.read)
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub1_queues = wire_queues(sub1.read_batch)
         subscriber_factory.return_value = sub1
         await assign_queues.results.put({Partition(1)})
         await sub1_queues.called.get()
@@ -154,21 +167,130 @@ async def test_delivery_from_multiple(subscriber, assigner, subscriber_factory):
     assign_queues = wire_queues(assigner.get_assignment)
     async with subscriber:
         await assign_queues.called.get()
-        sub1 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
-        sub2 = mock_async_context_manager(MagicMock(spec=AsyncSingleSubscriber))
-        sub1_queues = wire_queues(sub1.read)
-        sub2_queues = wire_queues(sub2.read)
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub2 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub1_queues = wire_queues(sub1.read_batch)
+        sub2_queues = wire_queues(sub2.read_batch)
         subscriber_factory.side_effect = (
             lambda partition: sub1 if partition == Partition(1) else sub2
         )
         await assign_queues.results.put({Partition(1), Partition(2)})
         await sub1_queues.results.put(
-            Message(PubsubMessage(message_id="1")._pb, "", 0, None)
+            [Message(PubsubMessage(message_id="1")._pb, "", 0, None)]
         )
         await sub2_queues.results.put(
-            Message(PubsubMessage(message_id="2")._pb, "", 0, None)
+            [Message(PubsubMessage(message_id="2")._pb, "", 0, None)]
         )
         message_ids: Set[str] = set()
         message_ids.add((await subscriber.read()).message_id)
         message_ids.add((await subscriber.read()).message_id)
         assert message_ids == {"1", "2"}
+
+
+async def test_delivery_while_other_partitions_start(
+    subscriber, assigner, subscriber_factory
+):
+    assign_queues = wire_queues(assigner.get_assignment)
+    async with subscriber:
+        await assign_queues.called.get()
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub2 = MagicMock(spec=AsyncPartitionSubscriber)
+        sub1_queues = wire_queues(sub1.read_batch)
+        sub2_enter_queues = wire_queues(sub2.__aenter__)
+        subscriber_factory.side_effect = (
+            lambda partition: sub1 if partition == Partition(1) else sub2
+        )
+        await assign_queues.results.put({Partition(1), Partition(2)})
+        await sub2_enter_queues.called.get()
+        await sub1_queues.results.put(
+            [Message(PubsubMessage(message_id="1")._pb, "", 0, None)]
+        )
+        assert (await subscriber.read()).message_id == "1"
+        await sub2_enter_queues.results.put(sub2)
+        await assign_queues.called.get()
+    sub1.__aexit__.assert_called_once()
+    sub2.__aexit__.assert_called_once()
+
+
+async def test_revoke_waits_for_acks(
+    subscriber, assigner, subscriber_factory, listener
+):
+    assign_queues = wire_queues(assigner.get_assignment)
+    async with subscriber:
+        await assign_queues.called.get()
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub2 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub1_queues = wire_queues(sub1.read_batch)
+        sub2_queues = wire_queues(sub2.read_batch)
+        sub2_wait_queues = wire_queues(sub2.wait_for_acks)
+        subscriber_factory.side_effect = (
+            lambda partition: sub1 if partition == Partition(1) else sub2
+        )
+        await assign_queues.results.put({Partition(1), Partition(2)})
+        await assign_queues.called.get()
+        await sub1_queues.called.get()
+        await sub2_queues.called.get()
+        listener.on_partitions_assigned.assert_called_once_with(
+            SUBSCRIPTION, {Partition(1), Partition(2)}
+        )
+        sub2_message = Message(PubsubMessage(message_id="2")._pb, "", 0, None)
+        await sub2_queues.results.put([sub2_message])
+        await sub2_queues.called.get()
+        await assign_queues.results.put({Partition(1)})
+        await sub2_wait_queues.called.get()
+        listener.on_partitions_revoked.assert_called_once_with(
+            SUBSCRIPTION, {Partition(2)}
+        )
+        # The buffered message from the revoked partition is abandoned rather than delivered.
+        sub2.wait_for_acks.assert_called_once_with([sub2_message])
+        sub2.__aexit__.assert_not_called()
+        await sub2_wait_queues.results.put(None)
+        await assign_queues.called.get()
+        sub2.__aexit__.assert_called_once()
+        await sub1_queues.results.put(
+            [Message(PubsubMessage(message_id="1")._pb, "", 0, None)]
+        )
+        assert (await subscriber.read()).message_id == "1"
+    listener.on_partitions_revoked.assert_called_with(SUBSCRIPTION, {Partition(1)})
+    sub1.__aexit__.assert_called_once()
+
+
+async def test_exit_while_draining_revoked_partition(
+    subscriber, assigner, subscriber_factory
+):
+    assign_queues = wire_queues(assigner.get_assignment)
+    async with subscriber:
+        await assign_queues.called.get()
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub1_queues = wire_queues(sub1.read_batch)
+        sub1_wait_queues = wire_queues(sub1.wait_for_acks)
+        subscriber_factory.return_value = sub1
+        await assign_queues.results.put({Partition(1)})
+        await assign_queues.called.get()
+        await sub1_queues.called.get()
+        await assign_queues.results.put(set())
+        await sub1_wait_queues.called.get()
+        sub1.__aexit__.assert_not_called()
+    # The revoked subscriber is exited even though its drain never finished.
+    sub1.__aexit__.assert_called_once()
+
+
+async def test_exit_while_exiting_revoked_partition(
+    subscriber, assigner, subscriber_factory
+):
+    assign_queues = wire_queues(assigner.get_assignment)
+    async with subscriber:
+        await assign_queues.called.get()
+        sub1 = mock_async_context_manager(MagicMock(spec=AsyncPartitionSubscriber))
+        sub1_queues = wire_queues(sub1.read_batch)
+        sub1_exit_queues = wire_queues(sub1.__aexit__)
+        subscriber_factory.return_value = sub1
+        await assign_queues.results.put({Partition(1)})
+        await assign_queues.called.get()
+        await sub1_queues.called.get()
+        await assign_queues.results.put(set())
+        await sub1_exit_queues.called.get()
+        # Shutdown interrupts the revoked subscriber's exit, and later exits complete immediately.
+        sub1.__aexit__.side_effect = None
+    # The interrupted exit is completed by the shutdown.
+    assert sub1.__aexit__.call_count == 2
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+
 import pytest
 
 from asynctest.mock import call, CoroutineMock
@@ -81,3 +83,49 @@ async def test_recreate(
         client_closer.assert_has_calls([call(client1)])
         assert await multiplexer.create_or_fail(1, client_factory) is client2
     client_closer.assert_has_calls([call(client1), call(client2)])
+
+
+async def test_concurrent_creation(multiplexer: AsyncClientMultiplexer[int, Client]):
+    client1 = Client()
+    client2 = Client()
+    release_1 = asyncio.Future()
+    factory_calls = []
+
+    async def factory_1():
+        factory_calls.append(1)
+        return await release_1
+
+    async def factory_2():
+        return client2
+
+    async with multiplexer:
+        first = asyncio.ensure_future(multiplexer.get_or_create(1, factory_1))
+        second = asyncio.ensure_future(multiplexer.get_or_create(1, factory_1))
+        await asyncio.sleep(0)
+        # Creating a different key is not blocked by the first creation.
+        assert await multiplexer.get_or_create(2, factory_2) is client2
+        assert not first.done()
+        assert not second.done()
+        release_1.set_result(client1)
+        assert await first is client1
+        assert await second is client1
+        assert factory_calls == [1]
+
+
+async def test_cancelled_creation_retried(
+    multiplexer: AsyncClientMultiplexer[int, Client]
+):
+    client1 = Client()
+
+    async def factory():
+        return client1
+
+    async with multiplexer:
+        first = asyncio.ensure_future(
+            multiplexer.get_or_create(1, lambda: asyncio.Future())
+        )
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(multiplexer.get_or_create(1, factory))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second is client1
@@ -0,0 +1,132 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import AsyncIterator
+
+from asynctest.mock import MagicMock
+import pytest
+from google.api_core.exceptions import FailedPrecondition, InvalidArgument
+from google.cloud.pubsub_v1.subscriber.message import Message
+
+from google.cloud.pubsublite.cloudpubsub.internal.async_handler_dispatcher import (
+    AsyncHandlerDispatcher,
+)
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+class QueueIterator(AsyncIterator):
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    async def __anext__(self):
+        result = await self.queue.get()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_message(ordering_key: str = ""):
+    message = MagicMock(spec=Message)
+    message.ordering_key = ordering_key
+    return message
+
+
+async def test_invalid_concurrency():
+    with pytest.raises(InvalidArgument):
+        AsyncHandlerDispatcher(QueueIterator(), MagicMock(), 0, False)
+
+
+async def test_acks_on_success_and_nacks_on_failure():
+    messages = QueueIterator()
+
+    async def handler(message):
+        if message.fail:
+            raise ValueError("handler failed")
+
+    dispatcher = AsyncHandlerDispatcher(messages, handler, 2, False)
+    run = asyncio.ensure_future(dispatcher.run())
+    good = make_message()
+    good.fail = False
+    bad = make_message()
+    bad.fail = True
+    await messages.queue.put(good)
+    await messages.queue.put(bad)
+    await messages.queue.put(FailedPrecondition("stream failed"))
+    with pytest.raises(FailedPrecondition):
+        await run
+    good.ack.assert_called_once()
+    good.nack.assert_not_called()
+    bad.nack.assert_called_once()
+    bad.ack.assert_not_called()
+
+
+async def test_concurrency_bounds_reads():
+    messages = QueueIterator()
+    started = asyncio.Queue()
+    release = asyncio.Event()
+
+    async def handler(message):
+        await started.put(message)
+        await release.wait()
+
+    dispatcher = AsyncHandlerDispatcher(messages, handler, 2, False)
+    run = asyncio.ensure_future(dispatcher.run())
+    for _ in range(3):
+        await messages.queue.put(make_message())
+    await started.get()
+    await started.get()
+    # The third message is not read while two handlers are outstanding.
+    await asyncio.sleep(0)
+    assert messages.queue.qsize() == 1
+    assert started.empty()
+    release.set()
+    await started.get()
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+
+async def test_ordered_by_key():
+    messages = QueueIterator()
+    handled = []
+    release_first = asyncio.Event()
+
+    async def handler(message):
+        if message.index == 0:
+            await release_first.wait()
+        handled.append(message.index)
+
+    dispatcher = AsyncHandlerDispatcher(messages, handler, 3, True)
+    run = asyncio.ensure_future(dispatcher.run())
+    keyed_0 = make_message("a")
+    keyed_0.index = 0
+    keyed_1 = make_message("a")
+    keyed_1.index = 1
+    unkeyed = make_message()
+    unkeyed.index = 2
+    for message in (keyed_0, keyed_1, unkeyed):
+        await messages.queue.put(message)
+    while not handled:
+        await asyncio.sleep(0)
+    assert handled == [2]
+    release_first.set()
+    while len(handled) < 3:
+        await asyncio.sleep(0)
+    assert handled == [2, 0, 1]
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from mock import MagicMock, call
@@ -79,3 +82,43 @@ def test_recreate(
         client_closer.assert_has_calls([call(client1)])
         assert multiplexer.create_or_fail(1, client_factory) is client2
     client_closer.assert_has_calls([call(client1), call(client2)])
+
+
+def test_concurrent_creation(multiplexer: ClientMultiplexer[int, Client]):
+    client1 = Client()
+    client2 = Client()
+    creating_1 = threading.Event()
+    release_1 = threading.Event()
+    factory_calls = []
+
+    def factory_1():
+        factory_calls.append(1)
+        creating_1.set()
+        assert release_1.wait(10)
+        return client1
+
+    with multiplexer:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(multiplexer.get_or_create, 1, factory_1)
+            assert creating_1.wait(10)
+            # A concurrent caller for the same key shares the creation.
+            second = executor.submit(multiplexer.get_or_create, 1, factory_1)
+            # Creating a different key is not blocked by the first creation.
+            assert multiplexer.get_or_create(2, lambda: client2) is client2
+            assert not first.done()
+            release_1.set()
+            assert first.result() is client1
+            assert second.result() is client1
+        assert factory_calls == [1]
+
+
+def test_failed_creation_retried(multiplexer: ClientMultiplexer[int, Client]):
+    client1 = Client()
+
+    def failing_factory():
+        raise FailedPrecondition("failed")
+
+    with multiplexer:
+        with pytest.raises(FailedPrecondition):
+            multiplexer.get_or_create(1, failing_factory)
+        assert multiplexer.get_or_create(1, lambda: client1) is client1
@@ -0,0 +1,87 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+import pytest
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.flow_control_budget import (
+    FlowControlBudget,
+)
+from google.cloud.pubsublite.types import FlowControlSettings
+from google.cloud.pubsublite.types.flow_control_settings import DISABLED_FLOW_CONTROL
+from google.cloud.pubsublite_v1 import FlowControlRequest
+
+
+class Grants:
+    def __init__(self):
+        self.requests: List[FlowControlRequest] = []
+
+    def __call__(self, request: FlowControlRequest):
+        self.requests.append(request)
+
+    def total(self):
+        return (
+            sum(request.allowed_messages for request in self.requests),
+            sum(request.allowed_bytes for request in self.requests),
+        )
+
+
+def test_invalid_budget():
+    with pytest.raises(InvalidArgument):
+        FlowControlBudget(FlowControlSettings(0, 100))
+
+
+def test_first_member_capped():
+    budget = FlowControlBudget(FlowControlSettings(100, 1000))
+    grants = Grants()
+    budget.register(FlowControlSettings(10, 500), grants)
+    assert grants.total() == (10, 500)
+
+
+def test_returned_tokens_go_to_new_member():
+    budget = FlowControlBudget(FlowControlSettings(100, 1000))
+    grants_1 = Grants()
+    member_1 = budget.register(DISABLED_FLOW_CONTROL, grants_1)
+    assert grants_1.total() == (100, 1000)
+    grants_2 = Grants()
+    member_2 = budget.register(DISABLED_FLOW_CONTROL, grants_2)
+    # The whole budget is with the first member, so nothing is available yet.
+    assert grants_2.total() == (0, 0)
+    budget.on_received(member_1, 60, 600)
+    budget.release(member_1, 60, 600)
+    # Each member is topped up to half of the budget.
+    assert grants_2.total() == (50, 500)
+    assert grants_1.total() == (110, 1100)
+    budget.unregister(member_2)
+    assert grants_1.total() == (160, 1600)
+
+
+def test_tokens_move_toward_consuming_member():
+    budget = FlowControlBudget(FlowControlSettings(100, 1000))
+    fast_grants = Grants()
+    slow_grants = Grants()
+    fast = budget.register(DISABLED_FLOW_CONTROL, fast_grants)
+    slow = budget.register(DISABLED_FLOW_CONTROL, slow_grants)
+    budget.on_received(fast, 100, 1000)
+    budget.release(fast, 100, 1000)
+    assert fast_grants.total() == (150, 1500)
+    assert slow_grants.total() == (50, 500)
+    # The slow member holds messages it has not acked, while the fast member acks.
+    budget.on_received(slow, 50, 500)
+    budget.on_received(fast, 50, 500)
+    budget.release(fast, 50, 500)
+    assert fast_grants.total() == (200, 2000)
+    assert slow_grants.total() == (50, 500)
@@ -0,0 +1,84 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from typing import List
+
+import pytest
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud.pubsub_v1.subscriber.message import Message
+
+from google.cloud.pubsublite.cloudpubsub.internal.loop_bound_subscriber import (
+    LoopBoundPartitionSubscriber,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    ManagedEventLoop,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.single_subscriber import (
+    AsyncPartitionSubscriber,
+)
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+class ThreadRecordingSubscriber(AsyncPartitionSubscriber):
+    def __init__(self):
+        self.threads = []
+        self.abandoned = None
+
+    def _record(self):
+        self.threads.append(threading.current_thread())
+
+    async def read(self) -> Message:
+        self._record()
+        raise FailedPrecondition("read failed")
+
+    async def read_batch(self) -> List[Message]:
+        self._record()
+        return []
+
+    async def wait_for_acks(self, abandoned):
+        self._record()
+        self.abandoned = abandoned
+
+    async def __aenter__(self):
+        self._record()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._record()
+
+
+async def test_runs_on_other_loop():
+    underlying = ThreadRecordingSubscriber()
+    created_on = []
+
+    def factory():
+        created_on.append(threading.current_thread())
+        return underlying
+
+    subscriber = LoopBoundPartitionSubscriber(factory, ManagedEventLoop())
+    async with subscriber:
+        assert await subscriber.read_batch() == []
+        with pytest.raises(FailedPrecondition):
+            await subscriber.read()
+        await subscriber.wait_for_acks(iter([]))
+        assert underlying.abandoned == []
+    assert len(underlying.threads) == 5
+    other_thread = underlying.threads[0]
+    assert other_thread is not threading.current_thread()
+    assert created_on == [other_thread]
+    assert all(thread is other_thread for thread in underlying.threads)
+    assert not other_thread.is_alive()
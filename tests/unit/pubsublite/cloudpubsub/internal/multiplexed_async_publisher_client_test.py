@@ -0,0 +1,131 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from asynctest.mock import MagicMock
+from google.api_core.exceptions import DeadlineExceeded, InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.multiplexed_async_publisher_client import (
+    MultiplexedAsyncPublisherClient,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
+    AsyncSinglePublisher,
+)
+from google.cloud.pubsublite.testing.test_utils import wire_queues
+from google.cloud.pubsublite.internal.wire.publisher import InvalidPartition
+from google.cloud.pubsublite.types import CloudZone, Partition, TopicPath
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+def topic(name: str) -> TopicPath:
+    return TopicPath(1, CloudZone.parse("us-central1-a"), name)
+
+
+async def test_idle_topics_closed():
+    publisher = MagicMock(spec=AsyncSinglePublisher)
+    publisher.publish.return_value = "1"
+    factory = MagicMock()
+    factory.return_value = publisher
+    exit_queues = wire_queues(publisher.__aexit__)
+    async with MultiplexedAsyncPublisherClient(
+        factory, topic_idle_seconds=0.01
+    ) as client:
+        assert await client.publish(topic("a"), b"data") == "1"
+        await exit_queues.called.get()
+        await exit_queues.results.put(None)
+        assert await client.publish(topic("a"), b"data") == "1"
+        assert factory.call_count == 2
+
+
+async def test_outstanding_publish_not_evicted():
+    publisher_a = MagicMock(spec=AsyncSinglePublisher)
+    publisher_b = MagicMock(spec=AsyncSinglePublisher)
+    publisher_b.publish.return_value = "2"
+    factory = MagicMock()
+    factory.side_effect = lambda path: {
+        topic("a"): publisher_a,
+        topic("b"): publisher_b,
+    }[path]
+    publish_queues = wire_queues(publisher_a.publish)
+    exit_queues = wire_queues(publisher_b.__aexit__)
+    async with MultiplexedAsyncPublisherClient(factory, max_live_topics=1) as client:
+        publish_a = asyncio.ensure_future(client.publish(topic("a"), b"data"))
+        await publish_queues.called.get()
+        assert await client.publish(topic("b"), b"data") == "2"
+        # "a" is still publishing, so the idle "b" is evicted instead.
+        await exit_queues.called.get()
+        await exit_queues.results.put(None)
+        publisher_a.__aexit__.assert_not_called()
+        await publish_queues.results.put("1")
+        assert await publish_a == "1"
+
+
+async def test_flush_all_topics():
+    publisher_a = MagicMock(spec=AsyncSinglePublisher)
+    publisher_b = MagicMock(spec=AsyncSinglePublisher)
+    factory = MagicMock()
+    factory.side_effect = lambda path: {
+        topic("a"): publisher_a,
+        topic("b"): publisher_b,
+    }[path]
+    flush_a_queues = wire_queues(publisher_a.flush)
+    flush_b_queues = wire_queues(publisher_b.flush)
+    async with MultiplexedAsyncPublisherClient(factory) as client:
+        await client.publish(topic("a"), b"data")
+        await client.publish(topic("b"), b"data")
+        flush = asyncio.ensure_future(client.flush())
+        # Both topics are flushed concurrently.
+        await flush_a_queues.called.get()
+        await flush_b_queues.called.get()
+        await flush_a_queues.results.put(None)
+        await asyncio.sleep(0)
+        assert not flush.done()
+        await flush_b_queues.results.put(None)
+        await flush
+
+
+async def test_flush_timeout():
+    publisher = MagicMock(spec=AsyncSinglePublisher)
+    factory = MagicMock()
+    factory.return_value = publisher
+    flush_queues = wire_queues(publisher.flush)
+    async with MultiplexedAsyncPublisherClient(factory) as client:
+        await client.publish(topic("a"), b"data")
+        with pytest.raises(DeadlineExceeded):
+            await client.flush(timeout=0.01)
+        await flush_queues.called.get()
+
+
+async def test_rejected_partition_keeps_publisher():
+    publisher = MagicMock(spec=AsyncSinglePublisher)
+    factory = MagicMock()
+    factory.return_value = publisher
+    async with MultiplexedAsyncPublisherClient(factory) as client:
+        publisher.publish.side_effect = InvalidPartition("")
+        with pytest.raises(InvalidPartition):
+            await client.publish(topic("a"), b"data", partition=Partition(5))
+        publisher.publish.assert_called_once_with(
+            data=b"data", ordering_key="", partition=Partition(5)
+        )
+        publisher.__aexit__.assert_not_called()
+        # Other invalid argument errors fail the publisher, so it is closed.
+        publisher.publish.side_effect = InvalidArgument("")
+        with pytest.raises(InvalidArgument):
+            await client.publish(topic("a"), b"data", partition=Partition(0))
+        publisher.__aexit__.assert_called_once()
+        assert factory.call_count == 1
@@ -37,6 +37,7 @@ from google.cloud.pubsublite.types import (
     SubscriptionPath,
     CloudZone,
     DISABLED_FLOW_CONTROL,
+    Partition,
 )
 
 pytestmark = pytest.mark.asyncio
@@ -88,3 +89,14 @@ async def test_iterator(
         with pytest.raises(FailedPrecondition):
             await read_fut_2
         default_subscriber.__aexit__.assert_called_once()
+
+
+async def test_buffered_messages(
+    default_subscriber, multiplexed_client: AsyncSubscriberClientInterface,
+):
+    default_subscriber.buffered_messages.return_value = {Partition(0): 3}
+    subscription = SubscriptionPath(1, CloudZone.parse("us-central1-a"), "abc")
+    async with multiplexed_client:
+        assert multiplexed_client.buffered_messages(subscription) == {}
+        await multiplexed_client.subscribe(subscription, DISABLED_FLOW_CONTROL)
+        assert multiplexed_client.buffered_messages(subscription) == {Partition(0): 3}
@@ -0,0 +1,177 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pytest
+from google.api_core.exceptions import DeadlineExceeded, InvalidArgument, NotFound
+from mock import MagicMock
+
+from google.cloud.pubsublite.cloudpubsub.internal.multiplexed_publisher_client import (
+    MultiplexedPublisherClient,
+    select_evictions,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
+    SinglePublisher,
+)
+from google.cloud.pubsublite.internal.wire.publisher import InvalidPartition
+from google.cloud.pubsublite.types import CloudZone, Partition, TopicPath
+
+
+def topic(name: str) -> TopicPath:
+    return TopicPath(1, CloudZone.parse("us-central1-a"), name)
+
+
+def test_invalid_settings():
+    with pytest.raises(InvalidArgument):
+        MultiplexedPublisherClient(MagicMock(), max_live_topics=0)
+    with pytest.raises(InvalidArgument):
+        MultiplexedPublisherClient(MagicMock(), topic_idle_seconds=0)
+
+
+def test_select_evictions_least_recently_used():
+    last_used = OrderedDict([(topic("a"), 1.0), (topic("b"), 2.0), (topic("c"), 3.0)])
+    # "a" has an outstanding publish, so "b" is evicted in its place.
+    assert select_evictions(last_used, {topic("a"): 1}, 2, None, 10.0) == [topic("b")]
+    assert list(last_used) == [topic("a"), topic("c")]
+
+
+def test_select_evictions_idle():
+    last_used = OrderedDict([(topic("a"), 1.0), (topic("b"), 2.0), (topic("c"), 3.0)])
+    assert select_evictions(last_used, {}, None, 8.0, 10.0) == [topic("a"), topic("b")]
+    assert list(last_used) == [topic("c")]
+
+
+def test_evicts_over_capacity():
+    publishers = {}
+    closed = threading.Event()
+
+    def factory(path: TopicPath):
+        publisher = MagicMock(spec=SinglePublisher)
+        publisher.__enter__.return_value = publisher
+        future = Future()
+        future.set_result("1")
+        publisher.publish.return_value = future
+        publisher.flush.return_value = future
+        if path == topic("a"):
+            publisher.__exit__.side_effect = lambda *args: closed.set()
+        publishers[path] = publisher
+        return publisher
+
+    with MultiplexedPublisherClient(factory, max_live_topics=1) as client:
+        assert client.publish(topic("a"), b"data").result() == "1"
+        assert client.publish(topic("b"), b"data").result() == "1"
+        assert closed.wait(10)
+        publishers[topic("b")].__exit__.assert_not_called()
+        # The evicted topic is reopened on the next publish.
+        client.publish(topic("a"), b"data")
+        assert publishers[topic("a")].publish.call_count == 1
+    publishers[topic("a")].__exit__.assert_called()
+
+
+def flushing_factory(publishers, flushes):
+    def factory(path: TopicPath):
+        publisher = MagicMock(spec=SinglePublisher)
+        publisher.__enter__.return_value = publisher
+        future = Future()
+        future.set_result("1")
+        publisher.publish.return_value = future
+        publisher.flush.side_effect = lambda: flushes[path]
+        publishers[path] = publisher
+        return publisher
+
+    return factory
+
+
+def test_flush_all_topics():
+    publishers = {}
+    flushes = {topic("a"): Future(), topic("b"): Future()}
+    with MultiplexedPublisherClient(flushing_factory(publishers, flushes)) as client:
+        client.publish(topic("a"), b"data")
+        client.publish(topic("b"), b"data")
+        flushed = Future()
+        thread = threading.Thread(target=lambda: flushed.set_result(client.flush()))
+        thread.start()
+        flushes[topic("a")].set_result(None)
+        assert not flushed.done()
+        flushes[topic("b")].set_result(None)
+        thread.join(10)
+        assert flushed.done()
+    # The topics were flushed by the call and again on exit.
+    assert publishers[topic("a")].flush.call_count == 2
+    assert publishers[topic("b")].flush.call_count == 2
+
+
+def test_flush_timeout():
+    publishers = {}
+    flushes = {topic("a"): Future()}
+    with MultiplexedPublisherClient(flushing_factory(publishers, flushes)) as client:
+        client.publish(topic("a"), b"data")
+        with pytest.raises(DeadlineExceeded):
+            client.flush(timeout=0.01)
+        assert flushes[topic("a")].cancelled()
+        flushes[topic("a")] = Future()
+        flushes[topic("a")].set_result(None)
+
+
+def test_exit_drain_timeout():
+    publishers = {}
+    flushes = {topic("a"): Future()}
+    client = MultiplexedPublisherClient(
+        flushing_factory(publishers, flushes), drain_timeout=0.01
+    )
+    with client:
+        client.publish(topic("a"), b"data")
+    # The messages were never acknowledged, so the drain gave up and the publisher was closed anyway.
+    assert flushes[topic("a")].cancelled()
+    publishers[topic("a")].__exit__.assert_called()
+
+
+def test_flush_failure():
+    publishers = {}
+    flushes = {topic("a"): Future()}
+    flushes[topic("a")].set_exception(NotFound(""))
+    with MultiplexedPublisherClient(flushing_factory(publishers, flushes)) as client:
+        client.publish(topic("a"), b"data")
+        with pytest.raises(NotFound):
+            client.flush()
+    # The failure is not raised again on exit.
+    publishers[topic("a")].__exit__.assert_called()
+
+
+def test_rejected_partition_keeps_publisher():
+    publishers = {}
+    flushes = {topic("a"): Future()}
+    flushes[topic("a")].set_result(None)
+    with MultiplexedPublisherClient(flushing_factory(publishers, flushes)) as client:
+        client.publish(topic("a"), b"data")
+        publisher = publishers[topic("a")]
+        rejected = Future()
+        rejected.set_exception(InvalidPartition(""))
+        publisher.publish.return_value = rejected
+        with pytest.raises(InvalidPartition):
+            client.publish(topic("a"), b"data", partition=Partition(5)).result()
+        publisher.publish.assert_called_with(
+            data=b"data", ordering_key="", partition=Partition(5)
+        )
+        publisher.__exit__.assert_not_called()
+        # Other invalid argument errors fail the publisher, so it is closed.
+        failed = Future()
+        failed.set_exception(InvalidArgument(""))
+        publisher.publish.return_value = failed
+        with pytest.raises(InvalidArgument):
+            client.publish(topic("a"), b"data", partition=Partition(0)).result()
+        publisher.__exit__.assert_called_once()
@@ -0,0 +1,146 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.partition_merger import (
+    PartitionMerger,
+)
+from google.cloud.pubsublite.types import Partition
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+async def read_n(merger: PartitionMerger, count: int):
+    return [await merger.get() for _ in range(count)]
+
+
+async def test_invalid_settings():
+    with pytest.raises(InvalidArgument):
+        PartitionMerger(0)
+    merger = PartitionMerger(10)
+    with pytest.raises(InvalidArgument):
+        merger.add_partition(Partition(0), 0)
+
+
+async def test_round_robin_between_partitions():
+    merger = PartitionMerger(100)
+    merger.add_partition(Partition(0))
+    merger.add_partition(Partition(1))
+    await merger.put(Partition(0), ["a1", "a2", "a3", "a4"])
+    await merger.put(Partition(1), ["b1", "b2"])
+    assert merger.depths() == {Partition(0): 4, Partition(1): 2}
+    assert await read_n(merger, 6) == ["a1", "b1", "a2", "b2", "a3", "a4"]
+    assert merger.depths() == {Partition(0): 0, Partition(1): 0}
+
+
+async def test_weighted_turns():
+    merger = PartitionMerger(100)
+    merger.add_partition(Partition(0), 2)
+    merger.add_partition(Partition(1))
+    await merger.put(Partition(0), ["a1", "a2", "a3", "a4"])
+    await merger.put(Partition(1), ["b1", "b2"])
+    assert await read_n(merger, 6) == ["a1", "a2", "b1", "a3", "a4", "b2"]
+
+
+async def test_get_waits_for_messages():
+    merger = PartitionMerger(100)
+    merger.add_partition(Partition(0))
+    get = asyncio.ensure_future(merger.get())
+    await asyncio.sleep(0)
+    assert not get.done()
+    await merger.put(Partition(0), ["a1"])
+    assert await get == "a1"
+
+
+async def test_put_waits_for_space():
+    merger = PartitionMerger(2)
+    merger.add_partition(Partition(0))
+    merger.add_partition(Partition(1))
+    await merger.put(Partition(0), ["a1", "a2"])
+    put = asyncio.ensure_future(merger.put(Partition(0), ["a3"]))
+    await asyncio.sleep(0)
+    assert not put.done()
+    # Other partitions are not blocked by a full buffer.
+    await merger.put(Partition(1), ["b1"])
+    assert await merger.get() == "a1"
+    await put
+    assert merger.depths() == {Partition(0): 2, Partition(1): 1}
+
+
+async def test_remove_partition_returns_buffered():
+    merger = PartitionMerger(100)
+    merger.add_partition(Partition(0))
+    merger.add_partition(Partition(1))
+    await merger.put(Partition(0), ["a1", "a2"])
+    await merger.put(Partition(1), ["b1"])
+    assert await merger.get() == "a1"
+    assert merger.remove_partition(Partition(0)) == ["a2"]
+    assert await merger.get() == "b1"
+    assert merger.depths() == {Partition(1): 0}
+
+
+async def test_put_waits_for_space_for_whole_batch():
+    merger = PartitionMerger(3)
+    merger.add_partition(Partition(0))
+    await merger.put(Partition(0), ["a1", "a2"])
+    put = asyncio.ensure_future(merger.put(Partition(0), ["a3", "a4"]))
+    await asyncio.sleep(0)
+    assert not put.done()
+    assert await merger.get() == "a1"
+    await put
+    assert merger.depths() == {Partition(0): 3}
+
+
+async def test_oversized_batch_added_to_empty_buffer():
+    merger = PartitionMerger(2)
+    merger.add_partition(Partition(0))
+    await merger.put(Partition(0), ["a1", "a2", "a3"])
+    assert merger.depths() == {Partition(0): 3}
+    put = asyncio.ensure_future(merger.put(Partition(0), ["a4"]))
+    await asyncio.sleep(0)
+    assert not put.done()
+    assert await merger.get() == "a1"
+    await asyncio.sleep(0)
+    assert not put.done()
+    assert await merger.get() == "a2"
+    await put
+    assert await read_n(merger, 2) == ["a3", "a4"]
+
+
+async def test_remove_partition_returns_waiting_batch():
+    merger = PartitionMerger(1)
+    merger.add_partition(Partition(0))
+    await merger.put(Partition(0), ["a1"])
+    put = asyncio.ensure_future(merger.put(Partition(0), ["a2", "a3"]))
+    await asyncio.sleep(0)
+    put.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await put
+    assert merger.remove_partition(Partition(0)) == ["a1", "a2", "a3"]
+
+
+async def test_empty_batch_ignored():
+    merger = PartitionMerger(1)
+    merger.add_partition(Partition(0))
+    await merger.put(Partition(0), [])
+    get = asyncio.ensure_future(merger.get())
+    await asyncio.sleep(0)
+    assert not get.done()
+    await merger.put(Partition(0), ["a1"])
+    assert await get == "a1"
@@ -0,0 +1,210 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import queue
+import threading
+from typing import Set
+
+from asynctest.mock import MagicMock
+from google.api_core.exceptions import FailedPrecondition, NotFound
+
+from google.cloud.pubsublite.cloudpubsub.internal.process_pool_subscriber import (
+    ProcessPoolSubscriberImpl,
+    Worker,
+    rebalance,
+)
+from google.cloud.pubsublite.cloudpubsub.internal.streaming_pull_manager import (
+    CloseCallback,
+)
+from google.cloud.pubsublite.internal.wire.assigner import Assigner
+from google.cloud.pubsublite.types import Partition
+
+
+def partitions(*values: int) -> Set[Partition]:
+    return {Partition(value) for value in values}
+
+
+class FakeWorker(Worker):
+    def __init__(self, assigned: Set[Partition], events: "queue.Queue"):
+        self.assigned = assigned
+        self.alive = False
+        self.error = None
+        self._events = events
+
+    def start(self):
+        self.alive = True
+        self._events.put(("start", frozenset(self.assigned), self))
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def request_stop(self):
+        self._events.put(("request_stop", frozenset(self.assigned), self))
+
+    def join(self, timeout: float):
+        self.alive = False
+        self._events.put(("stop", frozenset(self.assigned), self))
+
+    def failure(self):
+        return self.error
+
+
+class QueueAssigner(Assigner):
+    def __init__(self):
+        self.assignments = queue.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def get_assignment(self) -> Set[Partition]:
+        while True:
+            try:
+                result = self.assignments.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.01)
+                continue
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+
+def test_rebalance_spreads_partitions():
+    result = rebalance([set(), set(), set()], partitions(0, 1, 2, 3, 4))
+    assert sorted(len(assigned) for assigned in result) == [1, 2, 2]
+    assert set().union(*result) == partitions(0, 1, 2, 3, 4)
+
+
+def test_rebalance_keeps_existing_placement():
+    result = rebalance([partitions(0, 1), partitions(2, 3)], partitions(0, 1, 2, 4))
+    assert result[0] == partitions(0, 1)
+    assert result[1] == partitions(2, 4)
+
+
+def test_rebalance_moves_from_overloaded_workers():
+    result = rebalance([partitions(0, 1, 2, 3), set()], partitions(0, 1, 2, 3))
+    assert result == [partitions(0, 1), partitions(2, 3)]
+
+
+def get_event(events: "queue.Queue"):
+    return events.get(timeout=10)
+
+
+def test_assignment_restart_and_close():
+    events = queue.Queue()
+    assigner = QueueAssigner()
+    close_callback = MagicMock(spec=CloseCallback)
+    subscriber = ProcessPoolSubscriberImpl(
+        lambda: assigner,
+        lambda assigned: FakeWorker(assigned, events),
+        2,
+        restart_poll_seconds=0.01,
+    )
+    subscriber.add_close_callback(close_callback)
+    with subscriber:
+        assigner.assignments.put(partitions(0, 1))
+        started = {}
+        for _ in range(2):
+            _, assigned, worker = get_event(events)
+            started[assigned] = worker
+        assert started.keys() == {frozenset(partitions(0)), frozenset(partitions(1))}
+
+        assigner.assignments.put(partitions(1))
+        kind, assigned, _ = get_event(events)
+        assert (kind, assigned) == ("request_stop", frozenset(partitions(0)))
+        kind, assigned, _ = get_event(events)
+        assert (kind, assigned) == ("stop", frozenset(partitions(0)))
+
+        # A worker which dies is restarted with the same partitions.
+        started[frozenset(partitions(1))].alive = False
+        kind, assigned, _ = get_event(events)
+        assert (kind, assigned) == ("start", frozenset(partitions(1)))
+    kind, assigned, _ = get_event(events)
+    assert (kind, assigned) == ("request_stop", frozenset(partitions(1)))
+    kind, assigned, _ = get_event(events)
+    assert (kind, assigned) == ("stop", frozenset(partitions(1)))
+    close_callback.assert_called_once_with(subscriber, None)
+
+
+def test_changed_workers_stop_in_parallel():
+    events = queue.Queue()
+    assigner = QueueAssigner()
+    subscriber = ProcessPoolSubscriberImpl(
+        lambda: assigner, lambda assigned: FakeWorker(assigned, events), 2
+    )
+    subscriber.add_close_callback(MagicMock(spec=CloseCallback))
+    with subscriber:
+        assigner.assignments.put(partitions(0, 1))
+        for _ in range(2):
+            assert get_event(events)[0] == "start"
+        assigner.assignments.put(partitions(2, 3))
+        # Every changed worker is asked to stop before any is waited on.
+        assert [get_event(events)[0] for _ in range(6)] == [
+            "request_stop",
+            "request_stop",
+            "stop",
+            "stop",
+            "start",
+            "start",
+        ]
+
+
+def test_assigner_failure():
+    events = queue.Queue()
+    assigner = QueueAssigner()
+    closed = threading.Event()
+    error = FailedPrecondition("bad assignment")
+    subscriber = ProcessPoolSubscriberImpl(
+        lambda: assigner, lambda assigned: FakeWorker(assigned, events), 2
+    )
+    subscriber.add_close_callback(lambda manager, failure: closed.set())
+    subscriber.__enter__()
+    assigner.assignments.put(error)
+    assert closed.wait(10)
+    assert subscriber._failure is error
+
+
+def test_worker_permanent_failure_fails_subscriber():
+    events = queue.Queue()
+    assigner = QueueAssigner()
+    closed = threading.Event()
+    subscriber = ProcessPoolSubscriberImpl(
+        lambda: assigner,
+        lambda assigned: FakeWorker(assigned, events),
+        1,
+        restart_poll_seconds=0.01,
+    )
+    subscriber.add_close_callback(lambda manager, failure: closed.set())
+    subscriber.__enter__()
+    assigner.assignments.put(partitions(0))
+    _, _, worker = get_event(events)
+    error = NotFound("no subscription")
+    worker.error = error
+    worker.alive = False
+    assert closed.wait(10)
+    assert subscriber._failure is error
+
+
+def test_restart_backoff_grows_for_crash_looping_workers():
+    subscriber = ProcessPoolSubscriberImpl(
+        QueueAssigner, lambda assigned: None, 1, restart_poll_seconds=1
+    )
+    subscriber._started_at[0] = 100
+    delays = [subscriber._restart_delay(0, 101) for _ in range(9)]
+    assert delays == [0, 1, 2, 4, 8, 16, 32, 60, 60]
+    # A worker which ran for a long time restarts immediately.
+    assert subscriber._restart_delay(0, 1000) == 0
@@ -22,6 +22,7 @@ from google.cloud.pubsublite.cloudpubsub.internal.single_publisher import (
     AsyncSinglePublisher,
     SinglePublisher,
 )
+from google.cloud.pubsublite.types import Partition
 
 
 @pytest.fixture()
@@ -39,8 +40,12 @@ def publisher(async_publisher):
 def test_proxies_to_async(async_publisher, publisher: SinglePublisher):
     with publisher:
         async_publisher.__aenter__.assert_called_once()
-        publisher.publish(data=b"abc", ordering_key="zyx", xyz="xyz").result()
+        publisher.publish(
+            data=b"abc", ordering_key="zyx", partition=Partition(2), xyz="xyz"
+        ).result()
         async_publisher.publish.assert_called_once_with(
-            data=b"abc", ordering_key="zyx", xyz="xyz"
+            data=b"abc", ordering_key="zyx", partition=Partition(2), xyz="xyz"
         )
+        publisher.flush().result()
+        async_publisher.flush.assert_called_once()
     async_publisher.__aexit__.assert_called_once()
@@ -23,6 +23,10 @@ from google.pubsub_v1 import PubsubMessage
 
 from google.cloud.pubsublite.types import FlowControlSettings
 from google.cloud.pubsublite.cloudpubsub.internal.ack_set_tracker import AckSetTracker
+from google.cloud.pubsublite.cloudpubsub.internal.flow_control_budget import (
+    BudgetFlowControl,
+    FlowControlBudget,
+)
 from google.cloud.pubsublite.cloudpubsub.internal.single_partition_subscriber import (
     SinglePartitionSingleSubscriber,
 )
@@ -230,3 +234,122 @@ async def test_nack_calls_ack(
         await ack_called_queue.get()
         await ack_result_queue.put(None)
         ack_set_tracker.ack.assert_has_calls([call(1)])
+
+
+async def test_wait_for_acks(
+    subscriber: SinglePartitionSingleSubscriber,
+    underlying,
+    transformer,
+    ack_set_tracker,
+):
+    ack_called_queue = asyncio.Queue()
+    ack_result_queue = asyncio.Queue()
+    ack_set_tracker.ack.side_effect = make_queue_waiter(
+        ack_called_queue, ack_result_queue
+    )
+    async with subscriber:
+        underlying.read.return_value = SequencedMessage(
+            cursor=Cursor(offset=1), size_bytes=5
+        )
+        read_1: Message = await subscriber.read()
+        underlying.read.return_value = SequencedMessage(
+            cursor=Cursor(offset=2), size_bytes=5
+        )
+        read_2: Message = await subscriber.read()
+        # The second message was never delivered, so it is not waited on.
+        wait = asyncio.ensure_future(subscriber.wait_for_acks([read_2]))
+        read_1.ack()
+        await ack_called_queue.get()
+        await asyncio.sleep(0)
+        assert not wait.done()
+        await ack_result_queue.put(None)
+        await wait
+        ack_set_tracker.ack.assert_has_calls([call(1)])
+
+
+async def test_flow_control_budget(
+    underlying, flow_control_settings, ack_set_tracker, nack_handler, transformer
+):
+    budget = FlowControlBudget(FlowControlSettings(10, 100))
+    subscriber = SinglePartitionSingleSubscriber(
+        underlying,
+        flow_control_settings,
+        ack_set_tracker,
+        nack_handler,
+        transformer,
+        BudgetFlowControl(budget, flow_control_settings),
+    )
+    flow_called_queue = asyncio.Queue()
+    flow_result_queue = asyncio.Queue()
+    underlying.allow_flow.side_effect = make_queue_waiter(
+        flow_called_queue, flow_result_queue
+    )
+    async with subscriber:
+        await flow_called_queue.get()
+        await flow_result_queue.put(None)
+        underlying.allow_flow.assert_called_once_with(
+            FlowControlRequest(allowed_messages=10, allowed_bytes=100)
+        )
+        underlying.read.return_value = SequencedMessage(
+            cursor=Cursor(offset=1), size_bytes=5
+        )
+        read: Message = await subscriber.read()
+        read.ack()
+        # Acked tokens return to the budget, which grants them back to the only member.
+        await flow_called_queue.get()
+        await flow_result_queue.put(None)
+        underlying.allow_flow.assert_has_calls(
+            [call(FlowControlRequest(allowed_messages=1, allowed_bytes=5))]
+        )
+
+
+async def test_grants_hop_threads_only_off_loop(
+    underlying,
+    flow_control_settings,
+    ack_set_tracker,
+    nack_handler,
+    transformer,
+    monkeypatch,
+):
+    budget = FlowControlBudget(FlowControlSettings(10, 100))
+    subscriber = SinglePartitionSingleSubscriber(
+        underlying,
+        flow_control_settings,
+        ack_set_tracker,
+        nack_handler,
+        transformer,
+        BudgetFlowControl(budget, flow_control_settings),
+    )
+    flow_called_queue = asyncio.Queue()
+    flow_result_queue = asyncio.Queue()
+    underlying.allow_flow.side_effect = make_queue_waiter(
+        flow_called_queue, flow_result_queue
+    )
+    hops = []
+    run_coroutine_threadsafe = asyncio.run_coroutine_threadsafe
+
+    def counting_run_coroutine_threadsafe(coro, loop):
+        hops.append(coro)
+        return run_coroutine_threadsafe(coro, loop)
+
+    monkeypatch.setattr(
+        asyncio, "run_coroutine_threadsafe", counting_run_coroutine_threadsafe
+    )
+    async with subscriber:
+        await flow_called_queue.get()
+        await flow_result_queue.put(None)
+        underlying.read.return_value = SequencedMessage(
+            cursor=Cursor(offset=1), size_bytes=5
+        )
+        read: Message = await subscriber.read()
+        read.ack()
+        await flow_called_queue.get()
+        await flow_result_queue.put(None)
+        # Acks are handled on the subscriber's loop, so their grants are scheduled directly.
+        assert hops == []
+        request = FlowControlRequest(allowed_messages=2, allowed_bytes=3)
+        await asyncio.get_event_loop().run_in_executor(None, subscriber._grant, request)
+        await flow_called_queue.get()
+        await flow_result_queue.put(None)
+        assert len(hops) == 1
+        underlying.allow_flow.assert_has_calls([call(request)])
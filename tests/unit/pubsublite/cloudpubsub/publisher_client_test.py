@@ -0,0 +1,36 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from google.cloud.pubsublite.cloudpubsub import AsyncPublisherClient, PublisherClient
+from google.cloud.pubsublite.types import CloudZone, Partition, TopicPath
+
+TOPIC = TopicPath(1, CloudZone.parse("us-central1-a"), "topic")
+
+
+def test_partition_must_be_partition():
+    with PublisherClient() as client:
+        with pytest.raises(TypeError):
+            client.publish(TOPIC, b"data", partition="attribute")
+        with pytest.raises(TypeError):
+            # The partition can only be passed by keyword.
+            client.publish(TOPIC, b"data", "", Partition(1))
+
+
+@pytest.mark.asyncio
+async def test_async_partition_must_be_partition():
+    async with AsyncPublisherClient() as client:
+        with pytest.raises(TypeError):
+            await client.publish(TOPIC, b"data", partition=1)
@@ -0,0 +1,186 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import InvalidArgument
+
+from google.cloud.pubsublite.cloudpubsub.internal.managed_event_loop import (
+    ManagedEventLoop,
+)
+from google.cloud.pubsublite.internal import channel_pool
+from google.cloud.pubsublite.internal.channel_pool import (
+    ChannelPool,
+    can_pool,
+    get_async_channel_pool,
+    release_async_channel_pools,
+    retain_async_channel_pools,
+)
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+def make_pool(size: int):
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    return ChannelPool(factory, size), created
+
+
+def test_invalid_size():
+    with pytest.raises(InvalidArgument):
+        ChannelPool(object, 0)
+
+
+def test_creates_channels_lazily():
+    pool, created = make_pool(3)
+    # Unary calls do not hold a lease, so they do not cause more channels to be created.
+    assert pool.channel() is pool.channel()
+    assert len(created) == 1
+    lease_1 = pool.acquire()
+    assert created == [lease_1.channel]
+    lease_2 = pool.acquire()
+    assert len(created) == 2
+    assert lease_2.channel is created[1]
+    lease_2.release()
+    # A channel with no streams is reused rather than creating another.
+    assert pool.acquire().channel is created[1]
+    assert len(created) == 2
+
+
+def test_places_streams_on_least_loaded_channel():
+    pool, created = make_pool(2)
+    leases = [pool.acquire() for _ in range(4)]
+    assert len(created) == 2
+    assert pool.active_streams() == [2, 2]
+    leases[0].release()
+    leases[0].release()
+    assert pool.active_streams() == [1, 2]
+    assert pool.acquire().channel is created[0]
+    assert pool.active_streams() == [2, 2]
+
+
+def test_can_pool():
+    options = ClientOptions(api_endpoint="us-central1-pubsublite.googleapis.com")
+    assert can_pool(None, options)
+    assert can_pool("grpc_asyncio", options)
+    assert not can_pool("rest", options)
+    assert not can_pool(
+        "grpc_asyncio",
+        ClientOptions(api_endpoint=options.api_endpoint, scopes=["scope"]),
+    )
+    assert not can_pool(
+        "grpc_asyncio",
+        ClientOptions(
+            api_endpoint=options.api_endpoint, client_cert_source=lambda: (b"", b"")
+        ),
+    )
+
+
+async def test_async_pools_shared_by_endpoint_and_credentials():
+    options = ClientOptions(api_endpoint="us-central1-pubsublite.googleapis.com")
+    credentials = object()
+    pool = get_async_channel_pool(options, credentials)
+    assert (
+        get_async_channel_pool(
+            ClientOptions(api_endpoint=options.api_endpoint + ":443"), credentials
+        )
+        is pool
+    )
+    assert get_async_channel_pool(options, object()) is not pool
+    assert (
+        get_async_channel_pool(
+            ClientOptions(api_endpoint="europe-west1-pubsublite.googleapis.com"),
+            credentials,
+        )
+        is not pool
+    )
+    assert get_async_channel_pool(options, credentials, 8) is not pool
+
+
+def test_drain_releases_channels():
+    pool, created = make_pool(2)
+    lease = pool.acquire()
+    assert pool.drain() == created
+    assert pool.active_streams() == []
+    # Leases on drained channels do not affect the new channels.
+    new_lease = pool.acquire()
+    lease.release()
+    assert pool.active_streams() == [1]
+    assert new_lease.channel is created[1]
+
+
+class FakeChannel:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_stopped_loop_closes_channels(monkeypatch):
+    monkeypatch.setattr(
+        channel_pool,
+        "_create_async_channel",
+        lambda client_options, credentials: FakeChannel(),
+    )
+    options = ClientOptions(api_endpoint="us-central1-pubsublite.googleapis.com")
+
+    async def lease_channel():
+        return get_async_channel_pool(options, None).acquire().channel
+
+    loop = ManagedEventLoop()
+    with loop:
+        channel = loop.submit(lease_channel()).result()
+        assert not channel.closed
+    assert channel.closed
+    assert loop._loop not in channel_pool._async_pools
+
+
+async def test_last_released_client_closes_channels(monkeypatch):
+    monkeypatch.setattr(
+        channel_pool,
+        "_create_async_channel",
+        lambda client_options, credentials: FakeChannel(),
+    )
+    options = ClientOptions(api_endpoint="us-central1-pubsublite.googleapis.com")
+    retain_async_channel_pools()
+    retain_async_channel_pools()
+    channel = get_async_channel_pool(options, None).acquire().channel
+    await release_async_channel_pools()
+    assert not channel.closed
+    await release_async_channel_pools()
+    assert channel.closed
+    assert asyncio.get_event_loop() not in channel_pool._async_pools
+    assert asyncio.get_event_loop() not in channel_pool._async_pool_users
+
+
+async def test_async_pool_size(monkeypatch):
+    monkeypatch.setattr(
+        channel_pool,
+        "_create_async_channel",
+        lambda client_options, credentials: FakeChannel(),
+    )
+    options = ClientOptions(api_endpoint="us-central1-pubsublite.googleapis.com")
+    pool = get_async_channel_pool(options, None, 2)
+    leases = [pool.acquire() for _ in range(3)]
+    assert pool.active_streams() == [2, 1]
+    for lease in leases:
+        lease.release()
@@ -0,0 +1,67 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from google.api_core.exceptions import FailedPrecondition, InternalServerError
+
+from google.cloud.pubsublite.internal.gather_bounded import gather_bounded
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+async def test_bounds_parallelism():
+    running = 0
+    max_running = 0
+
+    async def action():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+
+    await gather_bounded([action() for _ in range(10)], 3)
+    assert max_running == 3
+
+
+async def test_runs_all_and_raises_first_error():
+    completed = []
+
+    async def action(index: int):
+        await asyncio.sleep(0)
+        if index == 1:
+            raise FailedPrecondition("first")
+        if index == 3:
+            raise InternalServerError("second")
+        completed.append(index)
+
+    with pytest.raises(FailedPrecondition):
+        await gather_bounded([action(index) for index in range(5)], 2)
+    assert completed == [0, 2, 4]
+
+
+async def test_raises_error_of_earliest_awaitable(caplog):
+    async def fail_later():
+        await asyncio.sleep(0.01)
+        raise FailedPrecondition("first")
+
+    async def fail_now():
+        raise InternalServerError("second")
+
+    with pytest.raises(FailedPrecondition):
+        await gather_bounded([fail_later(), fail_now()])
+    assert "second" in caplog.text
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import asyncio
+import random
 from unittest.mock import call
 from collections import defaultdict
 from typing import Dict, Set
@@ -36,7 +37,7 @@ from google.cloud.pubsublite_v1.types.subscriber import (
     PartitionAssignmentAck,
 )
 from google.cloud.pubsublite.testing.test_utils import make_queue_waiter
-from google.cloud.pubsublite.internal.wire.retrying_connection import _MIN_BACKOFF_SECS
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import _MIN_BACKOFF_SECS
 
 # All test coroutines will be treated as marked.
 pytestmark = pytest.mark.asyncio
@@ -82,6 +83,8 @@ def asyncio_sleep(monkeypatch, sleep_queues):
     """Requests.get() mocked to return {'mock_key':'mock_response'}."""
     mock = CoroutineMock()
     monkeypatch.setattr(asyncio, "sleep", mock)
+    # Back off for the full, unjittered, delay.
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
 
     async def sleeper(delay: float):
         await make_queue_waiter(
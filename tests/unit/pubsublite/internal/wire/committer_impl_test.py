@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import asyncio
+import random
 from unittest.mock import call
 from collections import defaultdict
 from typing import Dict
@@ -33,8 +34,11 @@ from google.cloud.pubsublite_v1.types.cursor import (
     InitialCommitCursorRequest,
 )
 from google.cloud.pubsublite_v1.types.common import Cursor
-from google.cloud.pubsublite.testing.test_utils import make_queue_waiter
-from google.cloud.pubsublite.internal.wire.retrying_connection import _MIN_BACKOFF_SECS
+from google.cloud.pubsublite.testing.test_utils import (
+    FakeFlushScheduler,
+    make_queue_waiter,
+)
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import _MIN_BACKOFF_SECS
 
 FLUSH_SECONDS = 100000
 
@@ -82,6 +86,8 @@ def asyncio_sleep(monkeypatch, sleep_queues):
     """Requests.get() mocked to return {'mock_key':'mock_response'}."""
     mock = CoroutineMock()
     monkeypatch.setattr(asyncio, "sleep", mock)
+    # Back off for the full, unjittered, delay.
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
 
     async def sleeper(delay: float):
         await make_queue_waiter(
@@ -93,8 +99,18 @@ def asyncio_sleep(monkeypatch, sleep_queues):
 
 
 @pytest.fixture()
-def committer(connection_factory, initial_request):
-    return CommitterImpl(initial_request.initial, FLUSH_SECONDS, connection_factory)
+def flush_scheduler():
+    return FakeFlushScheduler()
+
+
+@pytest.fixture()
+def committer(connection_factory, initial_request, flush_scheduler):
+    return CommitterImpl(
+        initial_request.initial,
+        FLUSH_SECONDS,
+        connection_factory,
+        flush_scheduler=flush_scheduler,
+    )
 
 
 def as_request(cursor: Cursor):
@@ -115,9 +131,8 @@ async def test_basic_commit_after_timeout(
     initial_request,
     asyncio_sleep,
     sleep_queues,
+    flush_scheduler,
 ):
-    sleep_called = sleep_queues[FLUSH_SECONDS].called
-    sleep_results = sleep_queues[FLUSH_SECONDS].results
     cursor1 = Cursor(offset=321)
     cursor2 = Cursor(offset=1)
     write_called_queue = asyncio.Queue()
@@ -144,12 +159,10 @@ async def test_basic_commit_after_timeout(
         assert not commit_fut1.done()
         assert not commit_fut2.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_called_with(FLUSH_SECONDS)
+        # Flush once the commit has waited FLUSH_SECONDS
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
 
         # Handle the connection write
-        await sleep_results.put(None)
         await write_called_queue.get()
         await write_result_queue.put(None)
         # Called with second cursor
@@ -171,9 +184,8 @@ async def test_commits_multi_cycle(
     initial_request,
     asyncio_sleep,
     sleep_queues,
+    flush_scheduler,
 ):
-    sleep_called = sleep_queues[FLUSH_SECONDS].called
-    sleep_results = sleep_queues[FLUSH_SECONDS].results
     cursor1 = Cursor(offset=321)
     cursor2 = Cursor(offset=1)
     write_called_queue = asyncio.Queue()
@@ -198,12 +210,10 @@ async def test_commits_multi_cycle(
         commit_fut1 = asyncio.ensure_future(committer.commit(cursor1))
         assert not commit_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_called_with(FLUSH_SECONDS)
+        # Flush once the commit has waited FLUSH_SECONDS
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
 
         # Handle the connection write
-        await sleep_results.put(None)
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -211,16 +221,12 @@ async def test_commits_multi_cycle(
         )
         assert not commit_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_has_calls([call(FLUSH_SECONDS), call(FLUSH_SECONDS)])
-
         # Write message 2
         commit_fut2 = asyncio.ensure_future(committer.commit(cursor2))
         assert not commit_fut2.done()
 
         # Handle the connection write
-        await sleep_results.put(None)
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -245,9 +251,8 @@ async def test_publishes_retried_on_restart(
     initial_request,
     asyncio_sleep,
     sleep_queues,
+    flush_scheduler,
 ):
-    sleep_called = sleep_queues[FLUSH_SECONDS].called
-    sleep_results = sleep_queues[FLUSH_SECONDS].results
     cursor1 = Cursor(offset=321)
     cursor2 = Cursor(offset=1)
     write_called_queue = asyncio.Queue()
@@ -272,12 +277,10 @@ async def test_publishes_retried_on_restart(
         commit_fut1 = asyncio.ensure_future(committer.commit(cursor1))
         assert not commit_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_called_with(FLUSH_SECONDS)
+        # Flush once the commit has waited FLUSH_SECONDS
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
 
         # Handle the connection write
-        await sleep_results.put(None)
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -285,16 +288,12 @@ async def test_publishes_retried_on_restart(
         )
         assert not commit_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_has_calls([call(FLUSH_SECONDS), call(FLUSH_SECONDS)])
-
         # Write message 2
         commit_fut2 = asyncio.ensure_future(committer.commit(cursor2))
         assert not commit_fut2.done()
 
         # Handle the connection write
-        await sleep_results.put(None)
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -320,14 +319,7 @@ async def test_publishes_retried_on_restart(
         # Re-sending messages on the new stream
         await write_called_queue.get()
         await write_result_queue.put(None)
-        asyncio_sleep.assert_has_calls(
-            [
-                call(FLUSH_SECONDS),
-                call(FLUSH_SECONDS),
-                call(FLUSH_SECONDS),
-                call(_MIN_BACKOFF_SECS),
-            ]
-        )
+        asyncio_sleep.assert_has_calls([call(_MIN_BACKOFF_SECS)])
         default_connection.write.assert_has_calls(
             [
                 # Aggregates response calls on second pass
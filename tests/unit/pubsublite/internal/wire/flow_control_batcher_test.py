@@ -44,3 +44,14 @@ def test_add_remove():
     restart_2 = batcher.request_for_restart()
     assert restart_2.allowed_bytes == 5
     assert restart_2.allowed_messages == 1
+
+
+def test_server_messages():
+    batcher = FlowControlBatcher()
+    batcher.add(FlowControlRequest(allowed_bytes=10, allowed_messages=3))
+    assert batcher.server_messages() == 0
+    batcher.release_pending_request()
+    assert batcher.server_messages() == 3
+    batcher.on_messages([SequencedMessage(size_bytes=2)])
+    batcher.add(FlowControlRequest(allowed_bytes=2, allowed_messages=1))
+    assert batcher.server_messages() == 2
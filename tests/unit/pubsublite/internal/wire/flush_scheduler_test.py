@@ -0,0 +1,106 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from google.cloud.pubsublite.internal.wire.flush_scheduler import (
+    FlushScheduler,
+    get_flush_scheduler,
+)
+from google.cloud.pubsublite.testing.test_utils import run_on_thread
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+async def test_flush_runs_after_delay():
+    scheduler = FlushScheduler(tick_seconds=0.01)
+    ran = asyncio.Event()
+    start = asyncio.get_event_loop().time()
+    scheduler.schedule(0.05, ran.set)
+    await asyncio.wait_for(ran.wait(), 1)
+    assert asyncio.get_event_loop().time() - start >= 0.04
+
+
+async def test_flushes_in_one_tick_share_a_wakeup(monkeypatch):
+    loop = asyncio.get_event_loop()
+    timers = []
+    call_at = loop.call_at
+
+    def counting_call_at(when, callback, *args, **kwargs):
+        if callback == scheduler._fire:
+            timers.append(when)
+        return call_at(when, callback, *args, **kwargs)
+
+    monkeypatch.setattr(loop, "call_at", counting_call_at)
+    scheduler = FlushScheduler(tick_seconds=1)
+    ran = []
+    done = asyncio.Event()
+    for index in range(100):
+        scheduler.schedule(0.001, lambda index=index: ran.append(index))
+    scheduler.schedule(0.001, done.set)
+    await asyncio.wait_for(done.wait(), 2)
+    assert ran == list(range(100))
+    assert len(timers) == 1
+
+
+async def test_earlier_flush_rearms_timer():
+    scheduler = FlushScheduler(tick_seconds=0.01)
+    ran = []
+    done = asyncio.Event()
+    scheduler.schedule(10, lambda: ran.append("late"))
+    scheduler.schedule(0.01, lambda: ran.append("early"))
+    scheduler.schedule(0.02, done.set)
+    await asyncio.wait_for(done.wait(), 1)
+    assert ran == ["early"]
+
+
+async def test_cancelled_flush_does_not_run():
+    scheduler = FlushScheduler(tick_seconds=0.01)
+    ran = []
+    done = asyncio.Event()
+    flush = scheduler.schedule(0.01, lambda: ran.append("cancelled"))
+    flush.cancel()
+    assert flush.cancelled()
+    scheduler.schedule(0.01, done.set)
+    await asyncio.wait_for(done.wait(), 1)
+    assert ran == []
+
+
+async def test_failed_flush_does_not_stop_others():
+    scheduler = FlushScheduler(tick_seconds=0.01)
+    done = asyncio.Event()
+
+    def fail():
+        raise RuntimeError("flush failed")
+
+    scheduler.schedule(0.01, fail)
+    scheduler.schedule(0.01, done.set)
+    await asyncio.wait_for(done.wait(), 1)
+
+
+async def test_scheduler_shared_per_loop():
+    assert get_flush_scheduler() is get_flush_scheduler()
+
+    def other_loop_scheduler():
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            return get_flush_scheduler()
+        finally:
+            loop.close()
+
+    assert run_on_thread(other_loop_scheduler) is not get_flush_scheduler()
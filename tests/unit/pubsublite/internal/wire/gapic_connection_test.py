@@ -16,7 +16,11 @@ import asyncio
 
 import pytest
 from google.api_core.exceptions import InternalServerError
-from google.cloud.pubsublite.internal.wire.gapic_connection import GapicConnection
+from google.cloud.pubsublite.internal.channel_pool import ChannelPool
+from google.cloud.pubsublite.internal.wire.gapic_connection import (
+    GapicConnection,
+    PooledGapicConnectionFactory,
+)
 from google.cloud.pubsublite.testing.test_utils import async_iterable
 
 # All test coroutines will be treated as marked.
@@ -52,3 +56,41 @@ async def test_writes():
     assert not task2.done()
     assert await conn.__anext__() == 2
     await task2
+
+
+async def test_abandoned_write_not_sent():
+    conn = GapicConnection[int, int]()
+    conn.set_response_it(async_iterable([]))
+    task1 = asyncio.ensure_future(conn.write(1))
+    task2 = asyncio.ensure_future(conn.write(2))
+    await asyncio.sleep(0)
+    task1.cancel()
+    assert await conn.__anext__() == 2
+    await task2
+
+
+async def test_pooled_connection_releases_lease():
+    pool = ChannelPool(object, 1)
+    channels = []
+
+    async def producer(channel, requests):
+        channels.append(channel)
+        return async_iterable([])
+
+    factory = PooledGapicConnectionFactory(pool, producer)
+    async with await factory.new():
+        assert pool.active_streams() == [1]
+    assert pool.active_streams() == [0]
+    assert channels == [pool.channel()]
+
+
+async def test_pooled_connection_releases_lease_on_failure():
+    pool = ChannelPool(object, 1)
+
+    async def producer(channel, requests):
+        raise InternalServerError("abc")
+
+    factory = PooledGapicConnectionFactory(pool, producer)
+    with pytest.raises(InternalServerError):
+        await factory.new()
+    assert pool.active_streams() == [0]
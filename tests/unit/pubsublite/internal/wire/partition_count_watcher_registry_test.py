@@ -0,0 +1,140 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+
+import pytest
+
+from google.cloud.pubsublite.internal.wire.partition_count_watcher_registry import (
+    PartitionCountWatcherRegistry,
+    get_partition_count_watcher_registry,
+    watch_partition_count,
+)
+from google.cloud.pubsublite.types import TopicPath
+from google.api_core.exceptions import GoogleAPICallError
+
+pytestmark = pytest.mark.asyncio
+
+
+def topic(name: str) -> TopicPath:
+    return TopicPath.parse(f"projects/1/locations/us-central1-a/topics/{name}")
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.calls = []
+        self.results = asyncio.Queue()
+
+    async def __call__(self, topic_path: TopicPath) -> int:
+        self.calls.append(topic_path)
+        result = await self.results.get()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture()
+def registry():
+    return PartitionCountWatcherRegistry()
+
+
+@pytest.fixture()
+def fetch():
+    return FakeFetcher()
+
+
+async def test_watchers_share_polls(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 1000) as watcher1:
+        async with registry.watcher(topic("a"), fetch, 1000) as watcher2:
+            fetch.results.put_nowait(3)
+            assert await watcher1.get_partition_count() == 3
+            assert await watcher2.get_partition_count() == 3
+            assert fetch.calls == [topic("a")]
+            assert registry.watched_topics() == 1
+
+
+async def test_late_watcher_gets_last_count(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 1000) as watcher1:
+        fetch.results.put_nowait(3)
+        assert await watcher1.get_partition_count() == 3
+        async with registry.watcher(topic("a"), fetch, 1000) as watcher2:
+            assert await watcher2.get_partition_count() == 3
+        assert len(fetch.calls) == 1
+
+
+async def test_topics_polled_separately(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 1000) as watcher1:
+        async with registry.watcher(topic("b"), fetch, 1000) as watcher2:
+            fetch.results.put_nowait(3)
+            fetch.results.put_nowait(3)
+            assert await watcher1.get_partition_count() == 3
+            assert await watcher2.get_partition_count() == 3
+            assert sorted(str(path) for path in fetch.calls) == [
+                str(topic("a")),
+                str(topic("b")),
+            ]
+            assert registry.watched_topics() == 2
+
+
+async def test_client_key_separates_watchers(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 1000, "x") as watcher1:
+        async with registry.watcher(topic("a"), fetch, 1000, "y") as watcher2:
+            fetch.results.put_nowait(3)
+            fetch.results.put_nowait(4)
+            assert await watcher1.get_partition_count() == 3
+            assert await watcher2.get_partition_count() == 4
+
+
+async def test_repolls_after_period(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 0.01) as watcher:
+        fetch.results.put_nowait(3)
+        assert await watcher.get_partition_count() == 3
+        fetch.results.put_nowait(4)
+        assert await watcher.get_partition_count() == 4
+        assert len(fetch.calls) >= 2
+
+
+async def test_first_failure_fails_watchers(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 1000) as watcher:
+        fetch.results.put_nowait(GoogleAPICallError("error"))
+        with pytest.raises(GoogleAPICallError):
+            await watcher.get_partition_count()
+        assert registry.watched_topics() == 0
+
+
+async def test_subsequent_failures_ignored(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 0.01) as watcher:
+        fetch.results.put_nowait(3)
+        assert await watcher.get_partition_count() == 3
+        fetch.results.put_nowait(GoogleAPICallError("error"))
+        fetch.results.put_nowait(4)
+        assert await watcher.get_partition_count() == 4
+
+
+async def test_poller_stops_when_unwatched(registry, fetch):
+    async with registry.watcher(topic("a"), fetch, 1000) as watcher:
+        fetch.results.put_nowait(3)
+        assert await watcher.get_partition_count() == 3
+        poller = registry._poller
+    # The last watcher's exit waits for the poller to stop.
+    assert poller.done()
+    assert registry._poller is None
+    assert registry.watched_topics() == 0
+
+
+async def test_watch_uses_loop_registry(fetch):
+    registry = get_partition_count_watcher_registry()
+    assert registry is get_partition_count_watcher_registry()
+    async with watch_partition_count(topic("a"), fetch, 1000):
+        assert registry.watched_topics() == 1
+    assert registry.watched_topics() == 0
@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+
 from asynctest.mock import MagicMock
 import pytest
 
@@ -20,12 +22,15 @@ from google.cloud.pubsublite.internal.wire.partition_count_watcher import (
 from google.cloud.pubsublite.internal.wire.partition_count_watching_publisher import (
     PartitionCountWatchingPublisher,
 )
-from google.cloud.pubsublite.internal.wire.publisher import Publisher
+from google.cloud.pubsublite.internal.wire.publisher import InvalidPartition, Publisher
 from google.cloud.pubsublite.internal.wire.routing_policy import RoutingPolicy
 from google.cloud.pubsublite.testing.test_utils import wire_queues, run_on_thread
 from google.cloud.pubsublite.types import Partition
 from google.cloud.pubsublite_v1 import PubSubMessage
-from google.api_core.exceptions import GoogleAPICallError
+from google.api_core.exceptions import (
+    GoogleAPICallError,
+    ResourceExhausted,
+)
 
 pytestmark = pytest.mark.asyncio
 
@@ -65,15 +70,83 @@ async def test_init(mock_watcher, publisher):
 
 async def test_failed_init(mock_watcher, publisher):
     mock_watcher.get_partition_count.side_effect = GoogleAPICallError("error")
-    with pytest.raises(GoogleAPICallError):
-        async with publisher:
-            pass
+    async with publisher:
+        with pytest.raises(GoogleAPICallError):
+            await publisher.publish(PubSubMessage())
+        with pytest.raises(GoogleAPICallError):
+            await publisher.publish(PubSubMessage())
     mock_watcher.__aenter__.assert_called_once()
     mock_watcher.__aexit__.assert_called_once()
 
 
+async def test_enter_does_not_wait_for_count(
+    mock_publishers, mock_policies, mock_watcher, publisher
+):
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    async with publisher:
+        await get_queues.called.get()
+        mock_policies[2].route.return_value = Partition(1)
+        mock_publishers[Partition(1)].publish.return_value = "a"
+        publish_1 = asyncio.ensure_future(publisher.publish(PubSubMessage()))
+        publish_2 = asyncio.ensure_future(publisher.publish(PubSubMessage()))
+        await asyncio.sleep(0)
+        # Messages wait for the partition count.
+        assert not publish_1.done()
+        assert not publish_2.done()
+        mock_publishers[Partition(1)].__aenter__.assert_not_called()
+        await get_queues.results.put(2)
+        assert await publish_1 == "a"
+        assert await publish_2 == "a"
+        mock_publishers[Partition(1)].__aenter__.assert_called_once()
+
+
+async def test_buffered_messages_bounded(mock_watcher, mock_publishers, mock_policies):
+    publisher = PartitionCountWatchingPublisher(
+        mock_watcher,
+        lambda p: mock_publishers[p],
+        lambda c: mock_policies[c],
+        max_buffered_messages=1,
+    )
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    async with publisher:
+        mock_policies[2].route.return_value = Partition(1)
+        mock_publishers[Partition(1)].publish.return_value = "a"
+        publish_1 = asyncio.ensure_future(publisher.publish(PubSubMessage()))
+        await asyncio.sleep(0)
+        with pytest.raises(ResourceExhausted):
+            await publisher.publish(PubSubMessage())
+        await get_queues.called.get()
+        await get_queues.results.put(2)
+        assert await publish_1 == "a"
+        assert await publisher.publish(PubSubMessage()) == "a"
+
+
+async def test_initial_partition_count_routes_immediately(
+    mock_watcher, mock_publishers, mock_policies
+):
+    publisher = PartitionCountWatchingPublisher(
+        mock_watcher,
+        lambda p: mock_publishers[p],
+        lambda c: mock_policies[c],
+        initial_partition_count=2,
+    )
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    async with publisher:
+        mock_policies[2].route.return_value = Partition(1)
+        mock_publishers[Partition(1)].publish.return_value = "a"
+        assert await publisher.publish(PubSubMessage()) == "a"
+
+        await get_queues.called.get()
+        await get_queues.results.put(3)
+        await get_queues.called.get()
+        mock_policies[3].route.return_value = Partition(2)
+        mock_publishers[Partition(2)].publish.return_value = "b"
+        assert await publisher.publish(PubSubMessage()) == "b"
+
+
 async def test_simple_publish(mock_publishers, mock_policies, mock_watcher, publisher):
-    mock_watcher.get_partition_count.return_value = 2
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    await get_queues.results.put(2)
     async with publisher:
         mock_policies[2].route.return_value = Partition(1)
         mock_publishers[Partition(1)].publish.return_value = "a"
@@ -88,7 +161,7 @@ async def test_publish_after_increase(
     get_queues = wire_queues(mock_watcher.get_partition_count)
     await get_queues.results.put(2)
     async with publisher:
-        get_queues.called.get_nowait()
+        await get_queues.called.get()
 
         mock_policies[2].route.return_value = Partition(1)
         mock_publishers[Partition(1)].publish.return_value = "a"
@@ -113,7 +186,7 @@ async def test_decrease_ignored(
     get_queues = wire_queues(mock_watcher.get_partition_count)
     await get_queues.results.put(2)
     async with publisher:
-        get_queues.called.get_nowait()
+        await get_queues.called.get()
 
         mock_policies[2].route.return_value = Partition(1)
         mock_publishers[Partition(1)].publish.return_value = "a"
@@ -130,3 +203,134 @@ async def test_decrease_ignored(
         await publisher.publish(PubSubMessage())
         mock_policies[2].route.assert_called_with(PubSubMessage())
         mock_publishers[Partition(1)].publish.assert_called()
+
+
+async def test_publishers_opened_on_first_message(
+    mock_publishers, mock_policies, mock_watcher, publisher
+):
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    await get_queues.results.put(2)
+    enter_queues = wire_queues(mock_publishers[Partition(1)].__aenter__)
+    async with publisher:
+        mock_publishers[Partition(0)].__aenter__.assert_not_called()
+        mock_publishers[Partition(1)].__aenter__.assert_not_called()
+
+        mock_policies[2].route.return_value = Partition(1)
+        mock_publishers[Partition(1)].publish.return_value = "a"
+        publish_1 = asyncio.ensure_future(publisher.publish(PubSubMessage()))
+        publish_2 = asyncio.ensure_future(publisher.publish(PubSubMessage()))
+        await enter_queues.called.get()
+        # Messages wait for the stream to open.
+        await asyncio.sleep(0)
+        assert not publish_1.done()
+        assert not publish_2.done()
+        await enter_queues.results.put(None)
+        assert await publish_1 == "a"
+        assert await publish_2 == "a"
+        mock_publishers[Partition(1)].__aenter__.assert_called_once()
+        mock_publishers[Partition(0)].__aenter__.assert_not_called()
+    mock_publishers[Partition(1)].__aexit__.assert_called_once()
+    mock_publishers[Partition(0)].__aexit__.assert_not_called()
+
+
+async def test_idle_publishers_closed(mock_publishers, mock_policies, mock_watcher):
+    publisher = PartitionCountWatchingPublisher(
+        mock_watcher,
+        lambda p: mock_publishers[p],
+        lambda c: mock_policies[c],
+        idle_close_seconds=0.01,
+    )
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    await get_queues.results.put(2)
+    mock_policies[2].route.return_value = Partition(1)
+    mock_publishers[Partition(1)].publish.return_value = "a"
+    exit_queues = wire_queues(mock_publishers[Partition(1)].__aexit__)
+    async with publisher:
+        await publisher.publish(PubSubMessage())
+        await exit_queues.called.get()
+        await exit_queues.results.put(None)
+        # The next message reopens the stream.
+        assert await publisher.publish(PubSubMessage()) == "a"
+        assert mock_publishers[Partition(1)].__aenter__.call_count == 2
+        await exit_queues.called.get()
+        await exit_queues.results.put(None)
+
+
+async def test_failed_open_exits_publisher(
+    mock_publishers, mock_policies, mock_watcher, publisher
+):
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    await get_queues.results.put(2)
+    mock_policies[2].route.return_value = Partition(1)
+    mock_publishers[Partition(1)].__aenter__.side_effect = GoogleAPICallError("error")
+    async with publisher:
+        with pytest.raises(GoogleAPICallError):
+            await publisher.publish(PubSubMessage())
+        mock_publishers[Partition(1)].__aexit__.assert_called_once()
+
+
+async def test_cancelled_open_exits_publisher(
+    mock_publishers, mock_policies, mock_watcher, publisher
+):
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    await get_queues.results.put(2)
+    mock_policies[2].route.return_value = Partition(1)
+    enter_queues = wire_queues(mock_publishers[Partition(1)].__aenter__)
+    async with publisher:
+        publish_fut = asyncio.ensure_future(publisher.publish(PubSubMessage()))
+        await enter_queues.called.get()
+    mock_publishers[Partition(1)].__aexit__.assert_called_once()
+    with pytest.raises(BaseException):
+        await publish_fut
+
+
+async def test_flush_waits_for_routing(
+    mock_publishers, mock_policies, mock_watcher, publisher
+):
+    get_queues = wire_queues(mock_watcher.get_partition_count)
+    async with publisher:
+        await get_queues.called.get()
+        mock_policies[2].route.return_value = Partition(1)
+        mock_publishers[Partition(1)].publish.return_value = "a"
+        publish_fut = asyncio.ensure_future(publisher.publish(PubSubMessage()))
+        await asyncio.sleep(0)
+        flush_fut = asyncio.ensure_future(publisher.flush())
+        await asyncio.sleep(0)
+        # The message has not reached a partition's publisher, so there is nothing to flush yet.
+        assert not flush_fut.done()
+        mock_publishers[Partition(1)].flush.assert_not_called()
+        await get_queues.results.put(2)
+        await flush_fut
+        mock_publishers[Partition(1)].publish.assert_called_once()
+        mock_publishers[Partition(1)].flush.assert_called_once()
+        assert await publish_fut == "a"
+
+
+async def test_flush_all_partitions(
+    mock_publishers, mock_policies, mock_watcher, publisher
+):
+    mock_watcher.get_partition_count.return_value = 2
+    async with publisher:
+        for partition in (Partition(0), Partition(1)):
+            mock_policies[2].route.return_value = partition
+            mock_publishers[partition].publish.return_value = "a"
+            assert await publisher.publish(PubSubMessage()) == "a"
+        await publisher.flush()
+        mock_publishers[Partition(0)].flush.assert_called_once()
+        mock_publishers[Partition(1)].flush.assert_called_once()
+
+
+async def test_publish_to_partition(
+    mock_publishers, mock_policies, mock_watcher, publisher
+):
+    mock_watcher.get_partition_count.return_value = 2
+    async with publisher:
+        mock_publishers[Partition(1)].publish.return_value = "a"
+        assert await publisher.publish(PubSubMessage(), Partition(1)) == "a"
+        mock_policies[2].route.assert_not_called()
+        for partition in (Partition(2), Partition(-1)):
+            with pytest.raises(InvalidPartition):
+                await publisher.publish(PubSubMessage(), partition)
+        mock_publishers[Partition(2)].__aenter__.assert_not_called()
+        # Rejected messages do not fail the publisher.
+        assert await publisher.publish(PubSubMessage(), Partition(1)) == "a"
@@ -0,0 +1,146 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import sys
+
+import pytest
+from google.api_core.exceptions import FailedPrecondition, InternalServerError
+
+from google.cloud.pubsublite.internal.wire.permanent_failable import PermanentFailable
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+async def test_result_without_creating_tasks():
+    loop = asyncio.get_event_loop()
+    created = []
+
+    def task_factory(loop, coro):
+        task = asyncio.Task(coro, loop=loop)
+        created.append(task)
+        return task
+
+    failable = PermanentFailable()
+    queue = asyncio.Queue()
+    await queue.put(1)
+    await queue.put(2)
+    loop.set_task_factory(task_factory)
+    try:
+        assert await failable.await_unless_failed(queue.get()) == 1
+        assert await failable.await_unless_failed(queue.get()) == 2
+    finally:
+        loop.set_task_factory(None)
+    assert created == []
+
+
+async def test_fail_interrupts_waiter():
+    failable = PermanentFailable()
+    never = asyncio.Future()
+    waiter = asyncio.ensure_future(failable.await_unless_failed(never))
+    await asyncio.sleep(0)
+    error = FailedPrecondition("failed")
+    failable.fail(error)
+    with pytest.raises(FailedPrecondition) as raised:
+        await waiter
+    assert raised.value is error
+    assert never.cancelled()
+
+
+async def test_already_failed():
+    failable = PermanentFailable()
+    failable.fail(FailedPrecondition("failed"))
+    queue = asyncio.Queue()
+    await queue.put(1)
+    with pytest.raises(FailedPrecondition):
+        await failable.await_unless_failed(queue.get())
+    assert queue.qsize() == 1
+
+
+async def test_cancellation_propagates():
+    failable = PermanentFailable()
+    waiter = asyncio.ensure_future(failable.await_unless_failed(asyncio.Future()))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert failable.error() is None
+
+
+async def test_inner_failure_through_outer():
+    outer = PermanentFailable()
+    inner = PermanentFailable()
+    waiter = asyncio.ensure_future(
+        outer.await_unless_failed(inner.await_unless_failed(asyncio.Future()))
+    )
+    await asyncio.sleep(0)
+    inner.fail(InternalServerError("inner"))
+    with pytest.raises(InternalServerError):
+        await waiter
+
+    waiter = asyncio.ensure_future(
+        outer.await_unless_failed(inner.await_unless_failed(asyncio.Future()))
+    )
+    # The inner failable is already failed.
+    with pytest.raises(InternalServerError):
+        await waiter
+
+
+async def test_outer_failure_through_inner():
+    outer = PermanentFailable()
+    inner = PermanentFailable()
+    waiter = asyncio.ensure_future(
+        outer.await_unless_failed(inner.await_unless_failed(asyncio.Future()))
+    )
+    await asyncio.sleep(0)
+    outer.fail(FailedPrecondition("outer"))
+    with pytest.raises(FailedPrecondition):
+        await waiter
+    assert inner.error() is None
+
+
+async def test_awaitable_fails_own_failable():
+    failable = PermanentFailable()
+
+    async def fail_then_return():
+        failable.fail(FailedPrecondition("failed"))
+        await asyncio.sleep(0)
+        return 1
+
+    assert await failable.await_unless_failed(fail_then_return()) == 1
+    with pytest.raises(FailedPrecondition):
+        await failable.await_unless_failed(fail_then_return())
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 11), reason="Cancellation requests are counted on 3.11+."
+)
+async def test_cancel_racing_fail_propagates():
+    failable = PermanentFailable()
+    waiter = asyncio.ensure_future(failable.await_unless_failed(asyncio.Future()))
+    await asyncio.sleep(0)
+    failable.fail(FailedPrecondition("failed"))
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert failable.error() is not None
+
+    failable = PermanentFailable()
+    waiter = asyncio.ensure_future(failable.await_unless_failed(asyncio.Future()))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    failable.fail(FailedPrecondition("failed"))
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert failable.error() is not None
@@ -0,0 +1,81 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from asynctest.mock import CoroutineMock
+import pytest
+
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import (
+    ReconnectLimiter,
+    jittered_backoff,
+    _MAX_BACKOFF_SECS,
+    _MIN_BACKOFF_SECS,
+)
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def asyncio_sleep(monkeypatch):
+    mock = CoroutineMock()
+    monkeypatch.setattr(asyncio, "sleep", mock)
+    return mock
+
+
+def test_jittered_backoff_bounds():
+    for retries in range(100):
+        ceiling = min(_MAX_BACKOFF_SECS, _MIN_BACKOFF_SECS * (2 ** retries))
+        assert 0 <= jittered_backoff(retries) <= ceiling
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        ReconnectLimiter(reconnects_per_second=0)
+    with pytest.raises(ValueError):
+        ReconnectLimiter(burst=0)
+
+
+async def test_burst_not_throttled(asyncio_sleep):
+    limiter = ReconnectLimiter(reconnects_per_second=1, burst=3)
+    for _ in range(3):
+        await limiter.acquire()
+    asyncio_sleep.assert_not_called()
+    stats = limiter.stats()
+    assert stats.reconnects == 3
+    assert stats.throttled == 0
+
+
+async def test_throttled_after_burst(asyncio_sleep):
+    limiter = ReconnectLimiter(reconnects_per_second=1, burst=1)
+    await limiter.acquire()
+    await limiter.acquire()
+    await limiter.acquire()
+    assert asyncio_sleep.call_count == 2
+    # Each waiter queues behind those before it.
+    first_delay = asyncio_sleep.call_args_list[0][0][0]
+    second_delay = asyncio_sleep.call_args_list[1][0][0]
+    assert 0 < first_delay <= 1
+    assert 1 < second_delay <= 2
+    stats = limiter.stats()
+    assert stats.reconnects == 3
+    assert stats.throttled == 2
+    assert stats.throttled_seconds == pytest.approx(first_delay + second_delay)
+
+
+async def test_budget_exhausted_recorded():
+    limiter = ReconnectLimiter()
+    limiter.record_budget_exhausted()
+    assert limiter.stats().budgets_exhausted == 1
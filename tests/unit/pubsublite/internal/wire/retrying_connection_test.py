@@ -22,12 +22,14 @@ from google.cloud.pubsublite.internal.wire.connection import (
     ConnectionFactory,
 )
 from google.cloud.pubsublite.internal.wire.connection_reinitializer import (
+    ConnectionRecycler,
     ConnectionReinitializer,
 )
-from google.cloud.pubsublite.internal.wire.retrying_connection import (
-    RetryingConnection,
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import (
+    ReconnectLimiter,
     _MIN_BACKOFF_SECS,
 )
+from google.cloud.pubsublite.internal.wire.retrying_connection import RetryingConnection
 from google.cloud.pubsublite.testing.test_utils import wire_queues
 
 # All test coroutines will be treated as marked.
@@ -119,9 +121,229 @@ async def test_reinitialize_after_retryable(
     await reinit_queues.results.put(InternalServerError("abc"))
     await reinit_queues.results.put(None)
     async with retrying_connection as _:
-        asyncio_sleep.assert_called_once_with(_MIN_BACKOFF_SECS)
+        asyncio_sleep.assert_called_once()
+        assert 0 <= asyncio_sleep.call_args[0][0] <= _MIN_BACKOFF_SECS
         assert reinitializer.reinitialize.call_count == 2
         assert await retrying_connection.read() == 1
         assert (
             default_connection.read.call_count == 2
         )  # re-call to read once first completes
+
+
+async def noop_reinitialize(connection):
+    pass
+
+
+def merge_even(first: int, second: int):
+    if first % 2 == 0 and second % 2 == 0:
+        return first + second
+    return None
+
+
+async def test_queued_writes_merged_and_pipelined(
+    connection_factory, reinitializer, default_connection
+):
+    reinitializer.reinitialize.side_effect = noop_reinitialize
+    wire_queues(default_connection.read)
+    write_queues = wire_queues(default_connection.write)
+    connection = RetryingConnection(
+        connection_factory, reinitializer, merge_requests=merge_even
+    )
+    async with connection:
+        writes = [
+            asyncio.ensure_future(connection.write(value)) for value in (1, 2, 4, 5)
+        ]
+        # All requests are sent before the first completes.
+        for _ in range(3):
+            await write_queues.called.get()
+        assert [args[0] for args, _ in default_connection.write.call_args_list] == [
+            1,
+            6,
+            5,
+        ]
+        assert not any(write.done() for write in writes)
+        for _ in range(3):
+            await write_queues.results.put(None)
+        await asyncio.gather(*writes)
+
+
+async def test_writes_complete_in_order(
+    connection_factory, reinitializer, default_connection
+):
+    reinitializer.reinitialize.side_effect = noop_reinitialize
+    wire_queues(default_connection.read)
+    results = {1: asyncio.Future(), 2: asyncio.Future()}
+    sent = asyncio.Queue()
+
+    async def write_action(value: int):
+        await sent.put(value)
+        await results[value]
+
+    default_connection.write.side_effect = write_action
+    connection = RetryingConnection(connection_factory, reinitializer)
+    async with connection:
+        first = asyncio.ensure_future(connection.write(1))
+        second = asyncio.ensure_future(connection.write(2))
+        assert [await sent.get(), await sent.get()] == [1, 2]
+        results[2].set_result(None)
+        await asyncio.sleep(0.01)
+        assert not second.done()
+        results[1].set_result(None)
+        await first
+        await second
+
+
+async def test_pipeline_depth_bounds_in_flight(
+    connection_factory, reinitializer, default_connection
+):
+    reinitializer.reinitialize.side_effect = noop_reinitialize
+    wire_queues(default_connection.read)
+    write_queues = wire_queues(default_connection.write)
+    connection = RetryingConnection(
+        connection_factory, reinitializer, write_pipeline_depth=2
+    )
+    async with connection:
+        writes = [asyncio.ensure_future(connection.write(value)) for value in range(3)]
+        await write_queues.called.get()
+        await write_queues.called.get()
+        await asyncio.sleep(0.01)
+        assert write_queues.called.empty()
+        await write_queues.results.put(None)
+        await write_queues.called.get()
+        await write_queues.results.put(None)
+        await write_queues.results.put(None)
+        await asyncio.gather(*writes)
+
+
+async def test_write_failure_fails_pipelined_writes(
+    connection_factory, reinitializer, default_connection, asyncio_sleep
+):
+    reinitializer.reinitialize.side_effect = noop_reinitialize
+    wire_queues(default_connection.read)
+    write_queues = wire_queues(default_connection.write)
+    connection = RetryingConnection(connection_factory, reinitializer)
+    async with connection:
+        first = asyncio.ensure_future(connection.write(1))
+        second = asyncio.ensure_future(connection.write(2))
+        await write_queues.called.get()
+        await write_queues.called.get()
+        await write_queues.results.put(InternalServerError("abc"))
+        with pytest.raises(InternalServerError):
+            await first
+        with pytest.raises(InternalServerError):
+            await second
+        # The connection is reestablished.
+        reinitializer.reinitialize.assert_called()
+
+
+async def test_reconnect_waits_for_limiter(
+    connection_factory, reinitializer, default_connection, asyncio_sleep
+):
+    limiter = MagicMock(spec=ReconnectLimiter)
+    reinit_queues = wire_queues(reinitializer.reinitialize)
+    default_connection.read.return_value = 1
+
+    await reinit_queues.results.put(InternalServerError("abc"))
+    await reinit_queues.results.put(None)
+    connection = RetryingConnection(
+        connection_factory, reinitializer, reconnect_limiter=limiter
+    )
+    async with connection:
+        # Only the reconnect is limited, not the first connection.
+        limiter.acquire.assert_called_once()
+        assert reinitializer.reinitialize.call_count == 2
+
+
+async def test_retry_budget_exhausted(
+    connection_factory, reinitializer, default_connection, asyncio_sleep
+):
+    limiter = MagicMock(spec=ReconnectLimiter)
+    reinit_queues = wire_queues(reinitializer.reinitialize)
+
+    await reinit_queues.results.put(InternalServerError("abc"))
+    await reinit_queues.results.put(InternalServerError("def"))
+    connection = RetryingConnection(
+        connection_factory, reinitializer, reconnect_limiter=limiter, retry_budget=1
+    )
+    with pytest.raises(InternalServerError, match="def"):
+        async with connection:
+            pass
+    assert reinitializer.reinitialize.call_count == 2
+    limiter.record_budget_exhausted.assert_called_once()
+
+
+def make_connection():
+    conn = MagicMock(spec=Connection)
+    conn.__aenter__.return_value = conn
+    return conn
+
+
+async def test_recycle_requires_recycler(connection_factory, reinitializer):
+    with pytest.raises(ValueError):
+        RetryingConnection(connection_factory, reinitializer, recycle_seconds=1)
+
+
+async def test_recycle_hands_off_after_drain(connection_factory, reinitializer):
+    reinitializer.reinitialize.side_effect = noop_reinitialize
+    first, second, third = make_connection(), make_connection(), make_connection()
+    connection_factory.new.side_effect = [first, second, third]
+    first_reads = wire_queues(first.read)
+    second_reads = wire_queues(second.read)
+    wire_queues(third.read)
+    recycler = MagicMock(spec=ConnectionRecycler)
+    init_queues = wire_queues(recycler.initialize_replacement)
+    connection = RetryingConnection(
+        connection_factory, reinitializer, recycle_seconds=0, recycler=recycler
+    )
+    async with connection:
+        await connection.write(1)
+        first.write.assert_called_once_with(1)
+        await init_queues.called.get()
+        recycler.initialize_replacement.assert_called_once_with(second)
+        await init_queues.results.put(None)
+        await asyncio.sleep(0.01)
+
+        # Writes are held until the write sent on the first connection is answered.
+        write = asyncio.ensure_future(connection.write(2))
+        await asyncio.sleep(0.01)
+        assert not write.done()
+        second.write.assert_not_called()
+        await first_reads.called.get()
+        await first_reads.results.put(10)
+        assert await connection.read() == 10
+
+        await write
+        first.write.assert_called_once_with(1)
+        second.write.assert_called_once_with(2)
+        first.__aexit__.assert_called_once()
+        second.__aexit__.assert_not_called()
+        # The replacement is not reinitialized.
+        reinitializer.reinitialize.assert_called_once_with(first)
+        await second_reads.called.get()
+        await second_reads.results.put(20)
+        assert await connection.read() == 20
+
+
+async def test_failed_replacement_keeps_connection(connection_factory, reinitializer):
+    reinitializer.reinitialize.side_effect = noop_reinitialize
+    first, second, third = make_connection(), make_connection(), make_connection()
+    connection_factory.new.side_effect = [first, second, third]
+    first_reads = wire_queues(first.read)
+    recycler = MagicMock(spec=ConnectionRecycler)
+    init_queues = wire_queues(recycler.initialize_replacement)
+    connection = RetryingConnection(
+        connection_factory, reinitializer, recycle_seconds=0, recycler=recycler
+    )
+    async with connection:
+        await init_queues.called.get()
+        await init_queues.results.put(InternalServerError("abc"))
+        # Another replacement is attempted.
+        await init_queues.called.get()
+        second.__aexit__.assert_called_once()
+        await connection.write(1)
+        first.write.assert_called_once_with(1)
+        await first_reads.called.get()
+        await first_reads.results.put(10)
+        assert await connection.read() == 10
+    # The replacement being initialized is closed on shutdown.
+    third.__aexit__.assert_called_once()
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import asyncio
+import random
 from unittest.mock import call
 from collections import defaultdict
 from typing import Dict, List
@@ -25,7 +26,10 @@ from google.cloud.pubsublite.internal.wire.connection import (
     Connection,
     ConnectionFactory,
 )
-from google.api_core.exceptions import InternalServerError
+from google.api_core.exceptions import (
+    FailedPrecondition,
+    InternalServerError,
+)
 from google.cloud.pubsublite_v1.types.publisher import (
     InitialPublishRequest,
     PublishRequest,
@@ -36,9 +40,16 @@ from google.cloud.pubsublite_v1.types.common import PubSubMessage, Cursor
 from google.cloud.pubsublite.internal.wire.single_partition_publisher import (
     SinglePartitionPublisher,
 )
-from google.cloud.pubsublite.internal.wire.publisher import Publisher
-from google.cloud.pubsublite.testing.test_utils import make_queue_waiter
-from google.cloud.pubsublite.internal.wire.retrying_connection import _MIN_BACKOFF_SECS
+from google.cloud.pubsublite.internal.wire import single_partition_publisher
+from google.cloud.pubsublite.internal.wire.publisher import InvalidPartition, Publisher
+from google.cloud.pubsublite.internal.wire.work_item import WorkItem
+from google.cloud.pubsublite.types import Partition
+from google.cloud.pubsublite.testing.test_utils import (
+    FakeFlushScheduler,
+    make_queue_waiter,
+    wire_queues,
+)
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import _MIN_BACKOFF_SECS
 
 FLUSH_SECONDS = 100000
 BATCHING_SETTINGS = BatchSettings(
@@ -87,6 +98,8 @@ def asyncio_sleep(monkeypatch, sleep_queues):
     """Requests.get() mocked to return {'mock_key':'mock_response'}."""
     mock = CoroutineMock()
     monkeypatch.setattr(asyncio, "sleep", mock)
+    # Back off for the full, unjittered, delay.
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
 
     async def sleeper(delay: float):
         await make_queue_waiter(
@@ -98,9 +111,17 @@ def asyncio_sleep(monkeypatch, sleep_queues):
 
 
 @pytest.fixture()
-def publisher(connection_factory, initial_request):
+def flush_scheduler():
+    return FakeFlushScheduler()
+
+
+@pytest.fixture()
+def publisher(connection_factory, initial_request, flush_scheduler):
     return SinglePartitionPublisher(
-        initial_request.initial_request, BATCHING_SETTINGS, connection_factory
+        initial_request.initial_request,
+        BATCHING_SETTINGS,
+        connection_factory,
+        flush_scheduler=flush_scheduler,
     )
 
 
@@ -124,9 +145,8 @@ async def test_basic_publish_after_timeout(
     initial_request,
     asyncio_sleep,
     sleep_queues,
+    flush_scheduler,
 ):
-    sleep_called = sleep_queues[FLUSH_SECONDS].called
-    sleep_results = sleep_queues[FLUSH_SECONDS].results
     message1 = PubSubMessage(data=b"abc")
     message2 = PubSubMessage(data=b"def")
     read_called_queue = asyncio.Queue()
@@ -146,18 +166,14 @@ async def test_basic_publish_after_timeout(
         assert not publish_fut1.done()
         assert not publish_fut2.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_called_with(FLUSH_SECONDS)
-
-        # Handle the connection write
+        # Handle the connection write once the batch has waited FLUSH_SECONDS
         write_future = asyncio.Future()
 
         async def write(val: PublishRequest):
             write_future.set_result(None)
 
         default_connection.write.side_effect = write
-        await sleep_results.put(None)
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
         await write_future
         default_connection.write.assert_has_calls(
             [call(initial_request), call(as_publish_request([message1, message2]))]
@@ -179,9 +195,8 @@ async def test_publishes_multi_cycle(
     initial_request,
     asyncio_sleep,
     sleep_queues,
+    flush_scheduler,
 ):
-    sleep_called = sleep_queues[FLUSH_SECONDS].called
-    sleep_results = sleep_queues[FLUSH_SECONDS].results
     message1 = PubSubMessage(data=b"abc")
     message2 = PubSubMessage(data=b"def")
     write_called_queue = asyncio.Queue()
@@ -206,12 +221,10 @@ async def test_publishes_multi_cycle(
         publish_fut1 = asyncio.ensure_future(publisher.publish(message1))
         assert not publish_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_called_with(FLUSH_SECONDS)
+        # Flush once the batch has waited FLUSH_SECONDS
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
 
         # Handle the connection write
-        await sleep_results.put(None)
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -219,16 +232,12 @@ async def test_publishes_multi_cycle(
         )
         assert not publish_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_has_calls([call(FLUSH_SECONDS), call(FLUSH_SECONDS)])
-
         # Write message 2
         publish_fut2 = asyncio.ensure_future(publisher.publish(message2))
         assert not publish_fut2.done()
 
         # Handle the connection write
-        await sleep_results.put(None)
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -257,9 +266,8 @@ async def test_publishes_retried_on_restart(
     initial_request,
     asyncio_sleep,
     sleep_queues,
+    flush_scheduler,
 ):
-    sleep_called = sleep_queues[FLUSH_SECONDS].called
-    sleep_results = sleep_queues[FLUSH_SECONDS].results
     message1 = PubSubMessage(data=b"abc")
     message2 = PubSubMessage(data=b"def")
     write_called_queue = asyncio.Queue()
@@ -284,12 +292,10 @@ async def test_publishes_retried_on_restart(
         publish_fut1 = asyncio.ensure_future(publisher.publish(message1))
         assert not publish_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_called_with(FLUSH_SECONDS)
+        # Flush once the batch has waited FLUSH_SECONDS
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
 
         # Handle the connection write
-        await sleep_results.put(None)
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -297,16 +303,12 @@ async def test_publishes_retried_on_restart(
         )
         assert not publish_fut1.done()
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_has_calls([call(FLUSH_SECONDS), call(FLUSH_SECONDS)])
-
         # Write message 2
         publish_fut2 = asyncio.ensure_future(publisher.publish(message2))
         assert not publish_fut2.done()
 
         # Handle the connection write
-        await sleep_results.put(None)
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
         await write_called_queue.get()
         await write_result_queue.put(None)
         default_connection.write.assert_has_calls(
@@ -329,26 +331,175 @@ async def test_publishes_retried_on_restart(
         write_result_queue.put_nowait(None)
         await read_called_queue.get()
         read_result_queue.put_nowait(PublishResponse(initial_response={}))
-        # Re-sending messages on the new stream
+        # Re-sending messages on the new stream, combined into one request
         await write_called_queue.get()
         await write_result_queue.put(None)
-        await write_called_queue.get()
-        await write_result_queue.put(None)
-        asyncio_sleep.assert_has_calls(
-            [
-                call(FLUSH_SECONDS),
-                call(FLUSH_SECONDS),
-                call(FLUSH_SECONDS),
-                call(_MIN_BACKOFF_SECS),
-            ]
-        )
+        asyncio_sleep.assert_has_calls([call(_MIN_BACKOFF_SECS)])
         default_connection.write.assert_has_calls(
             [
                 call(initial_request),
                 call(as_publish_request([message1])),
                 call(as_publish_request([message2])),
                 call(initial_request),
-                call(as_publish_request([message1])),
-                call(as_publish_request([message2])),
+                call(as_publish_request([message1, message2])),
             ]
         )
+
+        # One response covers both messages
+        await read_called_queue.get()
+        await read_result_queue.put(as_publish_response(100))
+        assert (await publish_fut1).cursor.offset == 100
+        assert (await publish_fut2).cursor.offset == 101
+
+
+def test_repack_respects_limits(monkeypatch):
+    monkeypatch.setattr(single_partition_publisher, "_MAX_MESSAGES", 3)
+    monkeypatch.setattr(single_partition_publisher, "_MAX_BYTES", 100)
+
+    def batch(*sizes: int):
+        return [WorkItem(PubSubMessage(data=b"a" * size)) for size in sizes]
+
+    # Messages of 1 data byte are 3 bytes, and of 96 data bytes are 98 bytes.
+    batches = [batch(1), batch(1, 1), batch(1), batch(96), batch(1), batch(1)]
+    repacked = SinglePartitionPublisher._repack(batches)
+    assert repacked == [
+        batches[0] + batches[1],
+        batches[2],
+        batches[3],
+        batches[4] + batches[5],
+    ]
+
+
+async def test_resent_batches_pipelined(
+    publisher, default_connection, initial_request, monkeypatch
+):
+    monkeypatch.setattr(single_partition_publisher, "_MAX_MESSAGES", 1)
+    message1 = PubSubMessage(data=b"abc")
+    message2 = PubSubMessage(data=b"def")
+    publisher._outstanding_writes = [[WorkItem(message1)], [WorkItem(message2)]]
+    default_connection.read.return_value = PublishResponse(initial_response={})
+    write_queues = wire_queues(default_connection.write)
+    await write_queues.results.put(None)
+    reinitialize = asyncio.ensure_future(publisher.reinitialize(default_connection))
+    await write_queues.called.get()
+    # Both batches are written before either write completes.
+    await write_queues.called.get()
+    await write_queues.called.get()
+    assert not reinitialize.done()
+    await write_queues.results.put(None)
+    await write_queues.results.put(None)
+    await reinitialize
+    default_connection.write.assert_has_calls(
+        [
+            call(initial_request),
+            call(as_publish_request([message1])),
+            call(as_publish_request([message2])),
+        ]
+    )
+    await publisher._stop_loopers()
+
+
+async def test_initialize_replacement(publisher, default_connection, initial_request):
+    default_connection.read.return_value = PublishResponse(initial_response={})
+    await publisher.initialize_replacement(default_connection)
+    default_connection.write.assert_called_once_with(initial_request)
+
+    default_connection.read.return_value = as_publish_response(0)
+    with pytest.raises(FailedPrecondition):
+        await publisher.initialize_replacement(default_connection)
+
+
+async def test_flush_sends_without_waiting(
+    publisher: Publisher, default_connection, initial_request, flush_scheduler,
+):
+    message1 = PubSubMessage(data=b"abc")
+    message2 = PubSubMessage(data=b"def")
+    read_called_queue = asyncio.Queue()
+    read_result_queue = asyncio.Queue()
+    default_connection.read.side_effect = make_queue_waiter(
+        read_called_queue, read_result_queue
+    )
+    read_result_queue.put_nowait(PublishResponse(initial_response={}))
+    async with publisher:
+        await read_called_queue.get()
+        publish_fut1 = asyncio.ensure_future(publisher.publish(message1))
+        publish_fut2 = asyncio.ensure_future(publisher.publish(message2))
+        await asyncio.sleep(0)
+
+        # The batch is sent as soon as the flush starts, and the flush completes once it is acknowledged.
+        write_future = asyncio.Future()
+
+        async def write(val: PublishRequest):
+            write_future.set_result(None)
+
+        default_connection.write.side_effect = write
+        flush_fut = asyncio.ensure_future(publisher.flush())
+        await write_future
+        default_connection.write.assert_has_calls(
+            [call(initial_request), call(as_publish_request([message1, message2]))]
+        )
+        assert not flush_fut.done()
+        await read_result_queue.put(as_publish_response(100))
+        await flush_fut
+        assert publish_fut1.done()
+        assert publish_fut2.done()
+
+        # Nothing is outstanding, so a second flush completes immediately.
+        await publisher.flush()
+        assert default_connection.write.call_count == 2
+
+
+async def test_publish_to_other_partition_rejected(publisher: Publisher):
+    with pytest.raises(InvalidPartition):
+        await publisher.publish(PubSubMessage(data=b"abc"), Partition(1))
+
+
+async def test_cancelled_flush_still_sends_batch(
+    publisher: Publisher, default_connection
+):
+    released = asyncio.Event()
+    sent = asyncio.Queue()
+
+    async def write(request: PublishRequest):
+        if "message_publish_request" in request:
+            await released.wait()
+            await sent.put(request)
+
+    default_connection.write.side_effect = write
+    read_called_queue = asyncio.Queue()
+    read_result_queue = asyncio.Queue()
+    default_connection.read.side_effect = make_queue_waiter(
+        read_called_queue, read_result_queue
+    )
+    read_result_queue.put_nowait(PublishResponse(initial_response={}))
+    async with publisher:
+        await read_called_queue.get()
+        # More batches than can be in flight and queued on the connection at once.
+        batch_count = 40
+        publishes = []
+        flushes = []
+
+        def publish_and_flush(index: int):
+            message = PubSubMessage(data=str(index).encode())
+            publishes.append(asyncio.ensure_future(publisher.publish(message)))
+            flushes.append(asyncio.ensure_future(publisher.flush()))
+
+        for index in range(batch_count):
+            publish_and_flush(index)
+        for _ in range(batch_count):
+            await asyncio.sleep(0)
+        # Writes are blocked, so the connection's write queue is full and the last flush is waiting to queue its
+        # batch.
+        cancelled = flushes.pop()
+        cancelled.cancel()
+        publish_and_flush(batch_count)
+        released.set()
+        for _ in range(batch_count + 1):
+            # A batch which was recorded but never queued is never sent.
+            request = await asyncio.wait_for(sent.get(), 5)
+            index = int(request.message_publish_request.messages[0].data)
+            await read_result_queue.put(as_publish_response(index * 10))
+        for index, publish in enumerate(publishes):
+            assert (await publish).cursor.offset == index * 10
+        await asyncio.gather(*flushes)
+        assert cancelled.cancelled()
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import asyncio
+import random
 from unittest.mock import call
 from collections import defaultdict
 from typing import Dict, List
@@ -28,7 +29,10 @@ from google.cloud.pubsublite.internal.wire.connection import (
 from google.api_core.exceptions import InternalServerError, GoogleAPICallError
 
 from google.cloud.pubsublite.internal.wire.subscriber import Subscriber
-from google.cloud.pubsublite.internal.wire.subscriber_impl import SubscriberImpl
+from google.cloud.pubsublite.internal.wire.subscriber_impl import (
+    SubscriberImpl,
+    merge_flow_control_requests,
+)
 from google.cloud.pubsublite_v1 import (
     SubscribeRequest,
     SubscribeResponse,
@@ -37,8 +41,11 @@ from google.cloud.pubsublite_v1 import (
     SeekRequest,
 )
 from google.cloud.pubsublite_v1.types.common import Cursor, SequencedMessage
-from google.cloud.pubsublite.testing.test_utils import make_queue_waiter
-from google.cloud.pubsublite.internal.wire.retrying_connection import _MIN_BACKOFF_SECS
+from google.cloud.pubsublite.testing.test_utils import (
+    FakeFlushScheduler,
+    make_queue_waiter,
+)
+from google.cloud.pubsublite.internal.wire.reconnect_limiter import _MIN_BACKOFF_SECS
 
 FLUSH_SECONDS = 100000
 
@@ -84,6 +91,8 @@ def asyncio_sleep(monkeypatch, sleep_queues):
     """Requests.get() mocked to return {'mock_key':'mock_response'}."""
     mock = CoroutineMock()
     monkeypatch.setattr(asyncio, "sleep", mock)
+    # Back off for the full, unjittered, delay.
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
 
     async def sleeper(delay: float):
         await make_queue_waiter(
@@ -95,8 +104,18 @@ def asyncio_sleep(monkeypatch, sleep_queues):
 
 
 @pytest.fixture()
-def subscriber(connection_factory, initial_request):
-    return SubscriberImpl(initial_request.initial, FLUSH_SECONDS, connection_factory)
+def flush_scheduler():
+    return FakeFlushScheduler()
+
+
+@pytest.fixture()
+def subscriber(connection_factory, initial_request, flush_scheduler):
+    return SubscriberImpl(
+        initial_request.initial,
+        FLUSH_SECONDS,
+        connection_factory,
+        flush_scheduler=flush_scheduler,
+    )
 
 
 def as_request(flow: FlowControlRequest):
@@ -112,14 +131,8 @@ def as_response(messages: List[SequencedMessage]):
 
 
 async def test_basic_flow_control_after_timeout(
-    subscriber: Subscriber,
-    default_connection,
-    initial_request,
-    asyncio_sleep,
-    sleep_queues,
+    subscriber: Subscriber, default_connection, initial_request, flush_scheduler,
 ):
-    sleep_called = sleep_queues[FLUSH_SECONDS].called
-    sleep_results = sleep_queues[FLUSH_SECONDS].results
     write_called_queue = asyncio.Queue()
     write_result_queue = asyncio.Queue()
     flow_1 = FlowControlRequest(allowed_messages=100, allowed_bytes=100)
@@ -157,12 +170,10 @@ async def test_basic_flow_control_after_timeout(
         await subscriber.allow_flow(flow_2)
         await subscriber.allow_flow(flow_3)
 
-        # Wait for writes to be waiting
-        await sleep_called.get()
-        asyncio_sleep.assert_called_with(FLUSH_SECONDS)
+        # Flush once the tokens have waited FLUSH_SECONDS
+        assert await flush_scheduler.run_next() == FLUSH_SECONDS
 
         # Handle the connection write
-        await sleep_results.put(None)
         await write_called_queue.get()
         await write_result_queue.put(None)
         # Called with aggregate
@@ -400,3 +411,53 @@ async def test_out_of_order_receipt_failure(
         except GoogleAPICallError as e:
             assert e.grpc_status_code == StatusCode.FAILED_PRECONDITION
         pass
+
+
+async def test_read_batch(subscriber: Subscriber, default_connection, initial_request):
+    write_called_queue = asyncio.Queue()
+    write_result_queue = asyncio.Queue()
+    flow = FlowControlRequest(allowed_messages=100, allowed_bytes=100)
+    message_1 = SequencedMessage(cursor=Cursor(offset=3), size_bytes=5)
+    message_2 = SequencedMessage(cursor=Cursor(offset=5), size_bytes=10)
+    default_connection.write.side_effect = make_queue_waiter(
+        write_called_queue, write_result_queue
+    )
+    read_called_queue = asyncio.Queue()
+    read_result_queue = asyncio.Queue()
+    default_connection.read.side_effect = make_queue_waiter(
+        read_called_queue, read_result_queue
+    )
+    read_result_queue.put_nowait(SubscribeResponse(initial={}))
+    write_result_queue.put_nowait(None)
+    async with subscriber:
+        await write_called_queue.get()
+        await read_called_queue.get()
+        flow_fut = asyncio.ensure_future(subscriber.allow_flow(flow))
+        await write_called_queue.get()
+        await write_result_queue.put(None)
+        await flow_fut
+
+        await read_result_queue.put(as_response([message_1, message_2]))
+        await read_called_queue.get()
+        assert (await subscriber.read_batch()) == [message_1, message_2]
+
+
+def test_merge_flow_control_requests():
+    merged = merge_flow_control_requests(
+        SubscribeRequest(
+            flow_control=FlowControlRequest(allowed_messages=1, allowed_bytes=10)
+        ),
+        SubscribeRequest(
+            flow_control=FlowControlRequest(allowed_messages=2, allowed_bytes=20)
+        ),
+    )
+    assert merged == SubscribeRequest(
+        flow_control=FlowControlRequest(allowed_messages=3, allowed_bytes=30)
+    )
+    assert (
+        merge_flow_control_requests(
+            SubscribeRequest(seek=SeekRequest(cursor=Cursor(offset=1))),
+            SubscribeRequest(flow_control=FlowControlRequest(allowed_messages=1)),
+        )
+        is None
+    )
@@ -0,0 +1,105 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+from typing import List
+
+import pytest
+
+
+def modules_loaded_by(statement: str) -> List[str]:
+    # Forking after other tests have used grpc can deadlock in grpc's fork handlers. Without close_fds, subprocess
+    # starts the interpreter with posix_spawn, which does not run them, where it is available.
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-W",
+            "ignore",
+            "-c",
+            f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))",
+        ],
+        close_fds=False,
+    )
+    return output.decode().split()
+
+
+def services_loaded_by(statement: str) -> List[str]:
+    prefix = "google.cloud.pubsublite_v1.services."
+    return sorted(
+        {
+            module[len(prefix) :].split(".")[0]
+            for module in modules_loaded_by(statement)
+            if module.startswith(prefix)
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import google.cloud.pubsublite",
+        "import google.cloud.pubsublite_v1",
+        "import google.cloud.pubsublite.cloudpubsub",
+        "from google.cloud.pubsublite.types import TopicPath",
+        "from google.cloud.pubsublite_v1 import PubSubMessage",
+    ],
+)
+def test_import_loads_no_services(statement):
+    assert services_loaded_by(statement) == []
+
+
+def test_package_import_skips_cloud_pubsub():
+    assert "google.cloud.pubsub_v1" not in modules_loaded_by(
+        "import google.cloud.pubsublite"
+    )
+
+
+def test_admin_client_loads_admin_service():
+    assert services_loaded_by("from google.cloud.pubsublite import AdminClient") == [
+        "admin_service"
+    ]
+
+
+def test_publisher_client_skips_subscriber_services():
+    loaded = services_loaded_by(
+        "from google.cloud.pubsublite.cloudpubsub import PublisherClient"
+    )
+    assert "subscriber_service" not in loaded
+    assert "cursor_service" not in loaded
+    assert "partition_assignment_service" not in loaded
+
+
+def test_lazy_attributes_match_eager_imports():
+    import google.cloud.pubsublite as pubsublite
+    import google.cloud.pubsublite_v1 as pubsublite_v1
+    import google.cloud.pubsublite.cloudpubsub as cloudpubsub
+
+    for module in (pubsublite, pubsublite_v1, cloudpubsub):
+        for name in module.__all__:
+            assert getattr(module, name) is not None
+            assert name in dir(module)
+    from google.cloud.pubsublite_v1.services.admin_service.client import (
+        AdminServiceClient,
+    )
+
+    assert pubsublite.AdminServiceClient is AdminServiceClient
+    assert pubsublite_v1.AdminServiceClient is AdminServiceClient
+
+
+def test_unknown_attribute_raises():
+    import google.cloud.pubsublite as pubsublite
+
+    with pytest.raises(AttributeError):
+        pubsublite.NotAName